@@ -0,0 +1,187 @@
+"""
+Ejecución en batch de la matriz provider × país.
+
+Cada config.json declara `countries` → `providers`. Este módulo expande esa
+matriz (AgentConfig.get_country_codes() / get_providers()) y ejecuta cada
+celda con concurrencia acotada global y por agente, devolviendo los
+resultados a medida que terminan.
+
+API Python:
+    request = BatchRunRequest(agents=["electricity"])
+    async for cell in iter_batch(request):
+        print(cell.country_code, cell.provider, cell.status)
+
+    response = await run_batch(request)   # todos los resultados + resumen
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from aifoundry.app.config import settings
+from aifoundry.app.core.agents.registry import get_agent_registry
+
+from .runner import get_agent_entry, prepare_run, run_prepared
+from .schemas import (
+    AgentRunRequest,
+    BatchCellResult,
+    BatchRunRequest,
+    BatchRunResponse,
+    BatchSummary,
+)
+
+logger = logging.getLogger(__name__)
+
+# (agent_name, country_code, provider)
+BatchCell = Tuple[str, str, str]
+
+
+def expand_matrix(request: BatchRunRequest) -> List[BatchCell]:
+    """
+    Expande la matriz agente × país × provider declarada en los config.json.
+
+    Los países sin providers declarados se omiten (cada celda necesita un
+    provider). Los filtros `countries`/`providers` del request restringen
+    la matriz a esos valores.
+
+    Raises:
+        HTTPException: 404 si algún agente no existe.
+    """
+    agent_names = request.agents or get_agent_registry().names()
+    countries = set(request.countries) if request.countries else None
+    providers = set(request.providers) if request.providers else None
+
+    cells: List[BatchCell] = []
+    for agent_name in agent_names:
+        config = get_agent_entry(agent_name).config
+        for country_code in config.get_country_codes():
+            if countries is not None and country_code not in countries:
+                continue
+            for provider in config.get_providers(country_code):
+                if providers is not None and provider not in providers:
+                    continue
+                cells.append((agent_name, country_code, provider))
+    return cells
+
+
+async def _run_cell(
+    cell: BatchCell,
+    request: BatchRunRequest,
+    global_sem: asyncio.Semaphore,
+    agent_sem: asyncio.Semaphore,
+) -> BatchCellResult:
+    """Ejecuta una celda respetando los límites de concurrencia."""
+    agent_name, country_code, provider = cell
+    queued_at = time.monotonic()
+
+    # Primero el límite por agente: no ocupar un hueco global mientras se espera
+    async with agent_sem, global_sem:
+        started = time.monotonic()
+        status, result, error = "error", None, None
+        try:
+            run_request = AgentRunRequest(
+                provider=provider,
+                country_code=country_code,
+                structured_output=request.structured_output,
+                use_mcp=request.use_mcp,
+                disable_simple_scrape=request.disable_simple_scrape,
+                max_retries=request.max_retries,
+                deadline_seconds=request.deadline_seconds,
+                cache=request.cache,
+            )
+            prepared = prepare_run(agent_name, run_request)
+            result = await run_prepared(prepared)
+            status = result.status
+        except HTTPException as e:
+            error = str(e.detail)
+        except Exception as e:
+            logger.warning(f"Batch: celda {cell} falló: {e}")
+            error = str(e) or type(e).__name__
+        finished = time.monotonic()
+
+    return BatchCellResult(
+        agent_name=agent_name,
+        country_code=country_code,
+        provider=provider,
+        status=status,
+        duration_seconds=round(finished - started, 3),
+        queued_seconds=round(started - queued_at, 3),
+        result=result,
+        error=error,
+    )
+
+
+async def iter_batch(
+    request: BatchRunRequest,
+    cells: Optional[List[BatchCell]] = None,
+) -> AsyncIterator[BatchCellResult]:
+    """
+    Ejecuta la matriz y va devolviendo cada celda según termina.
+
+    Args:
+        request: Opciones del batch (filtros, flags del agente, concurrencia).
+        cells: Celdas ya expandidas (por defecto expand_matrix(request)).
+
+    Yields:
+        BatchCellResult en orden de finalización.
+    """
+    if cells is None:
+        cells = expand_matrix(request)
+
+    max_concurrency = request.max_concurrency or settings.batch_max_concurrency
+    per_agent = request.per_agent_concurrency or settings.batch_per_agent_concurrency
+    global_sem = asyncio.Semaphore(max_concurrency)
+    agent_sems: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(per_agent))
+
+    logger.info(
+        f"Batch: {len(cells)} celdas (concurrencia global={max_concurrency}, "
+        f"por agente={per_agent})"
+    )
+
+    tasks = [
+        asyncio.create_task(_run_cell(cell, request, global_sem, agent_sems[cell[0]]))
+        for cell in cells
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Cliente desconectado o consumidor que abandona: no dejar celdas huérfanas
+        pending = [t for t in tasks if not t.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+def summarize_batch(results: List[BatchCellResult], duration_seconds: float) -> BatchSummary:
+    """Calcula el resumen agregado de un batch."""
+    by_agent: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for cell in results:
+        by_agent[cell.agent_name][cell.status] += 1
+
+    durations = [cell.duration_seconds for cell in results]
+    return BatchSummary(
+        total=len(results),
+        succeeded=sum(1 for c in results if c.status == "success"),
+        partial=sum(1 for c in results if c.status == "partial"),
+        failed=sum(1 for c in results if c.error is not None or c.status == "error"),
+        duration_seconds=round(duration_seconds, 3),
+        cell_seconds_avg=round(sum(durations) / len(durations), 3) if durations else 0.0,
+        cell_seconds_max=max(durations, default=0.0),
+        by_agent={name: dict(counts) for name, counts in by_agent.items()},
+    )
+
+
+async def run_batch(request: BatchRunRequest) -> BatchRunResponse:
+    """Ejecuta la matriz completa y devuelve todos los resultados + resumen."""
+    started = time.monotonic()
+    results = [cell async for cell in iter_batch(request)]
+    return BatchRunResponse(
+        results=results,
+        summary=summarize_batch(results, time.monotonic() - started),
+    )
@@ -0,0 +1,58 @@
+"""
+Wiring de jobs asíncronos para la API.
+
+Conecta el JobManager genérico (core/jobs.py) con la ejecución de agentes
+de la API: cada job es un AgentRunRequest serializado que se ejecuta con
+el mismo camino que POST /agents/{name}/run.
+"""
+
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException
+
+from aifoundry.app.config import settings
+from aifoundry.app.core.jobs import JobManager, JobStore
+
+from .runner import prepare_run, run_prepared
+from .schemas import AgentRunRequest
+
+
+async def _run_job(agent_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Executor de jobs: payload → AgentRunResponse serializado."""
+    request = AgentRunRequest(**payload)
+    try:
+        prepared = prepare_run(agent_name, request)
+        response = await run_prepared(prepared)
+    except HTTPException as e:
+        # El agente/país pudo desaparecer entre el submit y la ejecución,
+        # o cache='only' sin resultado cacheado
+        raise RuntimeError(e.detail) from e
+    return response.model_dump()
+
+
+# Singleton global del job manager
+_job_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """
+    Obtiene el singleton del JobManager de la API.
+
+    Returns:
+        Instancia global configurada desde settings (se arranca en el lifespan).
+    """
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager(
+            JobStore(settings.job_db_path),
+            _run_job,
+            workers=settings.job_workers,
+            max_queued=settings.job_max_queued,
+        )
+    return _job_manager
+
+
+def reset_job_manager() -> None:
+    """Resetea el singleton (útil para tests)."""
+    global _job_manager
+    _job_manager = None
@@ -5,33 +5,63 @@ Endpoints REST para gestionar y ejecutar agentes de IA.
 
 Endpoints:
     GET  /health                    — Health check detallado
+    GET  /metrics                   — Métricas en formato Prometheus
     GET  /agents                    — Lista agentes disponibles
     GET  /agents/{agent_name}/config — Devuelve config.json de un agente
     POST /agents/{agent_name}/run   — Ejecuta un agente
+    GET|POST /agents/{agent_name}/run/stream — Ejecuta un agente emitiendo progreso (SSE)
+    POST /agents/reload             — Recarga el registro de agentes desde disco
+    POST /agents/{agent_name}/jobs  — Crea un job asíncrono
+    GET  /jobs/{job_id}             — Estado y resultado de un job
+    DELETE /jobs/{job_id}           — Cancela un job
+    POST /batch                     — Ejecuta la matriz provider × país
+    POST /batch/stream              — Igual, devolviendo cada celda al terminar (NDJSON)
 """
 
 import json
 import logging
-from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict, List
+import time
+from typing import Annotated, Any, AsyncIterator, Dict, List
 
-from fastapi import APIRouter, HTTPException
-from pydantic import ValidationError
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
 from aifoundry.app.config import settings
-from aifoundry.app.core.agents.scraper.agent import ScraperAgent
+from aifoundry.app.core.admission import AdmissionError, get_admission_controller
+from aifoundry.app.core.agents.registry import get_agent_registry
 from aifoundry.app.core.agents.scraper.config_schema import AgentConfig
-from aifoundry.app.schemas.agent_responses import get_response_schema
-from aifoundry.app.utils.country import get_country_info
+from aifoundry.app.core.agents.scraper.pool import PoolExhaustedError
+from aifoundry.app.core.jobs import TERMINAL_STATUSES, JobQueueFullError
+from aifoundry.app.core.result_cache import get_result_cache
+from aifoundry.app.utils.metrics import (
+    ADMISSION_QUEUED,
+    ADMISSION_RUNNING,
+    RESULT_CACHE,
+    get_metrics_registry,
+)
 
+from .batch import expand_matrix, iter_batch, run_batch, summarize_batch
+from .jobs import get_job_manager
+from .runner import (
+    get_agent_entry,
+    lookup_cached,
+    prepare_run,
+    run_prepared,
+    stream_run,
+)
 from .schemas import (
+    AdmissionStatus,
     AgentInfo,
     AgentListResponse,
+    AgentReloadResponse,
     AgentRunRequest,
     AgentRunResponse,
+    BatchRunRequest,
+    BatchRunResponse,
     ErrorResponse,
     HealthResponse,
+    JobResponse,
 )
 
 logger = logging.getLogger(__name__)
@@ -42,136 +72,25 @@ router = APIRouter()
 # AGENT DISCOVERY
 # =============================================================================
 
-# Ruta base donde están los agentes (cada subdirectorio con config.json)
-_AGENTS_DIR = Path(__file__).resolve().parent.parent / "core" / "agents"
-
-# Meses en español (para query_template)
-_MESES_ES = {
-    1: "enero", 2: "febrero", 3: "marzo", 4: "abril",
-    5: "mayo", 6: "junio", 7: "julio", 8: "agosto",
-    9: "septiembre", 10: "octubre", 11: "noviembre", 12: "diciembre",
-}
-
-
-# Cache de configs validados (se llena en _discover_agents)
-_validated_configs: Dict[str, AgentConfig] = {}
-
 
 def _discover_agents() -> Dict[str, Dict[str, Any]]:
     """
-    Descubre agentes disponibles buscando config.json recursivamente.
+    Devuelve los agentes disponibles desde el registro en memoria.
 
-    Busca archivos config.json en cualquier subdirectorio de core/agents/.
-    Usa el nombre del directorio padre del config.json como nombre del agente.
-    Ignora directorios que empiezan con '_' o '__'.
-    Valida cada config.json contra AgentConfig schema Pydantic.
-    Los agentes con config inválido se descartan con un warning.
+    El registro escanea core/agents/**/config.json una sola vez (al arrancar o
+    en el primer uso) y valida cada config contra AgentConfig. Los agentes con
+    config inválido se descartan con un warning.
 
     Returns:
         Dict[agent_name, config_dict] con todos los agentes encontrados y válidos.
     """
-    global _validated_configs
-    agents: Dict[str, Dict[str, Any]] = {}
-
-    if not _AGENTS_DIR.is_dir():
-        logger.warning(f"Directorio de agentes no encontrado: {_AGENTS_DIR}")
-        return agents
-
-    for config_path in sorted(_AGENTS_DIR.glob("**/config.json")):
-        agent_dir = config_path.parent
-        agent_name = agent_dir.name
-
-        # Ignorar directorios internos
-        if agent_name.startswith("_"):
-            continue
-
-        try:
-            with open(config_path) as f:
-                raw_config = json.load(f)
-
-            # Validar contra schema Pydantic
-            validated = AgentConfig(**raw_config)
-            _validated_configs[agent_name] = validated
-            agents[agent_name] = raw_config
-            logger.debug(
-                f"Agent discovered: {agent_name} "
-                f"(product={validated.product}, countries={validated.get_country_codes()})"
-            )
-        except ValidationError as e:
-            logger.error(
-                f"Config inválido para agente '{agent_name}' "
-                f"({config_path}):\n{e}"
-            )
-        except (json.JSONDecodeError, OSError) as e:
-            logger.warning(f"Error cargando config de {agent_name}: {e}")
-
-    return agents
+    return {entry.name: entry.raw_config for entry in get_agent_registry().entries()}
 
 
 def get_validated_config(agent_name: str) -> AgentConfig | None:
     """Devuelve el AgentConfig validado de un agente, o None si no existe."""
-    if not _validated_configs:
-        _discover_agents()
-    return _validated_configs.get(agent_name)
-
-
-def _get_date_spanish() -> str:
-    """Fecha actual en formato español: '14 enero 2026'."""
-    now = datetime.now()
-    return f"{now.day} {_MESES_ES[now.month]} {now.year}"
-
-
-def _build_agent_config(
-    agent_name: str,
-    agent_config: Dict[str, Any],
-    request: AgentRunRequest,
-) -> Dict[str, Any]:
-    """
-    Construye el dict de config que se pasa a ScraperAgent.run().
-
-    Combina el config.json del agente con los parámetros del request.
-    Si no se proporciona query, la genera desde query_template.
-    """
-    country_code = request.country_code
-    country_info = get_country_info(country_code)
-    country_name = country_info.get("name", country_code)
-
-    # Obtener language del config del agente o fallback
-    countries = agent_config.get("countries", {})
-    country_data = countries.get(country_code, {})
-    language = country_data.get("language", "es")
-
-    # Construir query
-    if request.query:
-        query = request.query
-    else:
-        template = agent_config.get(
-            "query_template",
-            "{product} {provider} {country_name}",
-        )
-        query = template.format(
-            product=agent_config.get("product", agent_name),
-            provider=request.provider,
-            country_name=country_name,
-            date=_get_date_spanish(),
-        )
-
-    config: Dict[str, Any] = {
-        "product": agent_config.get("product", agent_name),
-        "provider": request.provider,
-        "country_code": country_code,
-        "language": language,
-        "query": query,
-        "freshness": agent_config.get("freshness", "pw"),
-        "extraction_prompt": agent_config.get("extraction_prompt", ""),
-        "validation_prompt": agent_config.get("validation_prompt", ""),
-    }
-
-    # Thread ID para conversaciones multi-turn
-    if request.thread_id:
-        config["thread_id"] = request.thread_id
-
-    return config
+    entry = get_agent_registry().get(agent_name)
+    return entry.config if entry else None
 
 
 # =============================================================================
@@ -188,9 +107,9 @@ def _build_agent_config(
 async def health_check():
     """
     Devuelve el estado del servicio, modelo LLM configurado,
-    URLs de MCPs y número de agentes disponibles.
+    URLs de MCPs, número de agentes disponibles y el estado de la cola
+    de admisión (runs en ejecución, en espera y tiempos de espera).
     """
-    agents = _discover_agents()
     return HealthResponse(
         status="healthy",
         version="0.1.0",
@@ -199,7 +118,33 @@ async def health_check():
             "brave_search": settings.brave_search_mcp_url,
             "playwright": settings.playwright_mcp_url,
         },
-        agents_available=len(agents),
+        agents_available=len(get_agent_registry()),
+        admission=AdmissionStatus(**get_admission_controller().stats()),
+    )
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    tags=["health"],
+    summary="Métricas en formato Prometheus",
+)
+async def metrics():
+    """
+    Métricas del proceso en formato texto de Prometheus: duración de runs,
+    llamadas/latencia/tokens del LLM por agente y modelo, latencia de tools,
+    bytes scrapeados, reintentos y errores por clase.
+    """
+    admission = get_admission_controller().stats()
+    ADMISSION_RUNNING.set(admission["running"])
+    ADMISSION_QUEUED.set(admission["queued"])
+    cache = get_result_cache().stats()
+    for stat in ("entries", "hits", "misses"):
+        RESULT_CACHE.set(cache[stat], stat=stat)
+
+    return PlainTextResponse(
+        get_metrics_registry().render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
     )
 
 
@@ -213,28 +158,19 @@ async def list_agents():
     """
     Descubre y lista todos los agentes disponibles con su información básica.
 
-    Escanea los subdirectorios de `core/agents/` buscando config.json.
+    Los agentes se sirven desde el registro en memoria (no se escanea disco).
     """
-    agents = _discover_agents()
-    agent_list: List[AgentInfo] = []
-
-    for name, config in agents.items():
-        countries_data = config.get("countries", {})
-        providers_by_country = {
-            cc: data.get("providers", [])
-            for cc, data in countries_data.items()
-        }
-
-        agent_list.append(
-            AgentInfo(
-                name=name,
-                product=config.get("product", name),
-                countries=list(countries_data.keys()),
-                providers_by_country=providers_by_country,
-                has_extraction_prompt=bool(config.get("extraction_prompt")),
-                has_validation_prompt=bool(config.get("validation_prompt")),
-            )
+    agent_list: List[AgentInfo] = [
+        AgentInfo(
+            name=entry.name,
+            product=entry.product,
+            countries=entry.countries,
+            providers_by_country=entry.providers_by_country,
+            has_extraction_prompt=entry.has_extraction_prompt,
+            has_validation_prompt=entry.has_validation_prompt,
         )
+        for entry in get_agent_registry().entries()
+    ]
 
     return AgentListResponse(agents=agent_list, total=len(agent_list))
 
@@ -252,16 +188,30 @@ async def get_agent_config(agent_name: str):
 
     Útil para ver los providers, países, templates y prompts disponibles.
     """
-    agents = _discover_agents()
+    return get_agent_entry(agent_name).raw_config
 
-    if agent_name not in agents:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Agente '{agent_name}' no encontrado. "
-            f"Disponibles: {list(agents.keys())}",
-        )
 
-    return agents[agent_name]
+@router.post(
+    "/agents/reload",
+    response_model=AgentReloadResponse,
+    tags=["agents"],
+    summary="Recarga el registro de agentes",
+)
+async def reload_agents(force: bool = False):
+    """
+    Vuelve a sincronizar el registro de agentes con disco.
+
+    Solo se re-leen y re-validan los config.json cuyo mtime/tamaño cambió.
+    Con `?force=true` se re-validan todos.
+    """
+    registry = get_agent_registry()
+    changes = registry.refresh(force=force)
+    return AgentReloadResponse(
+        added=changes["added"],
+        updated=changes["updated"],
+        removed=changes["removed"],
+        total=len(registry),
+    )
 
 
 @router.post(
@@ -272,7 +222,10 @@ async def get_agent_config(agent_name: str):
     responses={
         404: {"model": ErrorResponse},
         422: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
         500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+        504: {"model": ErrorResponse},
     },
 )
 async def run_agent(agent_name: str, request: AgentRunRequest):
@@ -286,6 +239,13 @@ async def run_agent(agent_name: str, request: AgentRunRequest):
     4. Extrae y valida los datos según los prompts del config.json
     5. Devuelve el resultado estructurado
 
+    Los resultados correctos se cachean con el TTL del `freshness` del agente;
+    `cache` controla su uso (`default`, `bypass`, `refresh`, `only`).
+
+    Si se alcanza el límite de runs concurrentes, la petición espera en una
+    cola acotada; con la cola llena responde 429 y si la espera se agota 503,
+    ambos con cabecera `Retry-After`.
+
     **Ejemplo:**
     ```json
     POST /agents/electricity/run
@@ -295,78 +255,275 @@ async def run_agent(agent_name: str, request: AgentRunRequest):
     }
     ```
     """
-    # Validar que el agente existe
-    agents = _discover_agents()
-    if agent_name not in agents:
+    prepared = prepare_run(agent_name, request)
+
+    try:
+        return await run_prepared(prepared, admit=True)
+    except HTTPException:
+        raise
+    except AdmissionError as e:
+        raise _admission_http_error(agent_name, e) from e
+    except PoolExhaustedError as e:
+        logger.warning(f"Pool de agentes agotado para '{agent_name}': {e}")
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    except Exception as e:
+        logger.error(f"Error ejecutando agente '{agent_name}': {e}")
         raise HTTPException(
-            status_code=404,
-            detail=f"Agente '{agent_name}' no encontrado. "
-            f"Disponibles: {list(agents.keys())}",
+            status_code=500,
+            detail=f"Error interno ejecutando agente: {str(e)}",
         )
 
-    agent_file_config = agents[agent_name]
 
-    # Validar que el país está soportado (si el agente define countries)
-    countries = agent_file_config.get("countries", {})
-    if countries and request.country_code not in countries:
-        raise HTTPException(
-            status_code=422,
-            detail=f"País '{request.country_code}' no soportado por '{agent_name}'. "
-            f"Disponibles: {list(countries.keys())}",
+def _admission_http_error(agent_name: str, error: AdmissionError) -> HTTPException:
+    """429 (cola llena) o 503 (espera agotada) con Retry-After."""
+    logger.warning(f"Run de '{agent_name}' no admitido: {error}")
+    return HTTPException(
+        status_code=error.status_code,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Formatea un evento Server-Sent Events."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _stream_agent_response(agent_name: str, request: AgentRunRequest) -> StreamingResponse:
+    # Validar antes de abrir el stream: 404/422/504 como en /run
+    prepared = prepare_run(agent_name, request)
+    cached = lookup_cached(prepared)
+    if cached is not None:
+        async def _cached_event() -> AsyncIterator[str]:
+            yield _sse("final", cached.model_dump())
+
+        return StreamingResponse(_cached_event(), media_type="text/event-stream")
+
+    # Admisión antes de abrir el stream: 429/503 con Retry-After como en /run
+    try:
+        ticket = await get_admission_controller().acquire(
+            agent_name, max_wait_seconds=prepared.remaining_deadline()
         )
+    except AdmissionError as e:
+        raise _admission_http_error(agent_name, e) from e
+
+    async def _events() -> AsyncIterator[str]:
+        try:
+            async for event in stream_run(prepared):
+                yield _sse(event["event"], event["data"])
+        except PoolExhaustedError as e:
+            logger.warning(f"Pool de agentes agotado para '{agent_name}': {e}")
+            yield _sse("error", {"status_code": 503, "detail": str(e)})
+        except Exception as e:
+            logger.error(f"Error ejecutando agente '{agent_name}' (stream): {e}")
+            yield _sse("error", {
+                "status_code": 500,
+                "detail": f"Error interno ejecutando agente: {str(e)}",
+            })
+        finally:
+            ticket.release()
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Por si el stream no llega a iterarse (release() es idempotente)
+        background=BackgroundTask(ticket.release),
+    )
+
+
+_STREAM_RESPONSES = {
+    200: {"content": {"text/event-stream": {}}},
+    404: {"model": ErrorResponse},
+    422: {"model": ErrorResponse},
+    429: {"model": ErrorResponse},
+    503: {"model": ErrorResponse},
+    504: {"model": ErrorResponse},
+}
+
+
+@router.post(
+    "/agents/{agent_name}/run/stream",
+    tags=["agents"],
+    summary="Ejecuta un agente emitiendo el progreso (SSE)",
+    responses=_STREAM_RESPONSES,
+)
+async def run_agent_stream(agent_name: str, request: AgentRunRequest):
+    """
+    Igual que `POST /agents/{agent_name}/run`, pero devuelve Server-Sent Events
+    mientras el agente trabaja:
+
+    - `step`: PASO del flujo (búsqueda, scraping, Playwright, extracción)
+    - `tool_start` / `tool_end` / `tool_error`: llamadas a tools con sus URLs
+    - `token`: fragmentos de la respuesta según se generan
+    - `retry`: reintento por error de red
+    - `final`: AgentRunResponse completo
+    - `error`: fallo de ejecución (`status_code` + `detail`)
+
+    Si el cliente cierra la conexión, el run se cancela.
+    """
+    return await _stream_agent_response(agent_name, request)
+
+
+@router.get(
+    "/agents/{agent_name}/run/stream",
+    tags=["agents"],
+    summary="Ejecuta un agente emitiendo el progreso (SSE, parámetros en query)",
+    responses=_STREAM_RESPONSES,
+)
+async def run_agent_stream_get(
+    agent_name: str,
+    request: Annotated[AgentRunRequest, Query()],
+):
+    """
+    Variante GET de `/agents/{agent_name}/run/stream` para clientes
+    EventSource (que solo hacen GET): los campos del request van en la query.
+
+    **Ejemplo:** `GET /agents/electricity/run/stream?provider=Endesa&country_code=ES`
+    """
+    return await _stream_agent_response(agent_name, request)
 
-    # Construir config para el agente
-    run_config = _build_agent_config(agent_name, agent_file_config, request)
 
-    logger.info(
-        f"Running agent '{agent_name}': provider={request.provider}, "
-        f"country={request.country_code}, query='{run_config['query']}'"
+# =============================================================================
+# ASYNC JOBS
+# =============================================================================
+
+
+def _job_response(job: Dict[str, Any]) -> JobResponse:
+    """Convierte un registro de JobStore en JobResponse."""
+    return JobResponse(
+        job_id=job["id"],
+        agent_name=job["agent_name"],
+        status=job["status"],
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"],
+        result=job["result"],
+        error=job["error"],
     )
 
-    # Ejecutar agente
-    # Si structured_output=True, usar response_format nativo (1 sola llamada LLM)
-    # en vez del post-procesamiento legacy (2 llamadas LLM).
-    # Se infiere el schema Pydantic del product type del agente.
-    response_model = None
-    if request.structured_output:
-        product = agent_file_config.get("product", agent_name)
-        response_model = get_response_schema(product)
-        logger.info(
-            f"Using native response_format: {response_model.__name__} "
-            f"(product={product})"
-        )
+
+@router.post(
+    "/agents/{agent_name}/jobs",
+    response_model=JobResponse,
+    status_code=202,
+    tags=["jobs"],
+    summary="Crea un job asíncrono",
+    responses={
+        404: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    },
+)
+async def submit_job(agent_name: str, request: AgentRunRequest):
+    """
+    Encola la ejecución de un agente y devuelve el job al instante.
+
+    El job se ejecuta en un pool acotado de workers. Consulta su estado
+    y resultado con `GET /jobs/{job_id}`.
+    """
+    # Validar agente y país antes de encolar (errores síncronos)
+    prepare_run(agent_name, request)
 
     try:
-        async with ScraperAgent(
-            use_mcp=request.use_mcp,
-            disable_simple_scrape=request.disable_simple_scrape,
-            response_model=response_model,
-            agent_name=agent_name,
-            verbose=False,  # No verbose en API (usamos logging)
-        ) as agent:
-            result = await agent.run(run_config, max_retries=request.max_retries)
-    except Exception as e:
-        logger.error(f"Error ejecutando agente '{agent_name}': {e}")
+        job = await get_job_manager().submit(agent_name, request.model_dump())
+    except (JobQueueFullError, RuntimeError) as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    logger.info(f"Job {job['id']} encolado para '{agent_name}'")
+    return _job_response(job)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobResponse,
+    tags=["jobs"],
+    summary="Estado y resultado de un job",
+    responses={404: {"model": ErrorResponse}},
+)
+async def get_job(job_id: str):
+    """Devuelve el estado de un job y, si terminó, su resultado."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' no encontrado")
+    return _job_response(job)
+
+
+@router.delete(
+    "/jobs/{job_id}",
+    response_model=JobResponse,
+    tags=["jobs"],
+    summary="Cancela un job",
+    responses={404: {"model": ErrorResponse}, 409: {"model": ErrorResponse}},
+)
+async def cancel_job(job_id: str):
+    """Cancela un job en cola o en ejecución."""
+    manager = get_job_manager()
+    job = manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' no encontrado")
+    if job["status"] in TERMINAL_STATUSES:
         raise HTTPException(
-            status_code=500,
-            detail=f"Error interno ejecutando agente: {str(e)}",
+            status_code=409,
+            detail=f"Job '{job_id}' ya terminó (status={job['status']})",
         )
 
-    # Serializar structured_response si es un objeto Pydantic
-    structured = result.get("structured_response")
-    if structured is not None and hasattr(structured, "model_dump"):
-        structured = structured.model_dump()
-
-    return AgentRunResponse(
-        status=result.get("status", "error"),
-        output=result.get("output", ""),
-        messages_count=result.get("messages_count", 0),
-        attempts=result.get("attempts", 1),
-        thread_id=result.get("thread_id", ""),
-        urls=result.get("urls", []),
-        query_es=result.get("query_es", ""),
-        query_final=result.get("query_final", ""),
-        used_playwright=result.get("used_playwright", False),
-        has_structured_output=result.get("has_structured_output", False),
-        structured_response=structured,
-    )
\ No newline at end of file
+    job = await manager.cancel(job_id)
+    return _job_response(job)
+
+
+# =============================================================================
+# BATCH (matriz provider × país)
+# =============================================================================
+
+
+@router.post(
+    "/batch",
+    response_model=BatchRunResponse,
+    tags=["batch"],
+    summary="Ejecuta la matriz provider × país",
+    responses={404: {"model": ErrorResponse}},
+)
+async def run_batch_endpoint(request: BatchRunRequest):
+    """
+    Ejecuta todas las combinaciones país × provider declaradas en el
+    config.json de cada agente (o de todos los agentes si `agents` está vacío),
+    con concurrencia acotada global y por agente.
+
+    **Ejemplo:**
+    ```json
+    POST /batch
+    {"agents": ["electricity"], "countries": ["ES", "PT"]}
+    ```
+    """
+    expand_matrix(request)  # valida agentes (404) antes de empezar
+    return await run_batch(request)
+
+
+@router.post(
+    "/batch/stream",
+    tags=["batch"],
+    summary="Ejecuta la matriz provider × país en streaming (NDJSON)",
+    responses={
+        200: {"content": {"application/x-ndjson": {}}},
+        404: {"model": ErrorResponse},
+    },
+)
+async def stream_batch_endpoint(request: BatchRunRequest):
+    """
+    Igual que `POST /batch`, pero devuelve una línea JSON por celda en cuanto
+    termina (`{"event": "cell", "data": {...}}`) y una línea final con el
+    resumen agregado (`{"event": "summary", "data": {...}}`).
+    """
+    cells = expand_matrix(request)  # valida agentes (404) antes de empezar
+
+    async def _ndjson() -> AsyncIterator[str]:
+        started = time.monotonic()
+        results = []
+        async for cell in iter_batch(request, cells):
+            results.append(cell)
+            yield json.dumps({"event": "cell", "data": cell.model_dump()}) + "\n"
+        summary = summarize_batch(results, time.monotonic() - started)
+        yield json.dumps({"event": "summary", "data": summary.model_dump()}) + "\n"
+
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
@@ -0,0 +1,467 @@
+"""
+Ejecución de agentes para la capa API.
+
+Centraliza el camino request → ScraperAgent.run() → AgentRunResponse para
+que lo compartan el endpoint síncrono (/run) y las ejecuciones en segundo
+plano (jobs):
+
+1. prepare_run(): valida agente/país y construye el run config
+2. execute_run(): ejecuta con un agente del pool; los runs idénticos
+   concurrentes comparten una sola ejecución (single-flight) y solo esa
+   pasa por el control de admisión
+   (stream_run(): igual, pero emitiendo eventos de progreso)
+3. build_run_response(): serializa el resultado
+
+run_prepared() encadena 2 y 3 pasando por la caché de resultados
+(lookup_cached() / store_result()), con TTL según el freshness del agente.
+
+El deadline_seconds del request cuenta desde prepare_run(): la espera en
+admisión y en el pool se descuenta del presupuesto que recibe el agente.
+"""
+
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from aifoundry.app.config import settings
+from aifoundry.app.core.admission import get_admission_controller
+from aifoundry.app.core.agents.registry import AgentEntry, get_agent_registry
+from aifoundry.app.core.agents.scraper.agent import ScraperAgent
+from aifoundry.app.core.agents.scraper.pool import get_agent_pool_manager
+from aifoundry.app.core.result_cache import (
+    CacheEntry,
+    freshness_ttl,
+    get_result_cache,
+    make_cache_key,
+)
+from aifoundry.app.schemas.agent_responses import get_response_schema
+from aifoundry.app.utils.country import get_country_info
+from aifoundry.app.utils.singleflight import SingleFlight
+
+from .schemas import AgentRunRequest, AgentRunResponse, CacheInfo
+
+logger = logging.getLogger(__name__)
+
+# Meses en español (para query_template)
+_MESES_ES = {
+    1: "enero", 2: "febrero", 3: "marzo", 4: "abril",
+    5: "mayo", 6: "junio", 7: "julio", 8: "agosto",
+    9: "septiembre", 10: "octubre", 11: "noviembre", 12: "diciembre",
+}
+
+
+def get_agent_entry(agent_name: str) -> AgentEntry:
+    """Devuelve la entrada registrada de un agente o lanza 404."""
+    registry = get_agent_registry()
+    entry = registry.get(agent_name)
+    if entry is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Agente '{agent_name}' no encontrado. "
+            f"Disponibles: {registry.names()}",
+        )
+    return entry
+
+
+def _get_date_spanish() -> str:
+    """Fecha actual en formato español: '14 enero 2026'."""
+    now = datetime.now()
+    return f"{now.day} {_MESES_ES[now.month]} {now.year}"
+
+
+def _build_agent_config(
+    agent_name: str,
+    agent_config: Dict[str, Any],
+    request: AgentRunRequest,
+) -> Dict[str, Any]:
+    """
+    Construye el dict de config que se pasa a ScraperAgent.run().
+
+    Combina el config.json del agente con los parámetros del request.
+    Si no se proporciona query, la genera desde query_template.
+    """
+    country_code = request.country_code
+    country_info = get_country_info(country_code)
+    country_name = country_info.get("name", country_code)
+
+    # Obtener language del config del agente o fallback
+    countries = agent_config.get("countries", {})
+    country_data = countries.get(country_code, {})
+    language = country_data.get("language", "es")
+
+    # Construir query
+    if request.query:
+        query = request.query
+    else:
+        template = agent_config.get(
+            "query_template",
+            "{product} {provider} {country_name}",
+        )
+        query = template.format(
+            product=agent_config.get("product", agent_name),
+            provider=request.provider,
+            country_name=country_name,
+            date=_get_date_spanish(),
+        )
+
+    config: Dict[str, Any] = {
+        "product": agent_config.get("product", agent_name),
+        "provider": request.provider,
+        "country_code": country_code,
+        "language": language,
+        "query": query,
+        "freshness": agent_config.get("freshness", "pw"),
+        "extraction_prompt": agent_config.get("extraction_prompt", ""),
+        "validation_prompt": agent_config.get("validation_prompt", ""),
+        "page_token_budget": agent_config.get("page_token_budget"),
+    }
+
+    # Thread ID para conversaciones multi-turn
+    if request.thread_id:
+        config["thread_id"] = request.thread_id
+
+    return config
+
+
+class PreparedRun:
+    """Run validado y listo para ejecutar."""
+
+    __slots__ = ("agent_name", "request", "entry", "run_config", "response_model", "created_at")
+
+    def __init__(
+        self,
+        agent_name: str,
+        request: AgentRunRequest,
+        entry: AgentEntry,
+        run_config: Dict[str, Any],
+        response_model: Optional[Type[BaseModel]],
+    ):
+        self.agent_name = agent_name
+        self.request = request
+        self.entry = entry
+        self.run_config = run_config
+        self.response_model = response_model
+        self.created_at = time.monotonic()
+
+    def remaining_deadline(self) -> Optional[float]:
+        """Segundos que quedan del deadline_seconds del request (None = sin límite)."""
+        if self.request.deadline_seconds is None:
+            return None
+        elapsed = time.monotonic() - self.created_at
+        # Un mínimo simbólico: el agente devuelve el parcial en vez de no arrancar
+        return max(0.001, self.request.deadline_seconds - elapsed)
+
+
+def prepare_run(agent_name: str, request: AgentRunRequest) -> PreparedRun:
+    """
+    Valida el request y construye el run config.
+
+    Raises:
+        HTTPException: 404 si el agente no existe, 422 si el país no está soportado.
+    """
+    # Validar que el agente existe
+    entry = get_agent_entry(agent_name)
+
+    # Validar que el país está soportado (si el agente define countries)
+    if entry.countries and request.country_code not in entry.config.countries:
+        raise HTTPException(
+            status_code=422,
+            detail=f"País '{request.country_code}' no soportado por '{agent_name}'. "
+            f"Disponibles: {entry.countries}",
+        )
+
+    # Construir config para el agente
+    run_config = _build_agent_config(agent_name, entry.raw_config, request)
+
+    # Si structured_output=True, usar response_format nativo (1 sola llamada LLM)
+    # en vez del post-procesamiento legacy (2 llamadas LLM).
+    # Se infiere el schema Pydantic del product type del agente.
+    response_model = None
+    if request.structured_output:
+        response_model = get_response_schema(entry.product)
+        logger.info(
+            f"Using native response_format: {response_model.__name__} "
+            f"(product={entry.product})"
+        )
+
+    return PreparedRun(agent_name, request, entry, run_config, response_model)
+
+
+@asynccontextmanager
+async def _checkout_agent(prepared: PreparedRun) -> AsyncIterator[ScraperAgent]:
+    """Agente del pool (o uno nuevo si el pool está desactivado)."""
+    request = prepared.request
+
+    if settings.agent_pool_enabled:
+        async with get_agent_pool_manager().checkout(
+            prepared.agent_name,
+            use_mcp=request.use_mcp,
+            disable_simple_scrape=request.disable_simple_scrape,
+            response_model=prepared.response_model,
+        ) as agent:
+            yield agent
+        return
+
+    async with ScraperAgent(
+        use_mcp=request.use_mcp,
+        disable_simple_scrape=request.disable_simple_scrape,
+        response_model=prepared.response_model,
+        agent_name=prepared.agent_name,
+        verbose=False,  # No verbose en API (usamos logging)
+    ) as agent:
+        yield agent
+
+
+def _log_run(prepared: PreparedRun) -> None:
+    request = prepared.request
+    logger.info(
+        f"Running agent '{prepared.agent_name}': provider={request.provider}, "
+        f"country={request.country_code}, query='{prepared.run_config['query']}'"
+    )
+
+
+# Singleton global: runs en curso, deduplicados por run_key()
+_run_flights: Optional[SingleFlight] = None
+
+
+def get_run_flights() -> SingleFlight:
+    """Obtiene el grupo single-flight de runs de agentes."""
+    global _run_flights
+    if _run_flights is None:
+        _run_flights = SingleFlight()
+    return _run_flights
+
+
+def reset_run_flights() -> None:
+    """Resetea el singleton (útil para tests)."""
+    global _run_flights
+    _run_flights = None
+
+
+def run_key(prepared: PreparedRun) -> Optional[str]:
+    """
+    Clave normalizada de un run: el run config de _build_agent_config más
+    las opciones del request que cambian el resultado.
+
+    Returns:
+        None si el run no debe compartirse (conversación con thread_id).
+    """
+    if "thread_id" in prepared.run_config:
+        return None
+    request = prepared.request
+    return json.dumps(
+        {
+            "agent": prepared.agent_name,
+            "config": prepared.run_config,
+            "structured_output": request.structured_output,
+            "use_mcp": request.use_mcp,
+            "disable_simple_scrape": request.disable_simple_scrape,
+            "max_retries": request.max_retries,
+            "deadline_seconds": request.deadline_seconds,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+
+
+async def _execute(prepared: PreparedRun) -> Dict[str, Any]:
+    _log_run(prepared)
+    async with _checkout_agent(prepared) as agent:
+        return await agent.run(
+            prepared.run_config,
+            max_retries=prepared.request.max_retries,
+            deadline_seconds=prepared.remaining_deadline(),
+        )
+
+
+async def _execute_admitted(prepared: PreparedRun) -> Dict[str, Any]:
+    # La espera en cola no puede comerse todo el deadline del run
+    async with get_admission_controller().admit(
+        prepared.agent_name, max_wait_seconds=prepared.remaining_deadline()
+    ):
+        return await _execute(prepared)
+
+
+async def execute_run(prepared: PreparedRun, admit: bool = False) -> Dict[str, Any]:
+    """
+    Ejecuta ScraperAgent.run() con un agente del pool (o uno nuevo si
+    el pool está desactivado).
+
+    Si ya hay un run idéntico en curso (misma run_key()), espera su
+    resultado en vez de lanzar otro agente.
+
+    Args:
+        prepared: Run validado (prepare_run).
+        admit: Si True, el run pasa por el control de admisión. Solo
+            ocupa hueco la ejecución real: quien se une a un run idéntico
+            en curso no hace cola.
+
+    Raises:
+        AdmissionError: Si admit=True y no se consigue hueco.
+        PoolExhaustedError: Si no hay agentes libres a tiempo.
+    """
+    execute = _execute_admitted if admit else _execute
+    key = run_key(prepared) if settings.run_coalescing_enabled else None
+    if key is None:
+        return await execute(prepared)
+
+    result = await get_run_flights().do(key, lambda: execute(prepared))
+    # Copia superficial: cada llamador puede modificar su dict sin afectar al resto
+    return dict(result)
+
+
+async def stream_run(prepared: PreparedRun) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Ejecuta ScraperAgent.astream_run() y va devolviendo sus eventos.
+
+    El evento `final` se devuelve ya serializado como AgentRunResponse.
+
+    Raises:
+        PoolExhaustedError: Si no hay agentes libres a tiempo.
+    """
+    _log_run(prepared)
+    async with _checkout_agent(prepared) as agent:
+        async for event in agent.astream_run(
+            prepared.run_config,
+            max_retries=prepared.request.max_retries,
+            deadline_seconds=prepared.remaining_deadline(),
+        ):
+            if event["event"] == "final":
+                response = build_run_response(event["data"])
+                store_result(prepared, response)
+                event = {"event": "final", "data": response.model_dump()}
+            yield event
+
+
+def build_run_response(result: Dict[str, Any]) -> AgentRunResponse:
+    """Convierte el dict de ScraperAgent.run() en AgentRunResponse."""
+    # Serializar structured_response si es un objeto Pydantic
+    structured = result.get("structured_response")
+    if structured is not None and hasattr(structured, "model_dump"):
+        structured = structured.model_dump()
+
+    return AgentRunResponse(
+        status=result.get("status", "error"),
+        output=result.get("output", ""),
+        messages_count=result.get("messages_count", 0),
+        attempts=result.get("attempts", 1),
+        thread_id=result.get("thread_id", ""),
+        urls=result.get("urls", []),
+        query_es=result.get("query_es", ""),
+        query_final=result.get("query_final", ""),
+        used_playwright=result.get("used_playwright", False),
+        has_structured_output=result.get("has_structured_output", False),
+        structured_response=structured,
+        deadline_exceeded=result.get("deadline_exceeded", False),
+    )
+
+
+# =============================================================================
+# RESULT CACHE
+# =============================================================================
+
+
+def result_cache_key(prepared: PreparedRun) -> Optional[str]:
+    """
+    Clave de caché de un run: (agente, provider, país, query, structured_output).
+
+    Returns:
+        None si el run no es cacheable (caché desactivada o conversación
+        con thread_id).
+    """
+    if not settings.result_cache_enabled or "thread_id" in prepared.run_config:
+        return None
+    request = prepared.request
+    return make_cache_key(
+        prepared.agent_name,
+        request.provider,
+        request.country_code,
+        prepared.run_config["query"],
+        request.structured_output,
+    )
+
+
+def _cache_hit_response(entry: CacheEntry) -> AgentRunResponse:
+    response = AgentRunResponse(**entry.value)
+    response.cache = CacheInfo(
+        hit=True,
+        tier=entry.tier,
+        age_seconds=round(entry.age_seconds, 3),
+        ttl_seconds=round(max(0.0, entry.expires_at - time.time()), 3),
+    )
+    return response
+
+
+def lookup_cached(prepared: PreparedRun) -> Optional[AgentRunResponse]:
+    """
+    Busca el resultado del run en la caché según `request.cache`.
+
+    Returns:
+        AgentRunResponse cacheado (con metadatos de caché) o None.
+
+    Raises:
+        HTTPException: 504 si cache='only' y no hay resultado vigente.
+    """
+    mode = prepared.request.cache
+    key = result_cache_key(prepared)
+
+    entry = None
+    if key is not None and mode in ("default", "only"):
+        entry = get_result_cache().get(key)
+
+    if entry is None:
+        if mode == "only":
+            raise HTTPException(
+                status_code=504,
+                detail=f"No hay resultado en caché para '{prepared.agent_name}' "
+                f"({prepared.request.provider}, {prepared.request.country_code})",
+            )
+        return None
+
+    logger.info(
+        f"Cache hit ({entry.tier}) para '{prepared.agent_name}': "
+        f"provider={prepared.request.provider}, country={prepared.request.country_code}"
+    )
+    return _cache_hit_response(entry)
+
+
+def store_result(prepared: PreparedRun, response: AgentRunResponse) -> None:
+    """Guarda un resultado correcto en la caché (salvo cache='bypass')."""
+    key = result_cache_key(prepared)
+    if key is None or prepared.request.cache == "bypass":
+        return
+    response.cache = CacheInfo(hit=False)
+    if response.status != "success":
+        return
+    ttl = freshness_ttl(prepared.run_config.get("freshness"))
+    get_result_cache().set(key, response.model_dump(exclude={"cache"}), ttl_seconds=ttl)
+
+
+async def run_prepared(prepared: PreparedRun, admit: bool = False) -> AgentRunResponse:
+    """
+    Ejecuta un run preparado pasando por la caché de resultados.
+
+    Args:
+        prepared: Run validado (prepare_run).
+        admit: Si True, el run pasa por el control de admisión antes de
+            ejecutarse (los aciertos de caché no ocupan hueco).
+
+    Raises:
+        HTTPException: 504 si cache='only' y no hay resultado vigente.
+        AdmissionError: Si admit=True y no se consigue hueco.
+        PoolExhaustedError: Si no hay agentes libres a tiempo.
+    """
+    cached = lookup_cached(prepared)
+    if cached is not None:
+        return cached
+
+    result = await execute_run(prepared, admit=admit)
+    response = build_run_response(result)
+    store_result(prepared, response)
+    return response
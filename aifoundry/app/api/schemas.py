@@ -4,7 +4,7 @@ Schemas Pydantic para los endpoints de la API.
 Define los modelos de request/response para la capa REST.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -59,6 +59,79 @@ class AgentRunRequest(BaseModel):
         le=10,
         description="Reintentos máximos ante errores de red.",
     )
+    deadline_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=3600,
+        description=(
+            "Presupuesto total del run en segundos (cola, reintentos, LLM y tools). "
+            "Al agotarse devuelve status='partial' con lo obtenido hasta entonces."
+        ),
+    )
+    cache: Literal["default", "bypass", "refresh", "only"] = Field(
+        default="default",
+        description=(
+            "Uso de la caché de resultados (TTL = freshness del agente): "
+            "'default' usa y guarda, 'bypass' la ignora, 'refresh' ejecuta y "
+            "sobrescribe, 'only' devuelve solo lo cacheado (504 si no hay)."
+        ),
+    )
+
+
+class BatchRunRequest(BaseModel):
+    """Request para ejecutar la matriz provider × país de uno o varios agentes."""
+
+    agents: List[str] = Field(
+        default_factory=list,
+        description="Agentes a ejecutar. Vacío = todos los agentes registrados.",
+        examples=[["electricity"]],
+    )
+    countries: Optional[List[str]] = Field(
+        default=None,
+        description="Filtra los países del config.json (None = todos).",
+    )
+    providers: Optional[List[str]] = Field(
+        default=None,
+        description="Filtra los providers del config.json (None = todos).",
+    )
+    structured_output: bool = Field(
+        default=False,
+        description="Si True, genera salida estructurada Pydantic vía LLM.",
+    )
+    use_mcp: bool = Field(
+        default=True,
+        description="Si True, usa herramientas MCP (Brave, Playwright).",
+    )
+    disable_simple_scrape: bool = Field(
+        default=False,
+        description="Si True, no incluye simple_scrape_url (fuerza Playwright).",
+    )
+    max_retries: int = Field(
+        default=3,
+        ge=1,
+        le=10,
+        description="Reintentos máximos ante errores de red (por celda).",
+    )
+    deadline_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=3600,
+        description="Presupuesto de tiempo por celda (ver AgentRunRequest.deadline_seconds).",
+    )
+    cache: Literal["default", "bypass", "refresh", "only"] = Field(
+        default="default",
+        description="Uso de la caché de resultados en cada celda (ver AgentRunRequest.cache).",
+    )
+    max_concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Celdas en paralelo en total (None = BATCH_MAX_CONCURRENCY).",
+    )
+    per_agent_concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Celdas en paralelo por agente (None = BATCH_PER_AGENT_CONCURRENCY).",
+    )
 
 
 # =============================================================================
@@ -66,10 +139,23 @@ class AgentRunRequest(BaseModel):
 # =============================================================================
 
 
+class CacheInfo(BaseModel):
+    """Metadatos de un resultado servido desde la caché."""
+
+    hit: bool = Field(description="Si el resultado viene de la caché")
+    tier: Optional[str] = Field(default=None, description="Nivel: 'memory' o 'disk'")
+    age_seconds: Optional[float] = Field(
+        default=None, description="Antigüedad del resultado cacheado"
+    )
+    ttl_seconds: Optional[float] = Field(
+        default=None, description="Segundos de vigencia restantes"
+    )
+
+
 class AgentRunResponse(BaseModel):
     """Response de la ejecución de un agente."""
 
-    status: str = Field(description="Estado: 'success' o 'error'")
+    status: str = Field(description="Estado: 'success', 'partial' o 'error'")
     output: str = Field(default="", description="Output del agente en texto libre")
     messages_count: int = Field(default=0, description="Número de mensajes en la conversación")
     attempts: int = Field(default=1, description="Número de intentos realizados")
@@ -84,6 +170,52 @@ class AgentRunResponse(BaseModel):
     structured_response: Optional[Dict[str, Any]] = Field(
         default=None, description="Respuesta estructurada (si se pidió)"
     )
+    deadline_exceeded: bool = Field(
+        default=False, description="Si el run se cortó por deadline_seconds (status='partial')"
+    )
+    cache: Optional[CacheInfo] = Field(
+        default=None, description="Metadatos de caché (None si no se consultó)"
+    )
+
+
+class BatchCellResult(BaseModel):
+    """Resultado de una celda (agente, país, provider) de un batch."""
+
+    agent_name: str = Field(description="Agente ejecutado")
+    country_code: str = Field(description="Código de país de la celda")
+    provider: str = Field(description="Provider de la celda")
+    status: str = Field(description="Estado del agente, o 'error' si la celda falló")
+    duration_seconds: float = Field(description="Duración de la celda (sin espera en cola)")
+    queued_seconds: float = Field(
+        default=0.0, description="Tiempo esperando un hueco de concurrencia"
+    )
+    result: Optional[AgentRunResponse] = Field(
+        default=None, description="Resultado del agente (si la celda terminó)"
+    )
+    error: Optional[str] = Field(default=None, description="Error de la celda")
+
+
+class BatchSummary(BaseModel):
+    """Resumen agregado de un batch."""
+
+    total: int = Field(description="Celdas ejecutadas")
+    succeeded: int = Field(default=0, description="Celdas con status='success'")
+    partial: int = Field(default=0, description="Celdas con status='partial'")
+    failed: int = Field(default=0, description="Celdas con error")
+    duration_seconds: float = Field(description="Duración total del batch")
+    cell_seconds_avg: float = Field(default=0.0, description="Duración media por celda")
+    cell_seconds_max: float = Field(default=0.0, description="Duración máxima de una celda")
+    by_agent: Dict[str, Dict[str, int]] = Field(
+        default_factory=dict,
+        description="Conteo de celdas por agente y status",
+    )
+
+
+class BatchRunResponse(BaseModel):
+    """Response de un batch completo (modo no streaming)."""
+
+    results: List[BatchCellResult] = Field(description="Resultados por celda")
+    summary: BatchSummary = Field(description="Resumen agregado")
 
 
 class AgentInfo(BaseModel):
@@ -113,6 +245,38 @@ class AgentListResponse(BaseModel):
     total: int = Field(description="Total de agentes")
 
 
+class AgentReloadResponse(BaseModel):
+    """Response de la recarga del registro de agentes."""
+
+    added: List[str] = Field(default_factory=list, description="Agentes nuevos")
+    updated: List[str] = Field(
+        default_factory=list, description="Agentes cuyo config.json cambió"
+    )
+    removed: List[str] = Field(
+        default_factory=list, description="Agentes eliminados o ahora inválidos"
+    )
+    total: int = Field(description="Total de agentes tras la recarga")
+
+
+class AdmissionStatus(BaseModel):
+    """Estado del control de admisión de runs."""
+
+    running: int = Field(description="Runs en ejecución")
+    running_by_agent: Dict[str, int] = Field(
+        default_factory=dict, description="Runs en ejecución por agente"
+    )
+    queued: int = Field(description="Runs esperando hueco")
+    max_concurrent: int = Field(description="Límite global (0 = sin límite)")
+    per_agent_concurrent: int = Field(description="Límite por agente (0 = sin límite)")
+    max_queue: int = Field(description="Tamaño máximo de la cola de espera")
+    oldest_wait_seconds: float = Field(description="Espera actual del run más antiguo en cola")
+    wait_seconds_avg: float = Field(description="Espera media (EWMA) de los runs admitidos")
+    wait_seconds_max: float = Field(description="Espera máxima observada")
+    admitted: int = Field(default=0, description="Runs admitidos")
+    rejected: int = Field(default=0, description="Runs rechazados con la cola llena (429)")
+    timed_out: int = Field(default=0, description="Runs rechazados por espera agotada (503)")
+
+
 class HealthResponse(BaseModel):
     """Response del health check."""
 
@@ -125,6 +289,26 @@ class HealthResponse(BaseModel):
     agents_available: int = Field(
         default=0, description="Número de agentes disponibles"
     )
+    admission: Optional[AdmissionStatus] = Field(
+        default=None, description="Cola y tiempos de espera del control de admisión"
+    )
+
+
+class JobResponse(BaseModel):
+    """Estado de un job asíncrono."""
+
+    job_id: str = Field(description="ID del job")
+    agent_name: str = Field(description="Agente que ejecuta el job")
+    status: str = Field(
+        description="Estado: 'queued', 'running', 'completed', 'failed' o 'cancelled'"
+    )
+    created_at: str = Field(description="Fecha de creación (ISO 8601, UTC)")
+    started_at: Optional[str] = Field(default=None, description="Inicio de la ejecución")
+    finished_at: Optional[str] = Field(default=None, description="Fin de la ejecución")
+    result: Optional[AgentRunResponse] = Field(
+        default=None, description="Resultado del agente (si status='completed')"
+    )
+    error: Optional[str] = Field(default=None, description="Error (si falló o se canceló)")
 
 
 class ErrorResponse(BaseModel):
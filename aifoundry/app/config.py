@@ -51,6 +51,129 @@ class Settings(BaseSettings):
     playwright_mcp_url: str = "http://localhost:8931/mcp"
     brave_api_key: str = ""  # API Key para Brave Search
 
+    # ===========================================
+    # Brave Search rate limit (rate_limiter.py, token bucket)
+    # ===========================================
+    brave_requests_per_second: float = 1.0  # 1 = plan gratuito; 20-50 en planes de pago; 0 = sin límite
+    brave_burst: int = 1  # Peticiones seguidas sin esperar (tamaño del bucket)
+    brave_max_concurrency: int = 1  # Peticiones a Brave a la vez; 0 = sin límite
+    brave_max_retries: int = 3  # Intentos ante 429
+    brave_retry_after_max: float = 60.0  # Espera máxima tras un 429 (acota Retry-After)
+
+    # ===========================================
+    # Agent Registry
+    # ===========================================
+    # Segundos entre comprobaciones automáticas de cambios en config.json
+    # (0 = solo se recarga al arrancar o vía POST /agents/reload)
+    agent_registry_auto_reload_seconds: float = 0.0
+
+    # ===========================================
+    # Agent Pool (ScraperAgent pre-inicializados)
+    # ===========================================
+    agent_pool_enabled: bool = True
+    agent_pool_min_size: int = 1  # Agentes calientes por combinación
+    agent_pool_max_size: int = 4  # Máximo de agentes vivos por combinación
+    agent_pool_checkout_timeout: float = 30.0  # Segundos esperando un agente libre
+    agent_pool_health_check_seconds: float = 60.0  # 0 = sin health check periódico
+
+    # ===========================================
+    # Async Jobs
+    # ===========================================
+    job_db_path: str = "./data/jobs.db"  # Tabla persistente de jobs (SQLite)
+    job_workers: int = 4  # Jobs ejecutándose a la vez
+    job_max_queued: int = 1000  # Jobs en espera (0 = sin límite)
+
+    # ===========================================
+    # Batch (matriz provider × país)
+    # ===========================================
+    batch_max_concurrency: int = 4  # Celdas en paralelo en total
+    batch_per_agent_concurrency: int = 2  # Celdas en paralelo por agente
+
+    # ===========================================
+    # Run coalescing (single-flight)
+    # ===========================================
+    run_coalescing_enabled: bool = True  # Runs idénticos concurrentes comparten ejecución
+
+    # ===========================================
+    # Admission control (runs síncronos de la API)
+    # ===========================================
+    admission_max_concurrent: int = 8  # Runs a la vez en total (0 = sin límite)
+    admission_per_agent_concurrent: int = 4  # Runs a la vez por agente (0 = sin límite)
+    admission_max_queue: int = 32  # Runs esperando hueco; si se llena → 429
+    admission_max_wait_seconds: float = 30.0  # Espera máxima en cola; después → 503
+
+    # ===========================================
+    # Result Cache (TTL según freshness del agente)
+    # ===========================================
+    result_cache_enabled: bool = True
+    result_cache_max_entries: int = 512  # Entradas del nivel en memoria (LRU)
+    result_cache_db_path: Optional[str] = None  # SQLite opcional, p.ej. ./data/results.db
+
+    # ===========================================
+    # Scrape HTTP client (AsyncClient compartido de simple_scrape)
+    # ===========================================
+    scrape_http2: bool = True
+    scrape_max_connections: int = 64  # Conexiones abiertas en total
+    scrape_max_keepalive_connections: int = 32  # Conexiones ociosas que se mantienen
+    scrape_keepalive_expiry: float = 30.0  # Segundos que vive una conexión ociosa
+    scrape_per_host_concurrency: int = 4  # Peticiones a la vez contra un mismo host
+    scrape_max_bytes: int = 5_000_000  # Se deja de leer el cuerpo a partir de aquí
+
+    # ===========================================
+    # Scrape politeness (por host, compartido por todos los runs)
+    # ===========================================
+    scrape_host_min_interval: float = 0.5  # Segundos entre peticiones al mismo host
+    scrape_respect_robots: bool = True  # Consultar robots.txt antes de descargar
+    scrape_robots_ttl: float = 3600.0  # Segundos que se cachea un robots.txt
+    scrape_robots_error_ttl: float = 60.0  # Segundos hasta reintentar un robots.txt que falló
+    scrape_backoff_base: float = 2.0  # Backoff tras el primer 429/503 (se duplica)
+    scrape_backoff_max: float = 60.0  # Backoff máximo (también acota Retry-After)
+
+    # ===========================================
+    # Scrape HTTP cache (ETag / Last-Modified / max-age en disco)
+    # ===========================================
+    scrape_http_cache_path: Optional[str] = "./data/http_cache.db"  # Vacío = desactivada
+    scrape_http_cache_max_mb: float = 256.0  # Tamaño máximo de los cuerpos (LRU)
+
+    # ===========================================
+    # Condensado de páginas (simple_scrape_url/urls)
+    # ===========================================
+    scrape_page_token_budget: int = 2500  # Tokens por página si el agente no fija page_token_budget
+
+    # ===========================================
+    # Scrape result cache (markdown procesado, por hash del cuerpo)
+    # ===========================================
+    scrape_result_cache_max_mb: float = 64.0  # Comprimido en memoria (LRU); 0 = desactivada
+
+    # ===========================================
+    # Extracción del contenido principal (content_extractor.py)
+    # ===========================================
+    scrape_extractor_min_quality: float = 0.5  # Por debajo se pasa a readability; >1 = siempre readability
+    scrape_fast_markdown: bool = False  # Conversión a markdown en un recorrido (sin imágenes ni negrita/cursiva); False = markdownify
+
+    # ===========================================
+    # Pool de procesos de extracción (extraction_pool.py, solo en la API)
+    # ===========================================
+    scrape_extract_workers: int = 4  # Procesos para el procesado de páginas; 0 = thread del proceso
+    scrape_extract_max_pending: int = 64  # Páginas en vuelo en el pool; el resto espera turno
+    scrape_extract_max_tasks_per_child: int = 200  # Páginas antes de reciclar un worker; 0 = nunca
+
+    # ===========================================
+    # Precarga de resultados de búsqueda (prefetch.py)
+    # ===========================================
+    scrape_prefetch_top_k: int = 4  # URLs de cada brave_web_search que se precargan; 0 = desactivada
+    scrape_prefetch_ttl: float = 90.0  # Segundos que vale una precarga dentro del run
+
+    # ===========================================
+    # Perfil por dominio (domain_profile.py): Playwright directo y dominios muertos
+    # ===========================================
+    scrape_domain_profile_path: Optional[str] = "./data/domain_profiles.db"  # Vacío = solo en memoria
+    scrape_domain_js_min_chars: int = 200  # Markdown más corto + señales de SPA (#root vacío, solo scripts) = pintada con JavaScript
+    scrape_domain_js_after: int = 2  # Fallos seguidos de simple_scrape (403/vacía) para ir directo a Playwright
+    scrape_domain_dead_after: int = 3  # Fallos seguidos (DNS, conexión, timeout) para rechazar el dominio
+    scrape_domain_js_ttl: float = 604800.0  # Segundos que vale "necesita JavaScript" (7 días)
+    scrape_domain_dead_ttl: float = 21600.0  # Segundos que se rechaza un dominio muerto (6 h)
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -0,0 +1,296 @@
+"""
+Control de admisión de runs de agentes.
+
+Sin límite, una ráfaga de requests abre sesiones MCP, páginas de Playwright
+y llamadas LLM sin tope y la latencia se degrada para todos. El
+AdmissionController acota cuántos runs se ejecutan a la vez (en total y
+por agente) y cuántos esperan:
+
+- Hay hueco → el run entra al instante.
+- No hay hueco → espera en una cola FIFO acotada hasta `max_wait_seconds`.
+- Cola llena → AdmissionRejectedError (API: 429 + Retry-After).
+- Espera agotada → AdmissionTimeoutError (API: 503 + Retry-After).
+
+Uso:
+    controller = get_admission_controller()
+    async with controller.admit("electricity"):
+        result = await agent.run(config)
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from aifoundry.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Peso de la última muestra en las medias móviles (EWMA)
+_EWMA_ALPHA = 0.2
+# Duración de un run supuesta mientras no hay muestras (para Retry-After)
+_DEFAULT_RUN_SECONDS = 30.0
+
+
+class AdmissionError(Exception):
+    """Run no admitido. `retry_after` = segundos sugeridos antes de reintentar."""
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionRejectedError(AdmissionError):
+    """La cola de espera está llena."""
+
+    status_code = 429
+
+
+class AdmissionTimeoutError(AdmissionError):
+    """Se agotó la espera máxima en cola."""
+
+    status_code = 503
+
+
+class AdmissionTicket:
+    """Hueco concedido a un run. release() es idempotente."""
+
+    __slots__ = ("_controller", "agent_name", "wait_seconds", "_admitted_at", "_released")
+
+    def __init__(self, controller: "AdmissionController", agent_name: str, wait_seconds: float):
+        self._controller = controller
+        self.agent_name = agent_name
+        self.wait_seconds = wait_seconds
+        self._admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(self.agent_name, time.monotonic() - self._admitted_at)
+
+
+class AdmissionController:
+    """
+    Límite de runs concurrentes (global y por agente) con cola acotada.
+
+    No usa primitivas asyncio ligadas a un event loop: cada espera es un
+    Future propio, así que el controlador puede compartirse entre loops
+    (p.ej. TestClient sin lifespan).
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        per_agent_concurrent: int = 4,
+        max_queue: int = 32,
+        max_wait_seconds: float = 30.0,
+    ):
+        """
+        Args:
+            max_concurrent: Runs en ejecución a la vez en total (0 = sin límite).
+            per_agent_concurrent: Runs a la vez por agente (0 = sin límite).
+            max_queue: Runs esperando hueco (0 = sin cola: se rechaza al instante).
+            max_wait_seconds: Espera máxima en cola antes de rechazar.
+        """
+        self.max_concurrent = max_concurrent
+        self.per_agent_concurrent = per_agent_concurrent
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+
+        self._running = 0
+        self._running_by_agent: Counter = Counter()
+        self._waiters: Deque[Tuple[str, asyncio.Future, float]] = deque()
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._wait_avg = 0.0
+        self._wait_max = 0.0
+        self._run_avg: Optional[float] = None
+
+    # -------------------------------------------------------------------------
+    # Huecos
+    # -------------------------------------------------------------------------
+
+    def _has_slot(self, agent_name: str) -> bool:
+        if self.max_concurrent and self._running >= self.max_concurrent:
+            return False
+        return not (
+            self.per_agent_concurrent
+            and self._running_by_agent[agent_name] >= self.per_agent_concurrent
+        )
+
+    def _take(self, agent_name: str) -> None:
+        self._running += 1
+        self._running_by_agent[agent_name] += 1
+
+    def _release(self, agent_name: str, held_seconds: Optional[float] = None) -> None:
+        self._running -= 1
+        self._running_by_agent[agent_name] -= 1
+        if self._running_by_agent[agent_name] <= 0:
+            del self._running_by_agent[agent_name]
+        if held_seconds is not None:
+            self._run_avg = (
+                held_seconds if self._run_avg is None
+                else (1 - _EWMA_ALPHA) * self._run_avg + _EWMA_ALPHA * held_seconds
+            )
+        self._wake()
+
+    def _wake(self) -> None:
+        """Concede huecos a los que esperan, en orden FIFO."""
+        for entry in list(self._waiters):
+            agent_name, future, _ = entry
+            if future.done():
+                self._waiters.remove(entry)
+                continue
+            if self.max_concurrent and self._running >= self.max_concurrent:
+                break
+            # Un agente en su límite no bloquea a los de otros agentes
+            if self._has_slot(agent_name):
+                self._waiters.remove(entry)
+                self._take(agent_name)
+                future.set_result(None)
+
+    def _record_wait(self, wait_seconds: float) -> None:
+        self.admitted += 1
+        self._wait_avg = (1 - _EWMA_ALPHA) * self._wait_avg + _EWMA_ALPHA * wait_seconds
+        self._wait_max = max(self._wait_max, wait_seconds)
+
+    def retry_after(self) -> int:
+        """Segundos sugeridos para reintentar (estimación por duración media de run)."""
+        run_seconds = self._run_avg if self._run_avg is not None else _DEFAULT_RUN_SECONDS
+        slots = self.max_concurrent or max(1, self._running)
+        return max(1, math.ceil(run_seconds * (len(self._waiters) + 1) / slots))
+
+    # -------------------------------------------------------------------------
+    # API
+    # -------------------------------------------------------------------------
+
+    async def acquire(
+        self, agent_name: str, max_wait_seconds: Optional[float] = None
+    ) -> AdmissionTicket:
+        """
+        Reserva un hueco para un run de `agent_name`.
+
+        Args:
+            agent_name: Agente del run.
+            max_wait_seconds: Espera máxima para este run (p.ej. lo que queda
+                de su deadline); nunca supera la del controlador.
+
+        Raises:
+            AdmissionRejectedError: Si la cola de espera está llena.
+            AdmissionTimeoutError: Si no hay hueco en `max_wait_seconds`.
+        """
+        # _wake() se ejecuta al liberar: si hay hueco, nadie en cola puede usarlo
+        if self._has_slot(agent_name):
+            self._take(agent_name)
+            self._record_wait(0.0)
+            return AdmissionTicket(self, agent_name, 0.0)
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejectedError(
+                f"Demasiadas peticiones en espera ({len(self._waiters)}/{self.max_queue})",
+                retry_after=self.retry_after(),
+            )
+
+        max_wait = self.max_wait_seconds
+        if max_wait_seconds is not None:
+            max_wait = min(max_wait, max_wait_seconds)
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        entry = (agent_name, future, started)
+        self._waiters.append(entry)
+
+        try:
+            await asyncio.wait_for(future, timeout=max_wait)
+        except TimeoutError:
+            if future.done() and not future.cancelled():
+                self._release(agent_name)
+            self._discard_waiter(entry)
+            self.timed_out += 1
+            raise AdmissionTimeoutError(
+                f"Sin hueco para '{agent_name}' tras {max_wait:.0f}s en cola",
+                retry_after=self.retry_after(),
+            ) from None
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # El hueco se concedió justo al cancelarse: devolverlo
+                self._release(agent_name)
+            else:
+                self._discard_waiter(entry)
+            raise
+
+        wait_seconds = time.monotonic() - started
+        self._record_wait(wait_seconds)
+        return AdmissionTicket(self, agent_name, wait_seconds)
+
+    def _discard_waiter(self, entry: Tuple[str, asyncio.Future, float]) -> None:
+        with suppress(ValueError):
+            self._waiters.remove(entry)
+
+    @asynccontextmanager
+    async def admit(
+        self, agent_name: str, max_wait_seconds: Optional[float] = None
+    ) -> AsyncIterator[AdmissionTicket]:
+        """Context manager: reserva un hueco y lo libera al salir."""
+        ticket = await self.acquire(agent_name, max_wait_seconds)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado actual: ejecución, cola y tiempos de espera."""
+        now = time.monotonic()
+        oldest = max((now - started for _, _, started in self._waiters), default=0.0)
+        return {
+            "running": self._running,
+            "running_by_agent": dict(self._running_by_agent),
+            "queued": len(self._waiters),
+            "max_concurrent": self.max_concurrent,
+            "per_agent_concurrent": self.per_agent_concurrent,
+            "max_queue": self.max_queue,
+            "oldest_wait_seconds": round(oldest, 3),
+            "wait_seconds_avg": round(self._wait_avg, 3),
+            "wait_seconds_max": round(self._wait_max, 3),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+# Singleton global
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """
+    Obtiene el singleton del AdmissionController.
+
+    Returns:
+        Instancia global configurada desde settings.
+    """
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController(
+            max_concurrent=settings.admission_max_concurrent,
+            per_agent_concurrent=settings.admission_per_agent_concurrent,
+            max_queue=settings.admission_max_queue,
+            max_wait_seconds=settings.admission_max_wait_seconds,
+        )
+    return _admission_controller
+
+
+def reset_admission_controller() -> None:
+    """Resetea el singleton (útil para tests)."""
+    global _admission_controller
+    _admission_controller = None
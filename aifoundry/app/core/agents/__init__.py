@@ -17,6 +17,7 @@ from aifoundry.app.core.agents.scraper import (
     ScraperAgent,
     get_local_tools,
     simple_scrape_url,
+    simple_scrape_urls,
     get_system_prompt,
 )
 
@@ -24,5 +25,6 @@ __all__ = [
     "ScraperAgent",
     "get_local_tools",
     "simple_scrape_url",
+    "simple_scrape_urls",
     "get_system_prompt",
 ]
@@ -0,0 +1,292 @@
+"""
+Registro de agentes en memoria.
+
+Descubre los config.json de `core/agents/**/config.json` UNA vez, los valida
+contra AgentConfig y guarda en memoria el config validado junto con sus datos
+derivados (países, providers por país, flags de prompts).
+
+Las consultas (`get`, `names`, `entries`) son lookups en un dict — no tocan disco.
+Los ficheros solo se vuelven a leer en `refresh()`, y solo si cambió su
+huella (mtime_ns, size). `refresh(force=True)` re-valida todo.
+
+Uso:
+    registry = get_agent_registry()
+    entry = registry.get("electricity")
+    if entry:
+        print(entry.config.get_country_codes())
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from aifoundry.app.config import settings
+from aifoundry.app.core.agents.scraper.config_schema import AgentConfig
+
+logger = logging.getLogger(__name__)
+
+# Ruta base donde están los agentes (cada subdirectorio con config.json)
+AGENTS_DIR = Path(__file__).resolve().parent
+
+# Huella de un fichero: (mtime_ns, size)
+Fingerprint = Tuple[int, int]
+
+
+class AgentEntry:
+    """
+    Agente registrado: config crudo, config validado y datos derivados.
+
+    Los datos derivados se calculan una vez al cargar para que los
+    endpoints no recalculen nada por request.
+    """
+
+    __slots__ = (
+        "name",
+        "path",
+        "fingerprint",
+        "raw_config",
+        "config",
+        "countries",
+        "providers_by_country",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        path: Path,
+        fingerprint: Fingerprint,
+        raw_config: Dict[str, Any],
+        config: AgentConfig,
+    ):
+        self.name = name
+        self.path = path
+        self.fingerprint = fingerprint
+        self.raw_config = raw_config
+        self.config = config
+        self.countries: List[str] = config.get_country_codes()
+        self.providers_by_country: Dict[str, List[str]] = {
+            cc: config.get_providers(cc) for cc in self.countries
+        }
+
+    @property
+    def product(self) -> str:
+        return self.config.product
+
+    @property
+    def has_extraction_prompt(self) -> bool:
+        return bool(self.config.extraction_prompt)
+
+    @property
+    def has_validation_prompt(self) -> bool:
+        return bool(self.config.validation_prompt)
+
+
+def _fingerprint(path: Path) -> Optional[Fingerprint]:
+    """Devuelve (mtime_ns, size) del fichero, o None si no se puede leer."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class AgentRegistry:
+    """
+    Registro en memoria de los agentes disponibles.
+
+    - `load()` / `refresh()`: escanea disco y (re)valida solo lo que cambió.
+    - `get()` / `names()` / `entries()`: lookups en memoria.
+    - Si `auto_reload_seconds > 0`, los lookups comprueban las huellas como
+      mucho una vez por intervalo (útil en desarrollo).
+    """
+
+    def __init__(self, agents_dir: Path = AGENTS_DIR, auto_reload_seconds: float = 0.0):
+        """
+        Args:
+            agents_dir: Directorio raíz donde buscar config.json.
+            auto_reload_seconds: Intervalo mínimo entre comprobaciones automáticas
+                de cambios en disco. 0 desactiva la recarga automática.
+        """
+        self._agents_dir = agents_dir
+        self._auto_reload_seconds = auto_reload_seconds
+        self._entries: Dict[str, AgentEntry] = {}
+        self._loaded = False
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # Carga
+    # -------------------------------------------------------------------------
+
+    def _scan(self) -> Dict[str, Path]:
+        """Busca config.json en disco. Devuelve {agent_name: path}."""
+        found: Dict[str, Path] = {}
+
+        if not self._agents_dir.is_dir():
+            logger.warning(f"Directorio de agentes no encontrado: {self._agents_dir}")
+            return found
+
+        for config_path in sorted(self._agents_dir.glob("**/config.json")):
+            agent_name = config_path.parent.name
+            # Ignorar directorios internos
+            if agent_name.startswith("_"):
+                continue
+            found[agent_name] = config_path
+
+        return found
+
+    def _load_entry(
+        self, agent_name: str, config_path: Path, fingerprint: Fingerprint
+    ) -> Optional[AgentEntry]:
+        """Lee y valida un config.json. Devuelve None si es inválido."""
+        try:
+            with open(config_path) as f:
+                raw_config = json.load(f)
+            validated = AgentConfig(**raw_config)
+        except ValidationError as e:
+            logger.error(
+                f"Config inválido para agente '{agent_name}' "
+                f"({config_path}):\n{e}"
+            )
+            return None
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Error cargando config de {agent_name}: {e}")
+            return None
+
+        logger.debug(
+            f"Agent discovered: {agent_name} "
+            f"(product={validated.product}, countries={validated.get_country_codes()})"
+        )
+        return AgentEntry(agent_name, config_path, fingerprint, raw_config, validated)
+
+    def refresh(self, force: bool = False) -> Dict[str, List[str]]:
+        """
+        Sincroniza el registro con disco.
+
+        Solo vuelve a leer y validar los config.json cuya huella
+        (mtime_ns, size) cambió, salvo que `force=True`.
+
+        Args:
+            force: Si True, re-valida todos los configs aunque no hayan cambiado.
+
+        Returns:
+            Dict con las listas de agentes "added", "updated" y "removed".
+        """
+        with self._lock:
+            changes: Dict[str, List[str]] = {"added": [], "updated": [], "removed": []}
+            found = self._scan()
+            entries = dict(self._entries)
+
+            for agent_name in list(entries):
+                if agent_name not in found:
+                    del entries[agent_name]
+                    changes["removed"].append(agent_name)
+
+            for agent_name, config_path in found.items():
+                fingerprint = _fingerprint(config_path)
+                if fingerprint is None:
+                    continue
+
+                current = entries.get(agent_name)
+                if (
+                    current is not None
+                    and not force
+                    and current.path == config_path
+                    and current.fingerprint == fingerprint
+                ):
+                    continue
+
+                entry = self._load_entry(agent_name, config_path, fingerprint)
+                if entry is None:
+                    # Config inválido: se descarta (y se quita si estaba)
+                    if entries.pop(agent_name, None) is not None:
+                        changes["removed"].append(agent_name)
+                    continue
+
+                entries[agent_name] = entry
+                changes["updated" if current is not None else "added"].append(agent_name)
+
+            # Swap atómico: los lectores nunca ven un dict a medio construir
+            self._entries = entries
+            self._loaded = True
+            self._last_check = time.monotonic()
+
+        if any(changes.values()):
+            logger.info(
+                f"Agent registry: {len(entries)} agentes "
+                f"(added={changes['added']}, updated={changes['updated']}, "
+                f"removed={changes['removed']})"
+            )
+        return changes
+
+    def load(self) -> None:
+        """Carga inicial (idempotente si ya está cargado)."""
+        if not self._loaded:
+            self.refresh()
+
+    def _ensure_fresh(self) -> None:
+        """Carga perezosa + recarga automática opcional por intervalo."""
+        if not self._loaded:
+            self.refresh()
+        elif (
+            self._auto_reload_seconds > 0
+            and time.monotonic() - self._last_check >= self._auto_reload_seconds
+        ):
+            self.refresh()
+
+    # -------------------------------------------------------------------------
+    # Consultas
+    # -------------------------------------------------------------------------
+
+    def get(self, agent_name: str) -> Optional[AgentEntry]:
+        """Devuelve la entrada de un agente, o None si no existe."""
+        self._ensure_fresh()
+        return self._entries.get(agent_name)
+
+    def names(self) -> List[str]:
+        """Nombres de los agentes registrados (orden de descubrimiento)."""
+        self._ensure_fresh()
+        return list(self._entries)
+
+    def entries(self) -> List[AgentEntry]:
+        """Entradas de todos los agentes registrados."""
+        self._ensure_fresh()
+        return list(self._entries.values())
+
+    def __len__(self) -> int:
+        self._ensure_fresh()
+        return len(self._entries)
+
+    def __contains__(self, agent_name: object) -> bool:
+        self._ensure_fresh()
+        return agent_name in self._entries
+
+
+# Singleton global del registro
+_agent_registry: Optional[AgentRegistry] = None
+
+
+def get_agent_registry() -> AgentRegistry:
+    """
+    Obtiene el singleton del registro de agentes.
+
+    Returns:
+        Instancia global de AgentRegistry (se carga perezosamente).
+    """
+    global _agent_registry
+    if _agent_registry is None:
+        _agent_registry = AgentRegistry(
+            auto_reload_seconds=settings.agent_registry_auto_reload_seconds,
+        )
+    return _agent_registry
+
+
+def reset_agent_registry() -> None:
+    """Resetea el singleton (útil para tests)."""
+    global _agent_registry
+    _agent_registry = None
@@ -8,6 +8,8 @@ Agente genérico con soporte para:
 - Structured output nativo via response_format de create_agent (1 sola llamada LLM)
 - Fallback a post-processing con with_structured_output() (2 llamadas LLM)
 - Checkpointer para memoria conversacional (InMemorySaver)
+- Streaming de progreso (astream_run): pasos, tools, tokens y resultado final
+- Deadline por run (deadline_seconds): al agotarse devuelve el mejor resultado parcial
 
 Se usa directamente con un config.json por dominio (salary, electricity, etc).
 No requiere subclases — cada dominio solo necesita su config.json.
@@ -19,16 +21,24 @@ Nota sobre system_prompt:
     Esto está documentado como patrón válido en la API oficial.
 """
 
+import asyncio
 import logging
 import re
+import time
 import uuid
 import warnings
-from typing import Optional, List, Dict, Type
-
-from langchain_core.messages import HumanMessage, SystemMessage
+from typing import Any, AsyncIterator, Callable, Optional, List, Dict, Type
+
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
 from langchain.agents import create_agent
 from langchain_core.tools import BaseTool
-from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.callbacks import AsyncCallbackHandler, BaseCallbackHandler
 from pydantic import BaseModel
 
 from aifoundry.app.core.models.llm import get_llm
@@ -36,9 +46,92 @@ from aifoundry.app.core.agents.scraper.prompts import get_system_prompt
 from aifoundry.app.core.agents.scraper.memory import InMemoryManager, NullMemoryManager
 from aifoundry.app.core.agents.scraper.tool_executor import ToolResolver
 from aifoundry.app.core.agents.scraper.output_parser import OutputParser
+from aifoundry.app.config import settings
+from aifoundry.app.utils.condense import PageFocus, focus_scope
+from aifoundry.app.utils.country import get_country_info
+from aifoundry.app.utils.deadline import (
+    Deadline,
+    DeadlineExceededError,
+    current_deadline,
+    deadline_scope,
+    within_deadline,
+)
+from aifoundry.app.utils.metrics import (
+    LLM_CALLS,
+    LLM_LATENCY,
+    LLM_TOKENS,
+    RUN_DURATION,
+    RUN_ERRORS,
+    RUN_RETRIES,
+    TOOL_CALLS,
+    TOOL_LATENCY,
+)
+from aifoundry.app.utils.prefetch import PrefetchCache, current_prefetch, prefetch_scope
 
 logger = logging.getLogger(__name__)
 
+# (event, data) → publica un evento de progreso en astream_run()
+EmitFn = Callable[[str, Dict[str, Any]], None]
+
+# Pasos del flujo que no dependen de una tool concreta
+_FIRST_STEP = ("0-2", "📋 ANÁLISIS Y CONSTRUCCIÓN DE QUERY")
+_FINAL_STEP = ("6-7", "📊 EXTRACCIÓN Y VALIDACIÓN")
+
+# Mapeo de tool name → (paso, emoji + descripción)
+_TOOL_TO_STEP: Dict[str, tuple] = {
+    "brave_web_search": ("3", "🔍 BÚSQUEDA WEB"),
+    "simple_scrape_url": ("4", "📄 SCRAPING SIMPLE"),
+    "simple_scrape_urls": ("4", "📄 SCRAPING SIMPLE"),
+    "browser_navigate": ("5", "🎭 PLAYWRIGHT"),
+    "browser_snapshot": ("5", "🎭 PLAYWRIGHT"),
+    "browser_click": ("5", "🎭 PLAYWRIGHT"),
+    "browser_type": ("5", "🎭 PLAYWRIGHT"),
+}
+
+
+def _find_result_urls(text: str) -> List[str]:
+    """Extrae las URLs de un resultado JSON de búsqueda ("url": "...")."""
+    return re.findall(r'"url":\s*"([^"]+)"', text)
+
+
+def _message_text(message) -> str:
+    """Texto de un mensaje (content puede ser str o lista de bloques)."""
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content
+    )
+
+
+def _partial_output(messages: list, max_tool_chars: int = 2000) -> str:
+    """
+    Mejor salida disponible de un run interrumpido.
+
+    Solo mira los mensajes del turno actual (tras el último HumanMessage):
+    la última respuesta final del LLM (sin tool_calls) o, si no llegó a
+    darla, el contenido de las últimas tools (búsquedas/scrapes) truncado.
+    """
+    start = 0
+    for i, message in enumerate(messages):
+        if isinstance(message, HumanMessage):
+            start = i + 1
+    turn = messages[start:]
+
+    for message in reversed(turn):
+        if isinstance(message, AIMessage) and not message.tool_calls:
+            text = _message_text(message).strip()
+            if text:
+                return text
+
+    tool_outputs = [
+        _message_text(m)[:max_tool_chars]
+        for m in turn
+        if isinstance(m, ToolMessage)
+    ]
+    return "\n\n".join(tool_outputs[-3:])
+
 
 # =============================================================================
 # CALLBACK HANDLER
@@ -56,15 +149,7 @@ class AgentCallbackHandler(BaseCallbackHandler):
     - PASO 6-7: Extracción y validación
     """
 
-    # Mapeo de tool name → (paso, emoji + descripción)
-    _TOOL_TO_STEP: Dict[str, tuple] = {
-        "brave_web_search": ("3", "🔍 BÚSQUEDA WEB"),
-        "simple_scrape_url": ("4", "📄 SCRAPING SIMPLE"),
-        "browser_navigate": ("5", "🎭 PLAYWRIGHT"),
-        "browser_snapshot": ("5", "🎭 PLAYWRIGHT"),
-        "browser_click": ("5", "🎭 PLAYWRIGHT"),
-        "browser_type": ("5", "🎭 PLAYWRIGHT"),
-    }
+    _TOOL_TO_STEP = _TOOL_TO_STEP
 
     def __init__(self, agent_name: str = "BASE"):
         self.agent_name = agent_name
@@ -83,7 +168,7 @@ class AgentCallbackHandler(BaseCallbackHandler):
     def on_llm_start(self, serialized, prompts, **kwargs) -> None:
         if self._first_llm:
             self._first_llm = False
-            self._log_step_header("0-2", "📋 ANÁLISIS Y CONSTRUCCIÓN DE QUERY")
+            self._log_step_header(*_FIRST_STEP)
         self._logger.info("🤖 AGENT %s - LLM thinking...", self.agent_name)
 
     def on_llm_end(self, response, **kwargs) -> None:
@@ -104,7 +189,7 @@ class AgentCallbackHandler(BaseCallbackHandler):
 
         # Para brave_web_search, mostrar URLs encontradas
         if "brave" in name.lower() or "url" in output_str.lower()[:50]:
-            urls = re.findall(r'"url":\s*"([^"]+)"', output_str)
+            urls = _find_result_urls(output_str)
             if urls:
                 self._logger.info("   URLs encontradas (%d):", len(urls))
                 for i, url in enumerate(urls[:10], 1):
@@ -121,28 +206,187 @@ class AgentCallbackHandler(BaseCallbackHandler):
         pass  # Ya se muestra en on_tool_start
 
     def on_agent_finish(self, finish, **kwargs) -> None:
-        self._log_step_header("6-7", "📊 EXTRACCIÓN Y VALIDACIÓN")
+        self._log_step_header(*_FINAL_STEP)
         self._logger.info("✅ AGENT %s FINISHED", self.agent_name)
 
 
+class StreamEventHandler(AsyncCallbackHandler):
+    """
+    Callback handler que publica el progreso del agente como eventos
+    para astream_run() (mismos pasos que AgentCallbackHandler).
+
+    Eventos:
+    - step: {"step", "name"} al entrar en un PASO nuevo
+    - tool_start: {"tool", "input", "urls"}
+    - tool_end: {"tool", "urls", "output_chars"}
+    - tool_error: {"error"}
+    """
+
+    def __init__(self, emit: EmitFn):
+        self._emit = emit
+        self._current_step: Optional[str] = None
+
+    def step(self, step_num: str, step_name: str) -> None:
+        """Emite un evento de paso si es diferente al actual."""
+        if self._current_step != step_num:
+            self._current_step = step_num
+            self._emit("step", {"step": step_num, "name": step_name})
+
+    async def on_chat_model_start(self, serialized, messages, **kwargs) -> None:
+        if self._current_step is None:
+            self.step(*_FIRST_STEP)
+
+    async def on_llm_start(self, serialized, prompts, **kwargs) -> None:
+        if self._current_step is None:
+            self.step(*_FIRST_STEP)
+
+    async def on_tool_start(self, serialized, input_str, **kwargs) -> None:
+        tool_name = (serialized or {}).get("name") or kwargs.get("name", "unknown")
+        if tool_name in _TOOL_TO_STEP:
+            self.step(*_TOOL_TO_STEP[tool_name])
+
+        input_str = str(input_str)
+        self._emit("tool_start", {
+            "tool": tool_name,
+            "input": input_str[:500],
+            "urls": [url.rstrip(".,;:") for url in re.findall(r'https?://[^\s"\'<>]+', input_str)],
+        })
+
+    async def on_tool_end(self, output, name: str = "", **kwargs) -> None:
+        output_str = str(getattr(output, "content", output))
+        self._emit("tool_end", {
+            "tool": name or kwargs.get("name", ""),
+            "urls": _find_result_urls(output_str)[:10],
+            "output_chars": len(output_str),
+        })
+
+    async def on_tool_error(self, error, **kwargs) -> None:
+        self._emit("tool_error", {"error": str(error)[:500]})
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Callback handler que registra métricas de LLM y tools
+    (latencia, llamadas, tokens) en utils/metrics.py.
+
+    Se ejecuta inline (sin thread pool): solo actualiza contadores.
+    """
+
+    run_inline = True
+
+    def __init__(self, agent_name: str, default_model: str):
+        self.agent_name = agent_name
+        self.default_model = default_model
+        # run_id → (inicio, modelo | tool)
+        self._llm_runs: Dict[Any, tuple] = {}
+        self._tool_runs: Dict[Any, tuple] = {}
+
+    def _start_llm(self, run_id, metadata: Optional[dict]) -> None:
+        model = (metadata or {}).get("ls_model_name") or self.default_model
+        self._llm_runs[run_id] = (time.monotonic(), model)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs) -> None:
+        self._start_llm(run_id, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs) -> None:
+        self._start_llm(run_id, metadata)
+
+    def _finish_llm(self, run_id, status: str):
+        started, model = self._llm_runs.pop(run_id, (None, self.default_model))
+        LLM_CALLS.inc(agent=self.agent_name, model=model, status=status)
+        if started is not None:
+            LLM_LATENCY.observe(time.monotonic() - started, agent=self.agent_name, model=model)
+        return model
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        model = self._finish_llm(run_id, "ok")
+        prompt_tokens, completion_tokens = _token_usage(response)
+        if prompt_tokens:
+            LLM_TOKENS.inc(prompt_tokens, agent=self.agent_name, model=model, type="prompt")
+        if completion_tokens:
+            LLM_TOKENS.inc(completion_tokens, agent=self.agent_name, model=model, type="completion")
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        self._finish_llm(run_id, "error")
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs) -> None:
+        tool_name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        self._tool_runs[run_id] = (time.monotonic(), tool_name)
+
+    def _finish_tool(self, run_id, status: str) -> None:
+        started, tool_name = self._tool_runs.pop(run_id, (None, "unknown"))
+        TOOL_CALLS.inc(tool=tool_name, status=status)
+        if started is not None:
+            TOOL_LATENCY.observe(time.monotonic() - started, tool=tool_name)
+
+    def on_tool_end(self, output, *, run_id, **kwargs) -> None:
+        # Las tools MCP devuelven los errores como texto ("### Error ...")
+        text = str(getattr(output, "content", output))[:2000]
+        self._finish_tool(run_id, "error" if _is_recoverable_error(text) else "ok")
+
+    def on_tool_error(self, error, *, run_id, **kwargs) -> None:
+        self._finish_tool(run_id, "error")
+
+
+class PrefetchCallbackHandler(BaseCallbackHandler):
+    """
+    Precarga las primeras URLs de cada brave_web_search (utils/prefetch.py)
+    mientras el LLM decide cuáles scrapear.
+
+    Se ejecuta inline, en el event loop y con el contexto del run: la caché
+    de precarga del run llega por contextvars. Sin caché (run sin precarga)
+    no hace nada.
+    """
+
+    run_inline = True
+
+    def on_tool_end(self, output, name: str = "", **kwargs) -> None:
+        if "brave" not in (name or "").lower():
+            return
+        prefetch = current_prefetch()
+        if prefetch is None:
+            return
+        # Mismo parseo que AgentCallbackHandler: los "url" del JSON, en orden
+        prefetch.prefetch(_find_result_urls(str(getattr(output, "content", output))))
+
+
+def _token_usage(response) -> tuple:
+    """(prompt_tokens, completion_tokens) de un LLMResult."""
+    prompt = completion = 0
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                prompt += usage.get("input_tokens", 0)
+                completion += usage.get("output_tokens", 0)
+    if prompt or completion:
+        return prompt, completion
+
+    token_usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+
+
 
 
 # =============================================================================
 # RECOVERABLE ERRORS
 # =============================================================================
 
-_RECOVERABLE_PATTERNS = (
-    "err_http2_protocol_error",
-    "net::err_",
-    "page.goto:",
-    "timeout",
-    "connection refused",
-    "connection reset",
-    "ssl_error",
-    "certificate",
-    "name not resolved",
-    "### error",
-)
+# Patrón → clase de error (label `error_class` de las métricas)
+_RECOVERABLE_ERROR_CLASSES: Dict[str, str] = {
+    "err_http2_protocol_error": "http2",
+    "net::err_": "network",
+    "page.goto:": "navigation",
+    "timeout": "timeout",
+    "connection refused": "connection_refused",
+    "connection reset": "connection_reset",
+    "ssl_error": "ssl",
+    "certificate": "ssl",
+    "name not resolved": "dns",
+    "### error": "tool_error",
+}
+
+_RECOVERABLE_PATTERNS = tuple(_RECOVERABLE_ERROR_CLASSES)
 
 # Errores que indican "sin datos" pero NO son fallos de red
 # No deben causar retry — se devuelven como resultado parcial/vacío
@@ -168,6 +412,20 @@ def _is_no_data_error(text: str) -> bool:
     return any(p in text_lower for p in _NO_DATA_PATTERNS)
 
 
+def _classify_error(text: str) -> str:
+    """
+    Clase de un error para métricas: la del primer patrón recuperable que
+    coincide, "no_data" si es una búsqueda sin resultados, u "other".
+    """
+    text_lower = (text or "").lower()
+    for pattern, error_class in _RECOVERABLE_ERROR_CLASSES.items():
+        if pattern in text_lower:
+            return error_class
+    if _is_no_data_error(text_lower):
+        return "no_data"
+    return "other"
+
+
 def _extract_failed_url(text: str) -> Optional[str]:
     """Extrae la primera URL de un texto de error."""
     match = re.search(r'https?://[^\s\)\"\'`\]<>]+', text)
@@ -286,6 +544,14 @@ class ScraperAgent:
         # Callback para logging
         self._callbacks = [AgentCallbackHandler()] if verbose else []
 
+        # Callback para métricas (LLM/tools) — siempre activo, sin estado entre runs
+        self._metrics_agent = agent_name or "default"
+        self._metrics_handler = MetricsCallbackHandler(self._metrics_agent, settings.litellm_model)
+
+        # Precarga de resultados de búsqueda — sin estado (la caché es del run)
+        self._prefetch_handler = PrefetchCallbackHandler()
+        self._prefetch_enabled = settings.scrape_prefetch_top_k > 0 and not disable_simple_scrape
+
         # Tool resolver (carga tools locales + MCP)
         self._tool_resolver = ToolResolver(
             use_mcp=use_mcp,
@@ -330,8 +596,11 @@ class ScraperAgent:
         if self._agent is not None:
             return
 
-        # Resolver tools (locales + MCP) via ToolResolver
-        self._all_tools = await self._tool_resolver.resolve_tools()
+        # Resolver tools (locales + MCP) via ToolResolver.
+        # Si ya están resueltas (p.ej. recompilación tras reset de memoria),
+        # se reutilizan sin volver a conectar con los MCP servers.
+        if self._all_tools is None:
+            self._all_tools = await self._tool_resolver.resolve_tools()
 
         # Construir kwargs para create_agent
         agent_kwargs: Dict = {
@@ -367,6 +636,35 @@ class ScraperAgent:
         self._agent = None
         self._all_tools = None
 
+    @property
+    def is_initialized(self) -> bool:
+        """Si el agente ya tiene tools cargadas y grafo compilado."""
+        return self._agent is not None
+
+    async def health_check(self) -> bool:
+        """
+        Comprueba que el agente sigue siendo reutilizable.
+
+        Returns:
+            True si está inicializado y sus MCP servers responden.
+        """
+        if self._agent is None:
+            return False
+        return await self._tool_resolver.health_check()
+
+    def reset_run_state(self) -> None:
+        """
+        Limpia el estado de un run para reutilizar el agente (pool).
+
+        Borra los checkpoints del thread usado, genera un thread_id nuevo y
+        recrea los callbacks. No recompila el grafo ni reconecta MCP.
+        """
+        if self._use_memory:
+            self._memory_manager.release_thread(self._thread_id)
+        self._thread_id = self._memory_manager.generate_thread_id()
+        if self._verbose:
+            self._callbacks = [AgentCallbackHandler()]
+
     # -------------------------------------------------------------------------
     # Memoria
     # -------------------------------------------------------------------------
@@ -426,13 +724,20 @@ class ScraperAgent:
     # Run config builder
     # -------------------------------------------------------------------------
 
-    def _build_run_config(self) -> dict:
+    def _build_run_config(self, extra_callbacks: Optional[List] = None) -> dict:
         """
         Construye el config dict para `agent.ainvoke()`.
 
-        Incluye callbacks y, si hay memoria, el thread_id estable.
+        Incluye callbacks (más los extra, p.ej. de streaming) y, si hay
+        memoria, el thread_id estable.
         """
-        run_config: dict = {"callbacks": self._callbacks}
+        run_config: dict = {
+            "callbacks": (
+                self._callbacks
+                + [self._metrics_handler, self._prefetch_handler]
+                + (extra_callbacks or [])
+            ),
+        }
 
         if self._use_memory:
             run_config["configurable"] = {"thread_id": self._thread_id}
@@ -443,7 +748,9 @@ class ScraperAgent:
     # Ejecución principal
     # -------------------------------------------------------------------------
 
-    async def run(self, config: dict, max_retries: int = 3) -> dict:
+    async def run(
+        self, config: dict, max_retries: int = 3, deadline_seconds: Optional[float] = None
+    ) -> dict:
         """
         Ejecuta el agente con retry automático ante errores de red.
 
@@ -455,10 +762,147 @@ class ScraperAgent:
             config: Dict con product, provider, country_code, language, query.
                     Opcionalmente thread_id para reanudar una conversación.
             max_retries: Número máximo de reintentos ante errores de red.
+            deadline_seconds: Presupuesto total del run (reintentos, LLM,
+                tools). Al agotarse devuelve status="partial" con lo que
+                haya. None = sin límite (o el deadline_scope del llamador).
 
         Returns:
             dict con status, output, y datos parseados.
         """
+        return await self._run(config, max_retries, deadline_seconds=deadline_seconds)
+
+    async def astream_run(
+        self, config: dict, max_retries: int = 3, deadline_seconds: Optional[float] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Igual que run(), pero va emitiendo el progreso mientras se ejecuta.
+
+        Cada evento es un dict {"event": str, "data": dict}:
+        - step: PASO del flujo ({"step": "3", "name": "🔍 BÚSQUEDA WEB"})
+        - tool_start / tool_end / tool_error: llamadas a tools con sus URLs
+        - token: fragmento de texto generado por el LLM ({"delta": "..."})
+        - retry: reintento por error de red ({"attempt", "error"})
+        - final: el mismo dict que devolvería run()
+
+        Si el consumidor deja de iterar (cliente desconectado), el run
+        en curso se cancela.
+
+        Example:
+            async for event in agent.astream_run(config):
+                if event["event"] == "token":
+                    print(event["data"]["delta"], end="")
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def emit(event: str, data: Dict[str, Any]) -> None:
+            queue.put_nowait({"event": event, "data": data})
+
+        task = asyncio.create_task(
+            self._run(config, max_retries, emit=emit, deadline_seconds=deadline_seconds)
+        )
+        # Centinela: los eventos emitidos antes de terminar ya están en la cola
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield item
+            yield {"event": "final", "data": task.result()}
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    async def _invoke(
+        self,
+        messages: list,
+        run_config: dict,
+        emit: Optional[EmitFn],
+        progress: Optional[dict] = None,
+    ) -> dict:
+        """
+        Ejecuta una vuelta completa del grafo ReAct.
+
+        Sin `emit` ni `progress` usa ainvoke(). Si no, usa astream(): con
+        `emit` reenvía los tokens del LLM según se generan y con `progress`
+        guarda en progress["state"] el último estado (para devolver un
+        resultado parcial si vence el deadline). Devuelve el estado final.
+        """
+        if emit is None and progress is None:
+            return await self._agent.ainvoke({"messages": messages}, config=run_config)
+
+        state: dict = {}
+        async for mode, chunk in self._agent.astream(
+            {"messages": messages},
+            config=run_config,
+            stream_mode=["messages", "values"],
+        ):
+            if mode == "values":
+                state = chunk
+                if progress is not None:
+                    progress["state"] = chunk
+                continue
+            if emit is None:
+                continue
+            message, _metadata = chunk
+            if isinstance(message, AIMessageChunk):
+                # .text es método en langchain-core < 1.0 y propiedad después
+                delta = message.text() if callable(message.text) else message.text
+                if delta:
+                    emit("token", {"delta": delta})
+        return state
+
+    async def _run(
+        self,
+        config: dict,
+        max_retries: int,
+        emit: Optional[EmitFn] = None,
+        deadline_seconds: Optional[float] = None,
+    ) -> dict:
+        """
+        Ejecuta el bucle de reintentos registrando la duración del run.
+
+        Fija el deadline del run (si lo hay) para que lo vean todas las
+        etapas: LLM, tools MCP y simple_scrape_url; el foco (palabras
+        clave y tokens por página) con que se condensan los scrapes; y la
+        caché de precarga de los resultados de búsqueda.
+        """
+        started = time.monotonic()
+        status = "error"
+        deadline = Deadline(deadline_seconds) if deadline_seconds else current_deadline()
+        focus = PageFocus.from_run_config(
+            config,
+            get_country_info(config.get("country_code", "ES"))["name"],
+            settings.scrape_page_token_budget,
+        )
+        try:
+            with deadline_scope(deadline), focus_scope(focus), prefetch_scope(self._new_prefetch()):
+                result = await self._run_attempts(config, max_retries, emit)
+            status = result.get("status", "error")
+            return result
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        finally:
+            RUN_DURATION.observe(
+                time.monotonic() - started, agent=self._metrics_agent, status=status
+            )
+
+    def _new_prefetch(self) -> Optional[PrefetchCache]:
+        """Caché de precarga del run (None si está desactivada)."""
+        if not self._prefetch_enabled:
+            return None
+        return PrefetchCache(top_k=settings.scrape_prefetch_top_k, ttl=settings.scrape_prefetch_ttl)
+
+    async def _run_attempts(
+        self, config: dict, max_retries: int, emit: Optional[EmitFn] = None
+    ) -> dict:
+        """Bucle de ejecución con reintentos compartido por run() y astream_run()."""
+        stream_handler = StreamEventHandler(emit) if emit is not None else None
+        extra_callbacks = [stream_handler] if stream_handler is not None else None
+
         # Auto-initialize si no se usó como context manager
         if self._agent is None:
             await self.initialize()
@@ -468,12 +912,19 @@ class ScraperAgent:
             self._thread_id = config["thread_id"]
 
         # Run config estable (mismo thread_id en todos los reintentos)
-        run_config = self._build_run_config()
+        run_config = self._build_run_config(extra_callbacks)
 
         last_error: Optional[str] = None
         failed_urls: List[str] = []
 
+        # Con deadline se sigue el estado del grafo para poder devolver un parcial
+        deadline = current_deadline()
+        progress: Optional[dict] = {} if deadline is not None else None
+
         for attempt in range(max_retries):
+            if deadline is not None and deadline.expired:
+                return await self._deadline_result(deadline, progress, attempt, last_error)
+
             # Construir mensajes frescos en cada intento
             system = self.get_system_prompt(config)
             human_msg = config.get("query", "Ejecuta la tarea según las instrucciones.")
@@ -490,9 +941,8 @@ class ScraperAgent:
             ]
 
             try:
-                result = await self._agent.ainvoke(
-                    {"messages": messages},
-                    config=run_config,
+                result = await within_deadline(
+                    self._invoke(messages, run_config, emit, progress), stage="agente"
                 )
 
                 final_message = result["messages"][-1]
@@ -505,11 +955,16 @@ class ScraperAgent:
                     if url:
                         failed_urls.append(url)
 
+                    error_class = _classify_error(output)
+                    RUN_ERRORS.inc(agent=self._metrics_agent, error_class=error_class)
                     if attempt < max_retries - 1:
+                        RUN_RETRIES.inc(agent=self._metrics_agent, error_class=error_class)
                         logger.warning(
                             f"⚠️ Error de red detectado (intento {attempt + 1}/{max_retries}), "
                             f"reintentando..."
                         )
+                        if emit is not None:
+                            emit("retry", {"attempt": attempt + 1, "error": output[:500]})
                         # Resetear memoria para evitar estado corrupto
                         if self._use_memory:
                             self._memory_manager.clear_session(self._thread_id)
@@ -517,15 +972,21 @@ class ScraperAgent:
                             self._thread_id = self._memory_manager.generate_thread_id()
                             self._agent = None
                             await self.initialize()
-                            run_config = self._build_run_config()
+                            run_config = self._build_run_config(extra_callbacks)
                         continue
 
+                if stream_handler is not None:
+                    stream_handler.step(*_FINAL_STEP)
+
                 # --- Structured output ---
-                structured_response = await self._output_parser.extract_structured(
-                    result=result,
-                    output=output,
-                    llm=self.llm,
-                    config=config,
+                structured_response = await within_deadline(
+                    self._output_parser.extract_structured(
+                        result=result,
+                        output=output,
+                        llm=self.llm,
+                        config=config,
+                    ),
+                    stage="extracción estructurada",
                 )
 
                 # Parsear output texto (skip si hay structured output)
@@ -547,12 +1008,19 @@ class ScraperAgent:
 
                 return response
 
+            except DeadlineExceededError as e:
+                logger.warning(f"⏱️ {e} (intento {attempt + 1}/{max_retries})")
+                return await self._deadline_result(deadline, progress, attempt, last_error)
+
             except Exception as e:
                 last_error = str(e)
                 url = _extract_failed_url(last_error)
                 if url:
                     failed_urls.append(url)
 
+                error_class = _classify_error(last_error)
+                RUN_ERRORS.inc(agent=self._metrics_agent, error_class=error_class)
+
                 # "No web results found" = búsqueda sin resultados, no error de red
                 # Devolver como resultado parcial en vez de reintentar
                 if _is_no_data_error(last_error):
@@ -567,6 +1035,9 @@ class ScraperAgent:
 
                 if _is_recoverable_error(last_error) and attempt < max_retries - 1:
                     logger.warning(f"⚠️ Error de red (intento {attempt + 1}/{max_retries}): {e}")
+                    RUN_RETRIES.inc(agent=self._metrics_agent, error_class=error_class)
+                    if emit is not None:
+                        emit("retry", {"attempt": attempt + 1, "error": last_error[:500]})
                     # Resetear memoria para evitar estado corrupto (tool_use sin tool_result)
                     if self._use_memory:
                         self._memory_manager.clear_session(self._thread_id)
@@ -574,7 +1045,7 @@ class ScraperAgent:
                         self._thread_id = self._memory_manager.generate_thread_id()
                         self._agent = None
                         await self.initialize()
-                        run_config = self._build_run_config()
+                        run_config = self._build_run_config(extra_callbacks)
                     continue
 
                 logger.error(f"❌ Agent error (no recuperable): {e}")
@@ -594,6 +1065,51 @@ class ScraperAgent:
             "thread_id": self._thread_id,
         }
 
+    async def _deadline_result(
+        self,
+        deadline: Deadline,
+        progress: Optional[dict],
+        attempt: int,
+        last_error: Optional[str],
+    ) -> dict:
+        """
+        Resultado parcial cuando vence el deadline del run.
+
+        Devuelve lo mejor que haya en el último estado del grafo (la última
+        respuesta del LLM o, si no llegó a responder, lo que devolvieron las
+        tools) con status="partial".
+        """
+        messages = ((progress or {}).get("state") or {}).get("messages", [])
+        partial = _partial_output(messages)
+
+        header = f"⏱️ Tiempo agotado ({deadline.seconds:g}s) antes de completar la tarea."
+        if partial:
+            output = f"{header} Resultado parcial:\n\n{partial}"
+        elif last_error:
+            output = f"{header} Último error: {last_error[:500]}"
+        else:
+            output = f"{header} No se obtuvieron datos."
+
+        response = {
+            "status": "partial",
+            "output": output,
+            "messages_count": len(messages),
+            "attempts": attempt + 1,
+            "thread_id": self._thread_id,
+            "deadline_exceeded": True,
+            **(self._output_parser.parse_text(partial) if partial else {}),
+        }
+
+        # El grafo se cortó a mitad (tool_use sin tool_result): no reutilizar la sesión
+        if self._use_memory and messages:
+            self._memory_manager.clear_session(self._thread_id)
+            self._checkpointer = self._memory_manager.get_checkpointer()
+            self._thread_id = self._memory_manager.generate_thread_id()
+            self._agent = None
+            await self.initialize()
+
+        return response
+
     # -------------------------------------------------------------------------
     # Output parsing (delegado a OutputParser)
     # -------------------------------------------------------------------------
@@ -48,6 +48,7 @@ class AgentConfig(BaseModel):
         - extraction_prompt: Prompt custom para el paso de extracción de datos
         - validation_prompt: Prompt custom para el paso de validación
         - social_networks: Lista de redes sociales (solo para agente social_comments)
+        - page_token_budget: Tokens máximos por página scrapeada (default SCRAPE_PAGE_TOKEN_BUDGET)
     """
 
     model_config = ConfigDict(extra="forbid")
@@ -60,6 +61,7 @@ class AgentConfig(BaseModel):
     validation_prompt: str = ""
     system_prompt_template: Optional[str] = None
     social_networks: Optional[List[str]] = None
+    page_token_budget: Optional[int] = None
 
     @field_validator("product")
     @classmethod
@@ -94,6 +96,13 @@ class AgentConfig(BaseModel):
             )
         return v
 
+    @field_validator("page_token_budget")
+    @classmethod
+    def positive_token_budget(cls, v: Optional[int]) -> Optional[int]:
+        if v is not None and v < 200:
+            raise ValueError("page_token_budget debe ser >= 200 tokens")
+        return v
+
     def get_country_codes(self) -> List[str]:
         """Lista de códigos de país soportados."""
         return list(self.countries.keys())
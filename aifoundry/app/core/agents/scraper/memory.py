@@ -23,6 +23,10 @@ class BaseMemoryManager(ABC):
     - get_checkpointer(): retorna el checkpointer de LangGraph
     - clear_session(): limpia una sesión específica
     - generate_thread_id(): genera un nuevo thread_id
+
+    Opcionalmente:
+    - release_thread(): borra los checkpoints de un thread sin recrear
+      el checkpointer (usado al devolver agentes al pool)
     """
 
     @abstractmethod
@@ -39,6 +43,9 @@ class BaseMemoryManager(ABC):
         """Genera un nuevo thread_id único."""
         return str(uuid.uuid4())
 
+    def release_thread(self, thread_id: str) -> None:  # noqa: B027 - hook opcional
+        """Libera el estado de un thread. Por defecto no hace nada."""
+
     @abstractmethod
     def get_history(self, thread_id: str) -> Optional[List]:
         """Obtiene el historial de mensajes de un thread."""
@@ -71,6 +78,18 @@ class InMemoryManager(BaseMemoryManager):
         self._checkpointer = MemorySaver()
         logger.info(f"Sesión limpiada (nuevo MemorySaver). Thread: {thread_id[:8]}...")
 
+    def release_thread(self, thread_id: str) -> None:
+        """
+        Borra los checkpoints de un thread manteniendo el mismo MemorySaver.
+
+        A diferencia de clear_session(), no invalida el agente compilado
+        (que tiene el checkpointer enlazado), así que se puede reutilizar.
+        """
+        try:
+            self._checkpointer.delete_thread(thread_id)
+        except Exception as e:
+            logger.debug(f"Error liberando thread {thread_id[:8]}...: {e}")
+
     def get_history(self, thread_id: str) -> Optional[List]:
         """Obtiene el historial de mensajes del thread actual."""
         try:
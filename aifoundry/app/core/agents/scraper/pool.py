@@ -0,0 +1,457 @@
+"""
+Pool de ScraperAgent pre-inicializados.
+
+Crear un ScraperAgent por request implica handshake MCP + get_tools(),
+compilar el grafo con create_agent y un MemorySaver nuevo. El pool mantiene
+agentes ya inicializados por combinación
+(agent_name, use_mcp, disable_simple_scrape, response_model) y los presta:
+
+- checkout(): devuelve un agente libre, crea uno si hay hueco (< max_size)
+  o espera hasta `checkout_timeout`.
+- checkin: resetea el estado del run (thread, checkpoints, callbacks) y lo
+  devuelve al pool. Si el run falló, se comprueba su salud y se recicla
+  si sus MCP servers ya no responden.
+- health_check(): revisa los agentes libres y repone hasta `min_size`.
+
+Uso:
+    manager = get_agent_pool_manager()
+    async with manager.checkout("electricity", use_mcp=True) as agent:
+        result = await agent.run(config)
+"""
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+from pydantic import BaseModel
+
+from aifoundry.app.config import settings
+from aifoundry.app.core.agents.scraper.agent import ScraperAgent
+
+logger = logging.getLogger(__name__)
+
+# (agent_name, use_mcp, disable_simple_scrape, response_model)
+PoolKey = Tuple[str, bool, bool, Optional[Type[BaseModel]]]
+
+
+class PoolExhaustedError(Exception):
+    """No hay agentes libres y el pool ya está en max_size."""
+
+
+def _default_factory(key: PoolKey) -> ScraperAgent:
+    agent_name, use_mcp, disable_simple_scrape, response_model = key
+    return ScraperAgent(
+        use_mcp=use_mcp,
+        disable_simple_scrape=disable_simple_scrape,
+        response_model=response_model,
+        agent_name=agent_name,
+        verbose=False,  # No verbose en API (usamos logging)
+    )
+
+
+class AgentPool:
+    """Pool de agentes inicializados para una combinación concreta (PoolKey)."""
+
+    def __init__(
+        self,
+        key: PoolKey,
+        min_size: int = 0,
+        max_size: int = 4,
+        checkout_timeout: float = 30.0,
+        agent_factory: Optional[Callable[[PoolKey], ScraperAgent]] = None,
+    ):
+        """
+        Args:
+            key: Combinación de parámetros que comparten los agentes del pool.
+            min_size: Agentes que se mantienen calientes (warmup/health_check).
+            max_size: Máximo de agentes vivos (libres + prestados).
+            checkout_timeout: Segundos máximos esperando un agente libre.
+            agent_factory: Constructor de agentes (por defecto ScraperAgent).
+        """
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(f"Tamaños de pool inválidos: min={min_size}, max={max_size}")
+
+        self.key = key
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self._factory = agent_factory or _default_factory
+        self._idle: Deque[ScraperAgent] = deque()
+        self._size = 0  # agentes vivos: libres + prestados + en creación
+        self._waiting = 0
+        self._closed = False
+        self._cond = asyncio.Condition()
+
+    @property
+    def name(self) -> str:
+        agent_name, use_mcp, disable_simple_scrape, response_model = self.key
+        model = response_model.__name__ if response_model else "none"
+        return f"{agent_name}[mcp={use_mcp},no_scrape={disable_simple_scrape},model={model}]"
+
+    # -------------------------------------------------------------------------
+    # Creación / descarte
+    # -------------------------------------------------------------------------
+
+    async def _create(self) -> ScraperAgent:
+        """Crea e inicializa un agente. El hueco (_size) ya está reservado."""
+        try:
+            agent = self._factory(self.key)
+            await agent.initialize()
+            return agent
+        except BaseException:
+            async with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    async def _discard(self, agent: ScraperAgent) -> None:
+        """Libera un agente y su hueco en el pool."""
+        try:
+            await agent.cleanup()
+        except Exception as e:
+            logger.debug(f"Error limpiando agente del pool {self.name}: {e}")
+        async with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    # -------------------------------------------------------------------------
+    # Checkout / checkin
+    # -------------------------------------------------------------------------
+
+    async def acquire(self) -> ScraperAgent:
+        """
+        Obtiene un agente listo para usar.
+
+        Raises:
+            PoolExhaustedError: Si no queda hueco tras `checkout_timeout`.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.checkout_timeout
+
+        async with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolExhaustedError(f"Pool {self.name} cerrado")
+                if self._idle:
+                    return self._idle.popleft()
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise PoolExhaustedError(
+                        f"Pool {self.name} agotado ({self.max_size} agentes en uso)"
+                    )
+                self._waiting += 1
+                try:
+                    await asyncio.wait_for(self._cond.wait(), remaining)
+                except TimeoutError:
+                    pass
+                finally:
+                    self._waiting -= 1
+
+        # Hueco reservado: crear fuera del lock (handshake MCP puede tardar)
+        return await self._create()
+
+    async def release(self, agent: ScraperAgent, healthy: bool = True) -> None:
+        """
+        Devuelve un agente al pool tras resetear su estado de run.
+
+        Args:
+            agent: Agente obtenido con acquire().
+            healthy: False si el run falló — se comprueba la salud del agente
+                antes de devolverlo y se recicla si sus MCP no responden.
+        """
+        try:
+            agent.reset_run_state()
+            if not healthy:
+                healthy = await agent.health_check()
+        except Exception as e:
+            logger.warning(f"Error reseteando agente del pool {self.name}: {e}")
+            healthy = False
+
+        if not healthy or self._closed:
+            if not healthy:
+                logger.info(f"Reciclando agente no sano del pool {self.name}")
+            await self._discard(agent)
+            return
+
+        async with self._cond:
+            self._idle.append(agent)
+            self._cond.notify()
+
+    @asynccontextmanager
+    async def checkout(self) -> AsyncIterator[ScraperAgent]:
+        """Context manager: acquire() + release() automático."""
+        agent = await self.acquire()
+        healthy = True
+        try:
+            yield agent
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            await self.release(agent, healthy=healthy)
+
+    # -------------------------------------------------------------------------
+    # Mantenimiento
+    # -------------------------------------------------------------------------
+
+    async def fill(self) -> None:
+        """Crea agentes hasta alcanzar min_size."""
+        created = []
+        while True:
+            async with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    break
+                self._size += 1
+            try:
+                created.append(await self._create())
+            except Exception as e:
+                logger.warning(f"Error precalentando pool {self.name}: {e}")
+                break
+
+        if created:
+            async with self._cond:
+                self._idle.extend(created)
+                self._cond.notify(len(created))
+            logger.info(f"Pool {self.name}: {len(created)} agentes precalentados")
+
+    async def health_check(self) -> int:
+        """
+        Comprueba los agentes libres, recicla los no sanos y repone min_size.
+
+        Returns:
+            Número de agentes reciclados.
+        """
+        async with self._cond:
+            candidates = list(self._idle)
+            self._idle.clear()
+
+        healthy, recycled = [], 0
+        for agent in candidates:
+            try:
+                ok = await agent.health_check()
+            except Exception:
+                ok = False
+            if ok:
+                healthy.append(agent)
+            else:
+                recycled += 1
+                await self._discard(agent)
+
+        async with self._cond:
+            self._idle.extend(healthy)
+            self._cond.notify(len(healthy))
+
+        if recycled:
+            logger.info(f"Pool {self.name}: {recycled} agentes reciclados")
+        await self.fill()
+        return recycled
+
+    async def close(self) -> None:
+        """Cierra el pool y libera los agentes libres."""
+        async with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for agent in idle:
+            await self._discard(agent)
+
+    def detach(self) -> List[ScraperAgent]:
+        """
+        Cierra el pool sin esperar y devuelve sus agentes libres para que
+        otro loop los limpie (su event loop ya no corre: no se puede usar
+        la condición). Los prestados se descartan al devolverse.
+        """
+        self._closed = True
+        idle = list(self._idle)
+        self._idle.clear()
+        self._size -= len(idle)
+        return idle
+
+    def stats(self) -> Dict[str, int]:
+        """Estado actual del pool."""
+        return {
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": self._size - len(self._idle),
+            "waiting": self._waiting,
+        }
+
+
+class AgentPoolManager:
+    """
+    Gestiona un AgentPool por cada PoolKey.
+
+    Los pools se crean perezosamente en el primer checkout. `start()` lanza
+    una tarea de fondo que ejecuta health_check() periódicamente.
+    """
+
+    def __init__(
+        self,
+        min_size: int = 0,
+        max_size: int = 4,
+        checkout_timeout: float = 30.0,
+        health_check_seconds: float = 60.0,
+        agent_factory: Optional[Callable[[PoolKey], ScraperAgent]] = None,
+    ):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_seconds = health_check_seconds
+        self._factory = agent_factory
+        self._pools: Dict[PoolKey, AgentPool] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._cleanup_tasks: Set[asyncio.Task] = set()
+
+    def get_pool(
+        self,
+        agent_name: str,
+        use_mcp: bool = True,
+        disable_simple_scrape: bool = False,
+        response_model: Optional[Type[BaseModel]] = None,
+    ) -> AgentPool:
+        """Devuelve (creando si hace falta) el pool de una combinación."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Los agentes y primitivas asyncio están ligados a su event loop
+            # (p.ej. TestClient crea uno por request): empezar de cero.
+            self._retire_pools(loop)
+
+        key: PoolKey = (agent_name, use_mcp, disable_simple_scrape, response_model)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = AgentPool(
+                key,
+                min_size=self.min_size,
+                max_size=self.max_size,
+                checkout_timeout=self.checkout_timeout,
+                agent_factory=self._factory,
+            )
+            self._pools[key] = pool
+        return pool
+
+    def _retire_pools(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Cierra los pools del event loop anterior y pasa a `loop`.
+
+        Sus agentes tienen clientes MCP y sesiones de Playwright abiertos: si
+        el loop anterior sigue corriendo (otro thread) se cierran allí; si
+        no, los libres se limpian en `loop` lo mejor posible.
+        """
+        pools = list(self._pools.values())
+        old_loop = self._loop
+        self._pools = {}
+        self._loop = loop
+        if not pools:
+            return
+
+        if old_loop is not None and old_loop.is_running():
+            for pool in pools:
+                asyncio.run_coroutine_threadsafe(pool.close(), old_loop)
+            return
+
+        agents = [agent for pool in pools for agent in pool.detach()]
+        if agents:
+            logger.info(f"Event loop nuevo: cerrando {len(agents)} agentes del pool anterior")
+            task = loop.create_task(self._cleanup_agents(agents))
+            self._cleanup_tasks.add(task)
+            task.add_done_callback(self._cleanup_tasks.discard)
+
+    @staticmethod
+    async def _cleanup_agents(agents: List[ScraperAgent]) -> None:
+        for agent in agents:
+            try:
+                await agent.cleanup()
+            except Exception as e:
+                logger.warning(f"Error cerrando agente de un event loop anterior: {e}")
+
+    def checkout(
+        self,
+        agent_name: str,
+        use_mcp: bool = True,
+        disable_simple_scrape: bool = False,
+        response_model: Optional[Type[BaseModel]] = None,
+    ):
+        """Atajo: get_pool(...).checkout()."""
+        return self.get_pool(
+            agent_name, use_mcp, disable_simple_scrape, response_model
+        ).checkout()
+
+    async def warmup(self, agent_names: Iterable[str]) -> None:
+        """Precalienta min_size agentes con la combinación por defecto."""
+        await asyncio.gather(
+            *(self.get_pool(name).fill() for name in agent_names),
+            return_exceptions=True,
+        )
+
+    async def health_check(self) -> int:
+        """Health check de todos los pools. Devuelve agentes reciclados."""
+        recycled = 0
+        for pool in list(self._pools.values()):
+            recycled += await pool.health_check()
+        return recycled
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_seconds)
+            try:
+                await self.health_check()
+            except Exception as e:
+                logger.warning(f"Error en health check del pool de agentes: {e}")
+
+    def start(self) -> None:
+        """Lanza el health check periódico en segundo plano."""
+        if self._health_task is None and self.health_check_seconds > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self) -> None:
+        """Detiene el health check y cierra todos los pools."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+        for pool in list(self._pools.values()):
+            await pool.close()
+        self._pools = {}
+        if self._cleanup_tasks:
+            await asyncio.gather(*self._cleanup_tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Estado de cada pool, indexado por nombre legible."""
+        return {pool.name: pool.stats() for pool in self._pools.values()}
+
+
+# Singleton global del pool manager
+_agent_pool_manager: Optional[AgentPoolManager] = None
+
+
+def get_agent_pool_manager() -> AgentPoolManager:
+    """
+    Obtiene el singleton del gestor de pools de agentes.
+
+    Returns:
+        Instancia global de AgentPoolManager configurada desde settings.
+    """
+    global _agent_pool_manager
+    if _agent_pool_manager is None:
+        _agent_pool_manager = AgentPoolManager(
+            min_size=settings.agent_pool_min_size,
+            max_size=settings.agent_pool_max_size,
+            checkout_timeout=settings.agent_pool_checkout_timeout,
+            health_check_seconds=settings.agent_pool_health_check_seconds,
+        )
+    return _agent_pool_manager
+
+
+def reset_agent_pool_manager() -> None:
+    """Resetea el singleton (útil para tests)."""
+    global _agent_pool_manager
+    _agent_pool_manager = None
@@ -159,8 +159,10 @@ Criterios de selección (priorizar):
 3. Medios de comunicación reconocidos
 Evitar: foros, blogs personales, aggregadores sin fuente original.
 
-Scrapea cada URL seleccionada con `simple_scrape_url(url="...")`.
-Si una URL falla, continúa con la siguiente.
+Scrapea TODAS las URLs seleccionadas en UNA sola llamada:
+`simple_scrape_urls(urls=["...", "...", ...])` (se descargan en paralelo).
+Usa `simple_scrape_url(url="...")` solo para una URL suelta posterior.
+Si una URL falla, continúa con las demás.
 
 ═══ PASO 3: PLAYWRIGHT (fallback) ═══
 
@@ -169,6 +171,7 @@ Si alguna URL relevante falló en el paso 2 (SSL, bloqueo, timeout), usa Playwri
 - Si 403/bloqueado, pasa a la siguiente
 - Si la página es dinámica, espera a que cargue
 
+Si el error dice que el dominio necesita navegador, ve directo a Playwright con esa URL.
 Solo usa Playwright para URLs fallidas. Si todas funcionaron, salta este paso.
 
 REGLA DE PARADA: Si tras procesar 8 URLs no encuentras datos relevantes sobre {product} {provider_text}en {country_name}, para y reporta que no se encontraron datos suficientes.
@@ -195,7 +198,7 @@ VALIDACIÓN:
 
 ═══ RESUMEN ═══
 1. Buscar con Brave (20 resultados)
-2. Seleccionar 5-8 mejores URLs → scrapear con simple_scrape_url
+2. Seleccionar 5-8 mejores URLs → scrapearlas juntas con simple_scrape_urls
 3. Playwright para URLs fallidas (si las hay)
 4. Extraer datos estructurados
 5. Validar y presentar resultado
@@ -5,13 +5,26 @@ Encapsula la lógica de carga de tools locales y MCP,
 incluyendo la configuración de error handlers.
 """
 
+import asyncio
+import functools
 import logging
-from typing import Optional, List, Dict
+import time
+from typing import Any, Awaitable, Callable, Optional, List, Dict
 
-from langchain_core.tools import BaseTool
+from langchain_core.tools import BaseTool, ToolException
 from langchain_mcp_adapters.client import MultiServerMCPClient
 
-from aifoundry.app.core.agents.scraper.tools import get_local_tools
+from aifoundry.app.core.agents.scraper.tools import SIMPLE_SCRAPE_TOOLS, get_local_tools
+from aifoundry.app.utils.deadline import DeadlineExceededError, within_deadline
+from aifoundry.app.utils.domain_profile import (
+    FETCHER_BROWSER,
+    REASON_OTHER,
+    ROUTE_DEAD,
+    get_domain_profiles,
+)
+from aifoundry.app.utils.host_scheduler import HostBackoffError, RobotsDisallowedError
+from aifoundry.app.utils.http_client import get_scrape_http_client
+from aifoundry.app.utils.rate_limiter import get_brave_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +65,92 @@ def _tool_error_handler(error: Exception) -> str:
     return f"Error en herramienta: {error_str[:500]}"
 
 
+def _with_deadline(
+    name: str, coroutine: Callable[..., Awaitable[Any]]
+) -> Callable[..., Awaitable[Any]]:
+    """
+    Acota una tool MCP al deadline del run en curso.
+
+    Sin deadline la llamada no cambia. Con deadline, la espera se corta
+    al agotarse el tiempo restante y el LLM recibe un ToolException
+    (vía _tool_error_handler) en vez de quedarse colgado.
+    """
+
+    @functools.wraps(coroutine)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await within_deadline(coroutine(*args, **kwargs), stage=name)
+        except DeadlineExceededError as e:
+            raise ToolException(f"{e}. Responde ya con los datos que tienes.") from None
+
+    return wrapper
+
+
+# Tools MCP que abren una URL: pasan por el planificador por host
+_NAVIGATION_TOOLS = frozenset({"browser_navigate"})
+
+
+def _with_host_politeness(coroutine: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Hace pasar la navegación de Playwright por el HostScheduler compartido.
+
+    Misma cortesía que simple_scrape (robots.txt, concurrencia, espaciado y
+    backoff por host); si el host no se puede visitar el LLM recibe un
+    ToolException para que pase a otra URL. Los dominios muertos según su
+    perfil (domain_profile.py) se rechazan sin abrir el navegador, y cada
+    navegación queda registrada en el perfil.
+    """
+
+    @functools.wraps(coroutine)
+    async def wrapper(*args, **kwargs):
+        url = kwargs.get("url")
+        if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+            return await coroutine(*args, **kwargs)
+
+        profiles = get_domain_profiles()
+        if profiles.route(url) == ROUTE_DEAD:
+            raise ToolException(
+                f"Dominio sin respuesta en runs anteriores ({profiles.get(url).last_failure}). "
+                "Usa otro resultado de la búsqueda."
+            )
+
+        client = get_scrape_http_client()
+        try:
+            await client.check_robots(url)
+            async with client.scheduler.slot(url):
+                started = time.perf_counter()
+                try:
+                    result = await coroutine(*args, **kwargs)
+                except Exception:
+                    profiles.record(url, FETCHER_BROWSER, False, time.perf_counter() - started, REASON_OTHER)
+                    raise
+                profiles.record(url, FETCHER_BROWSER, True, time.perf_counter() - started)
+                return result
+        except (RobotsDisallowedError, HostBackoffError) as e:
+            raise ToolException(f"{e}. Usa otro resultado de la búsqueda.") from None
+
+    return wrapper
+
+
+# Tools MCP que llaman a la API de Brave: pasan por su rate limiter
+_RATE_LIMITED_TOOLS = frozenset({"brave_web_search"})
+
+
+def _with_rate_limit(coroutine: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Hace pasar la búsqueda por el BraveRateLimiter compartido.
+
+    Espera su turno en el token bucket y reintenta los 429 respetando
+    Retry-After; el resto de errores llegan al LLM como antes.
+    """
+
+    @functools.wraps(coroutine)
+    async def wrapper(*args, **kwargs):
+        return await get_brave_rate_limiter().execute_with_retry(coroutine, *args, **kwargs)
+
+    return wrapper
+
+
 # =============================================================================
 # MCP CONFIG LOADER
 # =============================================================================
@@ -80,7 +179,7 @@ class ToolResolver:
     Resuelve y prepara las tools (locales + MCP) para el agente.
 
     Responsabilidades:
-    - Cargar tools locales (simple_scrape_url, etc.)
+    - Cargar tools locales (simple_scrape_url, simple_scrape_urls)
     - Conectar a MCP servers y obtener tools remotas
     - Configurar error handlers en tools MCP
     - Limpiar conexiones MCP al finalizar
@@ -95,13 +194,15 @@ class ToolResolver:
         """
         Args:
             use_mcp: Si cargar tools MCP (Brave, Playwright).
-            disable_simple_scrape: Si True, excluye simple_scrape_url.
+            disable_simple_scrape: Si True, excluye simple_scrape_url(s).
             custom_tools: Tools custom en vez de las por defecto.
         """
         self._use_mcp = use_mcp
         self._disable_simple_scrape = disable_simple_scrape
         self._custom_tools = custom_tools
         self._mcp_client: Optional[MultiServerMCPClient] = None
+        self._mcp_servers: List[str] = []
+        self._mcp_tool_count = 0
 
     def _get_local_tools(self) -> List[BaseTool]:
         """Obtiene las tools locales según la configuración."""
@@ -110,7 +211,7 @@ class ToolResolver:
 
         all_local = get_local_tools()
         if self._disable_simple_scrape:
-            return [t for t in all_local if t.name != "simple_scrape_url"]
+            return [t for t in all_local if t.name not in SIMPLE_SCRAPE_TOOLS]
         return list(all_local)
 
     async def resolve_tools(self) -> List[BaseTool]:
@@ -128,11 +229,19 @@ class ToolResolver:
                 self._mcp_client = MultiServerMCPClient(mcp_configs)
                 mcp_tools = await self._mcp_client.get_tools()
 
-                # Configurar manejo de errores en tools MCP
+                # Configurar manejo de errores, cortesía por host, rate limit y deadline en tools MCP
                 for t in mcp_tools:
                     t.handle_tool_error = _tool_error_handler
+                    if getattr(t, "coroutine", None) is not None:
+                        if t.name in _NAVIGATION_TOOLS:
+                            t.coroutine = _with_host_politeness(t.coroutine)
+                        if t.name in _RATE_LIMITED_TOOLS:
+                            t.coroutine = _with_rate_limit(t.coroutine)
+                        t.coroutine = _with_deadline(t.name, t.coroutine)
 
                 all_tools.extend(mcp_tools)
+                self._mcp_servers = list(mcp_configs)
+                self._mcp_tool_count = len(mcp_tools)
                 logger.info(f"MCP tools loaded: {[t.name for t in mcp_tools]}")
             except Exception as e:
                 logger.warning(
@@ -141,6 +250,35 @@ class ToolResolver:
 
         return all_tools
 
+    async def health_check(self, timeout: float = 5.0) -> bool:
+        """
+        Comprueba que las conexiones MCP siguen vivas.
+
+        Abre una sesión contra cada MCP server y envía un ping.
+        Sin MCP siempre es sano; con MCP pero sin tools cargadas
+        (el servidor estaba caído al inicializar) se considera degradado.
+
+        Args:
+            timeout: Timeout en segundos para cada ping.
+
+        Returns:
+            True si todos los MCP servers responden.
+        """
+        if not self._use_mcp:
+            return True
+        if self._mcp_client is None or self._mcp_tool_count == 0:
+            return False
+
+        for server_name in self._mcp_servers:
+            try:
+                async with asyncio.timeout(timeout):
+                    async with self._mcp_client.session(server_name) as session:
+                        await session.send_ping()
+            except Exception as e:
+                logger.warning(f"MCP server '{server_name}' no responde: {e}")
+                return False
+        return True
+
     async def cleanup(self) -> None:
         """Libera recursos (cierra MCP client)."""
         if self._mcp_client:
@@ -151,6 +289,8 @@ class ToolResolver:
                 logger.debug(f"Error cerrando MCP client: {e}")
             finally:
                 self._mcp_client = None
+                self._mcp_servers = []
+                self._mcp_tool_count = 0
 
     @property
     def mcp_client(self) -> Optional[MultiServerMCPClient]:
@@ -7,14 +7,136 @@ Aquí solo tools locales que wrappean utilidades.
 
 import asyncio
 import logging
+import time
+from typing import Any, Dict, List, Optional
 
 from langchain_core.tools import tool
 
-from aifoundry.app.utils.simple_scraper import simple_scrape as _simple_scrape
-from aifoundry.app.utils.text import truncate_text
+from aifoundry.app.config import settings
+from aifoundry.app.utils.condense import condense_markdown, current_focus
+from aifoundry.app.utils.deadline import remaining_timeout
+from aifoundry.app.utils.domain_profile import (
+    FETCHER_SIMPLE,
+    REASON_DEADLINE,
+    REASON_NEEDS_JS,
+    REASON_TIMEOUT,
+    ROUTE_BROWSER,
+    ROUTE_DEAD,
+    classify_failure,
+    get_domain_profiles,
+)
+from aifoundry.app.utils.prefetch import current_prefetch
+from aifoundry.app.utils.simple_scraper import simple_scrape_async as _simple_scrape
 
 logger = logging.getLogger(__name__)
 
+# Timeout por defecto de simple_scrape (se recorta al deadline del run)
+_SCRAPE_TIMEOUT = 30.0
+
+# simple_scrape_urls: tiempo total del lote, URLs por llamada y fracción del
+# presupuesto de tokens por página (llegan varias páginas en un solo mensaje)
+_BATCH_TIMEOUT = 45.0
+_BATCH_MAX_URLS = 10
+_BATCH_PAGE_SHARE = 0.6
+
+_DEADLINE_ERROR = "Tiempo agotado para el run"
+
+
+def _page_token_budget() -> int:
+    """Tokens por página: los del agente del run (page_token_budget) o el default."""
+    focus = current_focus()
+    return focus.token_budget if focus is not None else settings.scrape_page_token_budget
+
+
+def _format_page(data: Dict[str, Any], url: str, token_budget: int) -> str:
+    """Título, markdown condensado y fuente de un scrape correcto."""
+    title = data["metadata"].get("title") or "Sin título"
+    markdown = data.get("markdown", "")
+    source = data["metadata"].get("sourceURL", url)
+
+    # Los bloques más relevantes para el run (producto, proveedor, precios)
+    # hasta el presupuesto de tokens, en vez de los primeros N caracteres
+    condensed = condense_markdown(markdown, token_budget)
+
+    return f"""# {title}
+
+{condensed}
+
+---
+Source: {source}"""
+
+
+def _routed_elsewhere(url: str) -> Optional[Dict[str, Any]]:
+    """
+    Error inmediato si el perfil del dominio dice que simple_scrape no sirve.
+
+    Returns:
+        None si hay que descargar con simple_scrape; si no, el dict de error
+        con el tip de usar Playwright directamente o de descartar la URL.
+    """
+    profiles = get_domain_profiles()
+    route = profiles.route(url)
+    if route == ROUTE_BROWSER:
+        return {
+            "success": False,
+            "error": "El dominio necesita navegador: bloquea simple_scrape o usa JavaScript (runs anteriores)",
+            "tip": "Usa browser_navigate directamente con esta URL",
+        }
+    if route == ROUTE_DEAD:
+        profile = profiles.get(url)
+        return {
+            "success": False,
+            "error": f"Dominio sin respuesta en runs anteriores ({profile.last_failure})",
+            "tip": "No lo reintentes; usa otro resultado de la búsqueda",
+        }
+    return None
+
+
+def _record(url: str, result: Dict[str, Any], latency: Optional[float], timeout: float) -> None:
+    """Registra el resultado de simple_scrape (con `timeout` de espera) en el perfil del dominio."""
+    if result["success"]:
+        data = result["data"]
+        short = len(data.get("markdown", "").strip()) < settings.scrape_domain_js_min_chars
+        if short and data.get("jsShell"):
+            # Casi vacía y con pinta de SPA: el contenido lo pinta JavaScript.
+            # Una página corta sin esas señales (contacto, un snippet) es válida
+            get_domain_profiles().record(url, FETCHER_SIMPLE, False, latency, REASON_NEEDS_JS)
+        else:
+            get_domain_profiles().record(url, FETCHER_SIMPLE, True, latency)
+    else:
+        reason = classify_failure(result.get("error", ""))
+        if reason == REASON_TIMEOUT and timeout < _SCRAPE_TIMEOUT:
+            # Timeout recortado por el deadline del run: no cuenta contra el dominio
+            reason = REASON_DEADLINE
+        get_domain_profiles().record(url, FETCHER_SIMPLE, False, latency, reason)
+
+
+async def _scrape(url: str, timeout: float) -> Dict[str, Any]:
+    """
+    simple_scrape_async según el perfil del dominio (domain_profile.py).
+
+    Los dominios que necesitan navegador o que están muertos se responden al
+    momento sin descargar; si no, sirve antes lo precargado tras la búsqueda
+    (prefetch.py) y registra el resultado en el perfil.
+    """
+    routed = _routed_elsewhere(url)
+    if routed is not None:
+        logger.info(f"   ↪️ {routed['error']}: {url[:60]}")
+        return routed
+
+    prefetch = current_prefetch()
+    if prefetch is not None:
+        result = await prefetch.get(url, timeout)
+        if result is not None:
+            logger.info(f"   ⚡ Precargada: {url[:60]}")
+            _record(url, result, None, timeout)
+            return result
+
+    started = time.perf_counter()
+    result = await _simple_scrape(url, ["markdown"], timeout=timeout)
+    _record(url, result, time.perf_counter() - started, timeout)
+    return result
+
 
 @tool
 async def simple_scrape_url(url: str) -> str:
@@ -24,47 +146,121 @@ async def simple_scrape_url(url: str) -> str:
     Usa esta tool para obtener el contenido de una página web.
     Funciona con sitios estáticos. Devuelve markdown limpio.
 
-    Si falla o la página necesita JavaScript, usa playwright_navigate.
+    Si falla o la página necesita JavaScript, usa playwright_navigate. Los
+    dominios que en runs anteriores necesitaron navegador o no respondían se
+    contestan al momento con el tip de qué hacer, sin descargar.
 
     Args:
         url: URL completa a scrapear (ej: https://example.com/page)
 
     Returns:
-        Contenido de la página en markdown con título y fuente.
+        Contenido relevante de la página en markdown con título y fuente.
         Si falla, devuelve JSON con error y tip.
     """
     logger.info(f"🔧 scrape_url: {url[:60]}...")
 
-    # Ejecutar scrape síncrono en un thread para no bloquear el event loop
-    result = await asyncio.to_thread(_simple_scrape, url, ["markdown"])
+    # Nunca esperar más de lo que queda del deadline del run
+    timeout = remaining_timeout(_SCRAPE_TIMEOUT)
+    if timeout <= 0:
+        logger.warning("   ⏱️ Deadline agotado, no se scrapea")
+        return (
+            f'{{"error": "{_DEADLINE_ERROR}", "url": "{url}", '
+            f'"tip": "Responde ya con los datos que tienes"}}'
+        )
+
+    # Async sobre el cliente HTTP compartido: reutiliza conexiones entre scrapes
+    result = await _scrape(url, timeout)
 
     if result["success"]:
-        data = result["data"]
-        title = data["metadata"].get("title", "Sin título")
-        markdown = data.get("markdown", "")
-        source = data["metadata"].get("sourceURL", url)
+        output = _format_page(result["data"], url, _page_token_budget())
+        logger.info(f"   ✅ {len(result['data'].get('markdown', ''))} chars → {len(output)} chars")
+        return output
 
-        # Truncar para no saturar contexto
-        truncated = truncate_text(markdown, 10000)
+    else:
+        error = result.get("error", "Error desconocido")
+        # PDFs, vídeos, binarios: simple_scrape sugiere pasar a otra URL
+        tip = result.get("tip", "Intenta con playwright_navigate")
+        logger.warning(f"   ❌ {error}")
+        return f'{{"error": "{error}", "url": "{url}", "tip": "{tip}"}}'
 
-        output = f"""# {title}
 
-{truncated}
+@tool
+async def simple_scrape_urls(urls: List[str]) -> str:
+    """
+    Scrapea varias URLs a la vez y devuelve el markdown de todas.
 
----
-Source: {source}"""
+    Preferible a llamar simple_scrape_url una a una: todas las páginas se
+    descargan en paralelo en una sola llamada. Pasa aquí las 5-8 URLs
+    seleccionadas de la búsqueda.
 
-        logger.info(f"   ✅ {len(markdown)} chars → {len(truncated)} chars")
-        return output
+    Si alguna falla o necesita JavaScript, usa playwright_navigate solo con esa.
 
-    else:
-        error = result.get("error", "Error desconocido")
-        logger.warning(f"   ❌ {error}")
-        return f'{{"error": "{error}", "url": "{url}", "tip": "Intenta con playwright_navigate"}}'
+    Args:
+        urls: Lista de URLs completas a scrapear (máximo 10)
+
+    Returns:
+        Una sección por URL, en el mismo orden, con ✅ y su contenido en
+        markdown, o ❌ con el error y un tip.
+    """
+    # Sin duplicados, en el orden recibido
+    unique = list(dict.fromkeys(u.strip() for u in urls if u and u.strip()))
+    skipped = unique[_BATCH_MAX_URLS:]
+    unique = unique[:_BATCH_MAX_URLS]
+    logger.info(f"🔧 scrape_urls: {len(unique)} URLs")
+    if not unique:
+        return '{"error": "Lista de URLs vacía", "tip": "Pasa las URLs seleccionadas de la búsqueda"}'
+
+    # Tiempo total del lote, nunca más de lo que queda del deadline del run
+    total = remaining_timeout(_BATCH_TIMEOUT)
+    if total <= 0:
+        logger.warning("   ⏱️ Deadline agotado, no se scrapea")
+        return f'{{"error": "{_DEADLINE_ERROR}", "tip": "Responde ya con los datos que tienes"}}'
+
+    # Concurrentes sobre el cliente compartido (ya limita peticiones por host)
+    timeout = min(_SCRAPE_TIMEOUT, total)
+    tasks = [
+        asyncio.create_task(_scrape(url, timeout))
+        for url in unique
+    ]
+    try:
+        await asyncio.wait(tasks, timeout=total)
+    finally:
+        # Timeout del lote o tool cancelada: no dejar scrapes huérfanos
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    page_budget = int(_page_token_budget() * _BATCH_PAGE_SHARE)
+    sections = []
+    ok = 0
+    for i, (url, task) in enumerate(zip(unique, tasks, strict=True), 1):
+        # Las canceladas en el finally aún no constan como done()
+        if not task.done() or task.cancelled():
+            result = {"success": False, "error": f"Timeout del lote ({total:g}s)"}
+        elif task.exception() is not None:
+            result = {"success": False, "error": str(task.exception())}
+        else:
+            result = task.result()
+
+        if result["success"]:
+            ok += 1
+            sections.append(f"## [{i}] ✅ {url}\n\n{_format_page(result['data'], url, page_budget)}")
+        else:
+            tip = result.get("tip", "Intenta con playwright_navigate")
+            sections.append(f"## [{i}] ❌ {url}\nError: {result.get('error', 'Error desconocido')}\nTip: {tip}")
+
+    summary = f"Scrapeadas {ok}/{len(unique)} URLs"
+    if skipped:
+        summary += f" ({len(skipped)} ignoradas: máximo {_BATCH_MAX_URLS} por llamada)"
+    logger.info(f"   {'✅' if ok else '❌'} {summary}")
+    return summary + "\n\n" + "\n\n".join(sections)
 
 
 # Lista de tools locales
-LOCAL_TOOLS = [simple_scrape_url]
+LOCAL_TOOLS = [simple_scrape_url, simple_scrape_urls]
+
+# Tools que se excluyen con disable_simple_scrape
+SIMPLE_SCRAPE_TOOLS = frozenset({"simple_scrape_url", "simple_scrape_urls"})
 
 
 def get_local_tools():
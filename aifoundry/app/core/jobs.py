@@ -0,0 +1,367 @@
+"""
+Jobs asíncronos: ejecución en segundo plano con tabla persistente.
+
+Un run de agente puede tardar minutos. En vez de mantener la conexión HTTP
+abierta, el cliente crea un job, recibe su id al instante y consulta el
+estado más tarde.
+
+- JobStore: tabla de jobs en SQLite (sobrevive a reinicios).
+- JobManager: pool acotado de workers asyncio que consumen la cola.
+
+Estados: queued → running → completed | failed | cancelled
+
+Los jobs que quedaron en `running` por un reinicio vuelven a `queued`
+al arrancar y se re-ejecutan.
+
+El JobManager no sabe nada de agentes: recibe un `executor`
+(agent_name, payload) → dict que hace el trabajo real. Sus escrituras en el
+JobStore van por asyncio.to_thread: nunca bloquean el event loop.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Estados de un job
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+TERMINAL_STATUSES = frozenset({JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED})
+
+# (agent_name, payload) → resultado serializable a JSON
+JobExecutor = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    agent_name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobQueueFullError(Exception):
+    """La cola de jobs alcanzó su tamaño máximo."""
+
+
+# =============================================================================
+# JOB STORE (SQLite)
+# =============================================================================
+
+
+class JobStore:
+    """
+    Tabla de jobs en SQLite.
+
+    Usa una única conexión protegida por un lock: las operaciones son
+    lecturas/escrituras de una fila y no justifican un pool.
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        """
+        Args:
+            db_path: Ruta del fichero SQLite (":memory:" para tests).
+        """
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if db_path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def create(self, agent_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Inserta un job nuevo en estado queued."""
+        job_id = str(uuid.uuid4())
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, agent_name, payload, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (job_id, agent_name, json.dumps(payload), JOB_QUEUED, _now()),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Devuelve un job o None si no existe."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def _transition(self, job_id: str, from_status: str, sql_set: str, params: tuple) -> bool:
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                f"UPDATE jobs SET {sql_set} WHERE id = ? AND status = ?",
+                (*params, job_id, from_status),
+            )
+        return cur.rowcount == 1
+
+    def mark_running(self, job_id: str) -> bool:
+        """queued → running. False si el job ya no está en cola (p.ej. cancelado)."""
+        return self._transition(
+            job_id, JOB_QUEUED, "status = ?, started_at = ?", (JOB_RUNNING, _now())
+        )
+
+    def cancel_if_queued(self, job_id: str) -> bool:
+        """queued → cancelled. False si el job ya arrancó o terminó."""
+        return self._transition(
+            job_id, JOB_QUEUED, "status = ?, finished_at = ?", (JOB_CANCELLED, _now())
+        )
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        """running → completed | failed | cancelled."""
+        return self._transition(
+            job_id,
+            JOB_RUNNING,
+            "status = ?, result = ?, error = ?, finished_at = ?",
+            (status, json.dumps(result) if result is not None else None, error, _now()),
+        )
+
+    def requeue_running(self) -> int:
+        """running → queued (jobs interrumpidos por un reinicio/parada)."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?",
+                (JOB_QUEUED, JOB_RUNNING),
+            )
+        return cur.rowcount
+
+    def ids_by_status(self, status: str) -> List[str]:
+        """Ids de los jobs en un estado, por orden de creación."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (status,)
+            ).fetchall()
+        return [r["id"] for r in rows]
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Número de jobs por estado."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"
+            ).fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# =============================================================================
+# JOB MANAGER (workers)
+# =============================================================================
+
+
+class JobManager:
+    """
+    Ejecuta jobs en un pool acotado de workers asyncio.
+
+    Example:
+        manager = JobManager(JobStore("./data/jobs.db"), executor, workers=4)
+        await manager.start()
+        job = await manager.submit("electricity", {"provider": "Endesa"})
+        ...
+        await manager.stop()
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        executor: JobExecutor,
+        workers: int = 4,
+        max_queued: int = 1000,
+    ):
+        """
+        Args:
+            store: Tabla persistente de jobs.
+            executor: Corrutina (agent_name, payload) → resultado.
+            workers: Máximo de jobs ejecutándose a la vez.
+            max_queued: Máximo de jobs esperando en cola (0 = sin límite).
+        """
+        self.store = store
+        self._executor = executor
+        self._workers = max(1, workers)
+        self._max_queued = max_queued
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancel_requested: Set[str] = set()
+        # En cola y sin cancelar (la cola conserva los cancelados hasta que
+        # un worker los saca) y submits creando su fila
+        self._queued_ids: Set[str] = set()
+        self._reserved = 0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._worker_tasks)
+
+    async def start(self) -> None:
+        """Recupera jobs pendientes y arranca los workers."""
+        if self.started:
+            return
+        self._queue = asyncio.Queue()
+
+        requeued = await asyncio.to_thread(self.store.requeue_running)
+        pending = await asyncio.to_thread(self.store.ids_by_status, JOB_QUEUED)
+        for job_id in pending:
+            self._queued_ids.add(job_id)
+            self._queue.put_nowait(job_id)
+        if pending:
+            logger.info(f"Jobs: {len(pending)} pendientes recuperados ({requeued} interrumpidos)")
+
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self._workers)
+        ]
+        logger.info(f"JobManager iniciado con {self._workers} workers")
+
+    async def stop(self) -> None:
+        """
+        Detiene los workers. Los jobs en ejecución se interrumpen y quedan
+        en `running`; al siguiente arranque vuelven a la cola.
+        """
+        tasks = self._worker_tasks + list(self._running.values())
+        self._worker_tasks = []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._running.clear()
+        self._queued_ids.clear()
+        self._queue = None
+
+    async def submit(self, agent_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Encola un job y devuelve su registro (status=queued).
+
+        Raises:
+            RuntimeError: Si el manager no está iniciado.
+            JobQueueFullError: Si la cola está llena (sin contar cancelados).
+        """
+        queue = self._queue
+        if not self.started or queue is None:
+            raise RuntimeError("JobManager no iniciado")
+        if self._max_queued and len(self._queued_ids) + self._reserved >= self._max_queued:
+            raise JobQueueFullError(f"Cola de jobs llena ({self._max_queued} en espera)")
+
+        self._reserved += 1
+        try:
+            job = await asyncio.to_thread(self.store.create, agent_name, payload)
+        finally:
+            self._reserved -= 1
+        self._queued_ids.add(job["id"])
+        queue.put_nowait(job["id"])
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Devuelve el registro de un job."""
+        return self.store.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancela un job en cola o en ejecución.
+
+        Returns:
+            El job actualizado, o None si no existe. Si ya había terminado,
+            se devuelve sin cambios (el llamador decide cómo tratarlo).
+        """
+        if await asyncio.to_thread(self.store.cancel_if_queued, job_id):
+            self._queued_ids.discard(job_id)
+            return await asyncio.to_thread(self.store.get, job_id)
+
+        task = self._running.get(job_id)
+        if task is not None and not task.done():
+            # Registrar el estado antes de cancelar: el worker ya no podrá
+            # sobrescribirlo (finish() solo transiciona desde running)
+            self._cancel_requested.add(job_id)
+            await asyncio.to_thread(
+                self.store.finish, job_id, JOB_CANCELLED, error="Cancelado por el usuario"
+            )
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            logger.info(f"Job {job_id} cancelado")
+
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job_id = await queue.get()
+            self._queued_ids.discard(job_id)
+            try:
+                await self._run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # pragma: no cover - defensivo
+                logger.error(f"Job worker {index}: error inesperado en {job_id}: {e}")
+            finally:
+                queue.task_done()
+
+    async def _run_job(self, job_id: str) -> None:
+        if not await asyncio.to_thread(self.store.mark_running, job_id):
+            return  # cancelado mientras estaba en cola
+
+        job = await asyncio.to_thread(self.store.get, job_id)
+        task = asyncio.create_task(self._executor(job["agent_name"], job["payload"]))
+        self._running[job_id] = task
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if job_id in self._cancel_requested:
+                return  # cancel() ya registró el estado
+            # Parada del manager: el job queda en running y se recupera al arrancar
+            task.cancel()
+            raise
+        except Exception as e:
+            logger.warning(f"Job {job_id} falló: {e}")
+            await asyncio.to_thread(
+                self.store.finish, job_id, JOB_FAILED, error=str(e) or type(e).__name__
+            )
+        else:
+            await asyncio.to_thread(self.store.finish, job_id, JOB_COMPLETED, result=result)
+        finally:
+            self._running.pop(job_id, None)
+            self._cancel_requested.discard(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Estado actual de la cola y los workers."""
+        return {
+            "workers": self._workers if self.started else 0,
+            "queued": len(self._queued_ids),
+            "running": len(self._running),
+        }
@@ -0,0 +1,249 @@
+"""
+Caché de resultados de agentes con TTL según `freshness`.
+
+El config.json de cada agente declara con `freshness` (pd/pw/pm/py) cuánto
+pueden tener de antigüedad los datos que busca. Un run repetido para el
+mismo (agente, provider, país, query, structured_output) dentro de esa
+ventana devuelve el resultado guardado en milisegundos en vez de minutos.
+
+Dos niveles:
+- Memoria: LRU acotado por número de entradas (siempre activo).
+- Disco: tabla SQLite opcional (sobrevive a reinicios, compartible entre workers).
+
+Solo se guardan resultados serializables a JSON (AgentRunResponse.model_dump()).
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from aifoundry.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# freshness de Brave Search → TTL en segundos
+FRESHNESS_TTL_SECONDS: Dict[str, float] = {
+    "pd": 24 * 3600,
+    "pw": 7 * 24 * 3600,
+    "pm": 30 * 24 * 3600,
+    "py": 365 * 24 * 3600,
+}
+DEFAULT_FRESHNESS = "pw"
+
+TIER_MEMORY = "memory"
+TIER_DISK = "disk"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_expires ON results (expires_at);
+"""
+
+
+def freshness_ttl(freshness: Optional[str]) -> float:
+    """TTL en segundos para un valor de freshness (pw si no se reconoce)."""
+    return FRESHNESS_TTL_SECONDS.get(freshness or DEFAULT_FRESHNESS,
+                                     FRESHNESS_TTL_SECONDS[DEFAULT_FRESHNESS])
+
+
+def make_cache_key(
+    agent_name: str,
+    provider: str,
+    country_code: str,
+    query: str,
+    structured_output: bool,
+) -> str:
+    """Clave normalizada de un resultado cacheado."""
+    return json.dumps(
+        [agent_name, provider.strip().lower(), country_code.upper(),
+         " ".join(query.split()).lower(), bool(structured_output)],
+        ensure_ascii=False,
+    )
+
+
+class CacheEntry:
+    """Resultado cacheado con sus metadatos."""
+
+    __slots__ = ("value", "stored_at", "expires_at", "tier")
+
+    def __init__(self, value: Dict[str, Any], stored_at: float, expires_at: float, tier: str):
+        self.value = value
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.tier = tier
+
+    @property
+    def age_seconds(self) -> float:
+        return max(0.0, time.time() - self.stored_at)
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+
+class ResultCache:
+    """
+    Caché de dos niveles (LRU en memoria + SQLite opcional).
+
+    Example:
+        cache = ResultCache(max_entries=512, db_path="./data/results.db")
+        key = make_cache_key("electricity", "Endesa", "ES", query, False)
+        entry = cache.get(key)
+        if entry is None:
+            cache.set(key, response.model_dump(), ttl_seconds=freshness_ttl("pw"))
+    """
+
+    def __init__(self, max_entries: int = 512, db_path: Optional[str] = None):
+        """
+        Args:
+            max_entries: Entradas máximas del nivel en memoria.
+            db_path: Ruta del fichero SQLite (None = solo memoria).
+        """
+        self._max_entries = max(1, max_entries)
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path:
+            if db_path != ":memory:":
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            with self._lock, self._conn:
+                if db_path != ":memory:":
+                    self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.executescript(_SCHEMA)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Devuelve la entrada vigente o None (las caducadas se eliminan)."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry.expired:
+                    del self._memory[key]
+                else:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return CacheEntry(entry.value, entry.stored_at, entry.expires_at, TIER_MEMORY)
+
+            entry = self._get_disk(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            # Promocionar al nivel en memoria
+            self._put_memory(key, CacheEntry(entry.value, entry.stored_at, entry.expires_at, TIER_MEMORY))
+            self.hits += 1
+            return entry
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        """Guarda un resultado en ambos niveles."""
+        now = time.time()
+        entry = CacheEntry(value, now, now + ttl_seconds, TIER_MEMORY)
+        with self._lock:
+            self._put_memory(key, entry)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO results (key, value, stored_at, expires_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(value), entry.stored_at, entry.expires_at),
+                    )
+
+    def invalidate(self, key: str) -> None:
+        """Elimina una entrada de ambos niveles."""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        """Elimina las entradas caducadas. Devuelve cuántas se borraron."""
+        with self._lock:
+            expired = [k for k, e in self._memory.items() if e.expired]
+            for k in expired:
+                del self._memory[k]
+            removed = len(expired)
+            if self._conn is not None:
+                with self._conn:
+                    cur = self._conn.execute(
+                        "DELETE FROM results WHERE expires_at <= ?", (time.time(),)
+                    )
+                removed += cur.rowcount
+        return removed
+
+    def _put_memory(self, key: str, entry: CacheEntry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def _get_disk(self, key: str) -> Optional[CacheEntry]:
+        if self._conn is None:
+            return None
+        row: Optional[Tuple[str, float, float]] = self._conn.execute(
+            "SELECT value, stored_at, expires_at FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, stored_at, expires_at = row
+        if time.time() >= expires_at:
+            with self._conn:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            return None
+        return CacheEntry(json.loads(value), stored_at, expires_at, TIER_DISK)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de uso de la caché."""
+        with self._lock:
+            return {
+                "entries": len(self._memory),
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk": self._conn is not None,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Singleton global
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """
+    Obtiene el singleton de la caché de resultados.
+
+    Returns:
+        Instancia global configurada desde settings.
+    """
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache(
+            max_entries=settings.result_cache_max_entries,
+            db_path=settings.result_cache_db_path or None,
+        )
+    return _result_cache
+
+
+def reset_result_cache() -> None:
+    """Resetea el singleton (útil para tests)."""
+    global _result_cache
+    if _result_cache is not None:
+        _result_cache.close()
+    _result_cache = None
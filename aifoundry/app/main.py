@@ -5,6 +5,7 @@ FastAPI application for AI agents and tools.
 Uses the API router for all endpoints.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -12,7 +13,15 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from aifoundry.app.config import settings
+from aifoundry.app.api.jobs import get_job_manager
 from aifoundry.app.api.router import router as api_router
+from aifoundry.app.core.agents.registry import get_agent_registry
+from aifoundry.app.core.agents.scraper.pool import get_agent_pool_manager
+from aifoundry.app.core.result_cache import reset_result_cache
+from aifoundry.app.utils.domain_profile import reset_domain_profiles
+from aifoundry.app.utils.extraction_pool import get_extraction_pool, shutdown_extraction_pool
+from aifoundry.app.utils.http_cache import reset_http_cache
+from aifoundry.app.utils.http_client import close_scrape_http_client
 
 
 # ==============================================================================
@@ -25,7 +34,7 @@ async def lifespan(app: FastAPI):
     """
     Lifespan context manager for startup and shutdown events.
 
-    Startup: Configura logging y verifica conectividad.
+    Startup: Configura logging, carga el registro de agentes y verifica conectividad.
     Shutdown: Limpia recursos.
     """
     # STARTUP
@@ -36,11 +45,53 @@ async def lifespan(app: FastAPI):
     logger.info(f"   Brave MCP: {settings.brave_search_mcp_url}")
     logger.info(f"   Playwright MCP: {settings.playwright_mcp_url}")
 
+    # Registro de agentes: se escanea y valida una sola vez al arrancar
+    registry = get_agent_registry()
+    registry.load()
+    logger.info(f"   Agents: {registry.names()}")
+
+    # Pool de agentes: precalentado en segundo plano (no bloquea el arranque)
+    pool_manager = get_agent_pool_manager()
+    warmup_task = None
+    if settings.agent_pool_enabled:
+        pool_manager.start()
+        if settings.agent_pool_min_size > 0:
+            warmup_task = asyncio.create_task(pool_manager.warmup(registry.names()))
+        logger.info(
+            f"   Agent pool: min={settings.agent_pool_min_size}, "
+            f"max={settings.agent_pool_max_size}"
+        )
+
+    # Jobs asíncronos: recupera pendientes y arranca los workers
+    job_manager = get_job_manager()
+    await job_manager.start()
+    logger.info(f"   Jobs: {settings.job_workers} workers ({settings.job_db_path})")
+    if settings.result_cache_enabled:
+        logger.info(
+            f"   Result cache: {settings.result_cache_max_entries} entradas en memoria"
+            f"{', disco: ' + settings.result_cache_db_path if settings.result_cache_db_path else ''}"
+        )
+
+    # Pool de procesos para el procesado de páginas de simple_scrape
+    extraction_pool = get_extraction_pool()
+    extraction_pool.start()
+    if extraction_pool.started:
+        logger.info(f"   Extraction pool: {settings.scrape_extract_workers} procesos")
+
     yield  # Application runs here
 
     # SHUTDOWN
     logger = logging.getLogger(__name__)
     logger.info("👋 AIFoundry API shutting down...")
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await job_manager.stop()
+    await pool_manager.close()
+    reset_result_cache()  # Cierra el nivel SQLite (si está activo)
+    await close_scrape_http_client()  # Cierra las conexiones keep-alive de simple_scrape
+    reset_http_cache()  # Cierra el SQLite de la caché HTTP
+    await asyncio.to_thread(reset_domain_profiles)  # Escribe lo pendiente y cierra su SQLite
+    await asyncio.to_thread(shutdown_extraction_pool)  # Espera a los workers sin bloquear el loop
 
 
 # ==============================================================================
@@ -6,6 +6,7 @@ Basado en HEFESTO - Patrón simétrico.
 
 from .simple_scraper import simple_scrape
 from .text import parse_json_response, extract_urls, truncate_text, clean_markdown_code_blocks
+from .condense import condense_markdown
 from .country import get_country_info, COUNTRY_INFO
 from .rate_limiter import BraveRateLimiter, get_brave_rate_limiter
 
@@ -17,6 +18,7 @@ __all__ = [
     "extract_urls",
     "truncate_text",
     "clean_markdown_code_blocks",
+    "condense_markdown",
     # Country
     "get_country_info",
     "COUNTRY_INFO",
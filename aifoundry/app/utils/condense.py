@@ -0,0 +1,308 @@
+"""
+Condensado de páginas scrapeadas por relevancia y presupuesto de tokens.
+
+Truncar el markdown a los primeros N caracteres deja fuera, en muchas webs
+de tarifas, justo la tabla de precios (lo primero es menú, cookies y
+banners). Aquí el markdown se parte en bloques (secciones, trozos de tabla
+con su cabecera, párrafos), se puntúa cada bloque contra las palabras clave
+del run (producto, proveedor, país, query) y su densidad de cifras, precios
+y unidades, y se conservan los mejores hasta el presupuesto de tokens, en
+el orden original de la página.
+
+El foco (palabras clave + presupuesto) se fija una vez por run con
+focus_scope() y lo heredan las tools por contextvars, igual que el deadline.
+
+Este módulo contiene:
+- PageFocus: Palabras clave y presupuesto de tokens de un run
+- focus_scope / current_focus: Foco del run en curso
+- split_blocks / score_block: Troceado y puntuación
+- condense_markdown: Selección de bloques hasta el presupuesto
+
+Example:
+    ```python
+    focus = PageFocus(["electricidad", "Endesa", "España"], token_budget=2500)
+    with focus_scope(focus):
+        text = condense_markdown(markdown)  # usa current_focus()
+    ```
+"""
+
+import math
+import re
+import unicodedata
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Sequence
+
+# Aproximación de tokens (≈ 4 caracteres por token en es/en/pt/fr)
+CHARS_PER_TOKEN = 4
+
+# Tamaño objetivo de un bloque (los párrafos largos no se parten)
+_BLOCK_CHARS = 800
+
+_GAP_MARKER = "[…]"
+
+# Cifras con moneda o unidad: 0,149 €/kWh · 45 € · 1.200 EUR · 12 % · 30 €/mes
+_PRICE_RE = re.compile(
+    r"\d+(?:[.,]\d+)*\s*(?:€|\$|£|eur\b|usd\b|gbp\b|%|kwh\b|kw\b|mwh\b|/\s*(?:mes|año|ano|day|día|dia|h)\b)"
+    r"|(?:€|\$|£)\s*\d",
+    re.IGNORECASE,
+)
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_WORD_RE = re.compile(r"\w+")
+
+# Texto típico de banners y navegación (penaliza el bloque)
+_BOILERPLATE_TERMS = (
+    "cookie", "cookies", "privacidad", "privacy", "aviso legal", "suscríbete",
+    "newsletter", "iniciar sesión", "inicia sesión", "todos los derechos",
+    "aceptar", "rechazar",
+)
+
+# Palabras de la query que no aportan como palabra clave
+_STOPWORDS = frozenset({
+    "para", "como", "cual", "cuál", "desde", "hasta", "sobre", "entre", "precio", "precios",
+    "enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto",
+    "septiembre", "octubre", "noviembre", "diciembre", "with", "from", "what",
+})
+
+
+def estimate_tokens(text: str) -> int:
+    """Tokens aproximados de un texto."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _fold(text: str) -> str:
+    """Minúsculas sin tildes (para comparar palabras clave)."""
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in normalized if not unicodedata.combining(c))
+
+
+class PageFocus:
+    """Palabras clave y presupuesto de tokens con que se condensan las páginas de un run."""
+
+    __slots__ = ("keywords", "secondary", "token_budget")
+
+    def __init__(
+        self,
+        keywords: Sequence[str],
+        token_budget: int,
+        secondary: Sequence[str] = (),
+    ):
+        """
+        Args:
+            keywords: Términos principales (producto, proveedor, país).
+            token_budget: Tokens máximos por página.
+            secondary: Términos de menor peso (palabras de la query).
+        """
+        self.keywords = [_fold(k) for k in keywords if k and k.strip()]
+        self.secondary = [_fold(k) for k in secondary if k and k.strip() and _fold(k) not in self.keywords]
+        self.token_budget = token_budget
+
+    @classmethod
+    def from_run_config(cls, config: dict, country_name: str, default_budget: int) -> "PageFocus":
+        """
+        Foco a partir del config de un run (ver runner.build_agent_config).
+
+        El presupuesto es `page_token_budget` del config.json del agente o
+        `default_budget`.
+        """
+        keywords = [config.get("product", ""), config.get("provider", ""), country_name]
+        query_words = [
+            w for w in _WORD_RE.findall(config.get("query", ""))
+            if len(w) >= 4 and not w.isdigit() and w.lower() not in _STOPWORDS
+        ]
+        return cls(
+            keywords,
+            token_budget=config.get("page_token_budget") or default_budget,
+            secondary=query_words,
+        )
+
+
+_current_focus: ContextVar[Optional[PageFocus]] = ContextVar("aifoundry_page_focus", default=None)
+
+
+def current_focus() -> Optional[PageFocus]:
+    """Foco del run en curso (None fuera de un run)."""
+    return _current_focus.get()
+
+
+@contextmanager
+def focus_scope(focus: Optional[PageFocus]) -> Iterator[Optional[PageFocus]]:
+    """Fija `focus` como foco actual dentro del bloque."""
+    token = _current_focus.set(focus)
+    try:
+        yield focus
+    finally:
+        _current_focus.reset(token)
+
+
+class Block:
+    """Trozo contiguo del markdown con la cabecera de su sección."""
+
+    __slots__ = ("index", "text", "heading", "score")
+
+    def __init__(self, index: int, text: str, heading: str):
+        self.index = index
+        self.text = text
+        self.heading = heading
+        self.score = 0.0
+
+
+def _is_table_line(line: str) -> bool:
+    return line.lstrip().startswith("|")
+
+
+def split_blocks(markdown: str, block_chars: int = _BLOCK_CHARS) -> List[Block]:
+    """
+    Parte el markdown en bloques de hasta ~block_chars.
+
+    Cada cabecera (#) abre sección; las tablas se trocean por filas
+    repitiendo la fila de cabecera en cada trozo.
+    """
+    blocks: List[Block] = []
+    heading = ""
+    current: List[str] = []
+    size = 0
+
+    def flush() -> None:
+        nonlocal current, size
+        if current:
+            blocks.append(Block(len(blocks), "\n".join(current), heading))
+        current, size = [], 0
+
+    lines = markdown.split("\n")
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.lstrip().startswith("#"):
+            flush()
+            heading = line.strip()
+            current, size = [line], len(line)
+            i += 1
+            continue
+
+        if _is_table_line(line):
+            table = []
+            while i < len(lines) and _is_table_line(lines[i]):
+                table.append(lines[i])
+                i += 1
+            flush()
+            # Cabecera + separador (|---|) se repiten en cada trozo
+            header = table[:2] if len(table) > 1 and set(table[1].replace("|", "").strip()) <= set("-: ") else table[:1]
+            rows = table[len(header):]
+            chunk: List[str] = []
+            chunk_size = sum(len(h) for h in header)
+            for row in rows:
+                if chunk and chunk_size + len(row) > block_chars:
+                    blocks.append(Block(len(blocks), "\n".join(header + chunk), heading))
+                    chunk, chunk_size = [], sum(len(h) for h in header)
+                chunk.append(row)
+                chunk_size += len(row) + 1
+            blocks.append(Block(len(blocks), "\n".join(header + chunk), heading))
+            continue
+
+        if current and size + len(line) > block_chars:
+            flush()
+        current.append(line)
+        size += len(line) + 1
+        i += 1
+
+    flush()
+    return blocks
+
+
+def score_block(text: str, focus: Optional[PageFocus]) -> float:
+    """
+    Relevancia de un bloque: palabras clave del run + densidad de cifras y
+    precios, penalizando enlaces (menús) y textos de cookies/avisos.
+    """
+    folded = _fold(text)
+    words = max(1, len(_WORD_RE.findall(folded)))
+    score = 0.0
+
+    if focus is not None:
+        for keyword in focus.keywords:
+            count = folded.count(keyword)
+            if count:
+                score += 3.0 + min(count - 1, 4) * 0.5
+        for keyword in focus.secondary:
+            if keyword in folded:
+                score += 1.0
+
+    prices = len(_PRICE_RE.findall(text))
+    numbers = len(_NUMBER_RE.findall(text))
+    score += min(prices, 10) * 1.5 + min(numbers / words, 0.5) * 6
+
+    # Menús: la mayor parte del texto son enlaces
+    link_chars = sum(len(m.group(0)) for m in _LINK_RE.finditer(text))
+    link_ratio = link_chars / max(1, len(text))
+    score *= 1.0 - 0.8 * link_ratio
+
+    if any(term in folded for term in _BOILERPLATE_TERMS):
+        score *= 0.3
+    return score
+
+
+def condense_markdown(
+    markdown: str,
+    token_budget: Optional[int] = None,
+    focus: Optional[PageFocus] = None,
+) -> str:
+    """
+    Se queda con los bloques más relevantes hasta `token_budget` tokens.
+
+    Args:
+        markdown: Markdown de la página.
+        token_budget: Tokens máximos (por defecto, el del foco actual).
+        focus: Palabras clave (por defecto, current_focus()).
+
+    Returns:
+        El markdown tal cual si cabe; si no, los mejores bloques en su
+        orden original, con "[…]" donde se omitió contenido.
+    """
+    focus = focus if focus is not None else current_focus()
+    if token_budget is None:
+        token_budget = focus.token_budget if focus is not None else 2500
+    if estimate_tokens(markdown) <= token_budget:
+        return markdown
+
+    blocks = split_blocks(markdown)
+    for block in blocks:
+        block.score = score_block(block.text, focus)
+
+    # Mejores primero; a igual puntuación, lo que aparece antes
+    ranked = sorted((b for b in blocks if b.score > 0), key=lambda b: (-b.score, b.index))
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    selected: List[Block] = []
+    used = 0
+    for block in ranked:
+        cost = len(block.text) + len(_GAP_MARKER) + 2
+        if block.heading and not block.text.startswith(block.heading):
+            cost += len(block.heading) + 1
+        if used + cost > budget_chars:
+            continue
+        selected.append(block)
+        used += cost
+
+    if not selected:
+        # Nada destaca: como antes, el principio de la página
+        return markdown[:budget_chars] + "..."
+
+    selected.sort(key=lambda b: b.index)
+    parts: List[str] = []
+    emitted_headings = set()
+    previous = -1
+    for block in selected:
+        if block.index != previous + 1:
+            parts.append(_GAP_MARKER)
+        if block.text.startswith(block.heading):
+            emitted_headings.add(block.heading)
+        elif block.heading and block.heading not in emitted_headings:
+            # Contexto: la cabecera de la sección aunque su bloque no entre
+            parts.append(block.heading)
+            emitted_headings.add(block.heading)
+        parts.append(block.text)
+        previous = block.index
+    if previous != len(blocks) - 1:
+        parts.append(_GAP_MARKER)
+    return "\n".join(parts)
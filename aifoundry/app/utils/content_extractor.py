@@ -0,0 +1,180 @@
+"""
+Extractor rápido del contenido principal por densidad de texto y enlaces.
+
+readability.Document.summary() es el paso más lento del procesado de una
+página (copia el árbol, puntúa cada nodo con expresiones regulares de
+clases/ids y lo limpia varias veces) y en páginas de listados o tablas
+devuelve a menudo casi nada. Este extractor hace un único recorrido del
+árbol ya parseado:
+
+1. Quita scripts, estilos y navegación (nav, header, footer, aside...).
+2. Puntúa los bloques de texto (p, li, td, h*, pre...) por longitud,
+   comas y cifras, descontando la parte que es texto de enlaces.
+3. Acumula la puntuación en el contenedor más cercano (div, main,
+   article, section, table...) y en su padre.
+4. Elige el mejor contenedor y le añade los hermanos con contenido.
+
+Devuelve además una calidad (0-1) para que el llamador decida si fiarse
+del resultado o pasar a readability (SCRAPE_EXTRACTOR_MIN_QUALITY).
+
+Este módulo contiene:
+- extract_main_content: Contenido principal (elemento lxml) y su calidad
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import lxml.html
+from lxml.html import HtmlElement
+
+# Contenido mínimo (caracteres de texto) de una extracción válida
+MIN_TEXT_CHARS = 200
+
+# Se eliminan antes de puntuar (menús, banners, widgets)
+# <form> no: hay webs (ASP.NET) que envuelven toda la página en uno
+_DROP_TAGS = (
+    "script", "style", "noscript", "iframe", "nav", "footer", "header",
+    "aside", "button", "svg", "template",
+)
+
+# Bloques de texto que se puntúan
+_TEXT_TAGS = (
+    "p", "pre", "blockquote", "li", "td", "th", "dd", "dt",
+    "h1", "h2", "h3", "h4", "h5", "h6",
+)
+
+# Contenedores que reciben la puntuación de sus bloques
+_CONTAINER_TAGS = frozenset({
+    "div", "main", "article", "section", "table", "ul", "ol", "dl", "body", "td",
+})
+
+# Bonus para contenedores semánticos de contenido
+_SEMANTIC_BONUS = {"article": 1.5, "main": 1.3}
+
+
+def _link_chars(element: HtmlElement) -> int:
+    return sum(len(a.text_content()) for a in element.iter("a"))
+
+
+def _block_score(element: HtmlElement) -> float:
+    """Puntuación de un bloque de texto (0 si es ruido)."""
+    text = element.text_content()
+    length = len(text.strip())
+    if not length:
+        return 0.0
+
+    has_digits = any(c.isdigit() for c in text)
+
+    # Celdas y cabeceras cortas cuentan si llevan cifras (tablas de precios)
+    if length < 25 and not (has_digits and element.tag in ("td", "th", "li")):
+        return 0.0
+
+    link_density = min(1.0, _link_chars(element) / length)
+
+    score = 1.0 + text.count(",") + min(length / 100, 3.0) + (0.5 if has_digits else 0.0)
+    return score * (1.0 - link_density)
+
+
+def _container_of(element: HtmlElement, max_levels: int = 4) -> Optional[HtmlElement]:
+    """Contenedor más cercano (hasta `max_levels` niveles hacia arriba)."""
+    parent = element.getparent()
+    for _ in range(max_levels):
+        if parent is None:
+            return None
+        if parent.tag in _CONTAINER_TAGS:
+            return parent
+        parent = parent.getparent()
+    return None
+
+
+def _text_stats(element: HtmlElement) -> Tuple[int, int]:
+    """(caracteres de texto, caracteres de enlaces)."""
+    return len(element.text_content().strip()), _link_chars(element)
+
+
+def extract_main_content(
+    tree: HtmlElement, min_quality: float = 0.0
+) -> Tuple[Optional[HtmlElement], float]:
+    """
+    Extrae el contenido principal de una página.
+
+    Modifica `tree` (quita scripts, estilos y navegación y mueve el
+    contenido elegido a un <div> nuevo): llamar después de extraer
+    metadata y links.
+
+    Args:
+        tree: Árbol lxml de la página (simple_scraper._parse_html)
+        min_quality: Por debajo no se extrae nada (el árbol queda entero,
+            salvo scripts y navegación, para readability)
+
+    Returns:
+        (<div> con el contenido principal o None, calidad entre 0 y 1)
+    """
+    for element in list(tree.iter(*_DROP_TAGS)):
+        element.drop_tree()
+
+    body = tree.find(".//body")
+    if body is None:
+        body = tree
+    total_chars = len(body.text_content().strip())
+    if total_chars < MIN_TEXT_CHARS:
+        return None, 0.0
+
+    # Un recorrido: cada bloque suma a su contenedor y la mitad al abuelo
+    scores: Dict[HtmlElement, float] = {}
+    for element in body.iter(*_TEXT_TAGS):
+        score = _block_score(element)
+        if not score:
+            continue
+        container = _container_of(element)
+        if container is None:
+            continue
+        scores[container] = scores.get(container, 0.0) + score
+        grandparent = _container_of(container)
+        if grandparent is not None:
+            scores[grandparent] = scores.get(grandparent, 0.0) + score / 2
+
+    if not scores:
+        return None, 0.0
+
+    for container in scores:
+        scores[container] *= _SEMANTIC_BONUS.get(container.tag, 1.0)
+
+    best = max(scores, key=scores.get)
+    best_score = scores[best]
+
+    # Hermanos con contenido propio (artículos partidos en varios bloques)
+    parts: List[HtmlElement] = [best]
+    parent = best.getparent()
+    if parent is not None and best is not body:
+        threshold = max(5.0, best_score * 0.2)
+        parts = [
+            sibling for sibling in parent
+            if sibling is best or scores.get(sibling, 0.0) >= threshold
+        ]
+
+    text_chars = 0
+    link_chars = 0
+    for part in parts:
+        chars, links = _text_stats(part)
+        text_chars += chars
+        link_chars += links
+    if text_chars < MIN_TEXT_CHARS:
+        return None, 0.0
+
+    link_density = min(1.0, link_chars / text_chars)
+    coverage = text_chars / total_chars
+    quality = (
+        min(1.0, text_chars / 1000)
+        * (1.0 - link_density)
+        * min(1.0, coverage / 0.2)
+    )
+    quality = round(quality, 3)
+    if quality < min_quality:
+        return None, quality
+
+    # Sin serializar: el <div> se convierte directamente a markdown
+    content = lxml.html.Element("div")
+    for part in parts:
+        part.tail = None
+        content.append(part)
+    return content, quality
@@ -0,0 +1,122 @@
+"""
+Deadline - Presupuesto de tiempo de un run propagado por contextvars.
+
+Un run fija su deadline una vez (deadline_scope) y cada etapa que espera
+I/O (reintentos, LLM, tools MCP, simple_scrape) consulta cuánto queda
+con remaining_timeout() en vez de usar su timeout fijo. Las tasks y los
+threads de asyncio.to_thread heredan el contexto, así que no hace falta
+pasar el deadline como argumento a través de LangGraph.
+
+Este módulo contiene:
+- Deadline: Instante límite sobre el reloj monotónico
+- deadline_scope: Context manager que fija el deadline actual
+- current_deadline / remaining_timeout: Consulta del presupuesto restante
+- within_deadline: Espera acotada al deadline (DeadlineExceededError si vence)
+
+Example:
+    ```python
+    with deadline_scope(Deadline(60)):
+        timeout = remaining_timeout(30.0)  # min(30, lo que quede de los 60s)
+    ```
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Iterator, Optional
+
+
+class Deadline:
+    """Instante límite (reloj monotónico) de una operación."""
+
+    __slots__ = ("seconds", "expires_at")
+
+    def __init__(self, seconds: float):
+        """
+        Args:
+            seconds: Presupuesto total en segundos desde ahora.
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Segundos que quedan (0 si ya venció)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def elapsed(self) -> float:
+        """Segundos consumidos del presupuesto."""
+        return self.seconds - (self.expires_at - time.monotonic())
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("aifoundry_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline del run en curso (None = sin límite)."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """Fija `deadline` como deadline actual dentro del bloque (None = sin límite)."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining_timeout(default: Optional[float] = None) -> Optional[float]:
+    """
+    Timeout a usar en una espera: el menor entre `default` y lo que queda
+    del deadline actual.
+
+    Returns:
+        `default` si no hay deadline; si lo hay, min(default, restante)
+        (puede ser 0 si ya venció).
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return default
+    remaining = deadline.remaining()
+    return remaining if default is None else min(default, remaining)
+
+
+class DeadlineExceededError(Exception):
+    """Se agotó el deadline del run antes de terminar una etapa."""
+
+    def __init__(self, deadline: Deadline, stage: str = ""):
+        where = f" durante {stage}" if stage else ""
+        super().__init__(f"Deadline de {deadline.seconds:g}s agotado{where}")
+        self.deadline = deadline
+        self.stage = stage
+
+
+async def within_deadline(awaitable: Awaitable[Any], stage: str = "") -> Any:
+    """
+    Espera `awaitable` sin pasar del deadline actual.
+
+    Sin deadline equivale a `await awaitable`. Un TimeoutError lanzado
+    por el propio awaitable se propaga tal cual; solo el vencimiento del
+    deadline se convierte en DeadlineExceededError.
+
+    Raises:
+        DeadlineExceededError: Si el deadline vence antes de terminar.
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return await awaitable
+
+    scope = asyncio.timeout(deadline.remaining())
+    try:
+        async with scope:
+            return await awaitable
+    except TimeoutError:
+        if scope.expired():
+            raise DeadlineExceededError(deadline, stage) from None
+        raise
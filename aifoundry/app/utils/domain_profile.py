@@ -0,0 +1,379 @@
+"""
+Perfil persistente por dominio para elegir el fetcher de cada URL.
+
+El prompt hace que el agente pruebe primero simple_scrape y pase a Playwright
+si falla, y no recuerda nada entre runs: los sitios que siempre necesitan
+JavaScript o que siempre devuelven 403 a httpx cuestan en cada run un scrape
+fallido más un turno extra del LLM. Aquí se guarda, por dominio:
+
+- Intentos, éxitos y latencia media (EWMA) de las descargas.
+- Último motivo de fallo y cuándo ocurrió.
+- Si hace falta JavaScript: simple_scrape falló por bloqueo (401/403) o
+  devolvió un cascarón de SPA casi vacío (#root vacío, solo scripts)
+  SCRAPE_DOMAIN_JS_AFTER veces seguidas.
+- Fallos seguidos de dominio (DNS, conexión, timeout con el tiempo completo,
+  o Playwright): a partir de SCRAPE_DOMAIN_DEAD_AFTER el dominio se da por
+  muerto.
+
+Con eso route() decide antes de descargar: "simple", "browser" (la tool
+responde al momento que se use Playwright) o "dead" (se rechaza la URL con
+un mensaje corto). Los veredictos caducan (SCRAPE_DOMAIN_JS_TTL y
+SCRAPE_DOMAIN_DEAD_TTL) y el dominio vuelve a probarse.
+
+record() solo actualiza la memoria; los perfiles cambiados se escriben en
+SQLite por lotes (como mucho cada _FLUSH_INTERVAL segundos) en un thread,
+fuera del event loop, y al cerrar.
+
+Este módulo contiene:
+- DomainProfile: Estadísticas de un dominio
+- DomainProfileStore: Perfiles en memoria con persistencia en SQLite
+- classify_failure: Motivo de fallo a partir del error de simple_scrape
+- get_domain_profiles / reset_domain_profiles: Singleton configurado desde settings
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from aifoundry.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rutas de route()
+ROUTE_SIMPLE = "simple"
+ROUTE_BROWSER = "browser"
+ROUTE_DEAD = "dead"
+
+# Fetchers de record()
+FETCHER_SIMPLE = "simple"
+FETCHER_BROWSER = "browser"
+
+# Motivos de fallo (classify_failure y record)
+REASON_BLOCKED = "blocked"  # 401/403: httpx rechazado, un navegador suele pasar
+REASON_NEEDS_JS = "needs_js"  # Cascarón de SPA casi vacío: el contenido lo pinta JavaScript
+REASON_CONNECTION = "connection"  # DNS, SSL, conexión rechazada
+REASON_TIMEOUT = "timeout"  # Con el timeout completo de la tool
+REASON_DEADLINE = "deadline"  # Timeout recortado por el deadline del run: no dice nada del dominio
+REASON_HTTP = "http"  # Otros códigos HTTP (404, 5xx): de la página, no del dominio
+REASON_OTHER = "other"
+
+# Fallos de simple_scrape que indican que hace falta un navegador
+_JS_REASONS = frozenset({REASON_BLOCKED, REASON_NEEDS_JS})
+# Fallos de simple_scrape que cuentan para dar el dominio por muerto
+_DEAD_REASONS = frozenset({REASON_CONNECTION, REASON_TIMEOUT})
+# Fallos de una página o del run, no del dominio: solo cuentan como intento
+_IGNORED_REASONS = frozenset({REASON_HTTP, REASON_DEADLINE})
+
+# Peso de la última descarga en la latencia media
+_LATENCY_ALPHA = 0.3
+
+# Segundos como mucho entre escrituras en SQLite de los perfiles cambiados
+_FLUSH_INTERVAL = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS domain_profiles (
+    domain TEXT PRIMARY KEY,
+    attempts INTEGER NOT NULL,
+    successes INTEGER NOT NULL,
+    avg_latency REAL,
+    last_failure TEXT,
+    last_failure_at REAL,
+    simple_misses INTEGER NOT NULL,
+    consecutive_failures INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+_COLUMNS = (
+    "domain", "attempts", "successes", "avg_latency", "last_failure",
+    "last_failure_at", "simple_misses", "consecutive_failures", "updated_at",
+)
+
+
+def domain_of(url: str) -> Optional[str]:
+    """Host de `url` en minúsculas y sin "www." (None si no es una URL http)."""
+    try:
+        host = urlsplit(url.strip()).hostname
+    except ValueError:
+        return None
+    if not host:
+        return None
+    return host[4:] if host.startswith("www.") else host
+
+
+def classify_failure(error: str) -> str:
+    """Motivo de fallo a partir del mensaje de error de simple_scrape."""
+    if error.startswith(("HTTP 401", "HTTP 403")):
+        return REASON_BLOCKED
+    if error.startswith("HTTP "):
+        return REASON_HTTP
+    if error.startswith("Timeout"):
+        return REASON_TIMEOUT
+    if error.startswith("Error de conexión"):
+        return REASON_CONNECTION
+    return REASON_OTHER
+
+
+class DomainProfile:
+    """Estadísticas de descarga de un dominio."""
+
+    __slots__ = _COLUMNS
+
+    def __init__(
+        self,
+        domain: str,
+        attempts: int = 0,
+        successes: int = 0,
+        avg_latency: Optional[float] = None,
+        last_failure: Optional[str] = None,
+        last_failure_at: Optional[float] = None,
+        simple_misses: int = 0,
+        consecutive_failures: int = 0,
+        updated_at: float = 0.0,
+    ):
+        self.domain = domain
+        self.attempts = attempts
+        self.successes = successes
+        self.avg_latency = avg_latency
+        self.last_failure = last_failure
+        self.last_failure_at = last_failure_at
+        # Fallos seguidos de simple_scrape por bloqueo o página vacía
+        self.simple_misses = simple_misses
+        # Fallos seguidos de dominio (cualquier fetcher)
+        self.consecutive_failures = consecutive_failures
+        self.updated_at = updated_at
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.attempts if self.attempts else 0.0
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in _COLUMNS}
+
+
+class DomainProfileStore:
+    """
+    Perfiles por dominio en memoria, persistidos en SQLite por lotes.
+
+    Example:
+        store = DomainProfileStore("./data/domain_profiles.db")
+        if store.route(url) == ROUTE_SIMPLE:
+            ...
+            store.record(url, FETCHER_SIMPLE, success=False, reason=REASON_BLOCKED)
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        js_after: int = 2,
+        dead_after: int = 3,
+        js_ttl: float = 7 * 24 * 3600,
+        dead_ttl: float = 6 * 3600,
+    ):
+        """
+        Args:
+            db_path: Fichero SQLite (":memory:" para tests).
+            js_after: Fallos seguidos de simple_scrape (403, página vacía) para ir directo a Playwright.
+            dead_after: Fallos seguidos de dominio para rechazarlo.
+            js_ttl: Segundos que vale el veredicto "necesita JavaScript".
+            dead_ttl: Segundos que se rechaza un dominio muerto antes de volver a probar.
+        """
+        self.js_after = max(1, js_after)
+        self.dead_after = max(1, dead_after)
+        self.js_ttl = js_ttl
+        self.dead_ttl = dead_ttl
+        self._lock = threading.Lock()
+        # Serializa el uso de la conexión (flush desde threads del executor)
+        self._write_lock = threading.Lock()
+        self._dirty: Set[str] = set()
+        self._flush_pending = False
+        self._last_flush = time.monotonic()
+        self._closed = False
+
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            if db_path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM domain_profiles"
+            ).fetchall()
+        # Pocos miles de dominios como mucho: todos en memoria
+        self._profiles: Dict[str, DomainProfile] = {row[0]: DomainProfile(*row) for row in rows}
+
+    def get(self, url: str) -> Optional[DomainProfile]:
+        """Perfil del dominio de `url` o None si no se conoce."""
+        domain = domain_of(url)
+        with self._lock:
+            return self._profiles.get(domain) if domain else None
+
+    def route(self, url: str) -> str:
+        """
+        Fetcher para `url` según lo aprendido de su dominio.
+
+        Returns:
+            ROUTE_DEAD si acumula fallos de dominio recientes, ROUTE_BROWSER
+            si httpx no sirve (bloqueo o JavaScript) y ROUTE_SIMPLE si no.
+        """
+        profile = self.get(url)
+        return ROUTE_SIMPLE if profile is None else self._route(profile, time.time())
+
+    def _route(self, profile: DomainProfile, now: float) -> str:
+        if profile.last_failure_at is None:
+            return ROUTE_SIMPLE
+        age = now - profile.last_failure_at
+        if profile.consecutive_failures >= self.dead_after and age < self.dead_ttl:
+            return ROUTE_DEAD
+        if profile.simple_misses >= self.js_after and age < self.js_ttl:
+            return ROUTE_BROWSER
+        return ROUTE_SIMPLE
+
+    def record(
+        self,
+        url: str,
+        fetcher: str,
+        success: bool,
+        latency: Optional[float] = None,
+        reason: Optional[str] = None,
+    ) -> None:
+        """
+        Registra el resultado de una descarga.
+
+        Args:
+            url: URL descargada.
+            fetcher: FETCHER_SIMPLE o FETCHER_BROWSER.
+            success: Si se obtuvo contenido útil.
+            latency: Segundos de la descarga (None si no se midió, p.ej. precargada).
+            reason: Motivo del fallo (REASON_*).
+        """
+        domain = domain_of(url)
+        if domain is None:
+            return
+        now = time.time()
+        with self._lock:
+            profile = self._profiles.get(domain)
+            if profile is None:
+                profile = self._profiles[domain] = DomainProfile(domain)
+            profile.attempts += 1
+            profile.updated_at = now
+            if latency is not None:
+                profile.avg_latency = (
+                    latency if profile.avg_latency is None
+                    else _LATENCY_ALPHA * latency + (1 - _LATENCY_ALPHA) * profile.avg_latency
+                )
+
+            if success:
+                profile.successes += 1
+                profile.consecutive_failures = 0
+                if fetcher == FETCHER_SIMPLE:
+                    profile.simple_misses = 0
+            elif reason in _IGNORED_REASONS:
+                # 404/5xx de una página concreta o timeout recortado por el
+                # deadline del run: no dicen nada del dominio
+                pass
+            else:
+                profile.last_failure = reason or REASON_OTHER
+                profile.last_failure_at = now
+                if fetcher == FETCHER_SIMPLE and reason in _JS_REASONS:
+                    profile.simple_misses += 1
+                elif fetcher == FETCHER_BROWSER or reason in _DEAD_REASONS:
+                    profile.consecutive_failures += 1
+            self._dirty.add(domain)
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Escribe los perfiles cambiados si toca (en un thread si hay event loop)."""
+        with self._lock:
+            if self._flush_pending or time.monotonic() - self._last_flush < _FLUSH_INTERVAL:
+                return
+            self._flush_pending = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        # El INSERT y el commit de SQLite fuera del event loop
+        loop.run_in_executor(None, self.flush)
+
+    def flush(self) -> None:
+        """Persiste en una transacción los perfiles cambiados desde la última escritura."""
+        with self._lock:
+            rows: List[Tuple] = [
+                tuple(getattr(self._profiles[domain], name) for name in _COLUMNS)
+                for domain in self._dirty
+            ]
+            self._dirty.clear()
+            self._flush_pending = False
+            self._last_flush = time.monotonic()
+        if not rows:
+            return
+        with self._write_lock:
+            if self._closed:
+                return
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        f"INSERT OR REPLACE INTO domain_profiles ({', '.join(_COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                        rows,
+                    )
+            except sqlite3.Error as e:
+                # Los perfiles en memoria siguen valiendo para este proceso
+                logger.warning(f"No se pudieron guardar {len(rows)} perfiles de dominio: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Dominios conocidos y cuántos van directos a Playwright o están muertos."""
+        now = time.time()
+        with self._lock:
+            routes = [self._route(profile, now) for profile in self._profiles.values()]
+        return {
+            "domains": len(routes),
+            "browser": routes.count(ROUTE_BROWSER),
+            "dead": routes.count(ROUTE_DEAD),
+        }
+
+    def close(self) -> None:
+        """Escribe lo pendiente y cierra la conexión."""
+        self.flush()
+        with self._write_lock:
+            self._closed = True
+            self._conn.close()
+
+
+# Singleton global
+_domain_profiles: Optional[DomainProfileStore] = None
+
+
+def get_domain_profiles() -> DomainProfileStore:
+    """
+    Obtiene el singleton de perfiles por dominio.
+
+    Returns:
+        Instancia configurada desde settings; solo en memoria si
+        SCRAPE_DOMAIN_PROFILE_PATH está vacío.
+    """
+    global _domain_profiles
+    if _domain_profiles is None:
+        _domain_profiles = DomainProfileStore(
+            settings.scrape_domain_profile_path or ":memory:",
+            js_after=settings.scrape_domain_js_after,
+            dead_after=settings.scrape_domain_dead_after,
+            js_ttl=settings.scrape_domain_js_ttl,
+            dead_ttl=settings.scrape_domain_dead_ttl,
+        )
+    return _domain_profiles
+
+
+def reset_domain_profiles() -> None:
+    """Escribe lo pendiente, cierra y resetea el singleton (shutdown / tests)."""
+    global _domain_profiles
+    if _domain_profiles is not None:
+        _domain_profiles.close()
+    _domain_profiles = None
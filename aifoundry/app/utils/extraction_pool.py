@@ -0,0 +1,195 @@
+"""
+Pool de procesos para el procesado (CPU) de las páginas scrapeadas.
+
+La descarga de simple_scrape_async es I/O sobre el AsyncClient compartido,
+pero el procesado (parseo lxml, extracción del contenido principal,
+readability y markdown) es CPU en Python puro con el GIL tomado: en un
+thread, con 10+ runs a la vez, un worker de uvicorn se queda en un core al
+100% y el event loop se atasca. Aquí el procesado va a un
+ProcessPoolExecutor acotado:
+
+- SCRAPE_EXTRACT_WORKERS procesos (0 = sin pool: thread del proceso).
+- Como mucho SCRAPE_EXTRACT_MAX_PENDING páginas en vuelo; las demás esperan
+  turno sin encolar trabajo ilimitado en el pool.
+- Los workers se reciclan cada SCRAPE_EXTRACT_MAX_TASKS_PER_CHILD páginas.
+- Si un worker muere (BrokenProcessPool) el pool se recrea y esa página se
+  procesa en un thread.
+
+El pool se arranca y se para en el lifespan de FastAPI; fuera de la API
+(tests, scripts, CLI) run() usa un thread, como antes.
+
+Este módulo contiene:
+- ExtractionPool: Ejecutor acotado con fallback a thread
+- get_extraction_pool / shutdown_extraction_pool: Singleton configurado desde settings
+
+Example:
+    ```python
+    pool = get_extraction_pool()
+    pool.start()  # lifespan
+    result = await pool.run(_build_result, html, url, 200, ["markdown"], True)
+    ```
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from aifoundry.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Módulo que los workers importan al arrancar (forkserver)
+_PRELOAD = ["aifoundry.app.utils.simple_scraper"]
+
+
+def _settings_snapshot() -> Dict[str, Any]:
+    """Settings de scraping del proceso padre (pueden haberse cambiado en caliente)."""
+    return {
+        name: value
+        for name, value in settings.model_dump().items()
+        if name.startswith("scrape_")
+    }
+
+
+def _init_worker(overrides: Dict[str, Any]) -> None:
+    """Inicializador de cada worker: mismos settings de scraping que el padre."""
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    """forkserver donde existe (no hereda threads ni sockets del padre); si no, spawn."""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(_PRELOAD)
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class ExtractionPool:
+    """
+    ProcessPoolExecutor acotado para funciones CPU-bound.
+
+    Sin arrancar (o con max_workers=0) run() ejecuta en un thread.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 64, max_tasks_per_child: int = 200):
+        """
+        Args:
+            max_workers: Procesos del pool (0 = sin pool).
+            max_pending: Tareas en vuelo como máximo (el resto espera turno).
+            max_tasks_per_child: Tareas antes de reciclar un worker (0 = nunca).
+        """
+        self.max_workers = max_workers
+        self.max_pending = max(1, max_pending)
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.completed = 0
+        self.fallbacks = 0
+        self.restarts = 0
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        """Crea el pool (los procesos arrancan con la primera tarea)."""
+        if self._executor is not None or self.max_workers <= 0:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=_mp_context(),
+            initializer=_init_worker,
+            initargs=(_settings_snapshot(),),
+            max_tasks_per_child=self.max_tasks_per_child or None,
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Para el pool; las tareas aún no empezadas se cancelan."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Los semáforos de asyncio son del loop en el que se usan
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._loop = loop
+        return self._slots
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Ejecuta fn(*args) en el pool (o en un thread si no está arrancado).
+
+        `fn` y sus argumentos deben ser picklables (funciones de módulo).
+        """
+        if self._executor is None:
+            return await asyncio.to_thread(fn, *args)
+
+        async with self._semaphore():
+            executor = self._executor
+            if executor is None:  # shutdown mientras esperábamos turno
+                return await asyncio.to_thread(fn, *args)
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                logger.error("Pool de extracción roto (worker caído): se recrea")
+                self._restart(executor)
+                self.fallbacks += 1
+                return await asyncio.to_thread(fn, *args)
+            self.completed += 1
+            return result
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        # Varias tareas pueden ver el mismo pool roto: solo la primera lo recrea
+        if self._executor is not broken:
+            return
+        self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.restarts += 1
+        self.start()
+
+    def stats(self) -> Dict[str, int]:
+        """Configuración y contadores de uso."""
+        return {
+            "workers": self.max_workers if self.started else 0,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "fallbacks": self.fallbacks,
+            "restarts": self.restarts,
+        }
+
+
+# Singleton global
+_extraction_pool: Optional[ExtractionPool] = None
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """
+    Obtiene el singleton del pool de extracción.
+
+    Returns:
+        Instancia configurada desde settings (sin arrancar hasta start()).
+    """
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = ExtractionPool(
+            max_workers=settings.scrape_extract_workers,
+            max_pending=settings.scrape_extract_max_pending,
+            max_tasks_per_child=settings.scrape_extract_max_tasks_per_child,
+        )
+    return _extraction_pool
+
+
+def shutdown_extraction_pool() -> None:
+    """Para y resetea el singleton (shutdown / tests)."""
+    global _extraction_pool
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown()
+    _extraction_pool = None
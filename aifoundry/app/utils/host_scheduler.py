@@ -0,0 +1,307 @@
+"""
+Planificador de cortesía por host para el scraping.
+
+Con varios runs a la vez, distintos agentes atacan la misma web de tarifas o
+salarios simultáneamente; el sitio responde 429 / 503 o nos banea un rato y
+eso acaba en escaladas a Playwright y reintentos del run completo. Todas las
+peticiones de scraping (simple_scrape_async, simple_scrape_urls y la
+navegación de Playwright) pasan por un HostScheduler compartido que, por host:
+
+- Limita las peticiones simultáneas.
+- Espacia las peticiones (intervalo mínimo, o el Crawl-delay de robots.txt
+  si es mayor).
+- Aplica backoff adaptativo tras un 429 / 503 (exponencial, respetando
+  Retry-After) que se relaja con las respuestas correctas.
+- Cachea robots.txt parseado con TTL (corto si no se pudo descargar).
+
+Este módulo contiene:
+- HostScheduler: Estado por host y slot() para hacer una petición
+- RobotsDisallowedError / HostBackoffError: Errores para el LLM
+- get_host_scheduler / reset_host_scheduler: Singleton configurado desde settings
+
+Example:
+    ```python
+    scheduler = get_host_scheduler()
+    if not await scheduler.robots_allowed(url, fetch_robots):
+        raise RobotsDisallowedError(url)
+    async with scheduler.slot(url):
+        response = await client.get(url)
+        scheduler.record(url, response.status_code, response.headers.get("retry-after"))
+    ```
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from aifoundry.app.config import settings
+from aifoundry.app.utils.deadline import remaining_timeout
+from aifoundry.app.utils.metrics import SCRAPE_THROTTLED
+
+logger = logging.getLogger(__name__)
+
+# (url de robots.txt) → contenido, o None si no existe. Si no se pudo
+# descargar (timeout, conexión, 5xx, backoff) lanza una excepción
+RobotsFetcher = Callable[[str], Awaitable[Optional[str]]]
+
+# Contenido equivalente a un robots.txt con 401/403: se prohíbe todo
+# (misma convención que urllib.robotparser)
+ROBOTS_DISALLOW_ALL = "User-agent: *\nDisallow: /\n"
+
+# Status que indican que el host pide que bajemos el ritmo
+BACKOFF_STATUS_CODES = frozenset({429, 503})
+
+# robots.txt se evalúa para cualquier agente (los User-Agent son de navegador)
+_ROBOTS_USER_AGENT = "*"
+
+
+def host_key(url: str) -> str:
+    """scheme://host[:port] en minúsculas."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After en segundos (acepta segundos o fecha HTTP)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RobotsDisallowedError(Exception):
+    """robots.txt del sitio no permite descargar la URL."""
+
+    def __init__(self, url: str):
+        super().__init__(f"robots.txt de {host_key(url)} no permite {url}")
+        self.url = url
+
+
+class HostBackoffError(Exception):
+    """El host está en backoff más tiempo del que queda al run."""
+
+    def __init__(self, host: str, wait: float):
+        super().__init__(f"{host} limita peticiones (429/503), espera de {wait:.0f}s")
+        self.host = host
+        self.wait = wait
+
+
+class _HostState:
+    """Estado de cortesía de un host."""
+
+    __slots__ = (
+        "semaphore", "next_slot", "blocked_until", "backoff",
+        "crawl_delay", "robots", "robots_expires_at", "robots_lock",
+        "requests", "throttled",
+    )
+
+    def __init__(self, max_concurrency: int):
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        self.next_slot = 0.0  # monotonic: primera salida permitida por espaciado
+        self.blocked_until = 0.0  # monotonic: fin del backoff
+        self.backoff = 0.0
+        self.crawl_delay = 0.0
+        self.robots: Optional[RobotFileParser] = None
+        self.robots_expires_at = 0.0
+        self.robots_lock = asyncio.Lock()
+        self.requests = 0
+        self.throttled = 0
+
+
+class HostScheduler:
+    """
+    Concurrencia, espaciado, backoff y robots.txt por host.
+
+    Está ligado al event loop en el que se usa (semáforos y locks de
+    asyncio): get_host_scheduler() crea otro si cambia el loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        min_interval: float = 0.0,
+        backoff_base: float = 2.0,
+        backoff_max: float = 60.0,
+        robots_ttl: float = 3600.0,
+        robots_error_ttl: float = 60.0,
+    ):
+        """
+        Args:
+            max_concurrency: Peticiones a la vez por host (0 = sin límite).
+            min_interval: Segundos mínimos entre salidas al mismo host.
+            backoff_base: Primer backoff tras un 429/503 (luego se duplica).
+            backoff_max: Backoff máximo (también acota Retry-After).
+            robots_ttl: Segundos que se reutiliza un robots.txt descargado.
+            robots_error_ttl: Segundos hasta reintentar un robots.txt que
+                no se pudo descargar.
+        """
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.robots_ttl = robots_ttl
+        self.robots_error_ttl = robots_error_ttl
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._hosts: Dict[str, _HostState] = {}
+
+    def _state(self, url: str) -> _HostState:
+        key = host_key(url)
+        state = self._hosts.get(key)
+        if state is None:
+            state = self._hosts[key] = _HostState(self.max_concurrency)
+        return state
+
+    # ------------------------------------------------------------------
+    # Espaciado y concurrencia
+    # ------------------------------------------------------------------
+
+    def _reserve(self, url: str, state: _HostState) -> float:
+        """
+        Reserva la próxima salida del host. Devuelve los segundos a esperar.
+
+        Raises:
+            HostBackoffError: Si la espera supera lo que queda del deadline del run.
+        """
+        now = time.monotonic()
+        start = max(now, state.next_slot, state.blocked_until)
+        budget = remaining_timeout()
+        if budget is not None and start - now > budget:
+            raise HostBackoffError(host_key(url), start - now)
+        state.next_slot = start + max(self.min_interval, state.crawl_delay)
+        return start - now
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """
+        Turno para una petición a `url`: hueco de concurrencia + espaciado.
+
+        Raises:
+            HostBackoffError: Si la espera supera lo que queda del deadline del run.
+        """
+        state = self._state(url)
+        if state.semaphore is not None:
+            await state.semaphore.acquire()
+        try:
+            wait = self._reserve(url, state)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            state.requests += 1
+            yield
+        finally:
+            if state.semaphore is not None:
+                state.semaphore.release()
+
+    def record(self, url: str, status_code: int, retry_after: Optional[str] = None) -> None:
+        """
+        Ajusta el backoff del host con el status de una respuesta.
+
+        429/503 duplican el backoff (o aplican Retry-After si es mayor); las
+        respuestas correctas lo van reduciendo a la mitad.
+        """
+        state = self._state(url)
+        if status_code in BACKOFF_STATUS_CODES:
+            state.throttled += 1
+            SCRAPE_THROTTLED.inc(status=str(status_code))
+            state.backoff = min(self.backoff_max, max(self.backoff_base, state.backoff * 2))
+            delay = max(state.backoff, min(self.backoff_max, parse_retry_after(retry_after) or 0.0))
+            state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+            logger.warning(f"   {host_key(url)} devolvió {status_code}: backoff {delay:.1f}s")
+        elif status_code < 400 and state.backoff:
+            state.backoff /= 2
+            if state.backoff < self.backoff_base:
+                state.backoff = 0.0
+
+    # ------------------------------------------------------------------
+    # robots.txt
+    # ------------------------------------------------------------------
+
+    async def robots_allowed(self, url: str, fetch: RobotsFetcher) -> bool:
+        """
+        Si robots.txt del host permite `url` (descargándolo si no está cacheado).
+
+        Sin robots.txt se permite todo; con 401/403 no se permite nada. Si no
+        se pudo descargar se sigue con el anterior (o se permite todo) y se
+        reintenta pasados robots_error_ttl segundos.
+        """
+        state = self._state(url)
+        if state.robots is None or time.monotonic() >= state.robots_expires_at:
+            async with state.robots_lock:
+                # Otra petición pudo descargarlo mientras esperábamos el lock
+                if state.robots is None or time.monotonic() >= state.robots_expires_at:
+                    await self._load_robots(url, state, fetch)
+        return state.robots.can_fetch(_ROBOTS_USER_AGENT, url)
+
+    async def _load_robots(self, url: str, state: _HostState, fetch: RobotsFetcher) -> None:
+        robots_url = f"{host_key(url)}/robots.txt"
+        try:
+            content = await fetch(robots_url)
+        except Exception as e:
+            # Fallo transitorio: no se cachea como "sin robots.txt" todo el TTL
+            logger.debug(f"robots.txt de {robots_url} no disponible: {e}")
+            if state.robots is None:
+                state.robots = RobotFileParser(robots_url)
+                state.robots.parse([])
+            state.robots_expires_at = time.monotonic() + self.robots_error_ttl
+            return
+
+        parser = RobotFileParser(robots_url)
+        parser.parse((content or "").splitlines())
+        state.robots = parser
+        state.robots_expires_at = time.monotonic() + self.robots_ttl
+        state.crawl_delay = float(parser.crawl_delay(_ROBOTS_USER_AGENT) or 0.0)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Peticiones, 429/503 y backoff actual por host."""
+        now = time.monotonic()
+        return {
+            key: {
+                "requests": state.requests,
+                "throttled": state.throttled,
+                "backoff": state.backoff,
+                "blocked_for": round(max(0.0, state.blocked_until - now), 3),
+                "crawl_delay": state.crawl_delay,
+            }
+            for key, state in self._hosts.items()
+        }
+
+
+# Singleton global
+_host_scheduler: Optional[HostScheduler] = None
+
+
+def get_host_scheduler() -> HostScheduler:
+    """
+    Obtiene el planificador compartido (debe llamarse desde un event loop).
+
+    Returns:
+        Instancia configurada desde settings, ligada al loop actual.
+    """
+    global _host_scheduler
+    loop = asyncio.get_running_loop()
+    if _host_scheduler is None or _host_scheduler.loop is not loop:
+        _host_scheduler = HostScheduler(
+            max_concurrency=settings.scrape_per_host_concurrency,
+            min_interval=settings.scrape_host_min_interval,
+            backoff_base=settings.scrape_backoff_base,
+            backoff_max=settings.scrape_backoff_max,
+            robots_ttl=settings.scrape_robots_ttl,
+            robots_error_ttl=settings.scrape_robots_error_ttl,
+        )
+        _host_scheduler.loop = loop
+    return _host_scheduler
+
+
+def reset_host_scheduler() -> None:
+    """Resetea el singleton (tests)."""
+    global _host_scheduler
+    _host_scheduler = None
@@ -0,0 +1,334 @@
+"""
+Caché HTTP en disco para simple_scrape (peticiones condicionales).
+
+Los agentes vuelven a scrapear las mismas páginas de tarifas en cada run y
+provider. Esta caché guarda cada respuesta 200 con sus validadores y:
+
+- Si sigue fresca (`Cache-Control: max-age`), se sirve sin tocar la red.
+- Si caducó pero tiene ETag / Last-Modified, se revalida con
+  If-None-Match / If-Modified-Since y un 304 se sirve desde disco.
+- `no-store` y `Vary: *` no se guardan; `no-cache` siempre se revalida.
+
+El tamaño total de los cuerpos está acotado (LRU por último acceso). Las
+lecturas no escriben: el último acceso se apunta en memoria y se guarda con
+la siguiente escritura. Desde código async se usa en un thread
+(asyncio.to_thread), nunca en el event loop.
+
+Este módulo contiene:
+- CachedResponse: Respuesta guardada con sus validadores
+- HttpCache: Almacén SQLite acotado por tamaño
+- get_http_cache / reset_http_cache: Singleton configurado desde settings
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+from aifoundry.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_cache (
+    url TEXT PRIMARY KEY,
+    status_code INTEGER NOT NULL,
+    content BLOB NOT NULL,
+    encoding TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_http_cache_access ON http_cache (last_access);
+"""
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """'max-age=60, no-cache' → {"max-age": "60", "no-cache": None}."""
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip().strip('"') or None
+    return directives
+
+
+def freshness_lifetime(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Segundos que una respuesta puede servirse sin revalidar.
+
+    Returns:
+        None si la respuesta no debe guardarse (no-store, Vary: *);
+        0 si hay que revalidarla siempre.
+    """
+    if headers.get("vary", "").strip() == "*":
+        return None
+    directives = parse_cache_control(headers.get("cache-control"))
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    try:
+        return max(0.0, float(directives.get("max-age") or 0))
+    except ValueError:
+        return 0.0
+
+
+class CachedResponse:
+    """Respuesta guardada en la caché con sus validadores."""
+
+    __slots__ = (
+        "url", "status_code", "content", "encoding",
+        "etag", "last_modified", "stored_at", "expires_at",
+    )
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        content: bytes,
+        encoding: Optional[str],
+        etag: Optional[str],
+        last_modified: Optional[str],
+        stored_at: float,
+        expires_at: float,
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Cabeceras de la petición condicional (vacío si no hay validadores)."""
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+
+class HttpCache:
+    """
+    Caché HTTP en SQLite acotada por tamaño (LRU por último acceso).
+
+    Example:
+        cache = HttpCache("./data/http_cache.db", max_bytes=256 * 1024 * 1024)
+        entry = cache.get(url)
+        headers = entry.validators() if entry else {}
+        ...
+        cache.store(url, 200, response.headers, response.content, response.encoding)
+    """
+
+    def __init__(self, db_path: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            db_path: Fichero SQLite (":memory:" para tests).
+            max_bytes: Tamaño máximo de los cuerpos guardados.
+        """
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        # url → último acceso pendiente de guardar (se escribe con el próximo store)
+        self._accessed: Dict[str, float] = {}
+
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            if db_path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM http_cache"
+            ).fetchone()[0]
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Entrada guardada para `url` (fresca o no) o None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status_code, content, encoding, etag, last_modified, stored_at, expires_at "
+                "FROM http_cache WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._accessed[url] = time.time()
+        return CachedResponse(url, *row)
+
+    def record_hit(self) -> None:
+        """Cuenta una entrada fresca servida sin petición."""
+        with self._lock:
+            self.hits += 1
+
+    def store(
+        self,
+        url: str,
+        status_code: int,
+        headers: Mapping[str, str],
+        content: bytes,
+        encoding: Optional[str],
+    ) -> bool:
+        """
+        Guarda una respuesta si es cacheable.
+
+        Solo se guardan 200 con max-age o validadores (ETag/Last-Modified).
+
+        Returns:
+            True si se guardó.
+        """
+        lifetime = freshness_lifetime(headers)
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        size = len(content)
+        cacheable = (
+            status_code == 200
+            and lifetime is not None
+            and (lifetime > 0 or etag or last_modified)
+            and size <= self.max_bytes
+        )
+        if not cacheable:
+            # Una versión anterior guardada ya no es válida
+            self.invalidate(url)
+            return False
+
+        now = time.time()
+        with self._lock, self._conn:
+            previous = self._conn.execute(
+                "SELECT size FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache (url, status_code, content, encoding, etag, "
+                "last_modified, stored_at, expires_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, status_code, content, encoding, etag, last_modified,
+                 now, now + lifetime, now, size),
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            self._flush_accessed()
+            self._evict()
+        return True
+
+    def mark_revalidated(self, entry: CachedResponse, headers: Mapping[str, str]) -> CachedResponse:
+        """
+        Actualiza una entrada tras un 304 (nueva frescura y validadores).
+
+        Returns:
+            La entrada actualizada (el cuerpo sigue siendo el guardado).
+        """
+        lifetime = freshness_lifetime(headers)
+        now = time.time()
+        entry.expires_at = now + (lifetime or 0.0)
+        entry.etag = headers.get("etag") or entry.etag
+        entry.last_modified = headers.get("last-modified") or entry.last_modified
+        with self._lock, self._conn:
+            self.revalidated += 1
+            self._conn.execute(
+                "UPDATE http_cache SET expires_at = ?, etag = ?, last_modified = ?, last_access = ? "
+                "WHERE url = ?",
+                (entry.expires_at, entry.etag, entry.last_modified, now, entry.url),
+            )
+        return entry
+
+    def invalidate(self, url: str) -> None:
+        """Elimina la entrada de `url` (si existe)."""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT size FROM http_cache WHERE url = ?", (url,)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+                self._total_bytes -= row[0]
+
+    def _flush_accessed(self) -> None:
+        """Guarda los últimos accesos apuntados por get() (con el lock tomado)."""
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE http_cache SET last_access = ? WHERE url = ?",
+                [(accessed, url) for url, accessed in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def _evict(self) -> None:
+        """Borra las entradas menos usadas hasta caber en max_bytes (con el lock tomado)."""
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT url, size FROM http_cache ORDER BY last_access ASC LIMIT 32"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for url, size in rows:
+                self._conn.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def stats(self) -> Dict[str, int]:
+        """Entradas, bytes y contadores de uso."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM http_cache").fetchone()[0]
+            return {
+                "entries": entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            with self._conn:
+                self._flush_accessed()
+            self._conn.close()
+
+
+# Singleton global (se crea desde threads de asyncio.to_thread)
+_http_cache: Optional[HttpCache] = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """
+    Obtiene el singleton de la caché HTTP.
+
+    Returns:
+        Instancia configurada desde settings, o None si está desactivada
+        (SCRAPE_HTTP_CACHE_PATH vacío).
+    """
+    global _http_cache
+    if not settings.scrape_http_cache_path:
+        return None
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HttpCache(
+                settings.scrape_http_cache_path,
+                max_bytes=int(settings.scrape_http_cache_max_mb * 1024 * 1024),
+            )
+    return _http_cache
+
+
+def reset_http_cache() -> None:
+    """Cierra y resetea el singleton (shutdown / tests)."""
+    global _http_cache
+    if _http_cache is not None:
+        _http_cache.close()
+    _http_cache = None
@@ -0,0 +1,214 @@
+"""
+Cliente HTTP compartido para scraping.
+
+Un único httpx.AsyncClient por proceso (por event loop) con pool de
+conexiones, keep-alive y HTTP/2: varios scrapes del mismo sitio en un run
+reutilizan la conexión en vez de pagar DNS + TCP + TLS cada vez.
+
+httpx no limita conexiones por host, así que cada petición pasa por el
+HostScheduler compartido (host_scheduler.py): concurrencia y espaciado por
+host, backoff tras 429/503 y robots.txt.
+
+Este módulo contiene:
+- ScrapeHttpClient: AsyncClient + planificador de cortesía por host
+- get_scrape_http_client / close_scrape_http_client: Singleton del proceso
+
+Example:
+    ```python
+    client = get_scrape_http_client()
+    response = await client.get("https://example.com", headers=headers, timeout=10)
+    async with client.stream("https://example.com", timeout=10) as response:
+        ...  # headers disponibles antes de leer el cuerpo
+    ...
+    await close_scrape_http_client()  # en el shutdown del lifespan
+    ```
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+import httpx
+
+from aifoundry.app.config import settings
+from aifoundry.app.utils.host_scheduler import (
+    ROBOTS_DISALLOW_ALL,
+    HostScheduler,
+    RobotsDisallowedError,
+    get_host_scheduler,
+)
+
+logger = logging.getLogger(__name__)
+
+# Conexión TCP/TLS: nunca más que esto aunque el timeout total sea mayor
+_CONNECT_TIMEOUT = 10.0
+
+
+# robots.txt: descarga corta, nunca bloquea el scrape mucho tiempo
+_ROBOTS_TIMEOUT = 5.0
+
+
+class ScrapeHttpClient:
+    """
+    httpx.AsyncClient compartido con cortesía por host (HostScheduler).
+
+    Está ligado al event loop en el que se crea (las conexiones de httpcore
+    lo están): get_scrape_http_client() crea otro si cambia el loop.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 64,
+        max_keepalive_connections: int = 32,
+        keepalive_expiry: float = 30.0,
+        per_host_concurrency: int = 4,
+        http2: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        scheduler: Optional[HostScheduler] = None,
+        respect_robots: bool = False,
+    ):
+        """
+        Args:
+            max_connections: Conexiones abiertas en total.
+            max_keepalive_connections: Conexiones ociosas que se mantienen.
+            keepalive_expiry: Segundos que vive una conexión ociosa.
+            per_host_concurrency: Peticiones a la vez por host (0 = sin límite).
+            http2: Si negociar HTTP/2 (multiplexa peticiones al mismo host).
+            transport: Transport alternativo (tests: httpx.MockTransport).
+            scheduler: Planificador por host; por defecto uno propio con
+                `per_host_concurrency` y sin espaciado.
+            respect_robots: Si consultar robots.txt antes de cada petición.
+        """
+        self.scheduler = scheduler or HostScheduler(max_concurrency=per_host_concurrency)
+        self.respect_robots = respect_robots
+        self.loop = asyncio.get_running_loop()
+        # verify=False para evitar errores de SSL en entornos corporativos con proxies
+        self._client = httpx.AsyncClient(
+            follow_redirects=True,
+            verify=False,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            transport=transport,
+        )
+        self.requests = 0
+
+    async def _fetch_robots(self, robots_url: str) -> Optional[str]:
+        """
+        Contenido de robots.txt (None si no existe).
+
+        401/403 equivalen a prohibirlo todo (ROBOTS_DISALLOW_ALL). Un 5xx
+        lanza httpx.HTTPStatusError, igual que un timeout o un error de
+        conexión: el planificador lo trata como fallo transitorio.
+        """
+        async with self.scheduler.slot(robots_url):
+            response = await self._client.get(robots_url, timeout=_ROBOTS_TIMEOUT)
+        self.scheduler.record(robots_url, response.status_code, response.headers.get("retry-after"))
+        if response.status_code in (401, 403):
+            return ROBOTS_DISALLOW_ALL
+        if response.status_code >= 500:
+            response.raise_for_status()
+        return response.text if response.is_success else None
+
+    async def check_robots(self, url: str) -> None:
+        """
+        Comprueba robots.txt (si respect_robots).
+
+        Raises:
+            RobotsDisallowedError: Si robots.txt no permite la URL.
+        """
+        if self.respect_robots and not await self.scheduler.robots_allowed(url, self._fetch_robots):
+            raise RobotsDisallowedError(url)
+
+    async def get(
+        self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0
+    ) -> httpx.Response:
+        """
+        GET respetando la cortesía por host.
+
+        Raises:
+            httpx.TimeoutException / httpx.RequestError: Como httpx.
+            RobotsDisallowedError / HostBackoffError: Ver HostScheduler.
+        """
+        await self.check_robots(url)
+        request_timeout = httpx.Timeout(timeout, connect=min(_CONNECT_TIMEOUT, timeout))
+        async with self.scheduler.slot(url):
+            self.requests += 1
+            response = await self._client.get(url, headers=headers, timeout=request_timeout)
+        self.scheduler.record(url, response.status_code, response.headers.get("retry-after"))
+        return response
+
+    @asynccontextmanager
+    async def stream(
+        self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        GET en streaming respetando la cortesía por host.
+
+        La respuesta llega con status y headers; el cuerpo se lee con
+        `response.aiter_bytes()` dentro del bloque. El hueco del host se
+        mantiene hasta salir del bloque.
+
+        Raises:
+            httpx.TimeoutException / httpx.RequestError: Como httpx.
+            RobotsDisallowedError / HostBackoffError: Ver HostScheduler.
+        """
+        await self.check_robots(url)
+        request_timeout = httpx.Timeout(timeout, connect=min(_CONNECT_TIMEOUT, timeout))
+        async with self.scheduler.slot(url):
+            self.requests += 1
+            async with self._client.stream("GET", url, headers=headers, timeout=request_timeout) as response:
+                self.scheduler.record(url, response.status_code, response.headers.get("retry-after"))
+                yield response
+
+    @property
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Peticiones hechas y hosts distintos contactados."""
+        return {"requests": self.requests, "hosts": len(self.scheduler.stats())}
+
+
+# Singleton global
+_scrape_http_client: Optional[ScrapeHttpClient] = None
+
+
+def get_scrape_http_client() -> ScrapeHttpClient:
+    """
+    Obtiene el cliente compartido (debe llamarse desde un event loop).
+
+    Returns:
+        Instancia configurada desde settings, ligada al loop actual.
+    """
+    global _scrape_http_client
+    loop = asyncio.get_running_loop()
+    client = _scrape_http_client
+    # Las conexiones de otro loop (p.ej. TestClient sin lifespan) no sirven aquí
+    if client is None or client.is_closed or client.loop is not loop:
+        _scrape_http_client = ScrapeHttpClient(
+            max_connections=settings.scrape_max_connections,
+            max_keepalive_connections=settings.scrape_max_keepalive_connections,
+            keepalive_expiry=settings.scrape_keepalive_expiry,
+            per_host_concurrency=settings.scrape_per_host_concurrency,
+            http2=settings.scrape_http2,
+            scheduler=get_host_scheduler(),
+            respect_robots=settings.scrape_respect_robots,
+        )
+    return _scrape_http_client
+
+
+async def close_scrape_http_client() -> None:
+    """Cierra el cliente compartido (shutdown del lifespan)."""
+    global _scrape_http_client
+    client, _scrape_http_client = _scrape_http_client, None
+    if client is None or client.is_closed:
+        return
+    if client.loop is asyncio.get_running_loop():
+        await client.aclose()
@@ -0,0 +1,245 @@
+"""
+Conversión HTML → Markdown en un solo recorrido del árbol lxml.
+
+markdownify serializa el HTML limpio, lo vuelve a parsear con BeautifulSoup,
+construye el markdown con concatenaciones anidadas y después simple_scrape
+partía y reunía todas las líneas para quitar las vacías. Aquí se recorre
+directamente el árbol ya parseado (el de content_extractor o readability) y
+se emiten las líneas ya compactas (sin líneas en blanco).
+
+Solo cubre lo que usan los agentes:
+- Cabeceras (# ...), párrafos y saltos de línea
+- Listas (- / 1.) anidadas, citas (>) y bloques de código
+- Enlaces [texto](href)
+- Tablas en formato pipe (| a | b |), con la primera fila como cabecera
+
+Imágenes, estilos y formato de texto (negrita, cursiva) se descartan.
+
+Este módulo contiene:
+- html_to_markdown: Markdown compacto de un elemento lxml
+"""
+
+import re
+from typing import List, Optional
+
+from lxml.html import HtmlElement
+
+_WS_RE = re.compile(r"\s+")
+
+# No aportan texto (su tail sí)
+_SKIP_TAGS = frozenset({
+    "script", "style", "noscript", "template", "head", "title", "meta", "link",
+    "img", "svg", "iframe", "button", "select", "input", "textarea", "object", "embed",
+})
+
+# Cortan la línea antes y después
+_BLOCK_TAGS = frozenset({
+    "html", "body", "p", "div", "section", "article", "main", "header", "footer",
+    "aside", "nav", "form", "fieldset", "figure", "figcaption", "address", "details",
+    "summary", "dl", "dt", "dd", "center", "hgroup", "caption", "tbody", "thead",
+    "tfoot", "tr", "td", "th",
+})
+
+_HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+
+def _collapse(text: str) -> str:
+    return _WS_RE.sub(" ", text).strip()
+
+
+def _link_target(element: HtmlElement) -> Optional[str]:
+    href = (element.get("href") or "").strip()
+    if not href or href.startswith(("#", "javascript:")):
+        return None
+    return href.replace(" ", "%20").replace(")", "%29")
+
+
+class _MarkdownWriter:
+    """Estado del recorrido: líneas emitidas y línea en construcción."""
+
+    __slots__ = ("lines", "inline", "lists", "quote", "marker")
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.inline: List[str] = []
+        # Pila de listas abiertas: [ordenada, siguiente número]
+        self.lists: List[List] = []
+        self.quote = 0
+        # Viñeta pendiente del <li> actual (se emite con su primera línea)
+        self.marker: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Emisión
+    # ------------------------------------------------------------------
+
+    def _prefix(self) -> str:
+        prefix = "> " * self.quote
+        if self.lists:
+            prefix += "  " * (len(self.lists) - 1)
+            if self.marker is not None:
+                prefix += self.marker
+                self.marker = None
+            else:
+                prefix += "  "
+        return prefix
+
+    def emit(self, text: str) -> None:
+        """Añade una línea ya formateada con la sangría de lista/cita."""
+        self.lines.append(self._prefix() + text)
+
+    def flush(self) -> None:
+        """Cierra la línea en construcción (si tiene texto)."""
+        if not self.inline:
+            return
+        text = _collapse("".join(self.inline))
+        self.inline = []
+        if text:
+            self.emit(text)
+
+    # ------------------------------------------------------------------
+    # Recorrido
+    # ------------------------------------------------------------------
+
+    def walk(self, element: HtmlElement) -> None:
+        tag = element.tag
+        if not isinstance(tag, str) or tag in _SKIP_TAGS:
+            # Comentarios, instrucciones de proceso y tags sin texto
+            pass
+        elif tag in _HEADINGS:
+            self.flush()
+            text = inline_markdown(element)
+            if text:
+                self.emit("#" * _HEADINGS[tag] + " " + text)
+        elif tag == "a":
+            text = inline_markdown(element, links=False)
+            target = _link_target(element)
+            if text:
+                self.inline.append(f"[{text}]({target})" if target else text)
+        elif tag in ("ul", "ol"):
+            self.flush()
+            self.lists.append([tag == "ol", 1])
+            self._children(element)
+            self.flush()
+            self.lists.pop()
+        elif tag == "li":
+            self.flush()
+            if self.lists:
+                ordered, number = self.lists[-1]
+                self.marker = f"{number}. " if ordered else "- "
+                self.lists[-1][1] = number + 1
+            self._children(element)
+            self.flush()
+            self.marker = None
+        elif tag == "table":
+            self.flush()
+            self._table(element)
+        elif tag == "pre":
+            self.flush()
+            code = [line.rstrip() for line in element.text_content().split("\n")]
+            code = [line for line in code if line.strip()]
+            if code:
+                self.emit("```")
+                for line in code:
+                    self.emit(line)
+                self.emit("```")
+        elif tag == "code":
+            text = _collapse(element.text_content())
+            if text:
+                self.inline.append(f"`{text}`")
+        elif tag == "blockquote":
+            self.flush()
+            self.quote += 1
+            self._children(element)
+            self.flush()
+            self.quote -= 1
+        elif tag in ("br", "hr"):
+            self.flush()
+        elif tag in _BLOCK_TAGS:
+            self.flush()
+            self._children(element)
+            self.flush()
+        else:
+            self._children(element)
+
+        if element.tail:
+            self.inline.append(element.tail)
+
+    def _children(self, element: HtmlElement) -> None:
+        if element.text:
+            self.inline.append(element.text)
+        for child in element:
+            self.walk(child)
+
+    def _table(self, table: HtmlElement) -> None:
+        rows: List[List[str]] = []
+        for row in table.iter("tr"):
+            # Las filas de tablas anidadas se quedan en su celda
+            if next(row.iterancestors("table"), None) is not table:
+                continue
+            cells = [
+                inline_markdown(cell).replace("|", "\\|")
+                for cell in row
+                if cell.tag in ("td", "th")
+            ]
+            if any(cells):
+                rows.append(cells)
+
+        width = max((len(cells) for cells in rows), default=0)
+        if width < 2:
+            # Tabla de maquetación (una columna): su contenido como bloques
+            self._children(table)
+            self.flush()
+            return
+
+        for i, cells in enumerate(rows):
+            cells = cells + [""] * (width - len(cells))
+            self.emit("| " + " | ".join(cells) + " |")
+            if i == 0:
+                self.emit("|" + " --- |" * width)
+
+
+def inline_markdown(element: HtmlElement, links: bool = True) -> str:
+    """Texto de un elemento en una línea (con enlaces [texto](href) si `links`)."""
+    parts: List[str] = []
+
+    def collect(node: HtmlElement) -> None:
+        tag = node.tag
+        if isinstance(tag, str) and tag not in _SKIP_TAGS:
+            target = _link_target(node) if links and tag == "a" else None
+            if target is not None:
+                text = inline_markdown(node, links=False)
+                if text:
+                    parts.append(f"[{text}]({target})")
+            else:
+                if tag in _BLOCK_TAGS or tag == "br":
+                    parts.append(" ")
+                if node.text:
+                    parts.append(node.text)
+                for child in node:
+                    collect(child)
+        if node.tail and node is not element:
+            parts.append(node.tail)
+
+    collect(element)
+    return _collapse("".join(parts))
+
+
+def html_to_markdown(element: HtmlElement) -> str:
+    """
+    Markdown compacto (sin líneas en blanco) de un elemento lxml.
+
+    Args:
+        element: Raíz del contenido (p. ej. el <div> de extract_main_content)
+
+    Returns:
+        Markdown con una línea por bloque
+    """
+    writer = _MarkdownWriter()
+    # El tail de la raíz no es parte del contenido
+    tail, element.tail = element.tail, None
+    try:
+        writer.walk(element)
+        writer.flush()
+    finally:
+        element.tail = tail
+    return "\n".join(writer.lines)
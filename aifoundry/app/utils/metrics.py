@@ -0,0 +1,352 @@
+"""
+Métricas en proceso con exposición en formato texto de Prometheus.
+
+Sin servicios externos ni dependencias: contadores, gauges e histogramas
+con labels, thread-safe (el scraper síncrono corre en threads) y
+renderizados por GET /metrics.
+
+Este módulo contiene:
+- Counter / Gauge / Histogram: Tipos de métrica
+- MetricsRegistry: Registro y render en formato Prometheus
+- Métricas de AIFoundry (runs, LLM, tools, scraping, errores)
+
+Example:
+    ```python
+    from aifoundry.app.utils.metrics import TOOL_LATENCY
+
+    TOOL_LATENCY.observe(0.42, tool="brave_web_search")
+    print(get_metrics_registry().render())
+    ```
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Buckets por defecto (segundos)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape_label(str(v))}"' for n, v in zip(names, values, strict=True))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    """Base de las métricas: nombre, ayuda, labels y lock."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name}: labels esperados {self.labelnames}, recibidos {tuple(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+    def samples(self) -> Iterable[Tuple[str, Sequence[str], Sequence[str], float]]:
+        """(sufijo, nombres de labels, valores, valor) de cada serie."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, names, values, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Contador monótono."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError(f"{self.name}: un contador no puede decrementarse")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", self.labelnames, key, value
+
+
+class Gauge(_Metric):
+    """Valor instantáneo (puede subir o bajar)."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", self.labelnames, key, value
+
+
+class Histogram(_Metric):
+    """Histograma acumulativo (buckets `le`, `_sum` y `_count`)."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key → [conteo por bucket (no acumulado)..., sum, count]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+        return int(series[-1]) if series else 0
+
+    def sum(self, **labels: str) -> float:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+        return series[-2] if series else 0.0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def samples(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        bucket_names = self.labelnames + ("le",)
+        for key, series in items:
+            cumulative = 0.0
+            for i, bound in enumerate(self.buckets):
+                cumulative += series[i]
+                yield "_bucket", bucket_names, key + (_format_value(bound),), cumulative
+            yield "_sum", self.labelnames, key, series[-2]
+            yield "_count", self.labelnames, key, series[-1]
+
+
+class MetricsRegistry:
+    """Conjunto de métricas que se exponen juntas."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica duplicada: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Todas las métricas en formato texto de Prometheus (0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Pone a cero todas las series (útil para tests)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+# Registro global
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Registro global de métricas de AIFoundry."""
+    return _registry
+
+
+# =============================================================================
+# MÉTRICAS DE AIFOUNDRY
+# =============================================================================
+
+RUN_DURATION = _registry.histogram(
+    "aifoundry_agent_run_duration_seconds",
+    "Duración de ScraperAgent.run() (todos los intentos)",
+    ["agent", "status"],
+    buckets=(1, 5, 10, 20, 30, 60, 90, 120, 180, 300, 600),
+)
+RUN_RETRIES = _registry.counter(
+    "aifoundry_agent_retries_total",
+    "Reintentos de run por error de red recuperable",
+    ["agent", "error_class"],
+)
+RUN_ERRORS = _registry.counter(
+    "aifoundry_agent_errors_total",
+    "Intentos de run fallidos por clase de error",
+    ["agent", "error_class"],
+)
+LLM_CALLS = _registry.counter(
+    "aifoundry_llm_calls_total",
+    "Llamadas al LLM",
+    ["agent", "model", "status"],
+)
+LLM_LATENCY = _registry.histogram(
+    "aifoundry_llm_latency_seconds",
+    "Latencia de cada llamada al LLM",
+    ["agent", "model"],
+    buckets=(0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30, 60),
+)
+LLM_TOKENS = _registry.counter(
+    "aifoundry_llm_tokens_total",
+    "Tokens consumidos por tipo (prompt/completion)",
+    ["agent", "model", "type"],
+)
+TOOL_CALLS = _registry.counter(
+    "aifoundry_tool_calls_total",
+    "Llamadas a tools (brave_web_search, simple_scrape_url, browser_*)",
+    ["tool", "status"],
+)
+TOOL_LATENCY = _registry.histogram(
+    "aifoundry_tool_latency_seconds",
+    "Latencia de cada llamada a tool",
+    ["tool"],
+)
+SCRAPE_BYTES = _registry.counter(
+    "aifoundry_scrape_bytes_total",
+    "Bytes descargados por simple_scrape",
+    ["status"],
+)
+SCRAPE_HTTP_CACHE = _registry.counter(
+    "aifoundry_scrape_http_cache_total",
+    "Consultas a la caché HTTP de simple_scrape (hit/revalidated/stale/miss)",
+    ["result"],
+)
+SCRAPE_RESULT_CACHE = _registry.counter(
+    "aifoundry_scrape_result_cache_total",
+    "Consultas a la caché de resultados procesados de simple_scrape (hit/miss)",
+    ["result"],
+)
+SCRAPE_THROTTLED = _registry.counter(
+    "aifoundry_scrape_throttled_total",
+    "Respuestas 429/503 que activan el backoff por host",
+    ["status"],
+)
+SCRAPE_PREFETCH = _registry.counter(
+    "aifoundry_scrape_prefetch_total",
+    "Precargas de resultados de búsqueda (started/hit/expired/unused)",
+    ["result"],
+)
+SCRAPE_PAGES = _registry.histogram(
+    "aifoundry_scrape_page_bytes",
+    "Tamaño de cada página descargada por simple_scrape",
+    [],
+    buckets=(10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000),
+)
+
+# Gauges de estado (se actualizan al servir /metrics)
+ADMISSION_RUNNING = _registry.gauge(
+    "aifoundry_admission_running",
+    "Runs síncronos en ejecución (control de admisión)",
+)
+ADMISSION_QUEUED = _registry.gauge(
+    "aifoundry_admission_queued",
+    "Runs síncronos esperando hueco (control de admisión)",
+)
+RESULT_CACHE = _registry.gauge(
+    "aifoundry_result_cache",
+    "Estado de la caché de resultados (entries/hits/misses)",
+    ["stat"],
+)
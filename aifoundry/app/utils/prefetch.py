@@ -0,0 +1,225 @@
+"""
+Precarga especulativa de los primeros resultados de búsqueda.
+
+Tras brave_web_search el LLM gasta un turno entero eligiendo las 5-8 URLs
+antes del primer simple_scrape_url(s). Mientras tanto, la red está parada.
+Con la precarga, al terminar la búsqueda se empiezan a descargar y procesar
+las primeras K URLs del resultado en una caché de vida corta del run. Cuando
+el LLM pide una de ellas, la tool la sirve ya caliente (o espera a la
+descarga en curso en vez de empezar otra).
+
+La caché se fija una vez por run con prefetch_scope() y la heredan el
+callback de la búsqueda y las tools por contextvars, igual que el deadline.
+
+Este módulo contiene:
+- PrefetchCache: Descargas en curso/terminadas de un run, con TTL
+- prefetch_scope / current_prefetch: Caché del run en curso
+
+Example:
+    ```python
+    with prefetch_scope(PrefetchCache(top_k=4, ttl=90)) as prefetch:
+        prefetch.prefetch(urls_de_brave)     # on_tool_end de la búsqueda
+        result = await prefetch.get(url, 30)  # simple_scrape_url → dict o None
+    ```
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urldefrag
+
+from aifoundry.app.utils.deadline import remaining_timeout
+from aifoundry.app.utils.domain_profile import ROUTE_SIMPLE, get_domain_profiles
+from aifoundry.app.utils.metrics import SCRAPE_PREFETCH
+from aifoundry.app.utils.simple_scraper import simple_scrape_async
+
+logger = logging.getLogger(__name__)
+
+# (url, timeout) → dict de resultado de simple_scrape_async
+FetchFn = Callable[[str, float], Awaitable[Dict[str, Any]]]
+
+# Timeout de cada precarga (se recorta al deadline del run)
+_PREFETCH_TIMEOUT = 30.0
+
+
+def _default_fetch(url: str, timeout: float) -> Awaitable[Dict[str, Any]]:
+    return simple_scrape_async(url, ["markdown"], timeout=timeout)
+
+
+def _key(url: str) -> str:
+    """URL sin fragmento ni espacios (el LLM a veces añade o quita el #...)."""
+    return urldefrag(url.strip())[0]
+
+
+class PrefetchCache:
+    """
+    Descargas especulativas de un run (url → task de simple_scrape_async).
+
+    Ligada al event loop y al contexto (deadline, foco) del run en que se
+    crea: prefetch() puede llamarse desde cualquier thread.
+    """
+
+    def __init__(self, top_k: int = 4, ttl: float = 90.0, fetch: Optional[FetchFn] = None):
+        """
+        Args:
+            top_k: URLs que se precargan por búsqueda.
+            ttl: Segundos que vale una precarga desde que empezó.
+            fetch: Descarga (por defecto simple_scrape_async con markdown).
+        """
+        self.top_k = top_k
+        self.ttl = ttl
+        self._fetch = fetch or _default_fetch
+        self._loop = asyncio.get_running_loop()
+        self._context = contextvars.copy_context()
+        # key → (inicio monotonic, task)
+        self._entries: Dict[str, Tuple[float, asyncio.Task]] = {}
+        self._served: Set[str] = set()
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Precarga
+    # ------------------------------------------------------------------
+
+    def prefetch(self, urls: Iterable[str]) -> None:
+        """
+        Empieza a descargar las primeras `top_k` URLs http(s) nuevas.
+
+        Se saltan las de dominios que simple_scrape no puede descargar
+        (necesitan navegador o están muertos, domain_profile.py).
+        """
+        profiles = get_domain_profiles()
+        selected: List[str] = []
+        for url in urls:
+            if len(selected) >= self.top_k:
+                break
+            url = url.strip()
+            if (
+                url.startswith(("http://", "https://"))
+                and _key(url) not in self._entries
+                and url not in selected
+                and profiles.route(url) == ROUTE_SIMPLE
+            ):
+                selected.append(url)
+        if not selected:
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._start(selected)
+        else:
+            # Callback síncrono en un thread del executor de LangChain
+            self._loop.call_soon_threadsafe(self._start, selected)
+
+    def _start(self, urls: List[str]) -> None:
+        if self._closed:
+            return
+        timeout = self._context.run(remaining_timeout, _PREFETCH_TIMEOUT)
+        if timeout <= 0:
+            return
+        now = time.monotonic()
+        for url in urls:
+            key = _key(url)
+            if key in self._entries:
+                continue
+            # Con el contexto del run: deadline y foco, no los del callback
+            task = self._loop.create_task(self._fetch(url, timeout), context=self._context)
+            task.add_done_callback(_consume_exception)
+            self._entries[key] = (now, task)
+            SCRAPE_PREFETCH.inc(result="started")
+        logger.info(f"   ⚡ Precargando {len(urls)} URLs de la búsqueda")
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    async def get(self, url: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Resultado precargado de `url` (esperando a la descarga en curso).
+
+        Returns:
+            El dict de simple_scrape_async si la precarga terminó bien dentro
+            de `timeout`; None si no se precargó, caducó o falló (la tool
+            descarga entonces como siempre).
+        """
+        key = _key(url)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        started, task = entry
+        if time.monotonic() - started > self.ttl:
+            self._drop(key)
+            SCRAPE_PREFETCH.inc(result="expired")
+            return None
+
+        if not task.done():
+            # wait() no cancela la task: si se agota, la precarga sigue en curso
+            await asyncio.wait({task}, timeout=timeout)
+        if not task.done() or task.cancelled() or task.exception() is not None:
+            return None
+
+        result = task.result()
+        if not result.get("success"):
+            # Un fallo (timeout, 5xx) se reintenta con la descarga normal
+            self._drop(key)
+            return None
+        self._served.add(key)
+        SCRAPE_PREFETCH.inc(result="hit")
+        return result
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None and not entry[1].done():
+            entry[1].cancel()
+
+    def stats(self) -> Dict[str, int]:
+        """Precargas lanzadas, en curso y servidas."""
+        return {
+            "started": len(self._entries),
+            "pending": sum(1 for _, task in self._entries.values() if not task.done()),
+            "served": len(self._served),
+        }
+
+    def close(self) -> None:
+        """Cancela las precargas en curso y cuenta las que nadie usó."""
+        self._closed = True
+        unused = len(set(self._entries) - self._served)
+        if unused:
+            SCRAPE_PREFETCH.inc(unused, result="unused")
+        for _, task in self._entries.values():
+            if not task.done():
+                task.cancel()
+        self._entries.clear()
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    # Evita "Task exception was never retrieved" si nadie pide la URL
+    if not task.cancelled():
+        task.exception()
+
+
+_current_prefetch: contextvars.ContextVar[Optional[PrefetchCache]] = contextvars.ContextVar(
+    "aifoundry_prefetch", default=None
+)
+
+
+def current_prefetch() -> Optional[PrefetchCache]:
+    """Caché de precarga del run en curso (None fuera de un run o desactivada)."""
+    return _current_prefetch.get()
+
+
+@contextmanager
+def prefetch_scope(cache: Optional[PrefetchCache]) -> Iterator[Optional[PrefetchCache]]:
+    """Fija `cache` como caché de precarga actual; al salir cancela lo pendiente."""
+    token = _current_prefetch.set(cache)
+    try:
+        yield cache
+    finally:
+        _current_prefetch.reset(token)
+        if cache is not None:
+            cache.close()
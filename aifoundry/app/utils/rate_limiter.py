@@ -3,134 +3,270 @@ Brave Rate Limiter - Rate limiting para Brave Search API.
 
 Basado en HEFESTO - Funciones para integración con Brave Search.
 
+Token bucket sobre reloj monotónico: se recargan `requests_per_second`
+tokens por segundo hasta `burst`, y cada petición gasta uno. Con el plan
+gratuito (1 rps, burst 1, 1 a la vez) se comporta como antes; en planes de
+pago (20-50 rps) basta con subir BRAVE_REQUESTS_PER_SECOND, BRAVE_BURST y
+BRAVE_MAX_CONCURRENCY.
+
+Un 429 bloquea el bucket el tiempo de Retry-After (o backoff exponencial si
+no viene) para todas las peticiones, no solo para la que lo recibió.
+
 Este módulo contiene:
-- BraveRateLimiter: Rate limiter con retry y backoff
-- get_brave_rate_limiter(): Singleton global
+- BraveRateLimiter: Token bucket con concurrencia acotada, retry y estadísticas de espera
+- get_brave_rate_limiter(): Singleton global configurado desde settings
 """
 
 import logging
 import asyncio
-from typing import Callable, Any, Optional
-from datetime import datetime, timedelta
+import time
+from typing import Callable, Any, Dict, Optional
+
+from aifoundry.app.config import settings
+from aifoundry.app.utils.host_scheduler import parse_retry_after
 
 logger = logging.getLogger(__name__)
 
 
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Si el error es un 429 / rate limit de Brave."""
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status == 429:
+        return True
+    error_str = str(error).lower()
+    return "429" in error_str or "too many" in error_str or "rate limit" in error_str
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Segundos de Retry-After del error (atributo retry_after o cabecera de error.response)."""
+    value = getattr(error, "retry_after", None)
+    if isinstance(value, (int, float)):
+        return max(0.0, float(value))
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers is None:
+        return None
+    try:
+        return parse_retry_after(headers.get("retry-after"))
+    except AttributeError:
+        return None
+
+
 class BraveRateLimiter:
     """
     Rate limiter para Brave Search API.
-    
-    - Semáforo: Solo 1 petición a Brave a la vez
-    - Límite: 1 request/segundo por defecto (Brave free tier)
-    - Retry con backoff exponencial en caso de 429
-    
+
+    - Token bucket: `requests_per_second` sostenidas, ráfagas de hasta `burst`
+    - Semáforo: como mucho `max_concurrency` peticiones a Brave a la vez
+    - Retry en caso de 429 respetando Retry-After (backoff exponencial si no viene)
+    - Estadísticas de espera en stats()
+
+    Está ligado al event loop en el que se usa (semáforo de asyncio): si
+    cambia el loop se crea otro semáforo.
+
     Example:
         ```python
         limiter = get_brave_rate_limiter()
-        
+
         async def search():
             return await brave_api.search("query")
-        
+
         result = await limiter.execute_with_retry(search)
         ```
     """
-    
-    def __init__(self, requests_per_second: float = 1.0, max_retries: int = 3):
+
+    def __init__(
+        self,
+        requests_per_second: float = 1.0,
+        max_retries: int = 3,
+        burst: int = 1,
+        max_concurrency: int = 1,
+        retry_after_max: float = 60.0,
+    ):
         """
         Inicializa el rate limiter.
-        
+
         Args:
-            requests_per_second: Peticiones por segundo permitidas
-            max_retries: Número máximo de reintentos en caso de 429
+            requests_per_second: Peticiones por segundo sostenidas (0 = sin límite)
+            max_retries: Número máximo de intentos en caso de 429
+            burst: Peticiones seguidas sin esperar (tamaño del bucket)
+            max_concurrency: Peticiones a la vez (0 = sin límite)
+            retry_after_max: Espera máxima tras un 429 (acota Retry-After)
         """
-        self.min_interval = timedelta(seconds=1.0 / requests_per_second)
+        self.requests_per_second = requests_per_second
         self.max_retries = max_retries
-        self.last_request = datetime.min
-        self._lock = asyncio.Lock()
-        # Semáforo: garantiza que SOLO 1 petición a Brave se ejecute a la vez
-        self._semaphore = asyncio.Semaphore(1)
-    
+        self.burst = max(1, burst)
+        self.max_concurrency = max_concurrency
+        self.retry_after_max = retry_after_max
+        # Bucket: tokens disponibles en el instante _updated (monotonic). Con
+        # esperas pendientes los tokens son negativos (turnos ya reservados)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Estadísticas
+        self.requests = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.throttled = 0
+
+    # ------------------------------------------------------------------
+    # Token bucket
+    # ------------------------------------------------------------------
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.requests_per_second)
+            self._updated = now
+
+    def _reserve(self) -> float:
+        """Reserva el próximo turno. Devuelve los segundos a esperar."""
+        now = time.monotonic()
+        start = max(now, self._blocked_until)
+        if self.requests_per_second > 0:
+            self._refill(now)
+            self._tokens -= 1
+            if self._tokens < 0:
+                start = max(start, self._updated - self._tokens / self.requests_per_second)
+        return start - now
+
+    def penalize(self, seconds: float) -> None:
+        """
+        Bloquea el bucket `seconds` (429): nadie sale antes y después se
+        vuelve al ritmo sostenido, sin ráfaga.
+        """
+        now = time.monotonic()
+        until = now + max(0.0, seconds)
+        self._blocked_until = max(self._blocked_until, until)
+        self._refill(now)
+        # Un token al acabar el bloqueo (la siguiente sale justo entonces)
+        self._tokens = min(self._tokens, 1.0)
+        self._updated = max(self._updated, self._blocked_until)
+
     async def wait_if_needed(self):
         """
-        Espera si es necesario para respetar el rate limit.
-        
+        Espera el turno del token bucket (y el bloqueo de un 429, si lo hay).
+
         NOTA: Este método debe llamarse DENTRO del contexto del semáforo
-        para garantizar que solo una petición esté en curso.
+        para respetar max_concurrency.
         """
-        async with self._lock:
-            now = datetime.now()
-            elapsed = now - self.last_request
-            if elapsed < self.min_interval:
-                wait_time = (self.min_interval - elapsed).total_seconds()
-                logger.debug(f"Brave rate limit: waiting {wait_time:.2f}s")
-                await asyncio.sleep(wait_time)
-            self.last_request = datetime.now()
-    
+        wait = self._reserve()
+        total = max(0.0, wait)
+        if wait > 0:
+            logger.debug(f"Brave rate limit: waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+        # Un 429 mientras esperábamos retrasa también los turnos ya reservados
+        while (blocked := self._blocked_until - time.monotonic()) > 0:
+            total += blocked
+            await asyncio.sleep(blocked)
+
+        self.requests += 1
+        if total > 0:
+            self.waited += 1
+            self.total_wait += total
+            self.max_wait = max(self.max_wait, total)
+
+    # ------------------------------------------------------------------
+    # Concurrencia
+    # ------------------------------------------------------------------
+
+    def _get_semaphore(self) -> Optional[asyncio.Semaphore]:
+        if self.max_concurrency <= 0:
+            return None
+        # Los semáforos de asyncio son del loop en el que se usan
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
     async def acquire(self):
-        """Adquiere el semáforo (bloquea si hay otra petición en curso)."""
-        await self._semaphore.acquire()
+        """Adquiere el semáforo (bloquea si hay max_concurrency peticiones en curso)."""
+        semaphore = self._get_semaphore()
+        if semaphore is not None:
+            await semaphore.acquire()
         logger.debug("Brave semaphore: acquired")
-    
+
     def release(self):
         """Libera el semáforo."""
-        self._semaphore.release()
+        if self._semaphore is not None and self.max_concurrency > 0:
+            self._semaphore.release()
         logger.debug("Brave semaphore: released")
-    
+
     async def __aenter__(self):
         """Context manager: adquiere semáforo y espera rate limit."""
         await self.acquire()
-        await self.wait_if_needed()
+        try:
+            await self.wait_if_needed()
+        except BaseException:
+            self.release()
+            raise
         return self
-    
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Context manager: libera semáforo."""
         self.release()
         return False
-    
+
     async def execute_with_retry(self, func: Callable, *args, **kwargs) -> Any:
         """
-        Ejecuta una función con retry y backoff exponencial.
-        
-        Usa el semáforo para garantizar que solo una petición a Brave
-        esté en curso a la vez.
-        
+        Ejecuta una función con rate limit y retry en caso de 429.
+
+        Tras un 429 el bucket se bloquea lo que indique Retry-After (acotado
+        a retry_after_max) o, si no viene, 2s, 4s, 8s...; el siguiente
+        intento espera su turno como cualquier otra petición.
+
         Args:
             func: Función async a ejecutar
             *args, **kwargs: Argumentos para la función
-            
+
         Returns:
             Resultado de la función
-            
+
         Raises:
             Exception: Si se agotan los reintentos
         """
         last_error = None
-        wait_time = 2  # Default
-        
+
         for attempt in range(self.max_retries):
-            # Adquirir semáforo: solo 1 petición a la vez
             async with self:  # usa __aenter__ y __aexit__
                 try:
                     return await func(*args, **kwargs)
                 except Exception as e:
-                    error_str = str(e).lower()
-                    
-                    # Si es rate limit (429), hacer backoff
-                    if "429" in error_str or "too many" in error_str or "rate limit" in error_str:
-                        wait_time = (2 ** attempt) * 2  # 2s, 4s, 8s
-                        logger.warning(f"Brave 429 - retry {attempt + 1}/{self.max_retries} en {wait_time}s")
-                        last_error = e
-                    else:
+                    if not _is_rate_limit_error(e):
                         # Otro error, no reintentar
                         raise
-            
-            # Esperar backoff FUERA del semáforo para no bloquear
-            if last_error:
-                await asyncio.sleep(wait_time)
-        
+                    last_error = e
+
+            if attempt == self.max_retries - 1:
+                # Último intento: no hay reintento que esperar ni que bloquear
+                break
+            retry_after = _retry_after(last_error)
+            wait_time = retry_after if retry_after is not None else (2 ** attempt) * 2
+            wait_time = min(self.retry_after_max, wait_time)
+            self.throttled += 1
+            logger.warning(f"Brave 429 - retry {attempt + 1}/{self.max_retries} en {wait_time:g}s")
+            # Fuera del semáforo: el bloqueo aplica a todas las peticiones
+            self.penalize(wait_time)
+
         # Si llegamos aquí, se agotaron los reintentos
         raise last_error or Exception("Max retries exceeded")
 
+    def stats(self) -> Dict[str, float]:
+        """Configuración, peticiones y tiempos de espera (segundos)."""
+        return {
+            "requests_per_second": self.requests_per_second,
+            "burst": self.burst,
+            "max_concurrency": self.max_concurrency,
+            "requests": self.requests,
+            "waited": self.waited,
+            "total_wait": self.total_wait,
+            "avg_wait": self.total_wait / self.requests if self.requests else 0.0,
+            "max_wait": self.max_wait,
+            "throttled": self.throttled,
+        }
+
 
 # Singleton global del rate limiter
 _brave_rate_limiter: Optional[BraveRateLimiter] = None
@@ -139,13 +275,19 @@ _brave_rate_limiter: Optional[BraveRateLimiter] = None
 def get_brave_rate_limiter() -> BraveRateLimiter:
     """
     Obtiene el singleton del rate limiter de Brave.
-    
+
     Returns:
-        Instancia global del BraveRateLimiter
+        Instancia global del BraveRateLimiter configurada desde settings
     """
     global _brave_rate_limiter
     if _brave_rate_limiter is None:
-        _brave_rate_limiter = BraveRateLimiter(requests_per_second=1.0, max_retries=3)
+        _brave_rate_limiter = BraveRateLimiter(
+            requests_per_second=settings.brave_requests_per_second,
+            max_retries=settings.brave_max_retries,
+            burst=settings.brave_burst,
+            max_concurrency=settings.brave_max_concurrency,
+            retry_after_max=settings.brave_retry_after_max,
+        )
     return _brave_rate_limiter
 
 
@@ -0,0 +1,162 @@
+"""
+Caché de resultados procesados de simple_scrape (direccionada por contenido).
+
+La caché HTTP (http_cache.py) evita la descarga, pero el coste de CPU está en
+el procesado: parseo, readability, markdownify y limpieza de espacios. Esta
+caché guarda el `data` final ({"markdown", "metadata", "links", ...})
+indexado por el hash del cuerpo descargado más las opciones de extracción:
+si los bytes de la página no han cambiado, se devuelve el markdown guardado
+sin volver a procesar.
+
+La URL y el status forman parte de la clave porque los links se resuelven
+contra la URL y la metadata incluye sourceURL / statusCode.
+
+Las entradas se guardan comprimidas (zlib) en un LRU en memoria acotado por
+bytes comprimidos.
+
+Este módulo contiene:
+- make_result_key: Clave (sha256 del cuerpo + opciones)
+- ScrapeResultCache: LRU comprimido acotado por tamaño
+- get_scrape_result_cache / reset_scrape_result_cache: Singleton desde settings
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from aifoundry.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def make_result_key(
+    html_content: str,
+    url: str,
+    status_code: int,
+    formats: List[str],
+    only_main_content: bool,
+) -> str:
+    """Clave de un resultado: hash del cuerpo + URL, status y opciones de extracción."""
+    body_hash = hashlib.sha256(html_content.encode("utf-8", errors="replace")).hexdigest()
+    options = ",".join(sorted(set(formats)))
+    return f"{body_hash}|{url}|{status_code}|{options}|{int(bool(only_main_content))}"
+
+
+class ScrapeResultCache:
+    """
+    LRU en memoria de resultados procesados, comprimidos y acotados por bytes.
+
+    Example:
+        cache = ScrapeResultCache(max_bytes=64 * 1024 * 1024)
+        key = make_result_key(html, url, 200, ["markdown"], True)
+        data = cache.get(key)
+        if data is None:
+            data = procesar(html)
+            cache.put(key, data)
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, compress_level: int = 6):
+        """
+        Args:
+            max_bytes: Tamaño máximo de las entradas (comprimidas).
+            compress_level: Nivel de zlib (1 = rápido, 9 = máximo).
+        """
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        # key → (zlib, tamaño sin comprimir)
+        self._entries: "OrderedDict[str, Tuple[bytes, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._raw_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """`data` guardado para `key` o None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(zlib.decompress(entry[0]))
+
+    def put(self, key: str, data: Dict[str, Any]) -> bool:
+        """
+        Guarda `data` comprimido.
+
+        Returns:
+            False si la entrada comprimida no cabe en max_bytes.
+        """
+        raw = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        blob = zlib.compress(raw, self.compress_level)
+        if len(blob) > self.max_bytes:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= len(previous[0])
+                self._raw_bytes -= previous[1]
+            self._entries[key] = (blob, len(raw))
+            self._total_bytes += len(blob)
+            self._raw_bytes += len(raw)
+            while self._total_bytes > self.max_bytes:
+                _, (evicted, raw_size) = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+                self._raw_bytes -= raw_size
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            self._raw_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Entradas, bytes comprimidos, ratio de compresión y contadores."""
+        with self._lock:
+            ratio = self._raw_bytes / self._total_bytes if self._total_bytes else 0.0
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "compression_ratio": round(ratio, 2),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Singleton global
+_scrape_result_cache: Optional[ScrapeResultCache] = None
+_scrape_result_cache_lock = threading.Lock()
+
+
+def get_scrape_result_cache() -> Optional[ScrapeResultCache]:
+    """
+    Obtiene el singleton de la caché de resultados procesados.
+
+    Returns:
+        Instancia configurada desde settings, o None si está desactivada
+        (SCRAPE_RESULT_CACHE_MAX_MB = 0).
+    """
+    global _scrape_result_cache
+    if settings.scrape_result_cache_max_mb <= 0:
+        return None
+    # Se crea también desde hilos (asyncio.to_thread en simple_scraper)
+    with _scrape_result_cache_lock:
+        if _scrape_result_cache is None:
+            _scrape_result_cache = ScrapeResultCache(
+                max_bytes=int(settings.scrape_result_cache_max_mb * 1024 * 1024)
+            )
+        return _scrape_result_cache
+
+
+def reset_scrape_result_cache() -> None:
+    """Resetea el singleton (tests)."""
+    global _scrape_result_cache
+    _scrape_result_cache = None
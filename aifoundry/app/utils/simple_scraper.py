@@ -5,10 +5,26 @@ API simple y limpia para scraping web con conversión a Markdown.
 Referencia: https://docs.firecrawl.dev/features/scrape
 
 FEATURES:
-- Sync first: Sin async para simplificar uso
+- Sync: simple_scrape() sin async para uso directo (ejecuta
+  simple_scrape_async() en un loop propio, con la misma cortesía por host)
+- Async para agentes: simple_scrape_async() sobre un AsyncClient compartido
+  (pool de conexiones, keep-alive, HTTP/2, límite por host)
 - Multiple formats: markdown, html, rawHtml, links
 - Clean output: Solo contenido principal (sin nav, ads, etc)
 - Rich metadata: title, description, language, og:*
+- Single parse: un único árbol lxml para metadata, links, readability y limpieza;
+  metadata y links en un solo recorrido, los links solo con el formato "links"
+- Fast extraction: contenido principal por densidad de texto/enlaces
+  (content_extractor.py); readability solo si la calidad es baja
+- Fast markdown: conversión en un recorrido del árbol (markdown_converter.py)
+  con SCRAPE_FAST_MARKDOWN=true; por defecto markdownify
+- HTTP cache: respuestas en disco con ETag / Last-Modified / max-age (http_cache.py)
+- Result cache: markdown ya procesado por hash del cuerpo (scrape_result_cache.py)
+- Process pool: descarga async; el procesado (CPU) en un pool de procesos
+  acotado (extraction_pool.py) para no atascar el event loop
+- Streaming: Content-Type / Content-Length antes del cuerpo, tope de bytes
+  (SCRAPE_MAX_BYTES) y decodificación incremental; PDFs, vídeos y binarios
+  se rechazan sin descargarlos
 - Simple API: Una función, parámetros claros
 
 DIFERENCIA CON scraper.py:
@@ -23,19 +39,41 @@ Example:
     >>> result = simple_scrape("https://example.com", formats=["markdown"])
     >>> if result["success"]:
     ...     print(result["data"]["markdown"])
+
+    >>> result = await simple_scrape_async("https://example.com")
 """
 
+import asyncio
+import codecs
+import copy
 import logging
 import random
 import re
-from typing import Any, Dict, List, Optional, Set
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
 
 import httpx
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml.html import HtmlElement
 from markdownify import markdownify as md
 from readability import Document
 
+from aifoundry.app.config import settings
+from aifoundry.app.utils.content_extractor import extract_main_content
+from aifoundry.app.utils.extraction_pool import get_extraction_pool
+from aifoundry.app.utils.http_cache import CachedResponse, HttpCache, get_http_cache
+from aifoundry.app.utils.host_scheduler import HostBackoffError, RobotsDisallowedError
+from aifoundry.app.utils.http_client import get_scrape_http_client
+from aifoundry.app.utils.markdown_converter import html_to_markdown
+from aifoundry.app.utils.metrics import (
+    SCRAPE_BYTES,
+    SCRAPE_HTTP_CACHE,
+    SCRAPE_PAGES,
+    SCRAPE_RESULT_CACHE,
+)
+from aifoundry.app.utils.scrape_result_cache import get_scrape_result_cache, make_result_key
+
 logger = logging.getLogger(__name__)
 
 # User agents rotativos para evitar bloqueos
@@ -49,6 +87,15 @@ USER_AGENTS = [
 # Formatos soportados
 SUPPORTED_FORMATS = {"markdown", "html", "rawHtml", "links"}
 
+# Content-Type que se procesan (el resto se rechaza antes de leer el cuerpo)
+_HTML_CONTENT_TYPES = frozenset({"text/html", "application/xhtml+xml", "text/plain"})
+
+# Tags que se eliminan en la limpieza básica (fallback sin readability)
+_BOILERPLATE_TAGS = ("script", "style", "noscript", "iframe", "nav", "footer", "header")
+
+# Parsers lxml por thread (no se pueden compartir entre threads)
+_parsers = threading.local()
+
 
 def _get_headers() -> Dict[str, str]:
     """Genera headers para parecer un navegador real."""
@@ -68,98 +115,132 @@ def _get_headers() -> Dict[str, str]:
     }
 
 
-def _extract_metadata(soup: BeautifulSoup, url: str, status_code: int, title_override: str = "") -> Dict[str, Any]:
+def _parse_html(html_content: str) -> HtmlElement:
     """
-    Extrae metadata de la página.
-    
-    Args:
-        soup: BeautifulSoup parseado
-        url: URL original
-        status_code: Código de estado HTTP
-        title_override: Título extraído por readability (opcional)
-        
-    Returns:
-        Dict con metadata completa
+    Parsea el HTML una sola vez en un árbol lxml.
+
+    El árbol se comparte entre metadata, links, readability y limpieza.
     """
-    metadata = {
-        "title": title_override or (soup.title.string.strip() if soup.title and soup.title.string else ""),
-        "description": "",
-        "language": soup.html.get("lang", "") if soup.html else "",
-        "keywords": "",
-        "robots": "",
-        "ogTitle": "",
-        "ogDescription": "",
-        "ogUrl": "",
-        "ogImage": "",
-        "ogSiteName": "",
-        "ogType": "",
-        "sourceURL": url,
-        "statusCode": status_code,
-    }
+    parser = getattr(_parsers, "html", None)
+    if parser is None:
+        parser = _parsers.html = lxml.html.HTMLParser(encoding="utf-8")
+
+    html_content = _clean_control_chars(html_content)
+    if not html_content.strip():
+        html_content = "<html><body></body></html>"
+    # Bytes UTF-8: una declaración <?xml encoding=...?> o un <meta charset>
+    # distinto no rompen el parseo
+    return lxml.html.document_fromstring(html_content.encode("utf-8"), parser=parser)
 
-    # Meta tags estándar
-    for name, key in [("description", "description"), ("keywords", "keywords"), ("robots", "robots")]:
-        tag = soup.find("meta", attrs={"name": name})
-        if tag:
-            metadata[key] = tag.get("content", "")
-
-    # Open Graph tags
-    og_mappings = {
-        "og:title": "ogTitle",
-        "og:description": "ogDescription",
-        "og:url": "ogUrl",
-        "og:image": "ogImage",
-        "og:site_name": "ogSiteName",
-        "og:type": "ogType",
-    }
-    
-    for og_prop, meta_key in og_mappings.items():
-        tag = soup.find("meta", property=og_prop)
-        if tag:
-            metadata[meta_key] = tag.get("content", "")
 
-    # Twitter Card como fallback
-    if not metadata["ogImage"]:
-        twitter_image = soup.find("meta", attrs={"name": "twitter:image"})
-        if twitter_image:
-            metadata["ogImage"] = twitter_image.get("content", "")
+# Links que no se siguen
+_SKIPPED_HREF_PREFIXES = ("#", "javascript:", "mailto:", "tel:")
 
-    return metadata
+# hrefs que urljoin + urlparse dejan tal cual (ya sin fragmento): absolutos
+# http(s) o desde la raíz, ASCII, sin espacios, params (;), barras invertidas
+# ni corchetes. El resto pasa por urljoin.
+_PLAIN_ABSOLUTE_HREF = re.compile(r"https?://[^/?\s;\\\[\]][^\s;\\\[\]]*")
+_PLAIN_ROOTED_HREF = re.compile(r"/(?:[^/\s;\\\[\]][^\s;\\\[\]]*)?")
 
 
-def _extract_links(soup: BeautifulSoup, base_url: str) -> List[str]:
+def _resolve_link(href: str, base_url: str, origin: Optional[str]) -> Optional[str]:
     """
-    Extrae todos los links de la página.
-    
+    URL absoluta http(s) de un href, sin fragmento (None si no es http/https).
+
+    Los casos comunes (absolutos o desde la raíz) se resuelven sin urljoin ni
+    urlparse, con el mismo resultado.
+    """
+    path = href.partition("#")[0]
+    if path.isascii() and not path.endswith("?"):
+        if _PLAIN_ABSOLUTE_HREF.fullmatch(path):
+            return path
+        # urljoin normaliza los segmentos "." y ".." de los relativos
+        if (
+            origin is not None
+            and "/." not in path
+            and "//" not in path
+            and _PLAIN_ROOTED_HREF.fullmatch(path)
+        ):
+            return origin + path
+
+    full_url = urljoin(base_url, href)
+    parsed = urlparse(full_url)
+    if parsed.scheme not in ("http", "https"):
+        return None
+    clean_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+    if parsed.query:
+        clean_url += f"?{parsed.query}"
+    return clean_url
+
+
+def _extract_metadata_and_links(
+    tree: HtmlElement,
+    url: str,
+    status_code: int,
+    with_links: bool = False,
+) -> Tuple[Dict[str, Any], Optional[List[str]]]:
+    """
+    Extrae metadata y, si se piden, los links en un solo recorrido del árbol.
+
     Args:
-        soup: BeautifulSoup parseado
-        base_url: URL base para resolver links relativos
-        
+        tree: Árbol lxml de la página (_parse_html)
+        url: URL original (también base de los links relativos)
+        status_code: Código de estado HTTP
+        with_links: Si recoger también los <a> (formato "links")
+
     Returns:
-        Lista de URLs únicas
+        (metadata, links únicos ordenados o None si with_links=False)
     """
+    title: Optional[str] = None
+    # name=... y property=og:* (el primero de cada uno)
+    by_name: Dict[str, str] = {}
+    by_property: Dict[str, str] = {}
+
     links: Set[str] = set()
-    
-    for a_tag in soup.find_all("a", href=True):
-        href = a_tag["href"]
-        
-        # Ignorar anchors, javascript, mailto, tel
-        if href.startswith(("#", "javascript:", "mailto:", "tel:")):
-            continue
-            
-        # Resolver URLs relativas
-        full_url = urljoin(base_url, href)
-        
-        # Solo incluir http/https
-        parsed = urlparse(full_url)
-        if parsed.scheme in ("http", "https"):
-            # Limpiar fragmentos
-            clean_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-            if parsed.query:
-                clean_url += f"?{parsed.query}"
-            links.add(clean_url)
-    
-    return sorted(links)
+    # href → URL resuelta: los menús repiten los mismos links muchas veces
+    resolved: Dict[str, Optional[str]] = {}
+    base = urlparse(url)
+    origin = f"{base.scheme}://{base.netloc}" if base.scheme in ("http", "https") and base.netloc else None
+
+    tags = ("title", "meta", "a") if with_links else ("title", "meta")
+    for element in tree.iter(*tags):
+        tag = element.tag
+        if tag == "a":
+            href = element.get("href")
+            if href is None or href.startswith(_SKIPPED_HREF_PREFIXES):
+                continue
+            if href not in resolved:
+                resolved[href] = _resolve_link(href, url, origin)
+            link = resolved[href]
+            if link is not None:
+                links.add(link)
+        elif tag == "meta":
+            name = element.get("name")
+            if name is not None and name not in by_name:
+                by_name[name] = element.get("content", "")
+            prop = element.get("property")
+            if prop is not None and prop not in by_property:
+                by_property[prop] = element.get("content", "")
+        elif title is None:
+            title = " ".join(element.text_content().split())
+
+    metadata = {
+        "title": title or "",
+        "description": by_name.get("description", ""),
+        "language": tree.get("lang", ""),
+        "keywords": by_name.get("keywords", ""),
+        "robots": by_name.get("robots", ""),
+        "ogTitle": by_property.get("og:title", ""),
+        "ogDescription": by_property.get("og:description", ""),
+        "ogUrl": by_property.get("og:url", ""),
+        # Twitter Card como fallback
+        "ogImage": by_property.get("og:image", "") or by_name.get("twitter:image", ""),
+        "ogSiteName": by_property.get("og:site_name", ""),
+        "ogType": by_property.get("og:type", ""),
+        "sourceURL": url,
+        "statusCode": status_code,
+    }
+    return metadata, (sorted(links) if with_links else None)
 
 
 def _clean_control_chars(text: str) -> str:
@@ -178,46 +259,132 @@ def _clean_control_chars(text: str) -> str:
     return cleaned
 
 
-def _clean_html_for_markdown(html_content: str, use_readability: bool = True) -> tuple[str, str]:
+# Contenedores donde montan React, Vue, Next, Nuxt, Gatsby...
+_JS_MOUNT_IDS = ("root", "app", "__next", "__nuxt", "___gatsby")
+# Con poco texto visible, más código inline que esto por carácter visible =
+# página pintada por scripts (las páginas SSR grandes también traen datos inline)
+_JS_SHELL_MAX_TEXT = 500
+_JS_SCRIPT_RATIO = 10
+
+
+def _looks_like_js_shell(tree: HtmlElement) -> bool:
+    """
+    Si la página parece un cascarón que rellena JavaScript (SPA sin SSR).
+
+    Señales: un contenedor de montaje (#root, #app, #__next...) vacío, un
+    <body> sin texto visible con <noscript> o <script>, o poco texto y mucho
+    más código inline. Llamar antes de la limpieza (quita los <script>).
     """
-    Limpia HTML para conversión a Markdown.
+    for mount_id in _JS_MOUNT_IDS:
+        mount = tree.get_element_by_id(mount_id, None)
+        if mount is not None and len(mount) == 0 and not (mount.text or "").strip():
+            return True
+
+    visible = sum(
+        len(text.strip())
+        for text in tree.xpath(
+            "//body//text()[not(ancestor::script or ancestor::style"
+            " or ancestor::noscript or ancestor::template)]"
+        )
+    )
+    script_chars = 0
+    has_scripts = False
+    for element in tree.iter("script", "noscript"):
+        has_scripts = True
+        if element.tag == "script":
+            script_chars += len(element.text or "")
+    if not visible:
+        return has_scripts
+    return visible < _JS_SHELL_MAX_TEXT and script_chars >= _JS_SCRIPT_RATIO * visible
+
+
+def _strip_boilerplate(tree: HtmlElement) -> HtmlElement:
+    """Limpieza básica: quita scripts, estilos y navegación y devuelve el <body>."""
+    for tag in list(tree.iter(*_BOILERPLATE_TAGS)):
+        tag.drop_tree()
+    body = tree.find(".//body")
+    return body if body is not None else tree
+
+
+def _main_content(tree: HtmlElement, use_readability: bool = True) -> HtmlElement:
+    """
+    Elemento con el contenido principal de la página.
+
+    Modifica `tree`: llamar después de extraer metadata y links.
+
+    Primero el extractor por densidad (un recorrido del árbol); readability
+    solo si su calidad queda por debajo de SCRAPE_EXTRACTOR_MIN_QUALITY, y la
+    limpieza básica si ninguno devuelve contenido suficiente.
     
     Args:
-        html_content: HTML crudo
-        use_readability: Si usar readability para extraer contenido principal
+        tree: Árbol lxml de la página (_parse_html)
+        use_readability: Si extraer solo el contenido principal
         
     Returns:
-        Tuple de (html_limpio, título_extraído)
+        Elemento lxml con el contenido principal
     """
-    title = ""
-    
-    # Limpiar caracteres de control ANTES de procesar
-    html_content = _clean_control_chars(html_content)
-    
     if use_readability:
+        extracted, quality = extract_main_content(tree, settings.scrape_extractor_min_quality)
+        if extracted is not None:
+            return extracted
+        logger.debug(f"Extractor rápido con calidad {quality:.2f}, usando readability")
+
         try:
-            doc = Document(html_content)
-            cleaned = doc.summary()
-            title = doc.title()
+            # Readability modifica el árbol que recibe (quita nodos ocultos y
+            # "unlikely"): una copia, para que el fallback vea el documento
+            # tal cual (sin reparsear el HTML)
+            cleaned = Document(copy.deepcopy(tree)).summary()
             
             # Si readability devuelve muy poco contenido, usar fallback
-            if len(cleaned) < 200:
-                logger.warning(f"Readability devolvió poco contenido ({len(cleaned)} chars), usando fallback")
-                soup = BeautifulSoup(html_content, "html.parser")
-                for tag in soup(["script", "style", "noscript", "iframe", "nav", "footer", "header"]):
-                    tag.decompose()
-                cleaned = str(soup.body) if soup.body else html_content
-            
-            return cleaned, title
+            if len(cleaned) >= 200:
+                return lxml.html.fromstring(cleaned)
+            logger.warning(f"Readability devolvió poco contenido ({len(cleaned)} chars), usando fallback")
         except Exception as e:
             logger.warning(f"Readability extraction failed: {e}")
     
     # Fallback: limpieza básica
-    soup = BeautifulSoup(html_content, "html.parser")
-    for tag in soup(["script", "style", "noscript", "iframe", "nav", "footer", "header"]):
-        tag.decompose()
-    
-    return str(soup.body) if soup.body else html_content, title
+    return _strip_boilerplate(tree)
+
+
+def _clean_html_for_markdown(tree: HtmlElement, use_readability: bool = True) -> str:
+    """
+    Limpia HTML para conversión a Markdown (ver _main_content).
+
+    Returns:
+        HTML limpio (contenido principal)
+    """
+    return lxml.html.tostring(_main_content(tree, use_readability), encoding="unicode")
+
+
+def _to_markdown(content: HtmlElement) -> str:
+    """
+    Markdown compacto del contenido principal.
+
+    Con SCRAPE_FAST_MARKDOWN un único recorrido del árbol (markdown_converter);
+    si no, markdownify sobre el HTML serializado y limpieza de líneas vacías.
+    """
+    if settings.scrape_fast_markdown:
+        return html_to_markdown(content)
+
+    markdown_content = md(lxml.html.tostring(content, encoding="unicode"), heading_style="ATX")
+    # Limpiar espacios excesivos
+    markdown_content = "\n".join(line for line in markdown_content.split("\n") if line.strip())
+    return markdown_content.strip()
+
+
+# Loop en un thread propio para simple_scrape(): las llamadas sync comparten
+# cliente, HostScheduler y caché de robots.txt (ligados a un event loop)
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None or _sync_loop.is_closed():
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, name="simple-scrape", daemon=True).start()
+        return _sync_loop
 
 
 def simple_scrape(
@@ -229,7 +396,9 @@ def simple_scrape(
     """
     Scrapea una URL y la convierte a los formatos solicitados.
     
-    API simple inspirada en Firecrawl para scraping web.
+    API simple inspirada en Firecrawl para scraping web. Versión sync de
+    simple_scrape_async(): se ejecuta en un event loop propio en otro thread,
+    con la misma cortesía por host y robots.txt. No llamar desde ese loop.
     
     Args:
         url: URL a scrapear
@@ -258,7 +427,8 @@ def simple_scrape(
                     ...
                 }
             },
-            "error": "mensaje de error si success=False"
+            "error": "mensaje de error si success=False",
+            "tip": "qué hacer (solo en algunos errores, p.ej. contenido no HTML)"
         }
         
     Example:
@@ -269,80 +439,352 @@ def simple_scrape(
         >>> result = simple_scrape("https://example.com", formats=["markdown", "links"])
         >>> links = result["data"]["links"]
     """
-    # Validar y normalizar formatos
+    # Mismo camino que simple_scrape_async (HostScheduler, robots.txt y
+    # backoff por host) sobre el loop propio de las llamadas sync
+    future = asyncio.run_coroutine_threadsafe(
+        simple_scrape_async(url, formats, only_main_content, timeout), _get_sync_loop()
+    )
+    return future.result()
+
+
+async def simple_scrape_async(
+    url: str,
+    formats: Optional[List[str]] = None,
+    only_main_content: bool = True,
+    timeout: float = 30.0,
+) -> Dict[str, Any]:
+    """
+    Igual que simple_scrape(), pero async y sobre el AsyncClient compartido.
+
+    Las conexiones se reutilizan entre llamadas (keep-alive / HTTP/2) y las
+    peticiones simultáneas a un mismo host se limitan
+    (SCRAPE_PER_HOST_CONCURRENCY), se espacian y respetan robots.txt y
+    el backoff tras 429/503 (host_scheduler.py). El procesado del HTML (CPU)
+    va al pool de procesos de extracción para no bloquear el event loop.
+
+    Args:
+        url: URL a scrapear
+        formats: Formatos a retornar (ver simple_scrape)
+        only_main_content: Si True, usa readability para extraer solo contenido principal.
+        timeout: Timeout en segundos. Default 30.0
+
+    Returns:
+        El mismo dict que simple_scrape().
+    """
+    formats, error = _validate_formats(formats)
+    if error is not None:
+        return error
+
+    # SQLite (lecturas de hasta SCRAPE_MAX_BYTES, escrituras y commits) en un
+    # thread: nunca en el event loop
+    cache, cached = await asyncio.to_thread(_cache_lookup, url)
+    if cached is not None and cached.fresh:
+        html_content, status_code = cached.text(), cached.status_code
+    else:
+        try:
+            client = get_scrape_http_client()
+            reader = None
+            async with client.stream(url, headers=_request_headers(cached), timeout=timeout) as response:
+                if not _is_revalidated(response, cache, cached):
+                    _accept_response(response)
+                    reader = _BodyReader(response, settings.scrape_max_bytes)
+                    async for chunk in response.aiter_bytes():
+                        if not reader.feed(chunk):
+                            break
+            # Ya fuera del turno del host
+            if reader is None:
+                html_content, status_code = await asyncio.to_thread(
+                    _serve_revalidated, cache, cached, response.headers
+                )
+            else:
+                html_content, status_code = _finish_response(response, url, reader)
+                await asyncio.to_thread(_update_http_cache, cache, cached, url, response, reader)
+        except (httpx.HTTPError, UnsupportedContentError, RobotsDisallowedError, HostBackoffError) as e:
+            return _fetch_error(e, timeout)
+
+    return await _process_page_async(html_content, url, status_code, formats, only_main_content)
+
+
+def _validate_formats(formats: Optional[List[str]]) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+    """Normaliza los formatos. Devuelve (formats, dict de error o None)."""
     if formats is None:
         formats = ["markdown"]
     
     invalid_formats = set(formats) - SUPPORTED_FORMATS
     if invalid_formats:
-        return {
+        return formats, {
             "success": False,
             "error": f"Formatos no soportados: {invalid_formats}. Válidos: {SUPPORTED_FORMATS}",
         }
-    
-    try:
-        # Fetch de la página
-        # verify=False para evitar errores de SSL en entornos corporativos con proxies
-        with httpx.Client(
-            follow_redirects=True,
-            timeout=httpx.Timeout(timeout, connect=10.0),
-            verify=False,
-            http2=True,
-        ) as client:
-            response = client.get(url, headers=_get_headers())
-            response.raise_for_status()
-            
-            # Manejar encoding
-            if response.encoding:
-                html_content = response.text
-            else:
-                html_content = response.content.decode("utf-8", errors="replace")
-            
-            status_code = response.status_code
+    return formats, None
+
+
+def _cache_lookup(url: str) -> Tuple[Optional[HttpCache], Optional[CachedResponse]]:
+    """Caché HTTP (None si está desactivada) y la entrada guardada para `url`."""
+    cache = get_http_cache()
+    if cache is None:
+        return None, None
+    cached = cache.get(url)
+    if cached is None:
+        SCRAPE_HTTP_CACHE.inc(result="miss")
+    elif cached.fresh:
+        cache.record_hit()
+        SCRAPE_HTTP_CACHE.inc(result="hit")
+    return cache, cached
+
+
+def _request_headers(cached: Optional[CachedResponse]) -> Dict[str, str]:
+    """Headers de navegador más los validadores de la entrada cacheada."""
+    headers = _get_headers()
+    if cached is not None:
+        headers.update(cached.validators())
+    return headers
+
+
+class UnsupportedContentError(Exception):
+    """La URL no devuelve una página web (PDF, imagen, vídeo, binario...)."""
+
+    def __init__(self, content_type: str):
+        super().__init__(f"Contenido no HTML ({content_type})")
+        self.content_type = content_type
+
+
+def _is_revalidated(
+    response: httpx.Response,
+    cache: Optional[HttpCache],
+    cached: Optional[CachedResponse],
+) -> bool:
+    """Si la respuesta es un 304 a una petición condicional (se sirve desde la caché)."""
+    return response.status_code == 304 and cache is not None and cached is not None
+
+
+def _serve_revalidated(
+    cache: HttpCache,
+    cached: CachedResponse,
+    headers: Mapping[str, str],
+) -> Tuple[str, int]:
+    """Actualiza la entrada tras un 304 y devuelve (html, status_code) guardados."""
+    SCRAPE_HTTP_CACHE.inc(result="revalidated")
+    cached = cache.mark_revalidated(cached, headers)
+    return cached.text(), cached.status_code
+
+
+def _accept_response(response: httpx.Response) -> None:
+    """
+    Valida status y headers antes de leer el cuerpo.
+
+    Raises:
+        httpx.HTTPStatusError: Si la respuesta no es 2xx.
+        UnsupportedContentError: Si el Content-Type no es HTML/texto.
+    """
+    if not response.is_success:
+        SCRAPE_BYTES.inc(0, status="http_error")
+        response.raise_for_status()
+
+    # Sin Content-Type se intenta igualmente (muchos servidores no lo envían)
+    content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type and content_type not in _HTML_CONTENT_TYPES:
+        SCRAPE_BYTES.inc(0, status="rejected")
+        raise UnsupportedContentError(content_type)
+
+    declared = response.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > settings.scrape_max_bytes:
+        logger.info(
+            f"   {response.url}: Content-Length {int(declared):,} > "
+            f"{settings.scrape_max_bytes:,}, se leen solo los primeros bytes"
+        )
+
+
+class _BodyReader:
+    """Acumula el cuerpo hasta `max_bytes` decodificándolo por trozos."""
+
+    def __init__(self, response: httpx.Response, max_bytes: int):
+        encoding = response.charset_encoding or "utf-8"
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            encoding = "utf-8"
+        self.encoding = encoding
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.truncated = False
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._chunks: List[bytes] = []
+        self._text: List[str] = []
+
+    def feed(self, chunk: bytes) -> bool:
+        """Añade un trozo. Devuelve False si se descartan bytes por el tope."""
+        room = self.max_bytes - self.size
+        # Un cuerpo de justo max_bytes no está truncado; sí si llega algo más
+        if len(chunk) > room:
+            chunk = chunk[:room]
+            self.truncated = True
+        self.size += len(chunk)
+        self._chunks.append(chunk)
+        self._text.append(self._decoder.decode(chunk))
+        return not self.truncated
+
+    @property
+    def content(self) -> bytes:
+        return b"".join(self._chunks)
+
+    def text(self) -> str:
+        return "".join(self._text) + self._decoder.decode(b"", final=True)
+
+
+def _finish_response(response: httpx.Response, url: str, reader: _BodyReader) -> Tuple[str, int]:
+    """
+    Registra métricas del cuerpo leído.
+
+    Returns:
+        (html, status_code)
+    """
+    SCRAPE_BYTES.inc(reader.size, status="truncated" if reader.truncated else "ok")
+    SCRAPE_PAGES.observe(reader.size)
+    if reader.truncated:
+        logger.warning(f"   {url}: cuerpo truncado a {reader.size:,} bytes (SCRAPE_MAX_BYTES)")
+    return reader.text(), response.status_code
+
 
-    except httpx.HTTPStatusError as e:
+def _update_http_cache(
+    cache: Optional[HttpCache],
+    cached: Optional[CachedResponse],
+    url: str,
+    response: httpx.Response,
+    reader: _BodyReader,
+) -> None:
+    """Guarda en la caché HTTP el cuerpo leído (si está completo) o invalida la entrada."""
+    if cache is None:
+        return
+    if cached is not None:
+        SCRAPE_HTTP_CACHE.inc(result="stale")
+    if reader.truncated:
+        cache.invalidate(url)
+    else:
+        cache.store(url, response.status_code, response.headers, reader.content, reader.encoding)
+
+
+def _fetch_error(error: Exception, timeout: float) -> Dict[str, Any]:
+    """Dict de error de simple_scrape para un fallo de descarga."""
+    if isinstance(error, UnsupportedContentError):
+        return {
+            "success": False,
+            "error": f"{error}: no es una página web",
+            "tip": "No reintentes esta URL; usa otro resultado de la búsqueda",
+        }
+    if isinstance(error, RobotsDisallowedError):
         return {
             "success": False,
-            "error": f"HTTP {e.response.status_code}: {str(e)}",
+            "error": str(error),
+            "tip": "El sitio no permite scrapear esta página; usa otro resultado de la búsqueda",
         }
-    except httpx.TimeoutException:
+    if isinstance(error, HostBackoffError):
         return {
             "success": False,
-            "error": f"Timeout después de {timeout}s",
+            "error": str(error),
+            "tip": "El sitio está limitando peticiones; usa otro resultado o responde con lo que tienes",
         }
-    except httpx.RequestError as e:
+    if isinstance(error, httpx.HTTPStatusError):
         return {
             "success": False,
-            "error": f"Error de conexión: {str(e)}",
+            "error": f"HTTP {error.response.status_code}: {str(error)}",
         }
+    if isinstance(error, httpx.TimeoutException):
+        return {
+            "success": False,
+            "error": f"Timeout después de {timeout:g}s",
+        }
+    return {
+        "success": False,
+        "error": f"Error de conexión: {str(error)}",
+    }
+
+
+def _result_cache_lookup(
+    html_content: str,
+    url: str,
+    status_code: int,
+    formats: List[str],
+    only_main_content: bool,
+) -> Tuple[Any, Optional[str], Optional[Dict[str, Any]]]:
+    """Consulta la caché de resultados. Devuelve (cache, key, resultado cacheado o None)."""
+    cache = get_scrape_result_cache()
+    if cache is None:
+        return None, None, None
+
+    key = make_result_key(html_content, url, status_code, formats, only_main_content)
+    data = cache.get(key)
+    if data is not None:
+        SCRAPE_RESULT_CACHE.inc(result="hit")
+        return cache, key, {"success": True, "data": data}
+    SCRAPE_RESULT_CACHE.inc(result="miss")
+    return cache, key, None
+
 
+async def _process_page_async(
+    html_content: str,
+    url: str,
+    status_code: int,
+    formats: List[str],
+    only_main_content: bool,
+) -> Dict[str, Any]:
+    """
+    _build_result pasando por la caché de resultados (mismo cuerpo → sin
+    reprocesar), en el pool de extracción (extraction_pool.py).
+
+    La caché de resultados es de este proceso; su sha256, json y zlib van
+    en un hilo para no ocupar el event loop.
+    """
+    cache, key, cached = await asyncio.to_thread(
+        _result_cache_lookup, html_content, url, status_code, formats, only_main_content
+    )
+    if cached is not None:
+        return cached
+
+    result = await get_extraction_pool().run(
+        _build_result, html_content, url, status_code, formats, only_main_content
+    )
+    if cache is not None and result["success"]:
+        await asyncio.to_thread(cache.put, key, result["data"])
+    return result
+
+
+def _build_result(
+    html_content: str,
+    url: str,
+    status_code: int,
+    formats: List[str],
+    only_main_content: bool,
+) -> Dict[str, Any]:
+    """Convierte el HTML descargado en el dict de resultado de simple_scrape."""
     try:
-        # Parse HTML
-        soup = BeautifulSoup(html_content, "html.parser")
+        # Un único parseo (lxml) compartido por todos los pasos
+        tree = _parse_html(html_content)
         
-        # Limpiar HTML y extraer título
-        cleaned_html, article_title = _clean_html_for_markdown(html_content, use_readability=only_main_content)
-        
-        # Extraer metadata
-        metadata = _extract_metadata(soup, url, status_code, article_title)
-        
-        # Construir respuesta
+        # Metadata y links (un solo recorrido) antes de limpiar: la limpieza
+        # modifica el árbol. Los <a> solo se recorren si se pide "links"
+        with_links = "links" in formats
+        metadata, links = _extract_metadata_and_links(tree, url, status_code, with_links)
         data: Dict[str, Any] = {"metadata": metadata}
+        if with_links:
+            data["links"] = links
+        
+        # Antes de limpiar: si la página la pinta JavaScript (domain_profile)
+        data["jsShell"] = _looks_like_js_shell(tree)
+
+        # La extracción del contenido principal solo si algún formato la usa
+        content = None
+        if "html" in formats or "markdown" in formats:
+            content = _main_content(tree, use_readability=only_main_content)
         
         if "rawHtml" in formats:
             data["rawHtml"] = html_content
             
         if "html" in formats:
-            data["html"] = cleaned_html
+            data["html"] = lxml.html.tostring(content, encoding="unicode")
             
         if "markdown" in formats:
-            markdown_content = md(cleaned_html, heading_style="ATX")
-            # Limpiar espacios excesivos
-            markdown_content = "\n".join(line for line in markdown_content.split("\n") if line.strip())
-            data["markdown"] = markdown_content.strip()
-            
-        if "links" in formats:
-            data["links"] = _extract_links(soup, url)
+            data["markdown"] = _to_markdown(content)
         
         return {
             "success": True,
@@ -0,0 +1,88 @@
+"""
+Single-flight - Deduplicación de llamadas idénticas en curso.
+
+Si varias corrutinas piden el mismo trabajo (misma clave) a la vez, solo
+la primera lo ejecuta; las demás esperan el mismo resultado (o la misma
+excepción). Cuando el trabajo termina la clave se libera: no es una caché.
+
+Este módulo contiene:
+- SingleFlight: Grupo de llamadas deduplicadas por clave
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """Trabajo en curso y número de llamadores esperándolo."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Ejecuta como mucho un trabajo por clave a la vez.
+
+    El trabajo corre en su propia task: si el llamador que lo inició se
+    cancela (p.ej. cliente desconectado) los demás siguen esperándolo.
+    Solo se cancela cuando ya no queda nadie esperando.
+
+    Example:
+        ```python
+        flights = SingleFlight()
+
+        async def fetch():
+            return await agent.run(config)
+
+        result = await flights.do(key, fetch)
+        ```
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.coalesced = 0  # Llamadas servidas por un trabajo ya en curso
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Ejecuta `fn()` o se une al trabajo en curso con la misma clave.
+
+        Args:
+            key: Clave del trabajo (hashable, normalizada por el llamador).
+            fn: Factoría de la corrutina que hace el trabajo real.
+
+        Returns:
+            El resultado de `fn()` (compartido entre todos los llamadores).
+        """
+        flight = self._flights.get(key)
+        if flight is None or flight.task.done():
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _t, k=key, f=flight: self._forget(k, f))
+        else:
+            self.coalesced += 1
+            logger.info(f"Single-flight: uniéndose a trabajo en curso ({flight.waiters} esperando)")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def in_flight(self) -> int:
+        """Número de trabajos distintos en curso."""
+        return len(self._flights)
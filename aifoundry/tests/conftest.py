@@ -4,6 +4,50 @@ Fixtures compartidas para tests de AIFoundry.
 
 import pytest
 
+from aifoundry.app.api.runner import reset_run_flights
+from aifoundry.app.core.admission import reset_admission_controller
+from aifoundry.app.config import settings
+from aifoundry.app.core.result_cache import reset_result_cache
+from aifoundry.app.utils.domain_profile import reset_domain_profiles
+from aifoundry.app.utils.extraction_pool import shutdown_extraction_pool
+from aifoundry.app.utils.http_cache import reset_http_cache
+from aifoundry.app.utils.scrape_result_cache import reset_scrape_result_cache
+
+
+@pytest.fixture(autouse=True)
+def _isolated_run_state():
+    """Cada test empieza sin resultados cacheados, runs en curso ni cola de admisión."""
+    reset_result_cache()
+    reset_run_flights()
+    reset_admission_controller()
+    yield
+    reset_result_cache()
+    reset_run_flights()
+    reset_admission_controller()
+
+
+@pytest.fixture(autouse=True)
+def _no_disk_http_cache(monkeypatch):
+    """La caché HTTP y los perfiles por dominio no escriben en ./data durante los tests."""
+    monkeypatch.setattr(settings, "scrape_http_cache_path", None)
+    monkeypatch.setattr(settings, "scrape_domain_profile_path", None)
+    reset_http_cache()
+    reset_scrape_result_cache()
+    reset_domain_profiles()
+    yield
+    reset_http_cache()
+    reset_scrape_result_cache()
+    reset_domain_profiles()
+
+
+@pytest.fixture(autouse=True)
+def _no_extraction_processes(monkeypatch):
+    """El procesado de páginas va a un thread (el lifespan no arranca procesos)."""
+    monkeypatch.setattr(settings, "scrape_extract_workers", 0)
+    shutdown_extraction_pool()
+    yield
+    shutdown_extraction_pool()
+
 
 @pytest.fixture
 def electricity_config():
@@ -5,9 +5,17 @@ Usa TestClient de FastAPI (no requiere servidor corriendo).
 NO ejecuta agentes reales (solo tests de routing, validación, discovery).
 """
 
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
 import pytest
 from fastapi.testclient import TestClient
 
+from aifoundry.app.api.jobs import reset_job_manager
+from aifoundry.app.config import settings
+from aifoundry.app.core.admission import get_admission_controller, reset_admission_controller
 from aifoundry.app.main import app
 
 
@@ -35,6 +43,16 @@ class TestHealthEndpoint:
         assert "version" in data
 
 
+class TestMetricsEndpoint:
+    def test_prometheus_text(self, client):
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert "# TYPE aifoundry_agent_run_duration_seconds histogram" in resp.text
+        assert "aifoundry_admission_queued 0" in resp.text
+        assert 'aifoundry_result_cache{stat="hits"} 0' in resp.text
+
+
 class TestListAgentsEndpoint:
     def test_list_agents_returns_200(self, client):
         resp = client.get("/agents")
@@ -86,6 +104,20 @@ class TestGetAgentConfigEndpoint:
         assert "Disponibles" in data["detail"]
 
 
+class TestReloadAgentsEndpoint:
+    def test_reload_returns_200(self, client):
+        client.get("/agents")  # asegura el registro cargado
+        resp = client.post("/agents/reload")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["total"] >= 3
+        assert data["added"] == [] and data["removed"] == []
+
+    def test_force_reload_updates_all(self, client):
+        data = client.post("/agents/reload?force=true").json()
+        assert "electricity" in data["updated"]
+
+
 class TestRunAgentEndpoint:
     """Tests de validación del endpoint POST /agents/{name}/run.
     
@@ -117,6 +149,293 @@ class TestRunAgentEndpoint:
         assert resp.status_code == 422
 
 
+class TestRunAgentCache:
+    """Caché de resultados en /run con execute_run parcheado."""
+
+    _OK = {"status": "success", "output": "ok", "thread_id": "t"}
+    _BODY = {"provider": "Endesa", "country_code": "ES"}
+
+    def test_repeated_run_hits_cache(self, client):
+        with patch(
+            "aifoundry.app.api.runner.execute_run", new=AsyncMock(return_value=self._OK)
+        ) as ex:
+            first = client.post("/agents/electricity/run", json=self._BODY).json()
+            second = client.post("/agents/electricity/run", json=self._BODY).json()
+        assert ex.await_count == 1
+        assert first["cache"]["hit"] is False
+        assert second["cache"]["hit"] is True
+
+    def test_cache_only_miss_504(self, client):
+        resp = client.post("/agents/electricity/run", json={**self._BODY, "cache": "only"})
+        assert resp.status_code == 504
+
+    def test_invalid_cache_mode_422(self, client):
+        resp = client.post("/agents/electricity/run", json={**self._BODY, "cache": "sometimes"})
+        assert resp.status_code == 422
+
+
+class TestRunAgentDeadline:
+    """deadline_seconds en /run."""
+
+    _BODY = {"provider": "Endesa", "country_code": "ES"}
+
+    def test_partial_not_cached(self, client):
+        partial = {
+            "status": "partial", "output": "⏱️ Tiempo agotado", "thread_id": "t",
+            "deadline_exceeded": True,
+        }
+        body = {**self._BODY, "deadline_seconds": 5}
+        with patch(
+            "aifoundry.app.api.runner.execute_run", new=AsyncMock(return_value=partial)
+        ) as ex:
+            first = client.post("/agents/electricity/run", json=body).json()
+            client.post("/agents/electricity/run", json=body)
+        assert first["status"] == "partial"
+        assert first["deadline_exceeded"] is True
+        assert ex.await_count == 2
+
+    @pytest.mark.parametrize("value", [0, -1, 7200])
+    def test_invalid_deadline_422(self, client, value):
+        resp = client.post(
+            "/agents/electricity/run", json={**self._BODY, "deadline_seconds": value}
+        )
+        assert resp.status_code == 422
+
+
+class TestAdmissionControl:
+    """Límites de concurrencia en /run y /run/stream."""
+
+    @pytest.fixture
+    def saturated(self, monkeypatch):
+        """Un único hueco, ya ocupado, y sin cola de espera."""
+        monkeypatch.setattr(settings, "admission_max_concurrent", 1)
+        monkeypatch.setattr(settings, "admission_max_queue", 0)
+        reset_admission_controller()
+        controller = get_admission_controller()
+        ticket = asyncio.run(controller.acquire("salary"))
+        yield controller
+        ticket.release()
+
+    def test_health_reports_admission(self, client):
+        data = client.get("/health").json()
+        assert data["admission"]["running"] == 0
+        assert data["admission"]["queued"] == 0
+
+    def test_run_rejected_with_retry_after(self, client, saturated):
+        resp = client.post(
+            "/agents/electricity/run", json={"provider": "Endesa", "country_code": "ES"}
+        )
+        assert resp.status_code == 429
+        assert int(resp.headers["Retry-After"]) >= 1
+        assert client.get("/health").json()["admission"]["rejected"] == 1
+
+    def test_stream_rejected_before_opening(self, client, saturated):
+        resp = client.post(
+            "/agents/electricity/run/stream", json={"provider": "Endesa", "country_code": "ES"}
+        )
+        assert resp.status_code == 429
+        assert "Retry-After" in resp.headers
+
+    def test_stream_releases_slot(self, client):
+        async def fake_stream(prepared):
+            yield {"event": "final", "data": {"status": "success"}}
+
+        with patch("aifoundry.app.api.router.stream_run", new=fake_stream):
+            client.post(
+                "/agents/electricity/run/stream", json={"provider": "Endesa", "country_code": "ES"}
+            )
+        assert get_admission_controller().stats()["running"] == 0
+
+
+def _parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestRunAgentStreamEndpoint:
+    """SSE de /agents/{name}/run/stream con stream_run parcheado."""
+
+    @staticmethod
+    async def _fake_stream(prepared):
+        yield {"event": "step", "data": {"step": "3", "name": "BÚSQUEDA WEB"}}
+        yield {"event": "token", "data": {"delta": "Hola"}}
+        yield {"event": "final", "data": {"status": "success", "output": "Hola"}}
+
+    def test_post_stream(self, client):
+        with patch("aifoundry.app.api.router.stream_run", new=self._fake_stream):
+            resp = client.post(
+                "/agents/electricity/run/stream",
+                json={"provider": "Endesa", "country_code": "ES"},
+            )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = _parse_sse(resp.text)
+        assert [e for e, _ in events] == ["step", "token", "final"]
+        assert events[-1][1]["status"] == "success"
+
+    def test_get_stream_query_params(self, client):
+        seen = {}
+
+        async def fake_stream(prepared):
+            seen["provider"] = prepared.request.provider
+            seen["country"] = prepared.request.country_code
+            yield {"event": "final", "data": {"status": "success"}}
+
+        with patch("aifoundry.app.api.router.stream_run", new=fake_stream):
+            resp = client.get(
+                "/agents/electricity/run/stream?provider=Iberdrola&country_code=ES"
+            )
+        assert resp.status_code == 200
+        assert seen == {"provider": "Iberdrola", "country": "ES"}
+
+    def test_stream_error_event(self, client):
+        async def failing_stream(prepared):
+            yield {"event": "step", "data": {"step": "0-2", "name": "ANÁLISIS"}}
+            raise RuntimeError("LLM caído")
+
+        with patch("aifoundry.app.api.router.stream_run", new=failing_stream):
+            resp = client.post(
+                "/agents/electricity/run/stream",
+                json={"provider": "Endesa", "country_code": "ES"},
+            )
+        events = _parse_sse(resp.text)
+        assert events[-1][0] == "error"
+        assert events[-1][1]["status_code"] == 500
+
+    def test_stream_validation_errors(self, client):
+        assert client.post(
+            "/agents/nonexistent/run/stream", json={"provider": "X"}
+        ).status_code == 404
+        assert client.get(
+            "/agents/electricity/run/stream?provider=Endesa&country_code=ZZ"
+        ).status_code == 422
+        assert client.get("/agents/electricity/run/stream").status_code == 422
+
+
+@pytest.fixture
+def lifespan_client(tmp_path, monkeypatch):
+    """TestClient con lifespan (workers de jobs) y sin precalentar agentes."""
+    monkeypatch.setattr(settings, "agent_pool_min_size", 0)
+    monkeypatch.setattr(settings, "job_db_path", str(tmp_path / "jobs.db"))
+    reset_job_manager()
+    with TestClient(app) as c:
+        yield c
+    reset_job_manager()
+
+
+def _wait_job(client, job_id, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        data = client.get(f"/jobs/{job_id}").json()
+        if data["status"] == status:
+            return data
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} no llegó a {status}")
+
+
+class TestJobsEndpoints:
+    """Tests de los endpoints de jobs asíncronos (agente mockeado)."""
+
+    def test_submit_unknown_agent_404(self, lifespan_client):
+        resp = lifespan_client.post(
+            "/agents/nonexistent/jobs",
+            json={"provider": "Test", "country_code": "ES"},
+        )
+        assert resp.status_code == 404
+
+    def test_submit_invalid_country_422(self, lifespan_client):
+        resp = lifespan_client.post(
+            "/agents/electricity/jobs",
+            json={"provider": "Endesa", "country_code": "ZZ"},
+        )
+        assert resp.status_code == 422
+
+    def test_job_lifecycle(self, lifespan_client):
+        fake_result = {"status": "success", "output": "ok", "attempts": 1}
+        with patch(
+            "aifoundry.app.api.runner.execute_run", AsyncMock(return_value=fake_result)
+        ):
+            resp = lifespan_client.post(
+                "/agents/electricity/jobs",
+                json={"provider": "Endesa", "country_code": "ES"},
+            )
+            assert resp.status_code == 202
+            job = resp.json()
+            assert job["status"] in ("queued", "running", "completed")
+
+            done = _wait_job(lifespan_client, job["job_id"], "completed")
+        assert done["result"]["status"] == "success"
+        assert done["result"]["output"] == "ok"
+
+    def test_cancel_running_job(self, lifespan_client):
+        async def slow_run(prepared, admit=False):
+            import asyncio
+
+            await asyncio.sleep(30)
+
+        with patch("aifoundry.app.api.runner.execute_run", slow_run):
+            job = lifespan_client.post(
+                "/agents/electricity/jobs",
+                json={"provider": "Endesa", "country_code": "ES"},
+            ).json()
+            _wait_job(lifespan_client, job["job_id"], "running")
+
+            resp = lifespan_client.delete(f"/jobs/{job['job_id']}")
+            assert resp.status_code == 200
+            assert resp.json()["status"] == "cancelled"
+
+            # Cancelar un job terminado → 409
+            resp = lifespan_client.delete(f"/jobs/{job['job_id']}")
+            assert resp.status_code == 409
+
+    def test_unknown_job_404(self, lifespan_client):
+        assert lifespan_client.get("/jobs/nope").status_code == 404
+        assert lifespan_client.delete("/jobs/nope").status_code == 404
+
+
+class TestBatchEndpoints:
+    """Batch provider × país con execute_run parcheado."""
+
+    _OK = {"status": "success", "output": "ok", "thread_id": "t"}
+
+    def test_unknown_agent_404(self, client):
+        resp = client.post("/batch", json={"agents": ["nonexistent"]})
+        assert resp.status_code == 404
+
+    def test_batch_returns_results_and_summary(self, client):
+        with patch(
+            "aifoundry.app.api.runner.execute_run", new=AsyncMock(return_value=self._OK)
+        ):
+            resp = client.post(
+                "/batch", json={"agents": ["electricity"], "countries": ["ES", "PT"]}
+            )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert len(data["results"]) == 6
+        assert data["summary"]["succeeded"] == 6
+        assert data["summary"]["by_agent"] == {"electricity": {"success": 6}}
+
+    def test_stream_ndjson(self, client):
+        with patch(
+            "aifoundry.app.api.runner.execute_run", new=AsyncMock(return_value=self._OK)
+        ):
+            resp = client.post(
+                "/batch/stream", json={"agents": ["electricity"], "countries": ["FR"]}
+            )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in resp.text.splitlines() if line]
+        assert [e["event"] for e in events] == ["cell", "cell", "cell", "summary"]
+        assert events[-1]["data"]["total"] == 3
+
+    def test_stream_unknown_agent_404(self, client):
+        resp = client.post("/batch/stream", json={"agents": ["nonexistent"]})
+        assert resp.status_code == 404
+
+
 class TestRootEndpoint:
     def test_root_returns_200(self, client):
         resp = client.get("/")
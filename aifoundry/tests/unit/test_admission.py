@@ -0,0 +1,115 @@
+"""
+Tests para core/admission.py — AdmissionController.
+"""
+
+import asyncio
+
+import pytest
+
+from aifoundry.app.core.admission import (
+    AdmissionController,
+    AdmissionRejectedError,
+    AdmissionTimeoutError,
+    get_admission_controller,
+    reset_admission_controller,
+)
+
+
+class TestAdmissionController:
+    async def test_admits_up_to_global_limit(self):
+        controller = AdmissionController(max_concurrent=2, per_agent_concurrent=0, max_queue=0)
+        t1 = await controller.acquire("a")
+        t2 = await controller.acquire("b")
+        with pytest.raises(AdmissionRejectedError) as exc:
+            await controller.acquire("c")
+        assert exc.value.status_code == 429
+        assert exc.value.retry_after >= 1
+        assert controller.stats()["rejected"] == 1
+
+        t1.release()
+        t1.release()  # idempotente
+        assert controller.stats()["running"] == 1
+        t2.release()
+
+    async def test_per_agent_limit_does_not_block_other_agents(self):
+        controller = AdmissionController(max_concurrent=4, per_agent_concurrent=1, max_queue=4)
+        await controller.acquire("electricity")
+
+        waiter = asyncio.create_task(controller.acquire("electricity"))
+        await asyncio.sleep(0.01)
+        assert controller.stats()["queued"] == 1
+
+        # Otro agente entra aunque haya alguien en cola
+        other = await asyncio.wait_for(controller.acquire("salary"), timeout=0.5)
+        assert controller.stats()["running_by_agent"] == {"electricity": 1, "salary": 1}
+        other.release()
+        waiter.cancel()
+
+    async def test_waiter_admitted_on_release_fifo(self):
+        controller = AdmissionController(max_concurrent=1, max_queue=2, max_wait_seconds=2)
+        first = await controller.acquire("a")
+
+        order = []
+
+        async def wait(name):
+            ticket = await controller.acquire(name)
+            order.append(name)
+            return ticket
+
+        w1 = asyncio.create_task(wait("b"))
+        await asyncio.sleep(0.01)
+        w2 = asyncio.create_task(wait("c"))
+        await asyncio.sleep(0.01)
+        assert controller.stats()["queued"] == 2
+
+        first.release()
+        t_b = await w1
+        assert order == ["b"]
+        t_b.release()
+        t_c = await w2
+        assert order == ["b", "c"]
+        assert t_c.wait_seconds > 0
+        assert controller.stats()["wait_seconds_max"] > 0
+
+    async def test_wait_timeout_503(self):
+        controller = AdmissionController(max_concurrent=1, max_queue=1, max_wait_seconds=0.05)
+        await controller.acquire("a")
+        with pytest.raises(AdmissionTimeoutError) as exc:
+            await controller.acquire("a")
+        assert exc.value.status_code == 503
+        stats = controller.stats()
+        assert stats["queued"] == 0
+        assert stats["timed_out"] == 1
+
+    async def test_per_call_max_wait_bounded_by_deadline(self):
+        controller = AdmissionController(max_concurrent=1, max_queue=1, max_wait_seconds=30)
+        await controller.acquire("a")
+        started = asyncio.get_running_loop().time()
+        with pytest.raises(AdmissionTimeoutError):
+            await controller.acquire("a", max_wait_seconds=0.05)
+        assert asyncio.get_running_loop().time() - started < 1
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        controller = AdmissionController(max_concurrent=1, max_queue=1, max_wait_seconds=5)
+        ticket = await controller.acquire("a")
+        waiter = asyncio.create_task(controller.acquire("a"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.stats()["queued"] == 0
+
+        ticket.release()
+        assert controller.stats()["running"] == 0
+
+    async def test_admit_context_manager_releases_on_error(self):
+        controller = AdmissionController(max_concurrent=1)
+        with pytest.raises(RuntimeError):
+            async with controller.admit("a"):
+                raise RuntimeError("boom")
+        assert controller.stats()["running"] == 0
+
+    def test_singleton(self):
+        reset_admission_controller()
+        assert get_admission_controller() is get_admission_controller()
+        reset_admission_controller()
@@ -0,0 +1,205 @@
+"""
+Tests para core/agents/scraper/pool.py — AgentPool / AgentPoolManager.
+
+Usa agentes fake (sin LLM ni MCP).
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from aifoundry.app.core.agents.scraper.agent import ScraperAgent
+from aifoundry.app.core.agents.scraper.pool import (
+    AgentPool,
+    AgentPoolManager,
+    PoolExhaustedError,
+    get_agent_pool_manager,
+    reset_agent_pool_manager,
+)
+
+KEY = ("electricity", True, False, None)
+
+
+def _fake_agent(healthy: bool = True) -> MagicMock:
+    agent = MagicMock()
+    agent.initialize = AsyncMock()
+    agent.cleanup = AsyncMock()
+    agent.health_check = AsyncMock(return_value=healthy)
+    agent.reset_run_state = MagicMock()
+    return agent
+
+
+class _Factory:
+    """Factory que registra los agentes creados."""
+
+    def __init__(self, healthy: bool = True):
+        self.created = []
+        self.healthy = healthy
+
+    def __call__(self, key):
+        agent = _fake_agent(self.healthy)
+        self.created.append(agent)
+        return agent
+
+
+class TestAgentPool:
+    def test_invalid_sizes(self):
+        with pytest.raises(ValueError):
+            AgentPool(KEY, min_size=3, max_size=2)
+
+    async def test_checkout_reuses_agent(self):
+        factory = _Factory()
+        pool = AgentPool(KEY, max_size=2, agent_factory=factory)
+
+        async with pool.checkout() as a1:
+            pass
+        async with pool.checkout() as a2:
+            pass
+
+        assert a1 is a2
+        assert len(factory.created) == 1
+        a1.initialize.assert_awaited_once()
+        assert a1.reset_run_state.call_count == 2
+
+    async def test_creates_up_to_max(self):
+        factory = _Factory()
+        pool = AgentPool(KEY, max_size=2, agent_factory=factory)
+
+        a1 = await pool.acquire()
+        a2 = await pool.acquire()
+        assert a1 is not a2
+        assert pool.stats() == {"size": 2, "idle": 0, "in_use": 2, "waiting": 0}
+
+    async def test_exhausted_raises_after_timeout(self):
+        pool = AgentPool(KEY, max_size=1, checkout_timeout=0.05, agent_factory=_Factory())
+        await pool.acquire()
+        with pytest.raises(PoolExhaustedError):
+            await pool.acquire()
+
+    async def test_waiter_gets_released_agent(self):
+        pool = AgentPool(KEY, max_size=1, checkout_timeout=2, agent_factory=_Factory())
+        a1 = await pool.acquire()
+
+        waiter = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0.01)
+        assert pool.stats()["waiting"] == 1
+
+        await pool.release(a1)
+        assert await waiter is a1
+
+    async def test_failed_run_recycles_unhealthy_agent(self):
+        factory = _Factory(healthy=False)
+        pool = AgentPool(KEY, max_size=1, agent_factory=factory)
+
+        with pytest.raises(RuntimeError):
+            async with pool.checkout():
+                raise RuntimeError("boom")
+
+        factory.created[0].cleanup.assert_awaited_once()
+        assert pool.stats()["size"] == 0
+
+    async def test_failed_run_keeps_healthy_agent(self):
+        factory = _Factory(healthy=True)
+        pool = AgentPool(KEY, max_size=1, agent_factory=factory)
+
+        with pytest.raises(RuntimeError):
+            async with pool.checkout():
+                raise RuntimeError("boom")
+
+        assert pool.stats()["idle"] == 1
+
+    async def test_creation_failure_frees_slot(self):
+        def broken_factory(key):
+            agent = _fake_agent()
+            agent.initialize.side_effect = Exception("MCP down")
+            return agent
+
+        pool = AgentPool(KEY, max_size=1, agent_factory=broken_factory)
+        with pytest.raises(Exception, match="MCP down"):
+            await pool.acquire()
+        assert pool.stats()["size"] == 0
+
+    async def test_fill_and_health_check(self):
+        factory = _Factory()
+        pool = AgentPool(KEY, min_size=2, max_size=3, agent_factory=factory)
+        await pool.fill()
+        assert pool.stats()["idle"] == 2
+
+        factory.created[0].health_check.return_value = False
+        recycled = await pool.health_check()
+
+        assert recycled == 1
+        # Se repone hasta min_size
+        assert pool.stats()["idle"] == 2
+        assert len(factory.created) == 3
+
+    async def test_close_discards_idle(self):
+        factory = _Factory()
+        pool = AgentPool(KEY, min_size=1, max_size=1, agent_factory=factory)
+        await pool.fill()
+        await pool.close()
+        factory.created[0].cleanup.assert_awaited_once()
+        with pytest.raises(PoolExhaustedError):
+            await pool.acquire()
+
+
+class TestAgentPoolManager:
+    async def test_pool_per_key(self):
+        manager = AgentPoolManager(agent_factory=_Factory())
+        p1 = manager.get_pool("electricity")
+        assert manager.get_pool("electricity") is p1
+        assert manager.get_pool("electricity", use_mcp=False) is not p1
+        assert manager.get_pool("salary") is not p1
+
+    async def test_warmup_and_stats(self):
+        manager = AgentPoolManager(min_size=1, max_size=2, agent_factory=_Factory())
+        await manager.warmup(["electricity", "salary"])
+        stats = manager.stats()
+        assert len(stats) == 2
+        assert all(s["idle"] == 1 for s in stats.values())
+        await manager.close()
+        assert manager.stats() == {}
+
+    def test_loop_change_cleans_up_previous_agents(self):
+        factory = _Factory()
+        manager = AgentPoolManager(min_size=1, max_size=2, agent_factory=factory)
+
+        async def warm():
+            await manager.warmup(["electricity"])
+
+        async def use_new_loop():
+            manager.get_pool("electricity")
+            await manager.close()
+
+        # Dos event loops, como dos requests de TestClient
+        asyncio.run(warm())
+        old_pool = next(iter(manager._pools.values()))
+        asyncio.run(use_new_loop())
+
+        factory.created[0].cleanup.assert_awaited_once()
+        assert old_pool.stats()["size"] == 0
+
+    def test_singleton(self):
+        reset_agent_pool_manager()
+        assert get_agent_pool_manager() is get_agent_pool_manager()
+        reset_agent_pool_manager()
+
+
+class TestScraperAgentReuse:
+    @patch("aifoundry.app.core.agents.scraper.agent.create_agent")
+    @patch("aifoundry.app.core.agents.scraper.agent.get_llm")
+    async def test_reset_run_state_keeps_compiled_graph(self, mock_get_llm, mock_create_agent):
+        mock_get_llm.return_value = MagicMock()
+        mock_create_agent.return_value = MagicMock()
+
+        agent = ScraperAgent(use_mcp=False, verbose=False)
+        await agent.initialize()
+        old_thread = agent.thread_id
+
+        agent.reset_run_state()
+
+        assert agent.thread_id != old_thread
+        assert agent.is_initialized
+        assert await agent.health_check() is True
+        mock_create_agent.assert_called_once()
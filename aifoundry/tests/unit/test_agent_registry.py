@@ -0,0 +1,130 @@
+"""
+Tests para core/agents/registry.py — AgentRegistry.
+"""
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from aifoundry.app.core.agents.registry import (
+    AGENTS_DIR,
+    AgentRegistry,
+    get_agent_registry,
+    reset_agent_registry,
+)
+
+
+def _write_config(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data))
+
+
+def _bump_mtime(path):
+    """Fuerza un mtime distinto (algunos FS tienen resolución gruesa)."""
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+
+@pytest.fixture
+def agents_dir(tmp_path, minimal_agent_config_dict):
+    _write_config(tmp_path / "alpha" / "config.json", minimal_agent_config_dict)
+    _write_config(
+        tmp_path / "beta" / "config.json",
+        {
+            **minimal_agent_config_dict,
+            "product": "beta_product",
+            "countries": {"ES": {"language": "es", "providers": ["A", "B"]}},
+        },
+    )
+    return tmp_path
+
+
+class TestAgentRegistryLoad:
+    def test_loads_valid_configs(self, agents_dir):
+        registry = AgentRegistry(agents_dir)
+        assert registry.names() == ["alpha", "beta"]
+        entry = registry.get("beta")
+        assert entry.product == "beta_product"
+        assert entry.countries == ["ES"]
+        assert entry.providers_by_country == {"ES": ["A", "B"]}
+
+    def test_unknown_agent_none(self, agents_dir):
+        assert AgentRegistry(agents_dir).get("nope") is None
+
+    def test_invalid_config_skipped(self, agents_dir):
+        _write_config(agents_dir / "broken" / "config.json", {"product": ""})
+        registry = AgentRegistry(agents_dir)
+        assert "broken" not in registry
+        assert len(registry) == 2
+
+    def test_underscore_dirs_ignored(self, agents_dir, minimal_agent_config_dict):
+        _write_config(agents_dir / "_internal" / "config.json", minimal_agent_config_dict)
+        assert "_internal" not in AgentRegistry(agents_dir)
+
+    def test_missing_dir_empty(self, tmp_path):
+        assert len(AgentRegistry(tmp_path / "missing")) == 0
+
+    def test_lookups_do_not_touch_disk(self, agents_dir):
+        registry = AgentRegistry(agents_dir)
+        registry.load()
+        with patch.object(registry, "_scan", side_effect=AssertionError("disk scan")):
+            assert registry.get("alpha") is not None
+            assert len(registry) == 2
+
+
+class TestAgentRegistryRefresh:
+    def test_unchanged_files_not_reparsed(self, agents_dir):
+        registry = AgentRegistry(agents_dir)
+        registry.load()
+        with patch.object(registry, "_load_entry") as mock_load:
+            changes = registry.refresh()
+        mock_load.assert_not_called()
+        assert changes == {"added": [], "updated": [], "removed": []}
+
+    def test_changed_file_reloaded(self, agents_dir, minimal_agent_config_dict):
+        registry = AgentRegistry(agents_dir)
+        registry.load()
+        path = agents_dir / "alpha" / "config.json"
+        _write_config(path, {**minimal_agent_config_dict, "product": "alpha_v2"})
+        _bump_mtime(path)
+
+        changes = registry.refresh()
+        assert changes["updated"] == ["alpha"]
+        assert registry.get("alpha").product == "alpha_v2"
+
+    def test_added_and_removed(self, agents_dir, minimal_agent_config_dict):
+        registry = AgentRegistry(agents_dir)
+        registry.load()
+        (agents_dir / "beta" / "config.json").unlink()
+        _write_config(agents_dir / "gamma" / "config.json", minimal_agent_config_dict)
+
+        changes = registry.refresh()
+        assert changes["added"] == ["gamma"]
+        assert changes["removed"] == ["beta"]
+        assert registry.names() == ["alpha", "gamma"]
+
+    def test_force_reparses_all(self, agents_dir):
+        registry = AgentRegistry(agents_dir)
+        registry.load()
+        changes = registry.refresh(force=True)
+        assert sorted(changes["updated"]) == ["alpha", "beta"]
+
+    def test_auto_reload_interval(self, agents_dir, minimal_agent_config_dict):
+        registry = AgentRegistry(agents_dir, auto_reload_seconds=0.01)
+        registry.load()
+        _write_config(agents_dir / "gamma" / "config.json", minimal_agent_config_dict)
+        registry._last_check -= 1  # simula que pasó el intervalo
+        assert "gamma" in registry
+
+
+class TestAgentRegistrySingleton:
+    def test_singleton(self):
+        reset_agent_registry()
+        assert get_agent_registry() is get_agent_registry()
+        reset_agent_registry()
+
+    def test_real_agents_dir(self):
+        registry = AgentRegistry(AGENTS_DIR)
+        assert {"electricity", "salary", "social_comments"} <= set(registry.names())
@@ -0,0 +1,142 @@
+"""
+Tests para api/batch.py — expansión de la matriz y ejecución acotada.
+
+execute_run se parchea: no se ejecuta ningún agente real.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from aifoundry.app.api.batch import expand_matrix, iter_batch, run_batch, summarize_batch
+from aifoundry.app.api.schemas import BatchCellResult, BatchRunRequest
+
+
+def _ok_result(**extra):
+    return {"status": "success", "output": "ok", "thread_id": "t", **extra}
+
+
+class TestExpandMatrix:
+    def test_single_agent_full_matrix(self):
+        cells = expand_matrix(BatchRunRequest(agents=["electricity"]))
+        assert len(cells) == 9
+        assert ("electricity", "ES", "Endesa") in cells
+        assert ("electricity", "FR", "EDF") in cells
+
+    def test_filters(self):
+        cells = expand_matrix(
+            BatchRunRequest(agents=["electricity"], countries=["PT"], providers=["Endesa", "EDF"])
+        )
+        assert cells == [("electricity", "PT", "Endesa")]
+
+    def test_skips_countries_without_providers(self):
+        assert expand_matrix(BatchRunRequest(agents=["social_comments"])) == []
+
+    def test_all_agents_by_default(self):
+        agents = {cell[0] for cell in expand_matrix(BatchRunRequest())}
+        assert {"electricity", "salary"} <= agents
+        assert "social_comments" not in agents
+
+    def test_unknown_agent_404(self):
+        with pytest.raises(HTTPException) as exc:
+            expand_matrix(BatchRunRequest(agents=["nonexistent"]))
+        assert exc.value.status_code == 404
+
+
+class TestIterBatch:
+    async def test_respects_concurrency_limits(self):
+        active = {"total": 0, "max_total": 0}
+        per_agent = {}
+
+        async def fake_execute(prepared, admit=False):
+            name = prepared.agent_name
+            active["total"] += 1
+            per_agent.setdefault(name, [0, 0])
+            per_agent[name][0] += 1
+            active["max_total"] = max(active["max_total"], active["total"])
+            per_agent[name][1] = max(per_agent[name][1], per_agent[name][0])
+            await asyncio.sleep(0.01)
+            active["total"] -= 1
+            per_agent[name][0] -= 1
+            return _ok_result()
+
+        request = BatchRunRequest(
+            agents=["electricity", "salary"], max_concurrency=3, per_agent_concurrency=2
+        )
+        with patch("aifoundry.app.api.runner.execute_run", side_effect=fake_execute):
+            results = [cell async for cell in iter_batch(request)]
+
+        assert len(results) == 9 + 12
+        assert active["max_total"] <= 3
+        assert all(peak <= 2 for _, peak in per_agent.values())
+
+    async def test_failed_cell_does_not_abort_batch(self):
+        async def fake_execute(prepared, admit=False):
+            if prepared.request.provider == "Iberdrola":
+                raise RuntimeError("LLM caído")
+            return _ok_result()
+
+        request = BatchRunRequest(agents=["electricity"], countries=["ES"])
+        with patch("aifoundry.app.api.runner.execute_run", side_effect=fake_execute):
+            response = await run_batch(request)
+
+        by_provider = {c.provider: c for c in response.results}
+        assert by_provider["Iberdrola"].status == "error"
+        assert "LLM caído" in by_provider["Iberdrola"].error
+        assert by_provider["Endesa"].status == "success"
+        assert response.summary.total == 3
+        assert response.summary.succeeded == 2
+        assert response.summary.failed == 1
+
+    async def test_results_stream_in_completion_order(self):
+        delays = {"Endesa": 0.05, "Iberdrola": 0.0, "Naturgy": 0.02}
+
+        async def fake_execute(prepared, admit=False):
+            await asyncio.sleep(delays[prepared.request.provider])
+            return _ok_result()
+
+        request = BatchRunRequest(agents=["electricity"], countries=["ES"], max_concurrency=3)
+        with patch("aifoundry.app.api.runner.execute_run", side_effect=fake_execute):
+            order = [cell.provider async for cell in iter_batch(request)]
+
+        assert order == ["Iberdrola", "Naturgy", "Endesa"]
+
+
+class TestSummarizeBatch:
+    def _cell(self, agent, status, duration, error=None):
+        return BatchCellResult(
+            agent_name=agent,
+            country_code="ES",
+            provider="X",
+            status=status,
+            duration_seconds=duration,
+            queued_seconds=0.0,
+            error=error,
+        )
+
+    def test_summary_math(self):
+        results = [
+            self._cell("electricity", "success", 1.0),
+            self._cell("electricity", "partial", 3.0),
+            self._cell("salary", "error", 2.0, error="boom"),
+        ]
+        summary = summarize_batch(results, 3.5)
+        assert summary.total == 3
+        assert summary.succeeded == 1
+        assert summary.partial == 1
+        assert summary.failed == 1
+        assert summary.cell_seconds_avg == 2.0
+        assert summary.cell_seconds_max == 3.0
+        assert summary.duration_seconds == 3.5
+        assert summary.by_agent == {
+            "electricity": {"success": 1, "partial": 1},
+            "salary": {"error": 1},
+        }
+
+    def test_empty(self):
+        summary = summarize_batch([], 0.0)
+        assert summary.total == 0
+        assert summary.cell_seconds_avg == 0.0
+        assert summary.cell_seconds_max == 0.0
@@ -0,0 +1,120 @@
+"""
+Tests para utils/condense.py — condensado de páginas por relevancia.
+"""
+
+from pathlib import Path
+
+from aifoundry.app.utils.condense import (
+    CHARS_PER_TOKEN,
+    PageFocus,
+    condense_markdown,
+    current_focus,
+    estimate_tokens,
+    focus_scope,
+    score_block,
+    split_blocks,
+)
+
+PAGES_DIR = Path(__file__).resolve().parent.parent / "fixtures" / "pages"
+
+FOCUS = PageFocus(["electricidad", "Endesa", "España"], token_budget=300, secondary=["tarifa"])
+
+NAV = "\n".join(f"[Menú {i}](https://endesa.com/{i})" for i in range(60))
+COOKIES = "Usamos cookies propias y de terceros. Aceptar | Rechazar | Política de privacidad"
+TABLE = "\n".join(
+    ["| Tarifa | Energía | Potencia |", "|---|---|---|"]
+    + [f"| Tarifa {i} Endesa | 0,1{i}9 €/kWh | 0,0{i}5 €/kW día |" for i in range(10)]
+)
+PAGE = f"{NAV}\n{COOKIES}\n# Luz para tu hogar\nBienvenido.\n## Precios Endesa\n{TABLE}\n## Contacto\nLlámanos."
+
+
+class TestSplitBlocks:
+    def test_headings_open_sections(self):
+        blocks = split_blocks("intro\n# A\ntexto a\n## B\ntexto b")
+        assert [b.text for b in blocks] == ["intro", "# A\ntexto a", "## B\ntexto b"]
+        assert blocks[2].heading == "## B"
+
+    def test_large_tables_repeat_header(self):
+        blocks = [b for b in split_blocks(TABLE, block_chars=150)]
+        assert len(blocks) > 1
+        for block in blocks:
+            assert block.text.startswith("| Tarifa | Energía | Potencia |\n|---|---|---|")
+
+    def test_long_sections_split(self):
+        text = "\n".join(["línea de texto " * 5] * 40)
+        blocks = split_blocks(text, block_chars=300)
+        assert len(blocks) > 5
+        assert "\n".join(b.text for b in blocks) == text
+
+
+class TestScoreBlock:
+    def test_prices_and_keywords_beat_navigation(self):
+        assert score_block(TABLE, FOCUS) > 10 * max(score_block(NAV, FOCUS), 0.1)
+
+    def test_cookie_banner_penalized(self):
+        assert score_block(COOKIES + " Endesa", FOCUS) < score_block("Ofertas Endesa", FOCUS)
+
+    def test_accents_ignored(self):
+        assert score_block("Tarifas en espana", FOCUS) == score_block("Tarifas en España", FOCUS)
+
+
+class TestCondenseMarkdown:
+    def test_short_text_unchanged(self):
+        assert condense_markdown("# Hola\n0,15 €", focus=FOCUS) == "# Hola\n0,15 €"
+
+    def test_keeps_price_table_within_budget(self):
+        output = condense_markdown(PAGE, focus=FOCUS)
+        assert "0,109 €/kWh" in output
+        assert "[Menú 0]" not in output
+        assert estimate_tokens(output) <= FOCUS.token_budget
+        # Cabecera de la sección como contexto y marcas de omisión
+        assert "## Precios Endesa" in output
+        assert output.startswith("[…]")
+
+    def test_original_order(self):
+        page = f"{TABLE}\n{NAV}\n## Resumen\nEndesa España electricidad 0,15 €/kWh"
+        output = condense_markdown(page, token_budget=400, focus=FOCUS)
+        assert output.index("Tarifa 0 Endesa") < output.index("## Resumen")
+
+    def test_budget_argument_overrides_focus(self):
+        output = condense_markdown(PAGE, token_budget=100, focus=FOCUS)
+        assert len(output) <= 100 * CHARS_PER_TOKEN
+
+    def test_nothing_relevant_falls_back_to_head(self):
+        text = "palabras sin cifras " * 500
+        output = condense_markdown(text, token_budget=50, focus=FOCUS)
+        assert output == text[: 50 * CHARS_PER_TOKEN] + "..."
+
+    def test_uses_current_focus(self):
+        with focus_scope(FOCUS):
+            assert current_focus() is FOCUS
+            assert "0,109 €/kWh" in condense_markdown(PAGE)
+        assert current_focus() is None
+
+    def test_fixture_page_keeps_price(self):
+        from aifoundry.app.utils.simple_scraper import _build_result
+
+        html = (PAGES_DIR / "utility_tariffs.html").read_text(encoding="utf-8")
+        markdown = _build_result(html, "https://www.example.es/tarifas", 200, ["markdown"], False)["data"]["markdown"]
+        focus = PageFocus(["electricidad", "España"], token_budget=800)
+        assert "0,149" not in markdown[: 800 * CHARS_PER_TOKEN]
+        assert "0,149" in condense_markdown(markdown, focus=focus)
+
+
+class TestPageFocus:
+    def test_from_run_config(self):
+        config = {
+            "product": "electricidad",
+            "provider": "Endesa",
+            "query": "precio electricidad Endesa España febrero 2026 tarifa",
+            "page_token_budget": 3000,
+        }
+        focus = PageFocus.from_run_config(config, "España", default_budget=2500)
+        assert focus.keywords == ["electricidad", "endesa", "espana"]
+        assert focus.secondary == ["tarifa"]
+        assert focus.token_budget == 3000
+
+    def test_default_budget_and_empty_provider(self):
+        focus = PageFocus.from_run_config({"product": "salarios", "provider": ""}, "Francia", 2500)
+        assert focus.keywords == ["salarios", "francia"]
+        assert focus.token_budget == 2500
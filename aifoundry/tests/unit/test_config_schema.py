@@ -74,6 +74,14 @@ class TestAgentConfigValid:
         assert cfg.system_prompt_template == "Custom: {product}"
 
 
+    def test_page_token_budget(self, minimal_agent_config_dict):
+        assert AgentConfig(**minimal_agent_config_dict).page_token_budget is None
+        cfg = AgentConfig(**minimal_agent_config_dict, page_token_budget=3000)
+        assert cfg.page_token_budget == 3000
+        with pytest.raises(ValidationError, match="page_token_budget"):
+            AgentConfig(**minimal_agent_config_dict, page_token_budget=10)
+
+
 class TestAgentConfigHelpers:
     def test_get_providers_unknown_country(self, minimal_agent_config_dict):
         cfg = AgentConfig(**minimal_agent_config_dict)
@@ -0,0 +1,81 @@
+"""
+Tests para utils/content_extractor.py — extracción por densidad de texto/enlaces.
+"""
+
+from pathlib import Path
+
+from aifoundry.app.utils.content_extractor import extract_main_content
+from aifoundry.app.utils.simple_scraper import _parse_html
+
+PAGES_DIR = Path(__file__).resolve().parent.parent / "fixtures" / "pages"
+
+NAV = "<nav>" + "".join(f'<a href="/{i}">Sección {i}</a>' for i in range(40)) + "</nav>"
+ARTICLE = "".join(
+    f"<p>La tarifa {i} de electricidad cuesta 0,1{i}9 €/kWh, con potencia de 0,0{i}5 €/kW día, "
+    f"según la comparativa publicada este mes por la compañía.</p>"
+    for i in range(10)
+)
+
+
+def _extract(html: str):
+    return extract_main_content(_parse_html(html))
+
+
+def _text(content) -> str:
+    return content.text_content()
+
+
+class TestExtractMainContent:
+
+    def test_picks_article_over_navigation(self):
+        content, quality = _extract(
+            f"<html><body>{NAV}<div class='sidebar'><a href='/x'>Ofertas</a></div>"
+            f"<div id='content'>{ARTICLE}</div><footer>Aviso legal</footer></body></html>"
+        )
+        text = _text(content)
+        assert "0,109 €/kWh" in text and "0,199 €/kWh" in text
+        assert "Sección 3" not in text and "Aviso legal" not in text
+        assert quality >= 0.5
+
+    def test_merges_sibling_blocks(self):
+        half = len(ARTICLE) // 2
+        split = ARTICLE.index("<p>", half)
+        content, _ = _extract(
+            f"<html><body><main><div>{ARTICLE[:split]}</div><div>{ARTICLE[split:]}</div></main></body></html>"
+        )
+        text = _text(content)
+        assert "0,109 €/kWh" in text and "0,199 €/kWh" in text
+
+    def test_price_table_cells_count(self):
+        rows = "".join(f"<tr><td>Tarifa {i}</td><td>0,1{i}9 €/kWh</td></tr>" for i in range(30))
+        content, _ = _extract(f"<html><body>{NAV}<table>{rows}</table></body></html>")
+        assert content is not None
+        assert "0,129 €/kWh" in _text(content)
+
+    def test_link_heavy_page_has_low_quality(self):
+        listing = "<ul>" + "".join(
+            f'<li><a href="/p/{i}">Producto número {i} de la colección de invierno</a></li>' for i in range(50)
+        ) + "</ul>"
+        _, quality = _extract(f"<html><body>{listing}</body></html>")
+        assert quality < 0.5
+
+    def test_too_little_text(self):
+        assert _extract("<html><body><p>Hola</p></body></html>") == (None, 0.0)
+        assert _extract("") == (None, 0.0)
+
+    def test_utility_fixture(self):
+        content, quality = _extract((PAGES_DIR / "utility_tariffs.html").read_text(encoding="utf-8"))
+        text = _text(content)
+        assert quality >= 0.5
+        assert "0,149" in text
+        assert "window.__DATA_" not in text
+
+    def test_news_fixture(self):
+        content, quality = _extract((PAGES_DIR / "news_article.html").read_text(encoding="utf-8"))
+        assert quality >= 0.5
+        assert content.find(".//article") is not None
+        assert content.find(".//nav") is None
+
+    def test_retailer_fixture_falls_below_threshold(self):
+        _, quality = _extract((PAGES_DIR / "retailer_listing.html").read_text(encoding="utf-8"))
+        assert quality < 0.5
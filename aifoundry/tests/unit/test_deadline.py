@@ -0,0 +1,97 @@
+"""
+Tests para utils/deadline.py — presupuesto de tiempo por contextvars.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from aifoundry.app.core.agents.scraper.tools import simple_scrape_url
+from aifoundry.app.utils.deadline import (
+    Deadline,
+    DeadlineExceededError,
+    current_deadline,
+    deadline_scope,
+    remaining_timeout,
+    within_deadline,
+)
+
+
+class TestDeadline:
+    def test_remaining_and_expired(self):
+        deadline = Deadline(10)
+        assert 9 < deadline.remaining() <= 10
+        assert not deadline.expired
+
+        past = Deadline(0)
+        assert past.remaining() == 0.0
+        assert past.expired
+
+    def test_scope_sets_and_restores(self):
+        assert current_deadline() is None
+        outer = Deadline(10)
+        with deadline_scope(outer):
+            assert current_deadline() is outer
+            with deadline_scope(None):
+                assert current_deadline() is None
+            assert current_deadline() is outer
+        assert current_deadline() is None
+
+    def test_remaining_timeout(self):
+        assert remaining_timeout(30.0) == 30.0
+        assert remaining_timeout() is None
+        with deadline_scope(Deadline(5)):
+            assert remaining_timeout(30.0) <= 5
+            assert remaining_timeout(1.0) == 1.0
+            assert remaining_timeout() <= 5
+
+    async def test_scope_inherited_by_tasks_and_threads(self):
+        with deadline_scope(Deadline(5)):
+            in_task = await asyncio.create_task(asyncio.sleep(0, result=current_deadline()))
+            in_thread = await asyncio.to_thread(current_deadline)
+        assert in_task is not None
+        assert in_thread is in_task
+
+
+class TestWithinDeadline:
+    async def test_no_deadline_passthrough(self):
+        assert await within_deadline(asyncio.sleep(0, result="ok")) == "ok"
+
+    async def test_expires(self):
+        with deadline_scope(Deadline(0.05)):
+            with pytest.raises(DeadlineExceededError) as exc:
+                await within_deadline(asyncio.sleep(5), stage="llm")
+        assert "llm" in str(exc.value)
+
+    async def test_inner_timeout_propagates(self):
+        async def inner():
+            raise TimeoutError("httpx timeout")
+
+        with deadline_scope(Deadline(5)):
+            with pytest.raises(TimeoutError) as exc:
+                await within_deadline(inner())
+        assert not isinstance(exc.value, DeadlineExceededError)
+
+
+class TestSimpleScrapeUrlDeadline:
+    async def test_timeout_clamped_to_deadline(self):
+        captured = {}
+
+        async def fake_scrape(url, formats, timeout=30.0):
+            captured["timeout"] = timeout
+            return {"success": False, "error": "boom"}
+
+        with patch("aifoundry.app.core.agents.scraper.tools._simple_scrape", fake_scrape):
+            with deadline_scope(Deadline(2)):
+                await simple_scrape_url.ainvoke({"url": "https://a.com"})
+
+        assert captured["timeout"] <= 2
+
+    async def test_expired_deadline_skips_fetch(self):
+        with patch("aifoundry.app.core.agents.scraper.tools._simple_scrape") as mock_scrape:
+            with deadline_scope(Deadline(0)):
+                output = await simple_scrape_url.ainvoke({"url": "https://a.com"})
+
+        mock_scrape.assert_not_called()
+        assert "Tiempo agotado" in output
@@ -0,0 +1,183 @@
+"""
+Tests para utils/domain_profile.py — perfil persistente por dominio.
+"""
+
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from aifoundry.app.config import settings
+from aifoundry.app.utils import domain_profile
+from aifoundry.app.utils.domain_profile import (
+    FETCHER_BROWSER,
+    FETCHER_SIMPLE,
+    REASON_BLOCKED,
+    REASON_CONNECTION,
+    REASON_DEADLINE,
+    REASON_HTTP,
+    REASON_NEEDS_JS,
+    REASON_OTHER,
+    REASON_TIMEOUT,
+    ROUTE_BROWSER,
+    ROUTE_DEAD,
+    ROUTE_SIMPLE,
+    DomainProfileStore,
+    classify_failure,
+    domain_of,
+    get_domain_profiles,
+    reset_domain_profiles,
+)
+
+
+@pytest.fixture
+def store():
+    store = DomainProfileStore(":memory:", js_after=2, dead_after=3)
+    yield store
+    store.close()
+
+
+class TestHelpers:
+
+    def test_domain_of(self):
+        assert domain_of("https://www.Endesa.com/tarifas?x=1") == "endesa.com"
+        assert domain_of(" http://tienda.endesa.com:8080/ ") == "tienda.endesa.com"
+        assert domain_of("no es una url") is None
+
+    def test_classify_failure(self):
+        assert classify_failure("HTTP 403: Forbidden") == REASON_BLOCKED
+        assert classify_failure("HTTP 401: Unauthorized") == REASON_BLOCKED
+        assert classify_failure("HTTP 404: Not Found") == REASON_HTTP
+        assert classify_failure("Timeout después de 30s") == REASON_TIMEOUT
+        assert classify_failure("Error de conexión: [Errno -2] Name or service not known") == REASON_CONNECTION
+        assert classify_failure("Contenido no HTML (application/pdf): no es una página web") == REASON_OTHER
+
+
+class TestRouting:
+
+    def test_unknown_domain_is_simple(self, store):
+        assert store.route("https://nuevo.com") == ROUTE_SIMPLE
+        assert store.get("https://nuevo.com") is None
+
+    def test_blocked_or_empty_pages_route_to_browser(self, store):
+        store.record("https://spa.com/a", FETCHER_SIMPLE, False, 0.2, REASON_BLOCKED)
+        assert store.route("https://spa.com/b") == ROUTE_SIMPLE
+        store.record("https://www.spa.com/c", FETCHER_SIMPLE, False, 0.2, REASON_NEEDS_JS)
+        assert store.route("https://spa.com/b") == ROUTE_BROWSER
+
+        # Playwright funciona: sigue yendo directo a Playwright
+        store.record("https://spa.com/b", FETCHER_BROWSER, True, 3.0)
+        assert store.route("https://spa.com/d") == ROUTE_BROWSER
+
+    def test_simple_success_resets_misses(self, store):
+        store.record("https://a.com", FETCHER_SIMPLE, False, reason=REASON_BLOCKED)
+        store.record("https://a.com", FETCHER_SIMPLE, True, 0.1)
+        store.record("https://a.com", FETCHER_SIMPLE, False, reason=REASON_BLOCKED)
+        assert store.route("https://a.com") == ROUTE_SIMPLE
+
+    def test_domain_failures_mark_dead(self, store):
+        store.record("https://caido.com", FETCHER_SIMPLE, False, reason=REASON_CONNECTION)
+        store.record("https://caido.com", FETCHER_SIMPLE, False, reason=REASON_TIMEOUT)
+        assert store.route("https://caido.com") == ROUTE_SIMPLE
+        store.record("https://caido.com", FETCHER_BROWSER, False, reason=REASON_OTHER)
+        assert store.route("https://caido.com/otra") == ROUTE_DEAD
+        assert store.get("https://caido.com").last_failure == REASON_OTHER
+
+    def test_page_errors_do_not_count(self, store):
+        for _ in range(5):
+            store.record("https://a.com/no-existe", FETCHER_SIMPLE, False, reason=REASON_HTTP)
+        assert store.route("https://a.com") == ROUTE_SIMPLE
+        assert store.get("https://a.com").last_failure is None
+
+    def test_deadline_timeouts_do_not_count(self, store):
+        for _ in range(5):
+            store.record("https://lento.com", FETCHER_SIMPLE, False, 2.0, REASON_DEADLINE)
+        assert store.route("https://lento.com") == ROUTE_SIMPLE
+        assert store.get("https://lento.com").consecutive_failures == 0
+
+    def test_verdicts_expire(self):
+        store = DomainProfileStore(":memory:", js_after=1, dead_after=1, js_ttl=0.0, dead_ttl=0.0)
+        store.record("https://spa.com", FETCHER_SIMPLE, False, reason=REASON_BLOCKED)
+        store.record("https://caido.com", FETCHER_SIMPLE, False, reason=REASON_CONNECTION)
+        assert store.route("https://spa.com") == ROUTE_SIMPLE
+        assert store.route("https://caido.com") == ROUTE_SIMPLE
+        store.close()
+
+
+class TestStats:
+
+    def test_success_rate_and_latency(self, store):
+        store.record("https://a.com", FETCHER_SIMPLE, True, 1.0)
+        store.record("https://a.com", FETCHER_SIMPLE, True, 2.0)
+        store.record("https://a.com", FETCHER_SIMPLE, True)  # precargada: sin latencia
+        store.record("https://a.com", FETCHER_SIMPLE, False, 0.5, REASON_BLOCKED)
+        profile = store.get("https://a.com")
+        assert profile.attempts == 4
+        assert profile.success_rate == 0.75
+        assert profile.avg_latency == pytest.approx(0.3 * 0.5 + 0.7 * (0.3 * 2.0 + 0.7 * 1.0))
+        assert profile.last_failure == REASON_BLOCKED
+
+    def test_store_stats(self, store):
+        for _ in range(2):
+            store.record("https://spa.com", FETCHER_SIMPLE, False, reason=REASON_BLOCKED)
+        for _ in range(3):
+            store.record("https://caido.com", FETCHER_SIMPLE, False, reason=REASON_CONNECTION)
+        store.record("https://ok.com", FETCHER_SIMPLE, True, 0.1)
+        assert store.stats() == {"domains": 3, "browser": 1, "dead": 1}
+
+
+class TestPersistence:
+
+    def test_profiles_survive_restart(self, tmp_path):
+        path = str(tmp_path / "perfiles" / "domains.db")
+        store = DomainProfileStore(path, js_after=1)
+        store.record("https://spa.com", FETCHER_SIMPLE, False, 0.4, REASON_NEEDS_JS)
+        store.close()
+
+        reopened = DomainProfileStore(path, js_after=1)
+        assert reopened.route("https://spa.com/tarifas") == ROUTE_BROWSER
+        assert reopened.get("https://spa.com").to_dict()["avg_latency"] == 0.4
+        reopened.close()
+
+
+class TestBatchedWrites:
+
+    def _rows(self, path):
+        with sqlite3.connect(path) as conn:
+            return conn.execute("SELECT domain, attempts FROM domain_profiles ORDER BY domain").fetchall()
+
+    def test_records_are_written_in_batches(self, tmp_path):
+        path = str(tmp_path / "domains.db")
+        store = DomainProfileStore(path)
+        store.record("https://a.com", FETCHER_SIMPLE, True, 0.1)
+        store.record("https://a.com", FETCHER_SIMPLE, True, 0.1)
+        # Aún dentro del intervalo: nada escrito
+        assert self._rows(path) == []
+        store.flush()
+        assert self._rows(path) == [("a.com", 2)]
+        store.record("https://b.com", FETCHER_SIMPLE, True, 0.1)
+        store.close()
+        assert self._rows(path) == [("a.com", 2), ("b.com", 1)]
+
+    async def test_flush_runs_off_the_event_loop(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(domain_profile, "_FLUSH_INTERVAL", 0.0)
+        store = DomainProfileStore(str(tmp_path / "domains.db"))
+        threads = []
+        flush = store.flush
+        monkeypatch.setattr(store, "flush", lambda: (threads.append(threading.get_ident()), flush()))
+        store.record("https://a.com", FETCHER_SIMPLE, True, 0.1)
+        await asyncio.sleep(0.05)
+        assert threads and threading.get_ident() not in threads
+        store.close()
+
+
+class TestSingleton:
+
+    def test_configured_from_settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "scrape_domain_js_after", 5)
+        monkeypatch.setattr(settings, "scrape_domain_dead_after", 7)
+        reset_domain_profiles()
+        store = get_domain_profiles()
+        assert (store.js_after, store.dead_after) == (5, 7)
+        assert get_domain_profiles() is store
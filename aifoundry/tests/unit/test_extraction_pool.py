@@ -0,0 +1,149 @@
+"""
+Tests para utils/extraction_pool.py — pool de procesos del procesado de páginas.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from aifoundry.app.config import settings
+from aifoundry.app.utils import simple_scraper
+from aifoundry.app.utils.extraction_pool import (
+    ExtractionPool,
+    _settings_snapshot,
+    get_extraction_pool,
+    shutdown_extraction_pool,
+)
+from aifoundry.app.utils.simple_scraper import _build_result
+
+PAGES_DIR = Path(__file__).resolve().parent.parent / "fixtures" / "pages"
+
+
+class _BrokenExecutor:
+    """Ejecutor cuyo worker 'muere' al recibir trabajo."""
+
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        raise BrokenProcessPool("worker caído")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+class TestExtractionPool:
+
+    async def test_not_started_runs_in_thread(self):
+        pool = ExtractionPool(max_workers=2)
+        assert await pool.run(threading.get_ident) != threading.get_ident()
+        assert pool.stats()["workers"] == 0
+
+    def test_zero_workers_never_starts(self):
+        pool = ExtractionPool(max_workers=0)
+        pool.start()
+        assert not pool.started
+
+    async def test_bounded_in_flight(self):
+        pool = ExtractionPool(max_workers=1, max_pending=2)
+        pool._executor = ThreadPoolExecutor(8)
+        running = peak = 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+        await asyncio.gather(*(pool.run(work) for _ in range(8)))
+        pool.shutdown()
+        assert peak == 2
+        assert pool.completed == 8
+
+    async def test_broken_pool_is_restarted_and_falls_back(self):
+        pool = ExtractionPool(max_workers=0)
+        broken = pool._executor = _BrokenExecutor()
+        assert await pool.run(sum, [1, 2, 3]) == 6
+        assert broken.shut_down
+        assert pool.stats()["fallbacks"] == 1
+        assert pool.stats()["restarts"] == 1
+
+    async def test_process_workers(self, monkeypatch):
+        monkeypatch.setattr(settings, "scrape_extractor_min_quality", 0.77)
+        pool = ExtractionPool(max_workers=1, max_tasks_per_child=0)
+        pool.start()
+        try:
+            assert await pool.run(os.getpid) != os.getpid()
+            # Los workers reciben los settings de scraping del padre
+            worker_settings = await pool.run(_settings_snapshot)
+            assert worker_settings["scrape_extractor_min_quality"] == 0.77
+
+            html_content = (PAGES_DIR / "utility_tariffs.html").read_text(encoding="utf-8")
+            args = (html_content, "https://a.com", 200, ["markdown", "links"], True)
+            assert await pool.run(_build_result, *args) == _build_result(*args)
+        finally:
+            pool.shutdown()
+
+
+class TestSingleton:
+
+    def test_configured_from_settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "scrape_extract_workers", 3)
+        monkeypatch.setattr(settings, "scrape_extract_max_pending", 9)
+        shutdown_extraction_pool()
+        pool = get_extraction_pool()
+        assert (pool.max_workers, pool.max_pending) == (3, 9)
+        assert get_extraction_pool() is pool
+        assert not pool.started
+
+
+class TestSimpleScrapeUsesPool:
+
+    async def test_processing_goes_through_pool(self, monkeypatch):
+        calls = []
+
+        class _Pool:
+            async def run(self, fn, *args):
+                calls.append(fn)
+                return fn(*args)
+
+        monkeypatch.setattr(simple_scraper, "get_extraction_pool", lambda: _Pool())
+        html_content = "<html><body><p>" + "Precio 0,15 €/kWh. " * 20 + "</p></body></html>"
+        first = await simple_scraper._process_page_async(html_content, "https://a.com", 200, ["markdown"], True)
+        # Segunda vez: caché de resultados en este proceso, sin pasar por el pool
+        second = await simple_scraper._process_page_async(html_content, "https://a.com", 200, ["markdown"], True)
+        assert calls == [_build_result]
+        assert first == second
+        assert "0,15 €/kWh" in first["data"]["markdown"]
+
+    async def test_result_cache_work_runs_off_the_event_loop(self, monkeypatch):
+        class _Pool:
+            async def run(self, fn, *args):
+                return fn(*args)
+
+        loop_thread = threading.get_ident()
+        threads = []
+        make_key = simple_scraper.make_result_key
+
+        def spy(*args):
+            threads.append(threading.get_ident())
+            return make_key(*args)
+
+        monkeypatch.setattr(simple_scraper, "get_extraction_pool", lambda: _Pool())
+        monkeypatch.setattr(simple_scraper, "make_result_key", spy)
+        cache = simple_scraper.get_scrape_result_cache()
+        put = cache.put
+        monkeypatch.setattr(cache, "put", lambda *a: (threads.append(threading.get_ident()), put(*a))[1])
+
+        html_content = "<html><body><p>" + "Precio 0,20 €/kWh. " * 20 + "</p></body></html>"
+        await simple_scraper._process_page_async(html_content, "https://b.com", 200, ["markdown"], True)
+        assert len(threads) == 2
+        assert loop_thread not in threads
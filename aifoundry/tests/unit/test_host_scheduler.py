@@ -0,0 +1,218 @@
+"""
+Tests para utils/host_scheduler.py — cortesía por host del scraping.
+"""
+
+import asyncio
+import time
+from email.utils import formatdate
+
+import pytest
+
+from aifoundry.app.utils.deadline import Deadline, deadline_scope
+from aifoundry.app.utils.host_scheduler import (
+    ROBOTS_DISALLOW_ALL,
+    HostBackoffError,
+    HostScheduler,
+    get_host_scheduler,
+    host_key,
+    parse_retry_after,
+    reset_host_scheduler,
+)
+
+URL = "https://endesa.com/tarifas"
+
+
+class TestHelpers:
+    def test_host_key(self):
+        assert host_key("https://Endesa.com:8443/a?b=1") == "https://endesa.com:8443"
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("30") == 30.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("pronto") is None
+        assert 50 <= parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
+
+
+class TestSlots:
+    async def test_max_concurrency_per_host(self):
+        scheduler = HostScheduler(max_concurrency=2)
+        active = {"a": 0, "b": 0}
+        peak = {"a": 0, "b": 0}
+
+        async def hit(host):
+            async with scheduler.slot(f"https://{host}.com/x"):
+                active[host] += 1
+                peak[host] = max(peak[host], active[host])
+                await asyncio.sleep(0.01)
+                active[host] -= 1
+
+        await asyncio.gather(*(hit("a") for _ in range(6)), *(hit("b") for _ in range(3)))
+        assert peak == {"a": 2, "b": 2}
+        assert scheduler.stats()["https://a.com"]["requests"] == 6
+
+    async def test_min_interval_spacing(self):
+        scheduler = HostScheduler(max_concurrency=0, min_interval=0.05)
+        starts = []
+
+        async def hit():
+            async with scheduler.slot(URL):
+                starts.append(time.monotonic())
+
+        await asyncio.gather(*(hit() for _ in range(4)))
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        assert all(gap >= 0.04 for gap in gaps)
+
+    async def test_other_hosts_not_delayed(self):
+        scheduler = HostScheduler(min_interval=1.0)
+        async with scheduler.slot(URL):
+            pass
+        started = time.monotonic()
+        async with scheduler.slot("https://iberdrola.es"):
+            pass
+        assert time.monotonic() - started < 0.1
+
+
+class TestBackoff:
+    async def test_429_doubles_and_success_decays(self):
+        scheduler = HostScheduler(backoff_base=1.0, backoff_max=4.0)
+        scheduler.record(URL, 429)
+        assert scheduler.stats()["https://endesa.com"]["backoff"] == 1.0
+        scheduler.record(URL, 503)
+        scheduler.record(URL, 429)
+        scheduler.record(URL, 429)
+        stats = scheduler.stats()["https://endesa.com"]
+        assert stats["backoff"] == 4.0
+        assert stats["throttled"] == 4
+
+        scheduler.record(URL, 200)
+        assert scheduler.stats()["https://endesa.com"]["backoff"] == 2.0
+        scheduler.record(URL, 200)
+        scheduler.record(URL, 200)
+        assert scheduler.stats()["https://endesa.com"]["backoff"] == 0.0
+
+    async def test_retry_after_respected_and_capped(self):
+        scheduler = HostScheduler(backoff_base=1.0, backoff_max=30.0)
+        scheduler.record(URL, 429, retry_after="20")
+        assert scheduler.stats()["https://endesa.com"]["blocked_for"] > 19
+        scheduler.record("https://b.com", 429, retry_after="3600")
+        assert scheduler.stats()["https://b.com"]["blocked_for"] <= 30
+
+    async def test_slot_waits_for_backoff(self):
+        scheduler = HostScheduler(backoff_base=0.1)
+        scheduler.record(URL, 429)
+        started = time.monotonic()
+        async with scheduler.slot(URL):
+            pass
+        assert time.monotonic() - started >= 0.08
+
+    async def test_backoff_longer_than_deadline_fails_fast(self):
+        scheduler = HostScheduler(backoff_base=10.0)
+        scheduler.record(URL, 429)
+        started = time.monotonic()
+        with deadline_scope(Deadline(1)):
+            with pytest.raises(HostBackoffError):
+                async with scheduler.slot(URL):
+                    pass
+        assert time.monotonic() - started < 0.5
+
+
+class TestRobots:
+    ROBOTS = "User-agent: *\nDisallow: /privado\nCrawl-delay: 2\n"
+
+    async def test_allowed_disallowed_and_cached(self):
+        scheduler = HostScheduler()
+        fetched = []
+
+        async def fetch(robots_url):
+            fetched.append(robots_url)
+            return self.ROBOTS
+
+        assert await scheduler.robots_allowed("https://a.com/tarifas", fetch)
+        assert not await scheduler.robots_allowed("https://a.com/privado/x", fetch)
+        assert fetched == ["https://a.com/robots.txt"]
+        assert scheduler.stats()["https://a.com"]["crawl_delay"] == 2.0
+
+    async def test_concurrent_checks_fetch_once(self):
+        scheduler = HostScheduler()
+        fetched = []
+
+        async def fetch(robots_url):
+            fetched.append(robots_url)
+            await asyncio.sleep(0.01)
+            return self.ROBOTS
+
+        await asyncio.gather(*(scheduler.robots_allowed("https://a.com/x", fetch) for _ in range(5)))
+        assert len(fetched) == 1
+
+    async def test_ttl_expiry_refetches(self):
+        scheduler = HostScheduler(robots_ttl=0.0)
+        fetched = []
+
+        async def fetch(robots_url):
+            fetched.append(robots_url)
+            return ""
+
+        await scheduler.robots_allowed("https://a.com/x", fetch)
+        await scheduler.robots_allowed("https://a.com/y", fetch)
+        assert len(fetched) == 2
+
+    async def test_missing_or_failing_robots_allows(self):
+        scheduler = HostScheduler()
+
+        async def missing(robots_url):
+            return None
+
+        async def failing(robots_url):
+            raise ConnectionError("caído")
+
+        assert await scheduler.robots_allowed("https://a.com/x", missing)
+        assert await scheduler.robots_allowed("https://b.com/x", failing)
+
+    async def test_failed_fetch_is_retried_soon(self):
+        scheduler = HostScheduler(robots_error_ttl=0.0)
+        fetched = []
+
+        async def flaky(robots_url):
+            fetched.append(robots_url)
+            if len(fetched) == 1:
+                raise HostBackoffError("https://a.com", 30.0)
+            return self.ROBOTS
+
+        assert await scheduler.robots_allowed("https://a.com/privado/x", flaky)
+        # El fallo no quedó cacheado el robots_ttl completo
+        assert not await scheduler.robots_allowed("https://a.com/privado/x", flaky)
+        assert len(fetched) == 2
+
+    async def test_failed_refresh_keeps_previous_robots(self):
+        scheduler = HostScheduler(robots_ttl=0.0, robots_error_ttl=60.0)
+
+        async def ok(robots_url):
+            return self.ROBOTS
+
+        async def failing(robots_url):
+            raise TimeoutError()
+
+        await scheduler.robots_allowed("https://a.com/x", ok)
+        assert not await scheduler.robots_allowed("https://a.com/privado/x", failing)
+        assert scheduler.stats()["https://a.com"]["crawl_delay"] == 2.0
+
+    async def test_disallow_all(self):
+        scheduler = HostScheduler()
+
+        async def forbidden(robots_url):
+            return ROBOTS_DISALLOW_ALL
+
+        assert not await scheduler.robots_allowed("https://a.com/", forbidden)
+        assert not await scheduler.robots_allowed("https://a.com/tarifas", forbidden)
+
+
+class TestSingleton:
+    async def test_configured_from_settings(self, monkeypatch):
+        from aifoundry.app.config import settings
+
+        monkeypatch.setattr(settings, "scrape_host_min_interval", 1.5)
+        reset_host_scheduler()
+        scheduler = get_host_scheduler()
+        assert scheduler is get_host_scheduler()
+        assert scheduler.min_interval == 1.5
+        reset_host_scheduler()
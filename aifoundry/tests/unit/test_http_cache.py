@@ -0,0 +1,151 @@
+"""
+Tests para utils/http_cache.py — caché HTTP condicional de simple_scrape.
+"""
+
+import time
+
+import pytest
+
+from aifoundry.app.utils.http_cache import (
+    HttpCache,
+    freshness_lifetime,
+    get_http_cache,
+    parse_cache_control,
+    reset_http_cache,
+)
+
+URL = "https://endesa.com/tarifas"
+
+
+@pytest.fixture
+def cache():
+    c = HttpCache(":memory:", max_bytes=1000)
+    yield c
+    c.close()
+
+
+class TestCacheControl:
+    def test_parse(self):
+        assert parse_cache_control('max-age=60, No-Cache, private="x"') == {
+            "max-age": "60",
+            "no-cache": None,
+            "private": "x",
+        }
+        assert parse_cache_control(None) == {}
+
+    def test_freshness_lifetime(self):
+        assert freshness_lifetime({"cache-control": "max-age=120"}) == 120.0
+        assert freshness_lifetime({"cache-control": "no-cache, max-age=120"}) == 0.0
+        assert freshness_lifetime({"cache-control": "no-store"}) is None
+        assert freshness_lifetime({"vary": "*"}) is None
+        assert freshness_lifetime({"cache-control": "max-age=abc"}) == 0.0
+        assert freshness_lifetime({}) == 0.0
+
+
+class TestHttpCache:
+    def test_store_and_get_fresh(self, cache):
+        assert cache.store(URL, 200, {"cache-control": "max-age=60"}, b"<p>hola</p>", "utf-8")
+        entry = cache.get(URL)
+        assert entry.fresh
+        assert entry.text() == "<p>hola</p>"
+        assert entry.validators() == {}
+
+    def test_validators_without_max_age(self, cache):
+        headers = {"etag": '"v1"', "last-modified": "Wed, 01 Oct 2026 10:00:00 GMT"}
+        assert cache.store(URL, 200, headers, b"x", None)
+        entry = cache.get(URL)
+        assert not entry.fresh
+        assert entry.validators() == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Wed, 01 Oct 2026 10:00:00 GMT",
+        }
+
+    def test_not_cacheable(self, cache):
+        # Sin max-age ni validadores, no-store, no-200 o demasiado grande
+        assert not cache.store(URL, 200, {}, b"x", None)
+        assert not cache.store(URL, 200, {"cache-control": "no-store", "etag": "a"}, b"x", None)
+        assert not cache.store(URL, 404, {"etag": "a"}, b"x", None)
+        assert not cache.store(URL, 200, {"etag": "a"}, b"x" * 2000, None)
+        assert cache.get(URL) is None
+
+    def test_no_store_invalidates_previous(self, cache):
+        cache.store(URL, 200, {"etag": '"v1"'}, b"viejo", None)
+        cache.store(URL, 200, {"cache-control": "no-store"}, b"nuevo", None)
+        assert cache.get(URL) is None
+        assert cache.stats()["bytes"] == 0
+
+    def test_lru_eviction_by_size(self, cache):
+        for i in range(3):
+            cache.store(f"{URL}/{i}", 200, {"etag": str(i)}, b"x" * 400, None)
+            time.sleep(0.001)
+        # 3 × 400 > 1000: se expulsa la menos usada (la 0)
+        assert cache.get(f"{URL}/0") is None
+        assert cache.get(f"{URL}/1") is not None
+        assert cache.stats()["bytes"] == 800
+
+    def test_get_does_not_write(self, cache):
+        cache.store(URL, 200, {"etag": "a"}, b"x", None)
+        changes = cache._conn.total_changes
+        assert cache.get(URL) is not None
+        assert cache._conn.total_changes == changes
+
+    def test_eviction_uses_reads_since_last_write(self, cache):
+        cache.store(f"{URL}/0", 200, {"etag": "0"}, b"x" * 400, None)
+        time.sleep(0.001)
+        cache.store(f"{URL}/1", 200, {"etag": "1"}, b"x" * 400, None)
+        time.sleep(0.001)
+        cache.get(f"{URL}/0")  # "0" pasa a ser la más reciente
+        cache.store(f"{URL}/2", 200, {"etag": "2"}, b"x" * 400, None)
+        assert cache.get(f"{URL}/1") is None
+        assert cache.get(f"{URL}/0") is not None
+
+    def test_replace_keeps_size_accounting(self, cache):
+        cache.store(URL, 200, {"etag": "a"}, b"x" * 300, None)
+        cache.store(URL, 200, {"etag": "b"}, b"x" * 100, None)
+        assert cache.stats()["bytes"] == 100
+        assert cache.stats()["entries"] == 1
+
+    def test_mark_revalidated(self, cache):
+        cache.store(URL, 200, {"etag": '"v1"'}, b"cuerpo", None)
+        entry = cache.get(URL)
+        entry = cache.mark_revalidated(entry, {"cache-control": "max-age=60", "etag": '"v2"'})
+        assert entry.fresh
+        stored = cache.get(URL)
+        assert stored.fresh
+        assert stored.etag == '"v2"'
+        assert stored.content == b"cuerpo"
+        assert cache.stats()["revalidated"] == 1
+
+    def test_counters(self, cache):
+        cache.get(URL)
+        cache.record_hit()
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+    def test_persists_on_disk(self, tmp_path):
+        path = str(tmp_path / "sub" / "http_cache.db")
+        first = HttpCache(path)
+        first.store(URL, 200, {"etag": "a"}, b"persistente", None)
+        first.close()
+
+        second = HttpCache(path)
+        assert second.get(URL).content == b"persistente"
+        assert second.stats()["bytes"] == len(b"persistente")
+        second.close()
+
+
+class TestSingleton:
+    def test_disabled_without_path(self):
+        # conftest desactiva la caché en disco
+        assert get_http_cache() is None
+
+    def test_configured_from_settings(self, monkeypatch, tmp_path):
+        from aifoundry.app.config import settings
+
+        monkeypatch.setattr(settings, "scrape_http_cache_path", str(tmp_path / "c.db"))
+        monkeypatch.setattr(settings, "scrape_http_cache_max_mb", 1.0)
+        cache = get_http_cache()
+        assert cache is get_http_cache()
+        assert cache.max_bytes == 1024 * 1024
+        reset_http_cache()
@@ -0,0 +1,157 @@
+"""
+Tests para utils/http_client.py — AsyncClient compartido de scraping.
+
+Sin red: las peticiones se sirven con httpx.MockTransport.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from aifoundry.app.utils import http_client
+from aifoundry.app.utils.host_scheduler import HostScheduler
+from aifoundry.app.utils.http_client import (
+    RobotsDisallowedError,
+    ScrapeHttpClient,
+    close_scrape_http_client,
+    get_scrape_http_client,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset_singleton():
+    http_client._scrape_http_client = None
+    yield
+    http_client._scrape_http_client = None
+
+
+class TestScrapeHttpClient:
+    async def test_get(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, text="ok"))
+        client = ScrapeHttpClient(transport=transport)
+        response = await client.get("https://a.com/x", timeout=5)
+        assert response.text == "ok"
+        assert client.stats() == {"requests": 1, "hosts": 1}
+        await client.aclose()
+        assert client.is_closed
+
+    async def test_stream(self):
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, content=b"abc" * 10, headers={"x-test": "1"})
+        )
+        client = ScrapeHttpClient(per_host_concurrency=1, transport=transport)
+        async with client.stream("https://a.com/x", timeout=5) as response:
+            assert response.headers["x-test"] == "1"
+            body = b"".join([chunk async for chunk in response.aiter_bytes()])
+        assert body == b"abc" * 10
+        assert client.stats() == {"requests": 1, "hosts": 1}
+        await client.aclose()
+
+    async def test_per_host_concurrency(self):
+        active = {}
+        peak = {}
+
+        async def handler(request):
+            host = request.url.host
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+            return httpx.Response(200)
+
+        client = ScrapeHttpClient(per_host_concurrency=2, transport=httpx.MockTransport(handler))
+        urls = [f"https://a.com/{i}" for i in range(6)] + [f"https://b.com/{i}" for i in range(2)]
+        await asyncio.gather(*(client.get(u) for u in urls))
+        await client.aclose()
+
+        assert peak["a.com"] == 2
+        assert peak["b.com"] == 2
+
+
+class TestPoliteness:
+    async def test_robots_checked_once_per_host(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.path)
+            if request.url.path == "/robots.txt":
+                return httpx.Response(200, text="User-agent: *\nDisallow: /privado\n")
+            return httpx.Response(200, text="ok")
+
+        client = ScrapeHttpClient(transport=httpx.MockTransport(handler), respect_robots=True)
+        await client.get("https://a.com/x")
+        await client.get("https://a.com/y")
+        with pytest.raises(RobotsDisallowedError):
+            async with client.stream("https://a.com/privado/z"):
+                pass
+        await client.aclose()
+
+        assert seen == ["/robots.txt", "/x", "/y"]
+
+    @pytest.mark.parametrize(
+        "status, allowed, retried",
+        [(401, False, False), (403, False, False), (404, True, False), (500, True, True)],
+    )
+    async def test_robots_status(self, status, allowed, retried):
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.path)
+            if request.url.path == "/robots.txt":
+                return httpx.Response(status)
+            return httpx.Response(200, text="ok")
+
+        scheduler = HostScheduler(robots_error_ttl=0.0)
+        client = ScrapeHttpClient(transport=httpx.MockTransport(handler), scheduler=scheduler, respect_robots=True)
+        for _ in range(2):
+            if allowed:
+                await client.get("https://a.com/x")
+            else:
+                with pytest.raises(RobotsDisallowedError):
+                    await client.get("https://a.com/x")
+        await client.aclose()
+
+        # Un 5xx es un fallo transitorio: se vuelve a pedir robots.txt
+        assert seen.count("/robots.txt") == (2 if retried else 1)
+
+    async def test_429_starts_backoff(self):
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(429, headers={"retry-after": "7"})
+        )
+        client = ScrapeHttpClient(transport=transport)
+        response = await client.get("https://a.com/x")
+        await client.aclose()
+
+        assert response.status_code == 429
+        stats = client.scheduler.stats()["https://a.com"]
+        assert stats["throttled"] == 1
+        assert stats["blocked_for"] > 6
+
+
+class TestSingleton:
+    async def test_reused_within_loop(self):
+        assert get_scrape_http_client() is get_scrape_http_client()
+
+    async def test_uses_shared_scheduler(self):
+        from aifoundry.app.utils.host_scheduler import get_host_scheduler
+
+        client = get_scrape_http_client()
+        assert client.scheduler is get_host_scheduler()
+        await close_scrape_http_client()
+        await close_scrape_http_client()
+        assert http_client._scrape_http_client is None
+
+    def test_new_client_per_event_loop(self):
+        async def grab():
+            return get_scrape_http_client()
+
+        first = asyncio.run(grab())
+        second = asyncio.run(grab())
+        assert first is not second
+
+    async def test_closed_client_replaced(self):
+        client = get_scrape_http_client()
+        await client.aclose()
+        assert get_scrape_http_client() is not client
+        await close_scrape_http_client()
@@ -0,0 +1,194 @@
+"""
+Tests para core/jobs.py — JobStore (SQLite) y JobManager (workers).
+"""
+
+import asyncio
+
+import pytest
+
+from aifoundry.app.core.jobs import (
+    JOB_CANCELLED,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JobManager,
+    JobQueueFullError,
+    JobStore,
+)
+
+
+async def _wait_status(manager, job_id, status, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        job = manager.get(job_id)
+        if job["status"] == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} no llegó a {status}: {manager.get(job_id)}")
+
+
+class TestJobStore:
+    def test_create_and_get(self):
+        store = JobStore()
+        job = store.create("electricity", {"provider": "Endesa"})
+        assert job["status"] == JOB_QUEUED
+        assert job["payload"] == {"provider": "Endesa"}
+        assert store.get(job["id"])["agent_name"] == "electricity"
+
+    def test_get_unknown(self):
+        assert JobStore().get("nope") is None
+
+    def test_transitions(self):
+        store = JobStore()
+        job_id = store.create("a", {})["id"]
+        assert store.mark_running(job_id) is True
+        assert store.mark_running(job_id) is False  # ya no está en cola
+        assert store.cancel_if_queued(job_id) is False
+        assert store.finish(job_id, JOB_COMPLETED, result={"status": "success"})
+        job = store.get(job_id)
+        assert job["status"] == JOB_COMPLETED
+        assert job["result"] == {"status": "success"}
+        assert job["finished_at"] is not None
+
+    def test_persistence_and_requeue(self, tmp_path):
+        db = str(tmp_path / "sub" / "jobs.db")
+        store = JobStore(db)
+        job_id = store.create("a", {})["id"]
+        store.mark_running(job_id)
+        store.close()
+
+        reopened = JobStore(db)
+        assert reopened.get(job_id)["status"] == JOB_RUNNING
+        assert reopened.requeue_running() == 1
+        assert reopened.ids_by_status(JOB_QUEUED) == [job_id]
+        assert reopened.count_by_status() == {JOB_QUEUED: 1}
+
+
+class TestJobManager:
+    async def test_submit_requires_start(self):
+        manager = JobManager(JobStore(), executor=None)
+        with pytest.raises(RuntimeError):
+            await manager.submit("a", {})
+
+    async def test_job_completes(self):
+        async def executor(agent_name, payload):
+            return {"agent": agent_name, **payload}
+
+        manager = JobManager(JobStore(), executor, workers=2)
+        await manager.start()
+        job = await manager.submit("electricity", {"provider": "Endesa"})
+        done = await _wait_status(manager, job["id"], JOB_COMPLETED)
+        assert done["result"] == {"agent": "electricity", "provider": "Endesa"}
+        await manager.stop()
+
+    async def test_job_failure_recorded(self):
+        async def executor(agent_name, payload):
+            raise ValueError("boom")
+
+        manager = JobManager(JobStore(), executor)
+        await manager.start()
+        job = await manager.submit("a", {})
+        failed = await _wait_status(manager, job["id"], JOB_FAILED)
+        assert failed["error"] == "boom"
+        await manager.stop()
+
+    async def test_bounded_workers(self):
+        running = 0
+        peak = 0
+        release = asyncio.Event()
+
+        async def executor(agent_name, payload):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await release.wait()
+            running -= 1
+            return {}
+
+        manager = JobManager(JobStore(), executor, workers=2)
+        await manager.start()
+        jobs = [await manager.submit("a", {}) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        assert peak == 2
+        assert manager.stats()["running"] == 2
+        release.set()
+        for job in jobs:
+            await _wait_status(manager, job["id"], JOB_COMPLETED)
+        await manager.stop()
+
+    async def test_queue_full(self):
+        block = asyncio.Event()
+
+        async def executor(agent_name, payload):
+            await block.wait()
+            return {}
+
+        manager = JobManager(JobStore(), executor, workers=1, max_queued=1)
+        await manager.start()
+        await manager.submit("a", {})
+        await asyncio.sleep(0.01)  # el primero pasa a running
+        await manager.submit("a", {})
+        with pytest.raises(JobQueueFullError):
+            await manager.submit("a", {})
+        await manager.stop()
+
+    async def test_cancelled_jobs_free_queue_slots(self):
+        block = asyncio.Event()
+
+        async def executor(agent_name, payload):
+            await block.wait()
+            return {}
+
+        manager = JobManager(JobStore(), executor, workers=1, max_queued=1)
+        await manager.start()
+        await manager.submit("a", {})
+        await asyncio.sleep(0.01)  # el primero pasa a running
+        queued = await manager.submit("a", {})
+        await manager.cancel(queued["id"])
+        assert manager.stats()["queued"] == 0
+        # El cancelado sigue en la asyncio.Queue, pero no ocupa hueco
+        await manager.submit("a", {})
+        await manager.stop()
+
+    async def test_cancel_queued_and_running(self):
+        started = asyncio.Event()
+
+        async def executor(agent_name, payload):
+            started.set()
+            await asyncio.sleep(10)
+            return {}
+
+        manager = JobManager(JobStore(), executor, workers=1)
+        await manager.start()
+        running_job = await manager.submit("a", {})
+        queued_job = await manager.submit("a", {})
+        await started.wait()
+
+        cancelled = await manager.cancel(queued_job["id"])
+        assert cancelled["status"] == JOB_CANCELLED
+
+        cancelled = await manager.cancel(running_job["id"])
+        assert cancelled["status"] == JOB_CANCELLED
+        assert manager.stats()["running"] == 0
+        await manager.stop()
+
+    async def test_cancel_unknown(self):
+        manager = JobManager(JobStore(), executor=None)
+        assert await manager.cancel("nope") is None
+
+    async def test_start_recovers_pending(self):
+        store = JobStore()
+        queued_id = store.create("a", {"n": 1})["id"]
+        interrupted_id = store.create("a", {"n": 2})["id"]
+        store.mark_running(interrupted_id)
+
+        async def executor(agent_name, payload):
+            return payload
+
+        manager = JobManager(store, executor)
+        await manager.start()
+        await _wait_status(manager, queued_id, JOB_COMPLETED)
+        await _wait_status(manager, interrupted_id, JOB_COMPLETED)
+        await manager.stop()
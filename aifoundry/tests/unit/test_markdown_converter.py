@@ -0,0 +1,78 @@
+"""
+Tests para utils/markdown_converter.py — HTML → Markdown en un recorrido.
+"""
+
+from pathlib import Path
+
+import lxml.html
+from markdownify import markdownify as md
+
+from aifoundry.app.utils.markdown_converter import html_to_markdown, inline_markdown
+from aifoundry.app.utils.simple_scraper import _main_content, _parse_html
+
+PAGES_DIR = Path(__file__).resolve().parent.parent / "fixtures" / "pages"
+
+
+def _convert(html: str) -> str:
+    return html_to_markdown(lxml.html.fromstring(html))
+
+
+class TestHtmlToMarkdown:
+
+    def test_headings_paragraphs_and_links(self):
+        markdown = _convert(
+            '<div><h2>Precios <a href="/endesa">Endesa</a></h2>'
+            '<p>Ver <a href="https://a.com/t">tarifa</a>. Más <b>info</b><br>línea 2</p></div>'
+        )
+        assert markdown.split("\n") == [
+            "## Precios [Endesa](/endesa)",
+            "Ver [tarifa](https://a.com/t). Más info",
+            "línea 2",
+        ]
+
+    def test_lists(self):
+        markdown = _convert(
+            "<div><ul><li>Uno<ul><li>Uno.a</li></ul></li><li><p>Dos</p><p>Dos bis</p></li></ul>"
+            "<ol><li>A</li><li>B</li></ol></div>"
+        )
+        assert markdown.split("\n") == ["- Uno", "  - Uno.a", "- Dos", "  Dos bis", "1. A", "2. B"]
+
+    def test_table(self):
+        markdown = _convert(
+            "<table><thead><tr><th>Tarifa</th><th>Precio</th></tr></thead>"
+            "<tbody><tr><td>One | Luz</td><td>0,149 €/kWh</td></tr><tr><td>Solo</td></tr></tbody></table>"
+        )
+        assert markdown.split("\n") == [
+            "| Tarifa | Precio |",
+            "| --- | --- |",
+            "| One \\| Luz | 0,149 €/kWh |",
+            "| Solo |  |",
+        ]
+
+    def test_layout_table_renders_blocks(self):
+        assert _convert("<table><tr><td><p>Uno</p><p>Dos</p></td></tr></table>") == "Uno\nDos"
+
+    def test_quote_code_and_skipped_tags(self):
+        markdown = _convert(
+            "<div><blockquote><p>Cita</p></blockquote><pre>a = 1\n\nb = 2</pre>"
+            "<p>Código <code>x()</code> <a href='#top'>arriba</a><script>var x;</script>"
+            "<img src='a.png' alt='foto'></p></div>"
+        )
+        assert markdown.split("\n") == ["> Cita", "```", "a = 1", "b = 2", "```", "Código `x()` arriba"]
+
+    def test_root_tail_is_ignored(self):
+        root = lxml.html.fromstring("<body><div><p>Dentro</p></div>Fuera</body>")
+        assert html_to_markdown(root[0]) == "Dentro"
+        assert root[0].tail == "Fuera"
+
+    def test_inline_markdown_without_links(self):
+        cell = lxml.html.fromstring('<td>Ver <a href="/x">tarifa</a><br>hoy</td>')
+        assert inline_markdown(cell) == "Ver [tarifa](/x) hoy"
+        assert inline_markdown(cell, links=False) == "Ver tarifa hoy"
+
+    def test_matches_markdownify_on_fixtures(self):
+        for name in ("utility_tariffs.html", "news_article.html", "retailer_listing.html"):
+            content = _main_content(_parse_html((PAGES_DIR / name).read_text(encoding="utf-8")))
+            expected = md(lxml.html.tostring(content, encoding="unicode"), heading_style="ATX")
+            expected = "\n".join(line for line in expected.split("\n") if line.strip()).strip()
+            assert html_to_markdown(content) == expected
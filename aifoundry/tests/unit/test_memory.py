@@ -35,6 +35,17 @@ class TestInMemoryManager:
 
         assert new_cp is not old_cp
 
+    def test_release_thread_keeps_checkpointer(self):
+        """release_thread() borra el thread sin recrear el MemorySaver."""
+        manager = InMemoryManager()
+        cp = manager.get_checkpointer()
+        cp.delete_thread = MagicMock()
+
+        manager.release_thread("thread-abc")
+
+        assert manager.get_checkpointer() is cp
+        cp.delete_thread.assert_called_once_with("thread-abc")
+
     def test_generate_thread_id_unique(self):
         """generate_thread_id() genera IDs únicos."""
         manager = InMemoryManager()
@@ -0,0 +1,84 @@
+"""
+Tests para utils/metrics.py — métricas y render Prometheus.
+"""
+
+import pytest
+
+from aifoundry.app.utils.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    get_metrics_registry,
+)
+
+
+class TestCounter:
+    def test_inc_by_labels(self):
+        c = Counter("calls_total", "Llamadas", ["tool"])
+        c.inc(tool="a")
+        c.inc(2, tool="a")
+        c.inc(tool="b")
+        assert c.value(tool="a") == 3
+        assert c.value(tool="b") == 1
+
+    def test_wrong_labels_raise(self):
+        c = Counter("calls_total", "Llamadas", ["tool"])
+        with pytest.raises(ValueError):
+            c.inc(model="x")
+
+    def test_negative_raises(self):
+        with pytest.raises(ValueError):
+            Counter("c", "c").inc(-1)
+
+
+class TestHistogram:
+    def test_observe_and_render(self):
+        h = Histogram("latency_seconds", "Latencia", ["tool"], buckets=(0.1, 1.0))
+        h.observe(0.05, tool="x")
+        h.observe(0.5, tool="x")
+        h.observe(5, tool="x")
+        assert h.count(tool="x") == 3
+        assert h.sum(tool="x") == pytest.approx(5.55)
+
+        lines = h.render()
+        assert '# TYPE latency_seconds histogram' in lines
+        assert 'latency_seconds_bucket{tool="x",le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{tool="x",le="1"} 2' in lines
+        assert 'latency_seconds_bucket{tool="x",le="+Inf"} 3' in lines
+        assert 'latency_seconds_count{tool="x"} 3' in lines
+
+
+class TestRegistry:
+    def test_render_and_reset(self):
+        registry = MetricsRegistry()
+        c = registry.counter("x_total", "X", ["agent"])
+        g = registry.gauge("queue", "Cola")
+        c.inc(agent='el"ec')
+        g.set(3)
+
+        text = registry.render()
+        assert '# HELP x_total X' in text
+        assert 'x_total{agent="el\\"ec"} 1' in text
+        assert "queue 3" in text
+        assert text.endswith("\n")
+
+        registry.reset()
+        assert c.value(agent='el"ec') == 0
+
+    def test_duplicate_name_raises(self):
+        registry = MetricsRegistry()
+        registry.counter("x_total", "X")
+        with pytest.raises(ValueError):
+            registry.counter("x_total", "X")
+
+    def test_app_metrics_registered(self):
+        registry = get_metrics_registry()
+        for name in (
+            "aifoundry_agent_run_duration_seconds",
+            "aifoundry_llm_calls_total",
+            "aifoundry_llm_tokens_total",
+            "aifoundry_tool_latency_seconds",
+            "aifoundry_scrape_bytes_total",
+            "aifoundry_agent_retries_total",
+        ):
+            assert registry.get(name) is not None
@@ -0,0 +1,148 @@
+"""
+Tests para utils/prefetch.py — precarga de resultados de búsqueda por run.
+"""
+
+import asyncio
+import threading
+
+from aifoundry.app.utils.deadline import Deadline, current_deadline, deadline_scope
+from aifoundry.app.utils.domain_profile import FETCHER_SIMPLE, REASON_BLOCKED, get_domain_profiles
+from aifoundry.app.utils.metrics import SCRAPE_PREFETCH
+from aifoundry.app.utils.prefetch import PrefetchCache, current_prefetch, prefetch_scope
+
+
+def _page(url: str) -> dict:
+    return {"success": True, "data": {"markdown": f"Contenido {url}", "metadata": {"sourceURL": url}}}
+
+
+class _FakeFetch:
+    """Descarga controlable: cada URL espera a `release` y registra su contexto."""
+
+    def __init__(self, results=None):
+        self.calls = []
+        self.deadlines = []
+        self.release = asyncio.Event()
+        self.results = results or {}
+
+    async def __call__(self, url, timeout):
+        self.calls.append((url, timeout))
+        self.deadlines.append(current_deadline())
+        await self.release.wait()
+        result = self.results.get(url, _page(url))
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class TestPrefetchCache:
+
+    async def test_prefetches_top_k_new_urls(self):
+        fetch = _FakeFetch()
+        cache = PrefetchCache(top_k=2, fetch=fetch)
+        cache.prefetch(["ftp://x", "https://a.com", "https://a.com", "https://b.com", "https://c.com"])
+        cache.prefetch(["https://a.com#precios"])  # misma URL sin fragmento
+        await asyncio.sleep(0)
+        assert [url for url, _ in fetch.calls] == ["https://a.com", "https://b.com"]
+        cache.close()
+
+    async def test_skips_domains_routed_elsewhere(self):
+        profiles = get_domain_profiles()
+        for _ in range(profiles.js_after):
+            profiles.record("https://spa.com", FETCHER_SIMPLE, False, reason=REASON_BLOCKED)
+        fetch = _FakeFetch()
+        cache = PrefetchCache(top_k=2, fetch=fetch)
+        cache.prefetch(["https://spa.com/tarifas", "https://a.com", "https://b.com"])
+        await asyncio.sleep(0)
+        assert [url for url, _ in fetch.calls] == ["https://a.com", "https://b.com"]
+        cache.close()
+
+    async def test_get_waits_for_inflight_fetch(self):
+        fetch = _FakeFetch()
+        cache = PrefetchCache(fetch=fetch)
+        cache.prefetch(["https://a.com/tarifas"])
+        getter = asyncio.create_task(cache.get("https://a.com/tarifas#luz", timeout=5))
+        await asyncio.sleep(0)
+        assert not getter.done()
+        fetch.release.set()
+        assert (await getter)["data"]["markdown"] == "Contenido https://a.com/tarifas"
+        assert cache.stats() == {"started": 1, "pending": 0, "served": 1}
+        assert len(fetch.calls) == 1
+        cache.close()
+
+    async def test_miss_failure_and_timeout_return_none(self):
+        fetch = _FakeFetch({"https://a.com/500": {"success": False, "error": "HTTP 500"}})
+        cache = PrefetchCache(fetch=fetch)
+        cache.prefetch(["https://a.com/500", "https://a.com/lenta"])
+        assert await cache.get("https://otra.com") is None
+
+        # Sin terminar dentro del timeout: None, pero la precarga sigue
+        assert await cache.get("https://a.com/lenta", timeout=0.01) is None
+        fetch.release.set()
+        assert await cache.get("https://a.com/lenta", timeout=1) is not None
+
+        # Un fallo se descarta para que la tool lo reintente
+        assert await cache.get("https://a.com/500", timeout=1) is None
+        assert cache.stats()["started"] == 1
+        cache.close()
+
+    async def test_expired_entries_are_dropped(self):
+        fetch = _FakeFetch()
+        fetch.release.set()
+        cache = PrefetchCache(ttl=0.0, fetch=fetch)
+        cache.prefetch(["https://a.com"])
+        await asyncio.sleep(0.01)
+        before = SCRAPE_PREFETCH.value(result="expired")
+        assert await cache.get("https://a.com") is None
+        assert SCRAPE_PREFETCH.value(result="expired") == before + 1
+
+    async def test_runs_with_run_context_and_deadline(self):
+        fetch = _FakeFetch()
+        deadline = Deadline(10)
+        with deadline_scope(deadline):
+            cache = PrefetchCache(fetch=fetch)
+        # Llamado fuera del scope (como un callback): hereda el del run
+        cache.prefetch(["https://a.com"])
+        await asyncio.sleep(0)
+        assert fetch.deadlines == [deadline]
+        assert fetch.calls[0][1] <= 10
+        cache.close()
+
+    async def test_prefetch_from_another_thread(self):
+        fetch = _FakeFetch()
+        cache = PrefetchCache(fetch=fetch)
+        thread = threading.Thread(target=cache.prefetch, args=(["https://a.com"],))
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0.01)
+        assert [url for url, _ in fetch.calls] == ["https://a.com"]
+        cache.close()
+
+    async def test_close_cancels_pending_and_counts_unused(self):
+        fetch = _FakeFetch()
+        cache = PrefetchCache(fetch=fetch)
+        cache.prefetch(["https://a.com", "https://b.com"])
+        await asyncio.sleep(0)
+        tasks = [task for _, task in cache._entries.values()]
+        before = SCRAPE_PREFETCH.value(result="unused")
+        cache.close()
+        await asyncio.sleep(0)
+        assert all(task.cancelled() for task in tasks)
+        assert SCRAPE_PREFETCH.value(result="unused") == before + 2
+        # Cerrada: no se empiezan más
+        cache.prefetch(["https://c.com"])
+        await asyncio.sleep(0)
+        assert len(fetch.calls) == 2
+
+
+class TestPrefetchScope:
+
+    async def test_scope_sets_and_closes(self):
+        cache = PrefetchCache(fetch=_FakeFetch())
+        with prefetch_scope(cache):
+            assert current_prefetch() is cache
+        assert current_prefetch() is None
+        assert cache._closed
+
+    def test_none_scope(self):
+        with prefetch_scope(None) as cache:
+            assert cache is None and current_prefetch() is None
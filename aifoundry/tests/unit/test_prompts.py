@@ -32,6 +32,10 @@ class TestSystemPromptBasic:
         prompt = get_system_prompt(electricity_config)
         assert "precio electricidad Endesa España febrero 2026" in prompt
 
+    def test_prefers_batch_scrape(self, electricity_config):
+        prompt = get_system_prompt(electricity_config)
+        assert "simple_scrape_urls(urls=" in prompt
+
     def test_contains_steps(self, electricity_config):
         prompt = get_system_prompt(electricity_config)
         assert "PASO 1" in prompt
@@ -5,14 +5,25 @@ Tests para utils/rate_limiter.py — BraveRateLimiter.
 import asyncio
 import time
 
+import httpx
 import pytest
+from aifoundry.app.config import settings
 from aifoundry.app.utils.rate_limiter import (
     BraveRateLimiter,
+    _retry_after,
     get_brave_rate_limiter,
     reset_brave_rate_limiter,
 )
 
 
+class _RateLimited(Exception):
+    """429 con Retry-After ya en segundos (como lo expone el cliente de Brave)."""
+
+    def __init__(self, retry_after):
+        super().__init__("429 Too Many Requests")
+        self.retry_after = retry_after
+
+
 class TestBraveRateLimiter:
     def test_creation(self):
         limiter = BraveRateLimiter(requests_per_second=2.0, max_retries=5)
@@ -76,6 +87,20 @@ class TestBraveRateLimiter:
         with pytest.raises(Exception, match="429"):
             await limiter.execute_with_retry(always_429)
 
+    @pytest.mark.asyncio
+    async def test_last_attempt_does_not_block_the_bucket(self):
+        """El 429 del último intento no penaliza ni cuenta como throttled."""
+        limiter = BraveRateLimiter(requests_per_second=100.0, max_retries=2)
+
+        async def always_429():
+            raise _RateLimited(0.05)
+
+        with pytest.raises(_RateLimited):
+            await limiter.execute_with_retry(always_429)
+        assert limiter.throttled == 1
+        # Solo el bloqueo del primer 429, ya vencido
+        assert limiter._blocked_until <= time.monotonic()
+
     @pytest.mark.asyncio
     async def test_context_manager(self):
         """Test async context manager."""
@@ -84,7 +109,115 @@ class TestBraveRateLimiter:
             pass  # Should not raise
 
 
+class TestTokenBucket:
+
+    async def test_burst_then_sustained_rate(self):
+        limiter = BraveRateLimiter(requests_per_second=10.0, burst=5, max_concurrency=0)
+        started = time.monotonic()
+        times = []
+        for _ in range(7):
+            async with limiter:
+                times.append(time.monotonic() - started)
+        # 5 sin esperar, luego una cada 100ms
+        assert times[4] < 0.05
+        assert times[5] >= 0.08
+        assert times[6] - times[5] >= 0.08
+
+    async def test_paid_tier_throughput(self):
+        limiter = BraveRateLimiter(requests_per_second=50.0, burst=5, max_concurrency=10)
+        active = peak = 0
+
+        async def search():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.05)
+            active -= 1
+            return "ok"
+
+        started = time.monotonic()
+        results = await asyncio.gather(*(limiter.execute_with_retry(search) for _ in range(25)))
+        elapsed = time.monotonic() - started
+
+        assert results == ["ok"] * 25
+        # 5 de ráfaga + 20 a 50 rps ≈ 0.4s (con 1 rps y una a la vez serían 24s)
+        assert 0.35 <= elapsed < 1.5
+        assert 1 < peak <= 10
+
+    async def test_unlimited_rate(self):
+        limiter = BraveRateLimiter(requests_per_second=0, max_concurrency=0)
+        started = time.monotonic()
+        for _ in range(20):
+            async with limiter:
+                pass
+        assert time.monotonic() - started < 0.05
+        assert limiter.stats()["waited"] == 0
+
+    async def test_honors_retry_after(self):
+        limiter = BraveRateLimiter(requests_per_second=100.0, max_retries=3)
+        calls = []
+
+        async def search():
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise _RateLimited(0.2)
+            return "ok"
+
+        assert await limiter.execute_with_retry(search) == "ok"
+        # Retry-After de 0.2s en vez del backoff por defecto de 2s
+        assert 0.18 <= calls[1] - calls[0] < 1.0
+        assert limiter.stats()["throttled"] == 1
+
+    async def test_retry_after_blocks_other_requests(self):
+        limiter = BraveRateLimiter(requests_per_second=100.0, burst=10, max_concurrency=0)
+        limiter.penalize(0.2)
+        started = time.monotonic()
+        async with limiter:
+            pass
+        assert time.monotonic() - started >= 0.18
+
+    def test_retry_after_from_response_header(self):
+        request = httpx.Request("GET", "https://api.search.brave.com/res/v1/web/search")
+        response = httpx.Response(429, headers={"Retry-After": "7"}, request=request)
+        error = httpx.HTTPStatusError("Too Many Requests", request=request, response=response)
+        assert _retry_after(error) == 7.0
+        assert _retry_after(ValueError("429")) is None
+
+    async def test_retry_after_capped(self):
+        limiter = BraveRateLimiter(requests_per_second=100.0, max_retries=2, retry_after_max=0.1)
+        calls = []
+
+        async def search():
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise _RateLimited(3600)
+            return "ok"
+
+        assert await limiter.execute_with_retry(search) == "ok"
+        assert calls[1] - calls[0] < 1.0
+
+    async def test_wait_stats(self):
+        limiter = BraveRateLimiter(requests_per_second=20.0, burst=1, max_concurrency=0)
+        for _ in range(3):
+            async with limiter:
+                pass
+        stats = limiter.stats()
+        assert stats["requests"] == 3
+        assert stats["waited"] == 2
+        assert stats["max_wait"] >= 0.04
+        assert stats["avg_wait"] == pytest.approx(stats["total_wait"] / 3)
+
+
 class TestSingleton:
+    def test_configured_from_settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "brave_requests_per_second", 25.0)
+        monkeypatch.setattr(settings, "brave_burst", 10)
+        monkeypatch.setattr(settings, "brave_max_concurrency", 5)
+        reset_brave_rate_limiter()
+        limiter = get_brave_rate_limiter()
+        assert (limiter.requests_per_second, limiter.burst, limiter.max_concurrency) == (25.0, 10, 5)
+        reset_brave_rate_limiter()
+
     def test_singleton_returns_same_instance(self):
         reset_brave_rate_limiter()
         a = get_brave_rate_limiter()
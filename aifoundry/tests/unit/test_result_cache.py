@@ -0,0 +1,91 @@
+"""
+Tests para core/result_cache.py — ResultCache (memoria + SQLite).
+"""
+
+import time
+
+from aifoundry.app.core.result_cache import (
+    TIER_DISK,
+    TIER_MEMORY,
+    ResultCache,
+    freshness_ttl,
+    make_cache_key,
+)
+
+
+class TestHelpers:
+    def test_freshness_ttl(self):
+        assert freshness_ttl("pd") == 24 * 3600
+        assert freshness_ttl("py") == 365 * 24 * 3600
+        assert freshness_ttl(None) == freshness_ttl("pw")
+        assert freshness_ttl("xx") == freshness_ttl("pw")
+
+    def test_key_normalizes_whitespace_and_case(self):
+        a = make_cache_key("electricity", "Endesa", "es", "precio  luz Endesa", False)
+        b = make_cache_key("electricity", " endesa", "ES", "Precio luz endesa ", False)
+        assert a == b
+        assert a != make_cache_key("electricity", "Endesa", "ES", "precio luz Endesa", True)
+
+
+class TestMemoryTier:
+    def test_set_get(self):
+        cache = ResultCache()
+        cache.set("k", {"status": "success"}, ttl_seconds=60)
+        entry = cache.get("k")
+        assert entry.value == {"status": "success"}
+        assert entry.tier == TIER_MEMORY
+        assert cache.stats()["hits"] == 1
+
+    def test_miss(self):
+        cache = ResultCache()
+        assert cache.get("nope") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_expired_entry_is_dropped(self):
+        cache = ResultCache()
+        cache.set("k", {"v": 1}, ttl_seconds=0.01)
+        time.sleep(0.02)
+        assert cache.get("k") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction(self):
+        cache = ResultCache(max_entries=2)
+        cache.set("a", {"v": 1}, 60)
+        cache.set("b", {"v": 2}, 60)
+        cache.get("a")  # a pasa a ser la más reciente
+        cache.set("c", {"v": 3}, 60)
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_invalidate(self):
+        cache = ResultCache()
+        cache.set("k", {"v": 1}, 60)
+        cache.invalidate("k")
+        assert cache.get("k") is None
+
+
+class TestDiskTier:
+    def test_survives_new_instance(self, tmp_path):
+        db = str(tmp_path / "results.db")
+        cache = ResultCache(db_path=db)
+        cache.set("k", {"status": "success", "urls": ["https://a.com"]}, 60)
+        cache.close()
+
+        reopened = ResultCache(db_path=db)
+        entry = reopened.get("k")
+        assert entry.tier == TIER_DISK
+        assert entry.value["urls"] == ["https://a.com"]
+        # Promocionada a memoria
+        assert reopened.get("k").tier == TIER_MEMORY
+        reopened.close()
+
+    def test_purge_expired(self, tmp_path):
+        cache = ResultCache(db_path=str(tmp_path / "results.db"))
+        cache.set("old", {"v": 1}, ttl_seconds=0.01)
+        cache.set("new", {"v": 2}, ttl_seconds=60)
+        time.sleep(0.02)
+        # Una entrada en memoria + una en disco
+        assert cache.purge_expired() == 2
+        assert cache.get("new") is not None
+        cache.close()
@@ -0,0 +1,190 @@
+"""
+Tests para api/runner.py — preparación y ejecución de runs.
+
+No ejecuta agentes reales: _execute se parchea.
+La caché de resultados se resetea en cada test (conftest).
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from aifoundry.app.api.runner import (
+    _execute,
+    execute_run,
+    get_run_flights,
+    prepare_run,
+    run_key,
+    run_prepared,
+)
+from aifoundry.app.api.schemas import AgentRunRequest
+from aifoundry.app.config import settings
+from aifoundry.app.core.admission import AdmissionController
+
+
+def _prepared(**overrides):
+    fields = {"provider": "Endesa", "country_code": "ES", **overrides}
+    return prepare_run("electricity", AgentRunRequest(**fields))
+
+
+class TestRunKey:
+    def test_identical_requests_same_key(self):
+        assert run_key(_prepared()) == run_key(_prepared())
+
+    def test_options_change_key(self):
+        base = run_key(_prepared())
+        assert run_key(_prepared(provider="Iberdrola")) != base
+        assert run_key(_prepared(structured_output=True)) != base
+        assert run_key(_prepared(use_mcp=False)) != base
+
+    def test_thread_id_not_coalesced(self):
+        assert run_key(_prepared(thread_id="abc")) is None
+
+    def test_deadline_changes_key(self):
+        assert run_key(_prepared(deadline_seconds=30)) != run_key(_prepared())
+
+
+class TestRemainingDeadline:
+    def test_no_deadline(self):
+        assert _prepared().remaining_deadline() is None
+
+    def test_counts_from_prepare(self):
+        prepared = _prepared(deadline_seconds=30)
+        prepared.created_at -= 10
+        assert 19 < prepared.remaining_deadline() <= 20
+
+    def test_never_zero(self):
+        prepared = _prepared(deadline_seconds=1)
+        prepared.created_at -= 5
+        assert 0 < prepared.remaining_deadline() < 0.01
+
+    async def test_execute_passes_remaining_budget(self):
+        agent = AsyncMock()
+        agent.run = AsyncMock(return_value={"status": "success"})
+
+        @asynccontextmanager
+        async def fake_checkout(prepared):
+            yield agent
+
+        prepared = _prepared(deadline_seconds=30)
+        with patch("aifoundry.app.api.runner._checkout_agent", fake_checkout):
+            await _execute(prepared)
+
+        kwargs = agent.run.call_args.kwargs
+        assert 0 < kwargs["deadline_seconds"] <= 30
+
+
+class TestExecuteRunCoalescing:
+    async def test_identical_concurrent_runs_execute_once(self):
+        calls = 0
+
+        async def fake_execute(prepared):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return {"status": "success", "output": "ok"}
+
+        with patch("aifoundry.app.api.runner._execute", side_effect=fake_execute):
+            results = await asyncio.gather(*(execute_run(_prepared()) for _ in range(3)))
+
+        assert calls == 1
+        assert all(r["output"] == "ok" for r in results)
+        # Cada llamador recibe su propio dict
+        assert results[0] is not results[1]
+        assert get_run_flights().coalesced == 2
+
+    async def test_disabled_runs_each_request(self, monkeypatch):
+        monkeypatch.setattr(settings, "run_coalescing_enabled", False)
+        calls = 0
+
+        async def fake_execute(prepared):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"status": "success"}
+
+        with patch("aifoundry.app.api.runner._execute", side_effect=fake_execute):
+            await asyncio.gather(execute_run(_prepared()), execute_run(_prepared()))
+
+        assert calls == 2
+
+
+class TestAdmission:
+    async def test_identical_runs_share_one_slot(self):
+        controller = AdmissionController(max_concurrent=1, per_agent_concurrent=0, max_queue=0)
+        running = []
+
+        async def fake_execute(prepared):
+            running.append(controller.stats()["running"])
+            await asyncio.sleep(0.02)
+            return {"status": "success", "output": "ok", "thread_id": "t"}
+
+        with patch("aifoundry.app.api.runner._execute", side_effect=fake_execute), patch(
+            "aifoundry.app.api.runner.get_admission_controller", return_value=controller
+        ):
+            results = await asyncio.gather(
+                run_prepared(_prepared(), admit=True),
+                run_prepared(_prepared(), admit=True),
+            )
+
+        assert [r.output for r in results] == ["ok", "ok"]
+        assert running == [1]
+        assert controller.stats()["admitted"] == 1
+        assert controller.stats()["rejected"] == 0
+        assert controller.stats()["running"] == 0
+
+
+class TestRunPreparedCache:
+    _OK = {"status": "success", "output": "tarifa 0.15", "thread_id": "t"}
+
+    async def test_second_run_served_from_cache(self):
+        with patch("aifoundry.app.api.runner._execute", new=AsyncMock(return_value=self._OK)) as ex:
+            first = await run_prepared(_prepared())
+            second = await run_prepared(_prepared())
+
+        assert ex.await_count == 1
+        assert first.cache.hit is False
+        assert second.cache.hit is True
+        assert second.cache.tier == "memory"
+        assert second.output == "tarifa 0.15"
+        assert second.cache.ttl_seconds > 0
+
+    async def test_errors_are_not_cached(self):
+        error = {"status": "error", "output": "boom"}
+        with patch("aifoundry.app.api.runner._execute", new=AsyncMock(return_value=error)) as ex:
+            await run_prepared(_prepared())
+            await run_prepared(_prepared())
+        assert ex.await_count == 2
+
+    async def test_bypass_and_refresh(self):
+        with patch("aifoundry.app.api.runner._execute", new=AsyncMock(return_value=self._OK)) as ex:
+            bypass = await run_prepared(_prepared(cache="bypass"))
+            assert bypass.cache is None
+            # bypass no guarda
+            await run_prepared(_prepared())
+            assert ex.await_count == 2
+            # refresh ejecuta aunque haya resultado
+            refreshed = await run_prepared(_prepared(cache="refresh"))
+            assert ex.await_count == 3
+            assert refreshed.cache.hit is False
+
+    async def test_only_without_result_504(self):
+        with pytest.raises(HTTPException) as exc:
+            await run_prepared(_prepared(cache="only"))
+        assert exc.value.status_code == 504
+
+    async def test_only_with_result(self):
+        with patch("aifoundry.app.api.runner._execute", new=AsyncMock(return_value=self._OK)):
+            await run_prepared(_prepared())
+        cached = await run_prepared(_prepared(cache="only"))
+        assert cached.cache.hit is True
+
+    async def test_thread_id_not_cached(self):
+        with patch("aifoundry.app.api.runner._execute", new=AsyncMock(return_value=self._OK)) as ex:
+            await run_prepared(_prepared(thread_id="abc"))
+            response = await run_prepared(_prepared(thread_id="abc"))
+        assert ex.await_count == 2
+        assert response.cache is None
@@ -0,0 +1,86 @@
+"""
+Tests para utils/scrape_result_cache.py — caché de resultados procesados.
+"""
+
+from aifoundry.app.config import settings
+from aifoundry.app.utils.scrape_result_cache import (
+    ScrapeResultCache,
+    get_scrape_result_cache,
+    make_result_key,
+    reset_scrape_result_cache,
+)
+
+URL = "https://endesa.com/tarifas"
+DATA = {"metadata": {"title": "Tarifas"}, "markdown": "# Tarifas\n" + "0,15 €/kWh " * 200}
+
+
+class TestMakeResultKey:
+    def test_same_body_same_key(self):
+        assert make_result_key("<p>a</p>", URL, 200, ["markdown", "links"], True) == make_result_key(
+            "<p>a</p>", URL, 200, ["links", "markdown"], True
+        )
+
+    def test_changes_with_body_and_options(self):
+        base = make_result_key("<p>a</p>", URL, 200, ["markdown"], True)
+        assert make_result_key("<p>b</p>", URL, 200, ["markdown"], True) != base
+        assert make_result_key("<p>a</p>", URL, 200, ["markdown"], False) != base
+        assert make_result_key("<p>a</p>", URL, 200, ["html"], True) != base
+        assert make_result_key("<p>a</p>", URL + "/x", 200, ["markdown"], True) != base
+
+
+class TestScrapeResultCache:
+    def test_roundtrip_compressed(self):
+        cache = ScrapeResultCache()
+        assert cache.get("k") is None
+        assert cache.put("k", DATA)
+        assert cache.get("k") == DATA
+
+        stats = cache.stats()
+        assert stats["entries"] == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["bytes"] < len(DATA["markdown"])
+        assert stats["compression_ratio"] > 1
+
+    def test_lru_eviction_by_bytes(self):
+        probe = ScrapeResultCache()
+        probe.put("k", DATA)
+        entry_size = probe.stats()["bytes"]
+
+        cache = ScrapeResultCache(max_bytes=entry_size * 2)
+        cache.put("a", DATA)
+        cache.put("b", DATA)
+        cache.get("a")  # "a" pasa a ser la más reciente
+        cache.put("c", DATA)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == DATA
+        assert cache.get("c") == DATA
+        assert cache.stats()["bytes"] <= entry_size * 2
+
+    def test_too_large_not_stored(self):
+        cache = ScrapeResultCache(max_bytes=10)
+        assert not cache.put("k", DATA)
+        assert cache.stats()["entries"] == 0
+
+    def test_replace_and_clear(self):
+        cache = ScrapeResultCache()
+        cache.put("k", {"markdown": "uno"})
+        cache.put("k", {"markdown": "dos"})
+        assert cache.stats()["entries"] == 1
+        assert cache.get("k") == {"markdown": "dos"}
+        cache.clear()
+        assert cache.stats()["bytes"] == 0
+
+
+class TestSingleton:
+    def test_configured_from_settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "scrape_result_cache_max_mb", 2.0)
+        cache = get_scrape_result_cache()
+        assert cache is get_scrape_result_cache()
+        assert cache.max_bytes == 2 * 1024 * 1024
+        reset_scrape_result_cache()
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setattr(settings, "scrape_result_cache_max_mb", 0)
+        assert get_scrape_result_cache() is None
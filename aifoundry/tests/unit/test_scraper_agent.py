@@ -6,15 +6,39 @@ Verifican la interfaz pública y el comportamiento del agente
 sin llamadas reales a LLM ni a servicios MCP.
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch, PropertyMock
 from typing import Any
 
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import ChatGeneration, LLMResult
 from pydantic import BaseModel, Field
 
+from aifoundry.app.config import settings
+from aifoundry.app.utils.metrics import (
+    LLM_CALLS,
+    LLM_TOKENS,
+    RUN_DURATION,
+    RUN_RETRIES,
+    TOOL_CALLS,
+    TOOL_LATENCY,
+    get_metrics_registry,
+)
+
 from aifoundry.app.core.agents.scraper.agent import (
+    MetricsCallbackHandler,
     ScraperAgent,
+    StreamEventHandler,
+    _classify_error,
+    _partial_output,
     _is_recoverable_error,
     _is_no_data_error,
     _extract_failed_url,
@@ -154,6 +178,12 @@ class TestErrorHelpers:
         result = _tool_error_handler(Exception("No web results found"))
         assert "No se encontraron resultados" in result
 
+    def test_classify_error(self):
+        assert _classify_error("net::ERR_HTTP2_PROTOCOL_ERROR at https://x") == "http2"
+        assert _classify_error("Request timeout") == "timeout"
+        assert _classify_error("No web results found") == "no_data"
+        assert _classify_error("ValueError: bad") == "other"
+
     def test_tool_error_handler_generic(self):
         result = _tool_error_handler(Exception("Something went wrong"))
         assert "Error en herramienta" in result
@@ -617,6 +647,331 @@ class TestScraperAgentRetry:
 # ─── Tests: Memory / Conversational ─────────────────────────────────
 
 
+class TestScraperAgentStream:
+    """Tests de astream_run() (eventos de progreso)."""
+
+    @staticmethod
+    def _streaming_executor(final_text: str):
+        """Executor cuyo astream() simula una búsqueda + tokens + estado final."""
+
+        async def astream(inputs, config=None, stream_mode=None):
+            handler = next(cb for cb in config["callbacks"] if isinstance(cb, StreamEventHandler))
+            await handler.on_chat_model_start({}, [])
+            await handler.on_tool_start({"name": "brave_web_search"}, "tarifas luz")
+            await handler.on_tool_end('[{"url": "https://a.com"}, {"url": "https://b.com"}]',
+                                      name="brave_web_search")
+            await handler.on_tool_start({"name": "simple_scrape_url"}, "https://a.com/tarifas")
+            for piece in final_text.split(" "):
+                yield "messages", (AIMessageChunk(content=piece + " "), {})
+            yield "values", {"messages": [AIMessage(content=final_text)]}
+
+        executor = MagicMock()
+        executor.astream = astream
+        return executor
+
+    @patch("aifoundry.app.core.agents.scraper.agent.create_agent")
+    @patch("aifoundry.app.core.agents.scraper.agent.get_llm")
+    async def test_astream_run_events(self, mock_get_llm, mock_create_agent, basic_config):
+        mock_get_llm.return_value = MagicMock()
+        mock_create_agent.return_value = self._streaming_executor("Precio 0.15 EUR/kWh")
+
+        async with ScraperAgent(use_mcp=False, verbose=False) as agent:
+            events = [e async for e in agent.astream_run(basic_config)]
+
+        kinds = [e["event"] for e in events]
+        steps = [e["data"]["step"] for e in events if e["event"] == "step"]
+        assert steps == ["0-2", "3", "4", "6-7"]
+        assert kinds[-1] == "final"
+        assert events[-1]["data"]["status"] == "success"
+        assert events[-1]["data"]["output"] == "Precio 0.15 EUR/kWh"
+
+        tool_end = next(e for e in events if e["event"] == "tool_end")
+        assert tool_end["data"]["urls"] == ["https://a.com", "https://b.com"]
+        scrape = [e for e in events if e["event"] == "tool_start"][-1]
+        assert scrape["data"]["urls"] == ["https://a.com/tarifas"]
+
+        tokens = "".join(e["data"]["delta"] for e in events if e["event"] == "token")
+        assert tokens.strip() == "Precio 0.15 EUR/kWh"
+
+    @patch("aifoundry.app.core.agents.scraper.agent.create_agent")
+    @patch("aifoundry.app.core.agents.scraper.agent.get_llm")
+    async def test_run_does_not_stream(
+        self, mock_get_llm, mock_create_agent, basic_config, mock_agent_response
+    ):
+        """run() sigue usando ainvoke() (sin overhead de streaming)."""
+        mock_get_llm.return_value = MagicMock()
+        mock_executor = _make_mock_agent_executor(mock_agent_response)
+        mock_create_agent.return_value = mock_executor
+
+        async with ScraperAgent(use_mcp=False, verbose=False) as agent:
+            await agent.run(basic_config)
+
+        mock_executor.ainvoke.assert_awaited_once()
+        assert mock_executor.astream.call_count == 0
+
+    @patch("aifoundry.app.core.agents.scraper.agent.create_agent")
+    @patch("aifoundry.app.core.agents.scraper.agent.get_llm")
+    async def test_astream_run_close_cancels_run(self, mock_get_llm, mock_create_agent, basic_config):
+        """Si el consumidor abandona el stream, el run en curso se cancela."""
+        mock_get_llm.return_value = MagicMock()
+        cancelled = asyncio.Event()
+
+        async def astream(inputs, config=None, stream_mode=None):
+            yield "messages", (AIMessageChunk(content="Hola"), {})
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            yield "values", {"messages": [AIMessage(content="nunca")]}
+
+        executor = MagicMock()
+        executor.astream = astream
+        mock_create_agent.return_value = executor
+
+        async with ScraperAgent(use_mcp=False, verbose=False) as agent:
+            stream = agent.astream_run(basic_config)
+            async for event in stream:
+                if event["event"] == "token":
+                    break
+            await stream.aclose()
+
+        assert cancelled.is_set()
+
+
+class TestScraperAgentMetrics:
+    """Métricas de runs, LLM y tools."""
+
+    @pytest.fixture(autouse=True)
+    def _reset_metrics(self):
+        get_metrics_registry().reset()
+        yield
+        get_metrics_registry().reset()
+
+    def test_handler_records_llm_and_tools(self):
+        handler = MetricsCallbackHandler("electricity", "gpt-test")
+        handler.on_chat_model_start({}, [], run_id="l1", metadata={"ls_model_name": "claude"})
+        message = AIMessage(
+            content="ok",
+            usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150},
+        )
+        handler.on_llm_end(
+            LLMResult(generations=[[ChatGeneration(message=message)]]), run_id="l1"
+        )
+
+        handler.on_tool_start({"name": "brave_web_search"}, "q", run_id="t1")
+        handler.on_tool_end("[]", run_id="t1")
+        handler.on_tool_start({"name": "browser_navigate"}, "u", run_id="t2")
+        handler.on_tool_end("### Error\nnet::ERR_TIMED_OUT", run_id="t2")
+
+        assert LLM_CALLS.value(agent="electricity", model="claude", status="ok") == 1
+        assert LLM_TOKENS.value(agent="electricity", model="claude", type="prompt") == 120
+        assert LLM_TOKENS.value(agent="electricity", model="claude", type="completion") == 30
+        assert TOOL_CALLS.value(tool="brave_web_search", status="ok") == 1
+        assert TOOL_CALLS.value(tool="browser_navigate", status="error") == 1
+        assert TOOL_LATENCY.count(tool="brave_web_search") == 1
+
+    def test_handler_token_usage_from_llm_output(self):
+        handler = MetricsCallbackHandler("salary", "gpt-test")
+        handler.on_llm_start({}, ["p"], run_id="l1")
+        handler.on_llm_end(
+            LLMResult(
+                generations=[[]],
+                llm_output={"token_usage": {"prompt_tokens": 10, "completion_tokens": 5}},
+            ),
+            run_id="l1",
+        )
+        assert LLM_TOKENS.value(agent="salary", model="gpt-test", type="prompt") == 10
+
+    @patch("aifoundry.app.core.agents.scraper.agent.create_agent")
+    @patch("aifoundry.app.core.agents.scraper.agent.get_llm")
+    async def test_run_records_duration_and_retries(
+        self, mock_get_llm, mock_create_agent, basic_config
+    ):
+        mock_get_llm.return_value = MagicMock()
+        mock_executor = MagicMock()
+        mock_executor.ainvoke = AsyncMock(side_effect=[
+            {"messages": [AIMessage(content="Error: connection timeout en https://a.com")]},
+            {"messages": [AIMessage(content="Datos encontrados")]},
+        ])
+        mock_create_agent.return_value = mock_executor
+
+        async with ScraperAgent(use_mcp=False, verbose=False, agent_name="electricity") as agent:
+            await agent.run(basic_config, max_retries=3)
+
+        assert RUN_DURATION.count(agent="electricity", status="success") == 1
+        assert RUN_RETRIES.value(agent="electricity", error_class="timeout") == 1
+
+
+class TestScraperAgentPageFocus:
+    """El run fija el foco con que las tools condensan las páginas."""
+
+    @patch("aifoundry.app.core.agents.scraper.agent.get_llm")
+    async def test_focus_from_run_config(self, mock_get_llm, basic_config):
+        from aifoundry.app.utils.condense import current_focus
+
+        mock_get_llm.return_value = MagicMock()
+        seen = {}
+
+        async def fake_attempts(config, max_retries, emit=None):
+            seen["focus"] = current_focus()
+            return {"status": "success"}
+
+        agent = ScraperAgent(use_mcp=False, verbose=False)
+        with patch.object(agent, "_run_attempts", fake_attempts):
+            await agent.run({**basic_config, "page_token_budget": 1234})
+
+        focus = seen["focus"]
+        assert focus.token_budget == 1234
+        assert focus.keywords == ["test_product", "testprovider", "espana"]
+        assert current_focus() is None
+
+
+class TestScraperAgentPrefetch:
+    """Tras brave_web_search se precargan las primeras URLs en la caché del run."""
+
+    @patch("aifoundry.app.core.agents.scraper.agent.get_llm")
+    async def test_run_sets_and_closes_prefetch_cache(self, mock_get_llm, basic_config, monkeypatch):
+        from aifoundry.app.utils.prefetch import current_prefetch
+
+        monkeypatch.setattr(settings, "scrape_prefetch_top_k", 3)
+        mock_get_llm.return_value = MagicMock()
+        seen = {}
+
+        async def fake_attempts(config, max_retries, emit=None):
+            seen["prefetch"] = current_prefetch()
+            return {"status": "success"}
+
+        agent = ScraperAgent(use_mcp=False, verbose=False)
+        with patch.object(agent, "_run_attempts", fake_attempts):
+            await agent.run(basic_config)
+
+        assert seen["prefetch"].top_k == 3
+        assert seen["prefetch"]._closed
+        assert current_prefetch() is None
+
+    @patch("aifoundry.app.core.agents.scraper.agent.get_llm")
+    def test_disabled_without_simple_scrape(self, mock_get_llm, monkeypatch):
+        monkeypatch.setattr(settings, "scrape_prefetch_top_k", 3)
+        mock_get_llm.return_value = MagicMock()
+        assert ScraperAgent(use_mcp=False, verbose=False, disable_simple_scrape=True)._new_prefetch() is None
+        monkeypatch.setattr(settings, "scrape_prefetch_top_k", 0)
+        assert ScraperAgent(use_mcp=False, verbose=False)._new_prefetch() is None
+
+    async def test_handler_prefetches_brave_results_only(self):
+        from aifoundry.app.core.agents.scraper.agent import PrefetchCallbackHandler
+        from aifoundry.app.utils.prefetch import PrefetchCache, prefetch_scope
+
+        fetched = []
+
+        async def fetch(url, timeout):
+            fetched.append(url)
+            return {"success": True, "data": {}}
+
+        output = '[{"url": "https://a.com/1"}, {"url": "https://b.com/2"}, {"url": "https://c.com/3"}]'
+        handler = PrefetchCallbackHandler()
+        assert handler.run_inline
+        with prefetch_scope(PrefetchCache(top_k=2, fetch=fetch)):
+            handler.on_tool_end('{"error": "x", "url": "https://z.com"}', name="simple_scrape_url")
+            handler.on_tool_end(output, name="brave_web_search")
+            await asyncio.sleep(0)
+        assert fetched == ["https://a.com/1", "https://b.com/2"]
+        # Fuera de un run no hace nada
+        handler.on_tool_end(output, name="brave_web_search")
+
+
+class TestScraperAgentDeadline:
+    """deadline_seconds: el run devuelve un parcial en vez de colgarse."""
+
+    @staticmethod
+    def _hanging_executor(messages):
+        """Executor cuyo astream() emite un estado y luego se queda colgado."""
+
+        async def astream(inputs, config=None, stream_mode=None):
+            yield ("values", {"messages": inputs["messages"] + messages})
+            await asyncio.sleep(10)
+
+        executor = MagicMock()
+        executor.astream = astream
+        executor.ainvoke = AsyncMock(side_effect=AssertionError("con deadline se usa astream"))
+        return executor
+
+    def test_partial_output_prefers_final_answer_of_current_turn(self):
+        messages = [
+            HumanMessage(content="turno anterior"),
+            AIMessage(content="respuesta antigua"),
+            HumanMessage(content="turno actual"),
+            AIMessage(content="", tool_calls=[{"name": "brave_web_search", "args": {}, "id": "1"}]),
+            ToolMessage(content="Tarifa Endesa 0,15 €/kWh", tool_call_id="1"),
+        ]
+        assert _partial_output(messages) == "Tarifa Endesa 0,15 €/kWh"
+        assert _partial_output(messages + [AIMessage(content="Precio: 0,15")]) == "Precio: 0,15"
+        assert _partial_output([HumanMessage(content="q")]) == ""
+
+    @patch("aifoundry.app.core.agents.scraper.agent.create_agent")
+    @patch("aifoundry.app.core.agents.scraper.agent.get_llm")
+    async def test_deadline_returns_partial(self, mock_get_llm, mock_create_agent, basic_config):
+        mock_get_llm.return_value = MagicMock()
+        mock_create_agent.return_value = self._hanging_executor([
+            AIMessage(content="", tool_calls=[{"name": "simple_scrape_url", "args": {}, "id": "1"}]),
+            ToolMessage(content="# Tarifas\nPrecio 0,15 €/kWh\nSource: https://a.com/tarifas", tool_call_id="1"),
+        ])
+
+        async with ScraperAgent(use_mcp=False, verbose=False) as agent:
+            old_thread = agent.thread_id
+            result = await asyncio.wait_for(
+                agent.run(basic_config, deadline_seconds=0.1), timeout=5
+            )
+            # La sesión cortada a mitad no se reutiliza
+            assert agent.thread_id != old_thread
+
+        assert result["status"] == "partial"
+        assert result["deadline_exceeded"] is True
+        assert "Tiempo agotado" in result["output"]
+        assert "0,15 €/kWh" in result["output"]
+        assert result["attempts"] == 1
+
+    @patch("aifoundry.app.core.agents.scraper.agent.create_agent")
+    @patch("aifoundry.app.core.agents.scraper.agent.get_llm")
+    async def test_deadline_stops_retries(self, mock_get_llm, mock_create_agent, basic_config):
+        mock_get_llm.return_value = MagicMock()
+        calls = 0
+
+        async def astream(inputs, config=None, stream_mode=None):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.06)
+            yield ("values", {"messages": inputs["messages"] + [
+                AIMessage(content="Error: connection timeout en https://a.com")
+            ]})
+
+        executor = MagicMock()
+        executor.astream = astream
+        mock_create_agent.return_value = executor
+
+        async with ScraperAgent(use_mcp=False, verbose=False) as agent:
+            result = await agent.run(basic_config, max_retries=10, deadline_seconds=0.15)
+
+        assert result["status"] == "partial"
+        assert calls < 10
+
+    @patch("aifoundry.app.core.agents.scraper.agent.create_agent")
+    @patch("aifoundry.app.core.agents.scraper.agent.get_llm")
+    async def test_without_deadline_uses_ainvoke(
+        self, mock_get_llm, mock_create_agent, basic_config, mock_agent_response
+    ):
+        mock_get_llm.return_value = MagicMock()
+        executor = MagicMock()
+        executor.ainvoke = AsyncMock(return_value=mock_agent_response)
+        mock_create_agent.return_value = executor
+
+        async with ScraperAgent(use_mcp=False, verbose=False) as agent:
+            result = await agent.run(basic_config)
+
+        assert result["status"] == "success"
+        assert "deadline_exceeded" not in result
+
+
 class TestScraperAgentMemory:
     """Tests de memoria conversacional."""
 
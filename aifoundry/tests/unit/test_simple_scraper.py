@@ -0,0 +1,581 @@
+"""
+Tests para utils/simple_scraper.py — descarga y conversión a markdown.
+
+Sin red: simple_scrape_async usa un ScrapeHttpClient con httpx.MockTransport.
+"""
+
+import threading
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+from urllib.parse import urljoin, urlparse
+
+import httpx
+import pytest
+
+from aifoundry.app.utils import simple_scraper
+from aifoundry.app.utils.http_cache import HttpCache
+from aifoundry.app.utils.http_client import ScrapeHttpClient
+from aifoundry.app.utils.simple_scraper import (
+    _build_result,
+    _extract_metadata_and_links,
+    _looks_like_js_shell,
+    _parse_html,
+    simple_scrape_async,
+)
+
+PAGES_DIR = Path(__file__).resolve().parent.parent / "fixtures" / "pages"
+
+
+def _page(name: str) -> str:
+    return (PAGES_DIR / name).read_text(encoding="utf-8")
+
+PAGE = """
+<html lang="es"><head><title>Tarifas Endesa</title>
+<meta name="description" content="Precios de la luz"></head>
+<body><nav>Menú</nav>
+<article><h1>Tarifas de luz</h1><p>El precio del kWh es 0,15 € en la tarifa One Luz.</p>
+<p>Consulta también la <a href="/gas">tarifa de gas</a>.</p></article>
+</body></html>
+"""
+
+
+def _client(handler):
+    return ScrapeHttpClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture
+async def serve():
+    """Parchea el cliente compartido con un handler de MockTransport."""
+    clients = []
+
+    def _serve(handler):
+        client = _client(handler)
+        clients.append(client)
+        return patch(
+            "aifoundry.app.utils.simple_scraper.get_scrape_http_client", return_value=client
+        )
+
+    yield _serve
+    for client in clients:
+        await client.aclose()
+
+
+class TestSimpleScrapeAsync:
+    async def test_markdown_and_links(self, serve):
+        handler = lambda request: httpx.Response(
+            200, text=PAGE, headers={"content-type": "text/html; charset=utf-8"}
+        )
+        with serve(handler):
+            result = await simple_scrape_async(
+                "https://endesa.com/tarifas", formats=["markdown", "links"]
+            )
+
+        assert result["success"] is True
+        data = result["data"]
+        assert "0,15 €" in data["markdown"]
+        assert data["metadata"]["title"]
+        assert "https://endesa.com/gas" in data["links"]
+
+    async def test_reuses_shared_client(self, serve):
+        seen = []
+
+        def handler(request):
+            seen.append(str(request.url))
+            return httpx.Response(200, text=PAGE, headers={"content-type": "text/html"})
+
+        with serve(handler) as get_client:
+            await simple_scrape_async("https://endesa.com/a")
+            await simple_scrape_async("https://endesa.com/b")
+
+        assert seen == ["https://endesa.com/a", "https://endesa.com/b"]
+        assert get_client.return_value.stats()["requests"] == 2
+
+    async def test_http_error(self, serve):
+        with serve(lambda request: httpx.Response(404, text="no")):
+            result = await simple_scrape_async("https://endesa.com/x")
+        assert result["success"] is False
+        assert result["error"].startswith("HTTP 404")
+
+    async def test_timeout(self, serve):
+        def handler(request):
+            raise httpx.ReadTimeout("lento", request=request)
+
+        with serve(handler):
+            result = await simple_scrape_async("https://endesa.com/x", timeout=2.5)
+        assert result == {"success": False, "error": "Timeout después de 2.5s"}
+
+    async def test_invalid_format(self):
+        result = await simple_scrape_async("https://endesa.com", formats=["pdf"])
+        assert result["success"] is False
+        assert "no soportados" in result["error"]
+
+
+class _Body(httpx.AsyncByteStream):
+    """Cuerpo en trozos que registra cuántos se han leído."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.read = 0
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+class TestSimpleScrapeSync:
+    def test_goes_through_host_scheduler_and_robots(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.path)
+            if request.url.path == "/robots.txt":
+                return httpx.Response(200, text="User-agent: *\nDisallow: /privado\n")
+            return httpx.Response(200, text=PAGE, headers={"content-type": "text/html"})
+
+        clients = []
+
+        def get_client():
+            # Se crea en el loop de las llamadas sync, como el singleton real
+            if not clients:
+                clients.append(ScrapeHttpClient(transport=httpx.MockTransport(handler), respect_robots=True))
+            return clients[0]
+
+        with patch("aifoundry.app.utils.simple_scraper.get_scrape_http_client", get_client):
+            first = simple_scraper.simple_scrape("https://endesa.com/tarifas")
+            second = simple_scraper.simple_scrape("https://endesa.com/gas")
+            blocked = simple_scraper.simple_scrape("https://endesa.com/privado/x")
+
+        assert first["success"] and second["success"]
+        assert "0,15 €" in first["data"]["markdown"]
+        assert blocked["success"] is False
+        assert "robots.txt" in blocked["error"]
+        # robots.txt una vez: mismo cliente y HostScheduler entre llamadas
+        assert seen == ["/robots.txt", "/tarifas", "/gas"]
+        assert clients[0].scheduler.stats()["https://endesa.com"]["requests"] == 3
+
+
+class TestStreaming:
+    async def test_non_html_rejected_before_body(self, serve):
+        body = _Body([b"%PDF-1.7" + b"\0" * 1024] * 100)
+        handler = lambda request: httpx.Response(
+            200, stream=body, headers={"content-type": "application/pdf", "content-length": "102500"}
+        )
+        with serve(handler):
+            result = await simple_scrape_async("https://endesa.com/tarifas.pdf")
+
+        assert result["success"] is False
+        assert "application/pdf" in result["error"]
+        assert "otro resultado" in result["tip"]
+        assert body.read == 0
+
+    async def test_robots_disallowed(self, serve):
+        from aifoundry.app.utils.host_scheduler import RobotsDisallowedError
+
+        with serve(lambda request: httpx.Response(200, text=PAGE)) as get_client:
+            get_client.return_value.check_robots = AsyncMock(
+                side_effect=RobotsDisallowedError("https://endesa.com/privado")
+            )
+            result = await simple_scrape_async("https://endesa.com/privado")
+
+        assert result["success"] is False
+        assert "robots.txt" in result["error"]
+        assert "otro resultado" in result["tip"]
+
+    async def test_missing_content_type_is_accepted(self, serve):
+        with serve(lambda request: httpx.Response(200, content=PAGE.encode())):
+            result = await simple_scrape_async("https://endesa.com/tarifas")
+        assert result["success"] is True
+
+    async def test_stops_at_byte_cap(self, serve, monkeypatch):
+        monkeypatch.setattr(simple_scraper.settings, "scrape_max_bytes", 4096)
+        head = PAGE.encode()
+        body = _Body([head] + [b"<p>relleno</p>" * 100] * 50)
+        handler = lambda request: httpx.Response(
+            200, stream=body, headers={"content-type": "text/html"}
+        )
+        with serve(handler):
+            result = await simple_scrape_async("https://endesa.com/tarifas", formats=["rawHtml"])
+
+        assert result["success"] is True
+        assert len(result["data"]["rawHtml"].encode()) == 4096
+        assert body.read < 50
+
+    async def test_body_of_exactly_the_cap_is_not_truncated(self, serve, monkeypatch):
+        head = PAGE.encode()
+        monkeypatch.setattr(simple_scraper.settings, "scrape_max_bytes", len(head))
+        cache = HttpCache(":memory:")
+        handler = lambda request: httpx.Response(
+            200, stream=_Body([head[:100], head[100:]]), headers={"content-type": "text/html", "etag": '"v1"'}
+        )
+        with serve(handler), patch("aifoundry.app.utils.simple_scraper.get_http_cache", return_value=cache):
+            result = await simple_scrape_async("https://endesa.com/tarifas", formats=["rawHtml"])
+
+        assert result["data"]["rawHtml"] == PAGE
+        # Completo: se guarda en la caché HTTP
+        assert cache.get("https://endesa.com/tarifas") is not None
+        cache.close()
+
+    async def test_incremental_decoding(self, serve):
+        # "€" en latin-9 (ISO-8859-15) y un carácter UTF-8 partido entre trozos
+        latin = "<html><body><p>Precio: 0,15 € el kWh</p></body></html>".encode("iso-8859-15")
+        utf8 = "<html><body><p>Precio: 0,15 € el kWh</p></body></html>".encode("utf-8")
+        split = utf8.index("€".encode()) + 1
+
+        with serve(lambda request: httpx.Response(
+            200, content=latin, headers={"content-type": "text/html; charset=iso-8859-15"}
+        )):
+            result = await simple_scrape_async("https://a.com", formats=["rawHtml"])
+        assert "0,15 €" in result["data"]["rawHtml"]
+
+        with serve(lambda request: httpx.Response(
+            200, stream=_Body([utf8[:split], utf8[split:]]), headers={"content-type": "text/html"}
+        )):
+            result = await simple_scrape_async("https://a.com", formats=["rawHtml"])
+        assert "0,15 €" in result["data"]["rawHtml"]
+
+
+class TestHttpCache:
+    """simple_scrape_async con la caché HTTP activada (SQLite en memoria)."""
+
+    @pytest.fixture
+    def cache(self):
+        c = HttpCache(":memory:")
+        with patch("aifoundry.app.utils.simple_scraper.get_http_cache", return_value=c):
+            yield c
+        c.close()
+
+    async def test_fresh_entry_skips_network(self, serve, cache):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(
+                200, text=PAGE, headers={"content-type": "text/html", "cache-control": "max-age=300"}
+            )
+
+        with serve(handler):
+            first = await simple_scrape_async("https://endesa.com/tarifas")
+            second = await simple_scrape_async("https://endesa.com/tarifas")
+
+        assert len(calls) == 1
+        assert second["data"]["markdown"] == first["data"]["markdown"]
+        assert cache.stats()["hits"] == 1
+
+    async def test_sqlite_runs_off_the_event_loop(self, serve, cache):
+        loop_thread = threading.get_ident()
+        threads = []
+        for name in ("get", "store", "mark_revalidated"):
+            method = getattr(cache, name)
+
+            def spy(*args, _method=method, **kwargs):
+                threads.append(threading.get_ident())
+                return _method(*args, **kwargs)
+
+            setattr(cache, name, spy)
+
+        def handler(request):
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304, headers={"etag": '"v1"'})
+            return httpx.Response(200, text=PAGE, headers={"content-type": "text/html", "etag": '"v1"'})
+
+        with serve(handler):
+            await simple_scrape_async("https://endesa.com/tarifas")
+            await simple_scrape_async("https://endesa.com/tarifas")
+
+        # get, store, get, mark_revalidated
+        assert len(threads) == 4
+        assert loop_thread not in threads
+
+    async def test_revalidates_with_etag(self, serve, cache):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304, headers={"etag": '"v1"'})
+            return httpx.Response(200, text=PAGE, headers={"content-type": "text/html", "etag": '"v1"'})
+
+        with serve(handler):
+            await simple_scrape_async("https://endesa.com/tarifas")
+            result = await simple_scrape_async("https://endesa.com/tarifas")
+
+        assert len(calls) == 2
+        assert "if-none-match" not in calls[0].headers
+        assert calls[1].headers["if-none-match"] == '"v1"'
+        assert result["success"] is True
+        assert result["data"]["metadata"]["statusCode"] == 200
+        assert "0,15 €" in result["data"]["markdown"]
+        assert cache.stats()["revalidated"] == 1
+
+    async def test_changed_page_replaces_entry(self, serve, cache):
+        versions = iter(["v1", "v2"])
+
+        def handler(request):
+            version = next(versions)
+            return httpx.Response(
+                200, text=PAGE.replace("0,15", version), headers={"etag": version}
+            )
+
+        with serve(handler):
+            await simple_scrape_async("https://endesa.com/tarifas")
+            result = await simple_scrape_async("https://endesa.com/tarifas")
+
+        assert "v2 €" in result["data"]["markdown"]
+        assert cache.get("https://endesa.com/tarifas").etag == "v2"
+
+
+class TestResultCache:
+    """Mismo cuerpo descargado → resultado procesado desde la caché."""
+
+    async def test_unchanged_body_skips_processing(self, serve):
+        bodies = iter([PAGE, PAGE, PAGE.replace("0,15", "0,20")])
+        handler = lambda request: httpx.Response(200, text=next(bodies))
+
+        with serve(handler), patch.object(
+            simple_scraper, "_build_result", wraps=simple_scraper._build_result
+        ) as build:
+            first = await simple_scrape_async("https://endesa.com/tarifas")
+            second = await simple_scrape_async("https://endesa.com/tarifas")
+            third = await simple_scrape_async("https://endesa.com/tarifas")
+
+        assert build.call_count == 2
+        assert second == first
+        assert "0,20 €" in third["data"]["markdown"]
+
+    async def test_options_are_part_of_the_key(self, serve):
+        with serve(lambda request: httpx.Response(200, text=PAGE)):
+            markdown = await simple_scrape_async("https://endesa.com/tarifas", formats=["markdown"])
+            links = await simple_scrape_async("https://endesa.com/tarifas", formats=["links"])
+        assert "links" not in markdown["data"]
+        assert "markdown" not in links["data"]
+
+
+class TestBuildResult:
+    """Procesado de páginas guardadas (tests/fixtures/pages)."""
+
+    def test_utility_page(self):
+        result = _build_result(
+            _page("utility_tariffs.html"),
+            "https://www.electrica.example.es/tarifas",
+            200,
+            ["markdown", "links", "html"],
+            True,
+        )
+        assert result["success"] is True
+        data = result["data"]
+        meta = data["metadata"]
+        assert meta["title"] == "Tarifas de luz para hogar | Compañía Eléctrica"
+        assert meta["description"].startswith("Consulta las tarifas")
+        assert meta["language"] == "es"
+        assert meta["ogSiteName"] == "Compañía Eléctrica"
+        assert meta["ogImage"] == "https://cdn.example.es/og.png"  # twitter:image
+        assert "0,149 €/kWh" in data["markdown"]
+        assert "window.__DATA_" not in data["markdown"]
+        assert "https://www.electrica.example.es/promo/1" in data["links"]
+
+    def test_links_resolved_and_deduplicated(self):
+        result = _build_result(
+            _page("retailer_listing.html"), "https://www.shop.example.com/mujer", 200, ["links"], True
+        )
+        links = result["data"]["links"]
+        assert "https://www.shop.example.com/p/producto-7?color=azul&talla=M" in links
+        assert not any("#" in link for link in links)
+        assert len(links) == len(set(links))
+
+    def test_single_parse(self):
+        with patch.object(
+            simple_scraper, "_parse_html", wraps=simple_scraper._parse_html
+        ) as parse:
+            _build_result(
+                _page("news_article.html"), "https://www.diario.example.es/luz", 200,
+                ["markdown", "links"], True,
+            )
+        assert parse.call_count == 1
+
+    def test_fast_extractor_skips_readability(self):
+        with patch.object(simple_scraper, "Document") as document:
+            result = _build_result(
+                _page("utility_tariffs.html"), "https://a.com", 200, ["markdown"], True
+            )
+        document.assert_not_called()
+        assert "0,149 €/kWh" in result["data"]["markdown"]
+
+    def test_low_quality_falls_back_to_readability(self, monkeypatch):
+        monkeypatch.setattr(simple_scraper.settings, "scrape_extractor_min_quality", 2.0)
+        with patch.object(simple_scraper, "Document", wraps=simple_scraper.Document) as document:
+            result = _build_result(
+                _page("utility_tariffs.html"), "https://a.com", 200, ["markdown"], True
+            )
+        document.assert_called_once()
+        assert "0,149 €/kWh" in result["data"]["markdown"]
+
+    def test_readability_does_not_touch_the_fallback_tree(self, monkeypatch):
+        monkeypatch.setattr(simple_scraper.settings, "scrape_extractor_min_quality", 2.0)
+
+        class _Readability:
+            """Como readability: poda el árbol recibido y devuelve poco contenido."""
+
+            def __init__(self, tree):
+                for element in list(tree.iter("p")):
+                    element.drop_tree()
+
+            def summary(self):
+                return "<div></div>"
+
+        with patch.object(simple_scraper, "Document", _Readability):
+            result = _build_result(PAGE, "https://a.com", 200, ["markdown"], True)
+        assert "0,15 €" in result["data"]["markdown"]
+
+    def test_markdownify_flag(self, monkeypatch):
+        monkeypatch.setattr(simple_scraper.settings, "scrape_fast_markdown", False)
+        with patch.object(simple_scraper, "md", wraps=simple_scraper.md) as markdownify:
+            result = _build_result(PAGE, "https://a.com", 200, ["markdown"], True)
+        markdownify.assert_called_once()
+        assert "0,15 €" in result["data"]["markdown"]
+        assert "\n\n" not in result["data"]["markdown"]
+
+    def test_fast_markdown_flag(self, monkeypatch):
+        monkeypatch.setattr(simple_scraper.settings, "scrape_fast_markdown", True)
+        with patch.object(simple_scraper, "md") as markdownify:
+            result = _build_result(PAGE, "https://a.com", 200, ["markdown"], True)
+        markdownify.assert_not_called()
+        assert "0,15 €" in result["data"]["markdown"]
+
+    def test_fallback_strips_boilerplate(self):
+        html_content = (
+            "<html><head><script>var x=1;</script></head><body><nav>Menú</nav>"
+            "<p>Precio 0,15</p><footer>Legal</footer></body></html>"
+        )
+        result = _build_result(html_content, "https://a.com", 200, ["html"], False)
+        cleaned = result["data"]["html"]
+        assert "Precio 0,15" in cleaned
+        assert "Menú" not in cleaned and "Legal" not in cleaned and "var x" not in cleaned
+
+    def test_xml_declaration_and_empty_page(self):
+        declared = '<?xml version="1.0" encoding="iso-8859-1"?><html><body><p>ñandú</p></body></html>'
+        assert "ñandú" in _build_result(declared, "https://a.com", 200, ["markdown"], False)["data"]["markdown"]
+        assert _build_result("", "https://a.com", 200, ["markdown"], True)["success"] is True
+
+
+def _reference_metadata_and_links(tree, url, status_code):
+    """Implementación anterior: find(<title>), recorrido de <meta> y otro de <a> con urljoin/urlparse."""
+    title_tag = tree.find(".//title")
+    title = " ".join(title_tag.text_content().split()) if title_tag is not None else ""
+    by_name, by_property = {}, {}
+    for tag in tree.iter("meta"):
+        name = tag.get("name")
+        if name is not None and name not in by_name:
+            by_name[name] = tag.get("content", "")
+        prop = tag.get("property")
+        if prop is not None and prop not in by_property:
+            by_property[prop] = tag.get("content", "")
+    metadata = {
+        "title": title,
+        "description": by_name.get("description", ""),
+        "language": tree.get("lang", ""),
+        "keywords": by_name.get("keywords", ""),
+        "robots": by_name.get("robots", ""),
+        "ogTitle": by_property.get("og:title", ""),
+        "ogDescription": by_property.get("og:description", ""),
+        "ogUrl": by_property.get("og:url", ""),
+        "ogImage": by_property.get("og:image", "") or by_name.get("twitter:image", ""),
+        "ogSiteName": by_property.get("og:site_name", ""),
+        "ogType": by_property.get("og:type", ""),
+        "sourceURL": url,
+        "statusCode": status_code,
+    }
+
+    links = set()
+    for a_tag in tree.iter("a"):
+        href = a_tag.get("href")
+        if href is None or href.startswith(("#", "javascript:", "mailto:", "tel:")):
+            continue
+        parsed = urlparse(urljoin(url, href))
+        if parsed.scheme in ("http", "https"):
+            clean_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+            if parsed.query:
+                clean_url += f"?{parsed.query}"
+            links.add(clean_url)
+    return metadata, sorted(links)
+
+
+LINKS_PAGE = """
+<html><head><title>Links</title></head><body>
+<a href="https://a.com/x#precios">1</a> <a href="/tarifas?luz=1">2</a> <a href="../gas">3</a>
+<a href="//cdn.a.com/img">4</a> <a href="HTTPS://A.com/Y">5</a> <a href="/a/./b/../c">6</a>
+<a href="/s;jsessionid=1?x">7</a> <a href="https://a.com/x?">8</a> <a href=" /espacio ">9</a>
+<a href="/ñ">10</a> <a href="ftp://a.com/f">11</a> <a href="mailto:x@a.com">12</a>
+<a href="#top">13</a> <a href="/">14</a> <a href="?pagina=2">15</a> <a href="/a//b">16</a>
+<a>sin href</a>
+</body></html>
+"""
+
+
+class TestMetadataAndLinks:
+    """Metadata y links en un solo recorrido, igual que la implementación anterior."""
+
+    @pytest.mark.parametrize("html_content", [
+        _page("utility_tariffs.html"), _page("news_article.html"),
+        _page("retailer_listing.html"), LINKS_PAGE, PAGE, "",
+    ])
+    def test_same_output_as_reference(self, html_content):
+        tree = _parse_html(html_content)
+        for url in ("https://www.shop.example.com/mujer/vestidos?p=1", "http://a.com"):
+            expected = _reference_metadata_and_links(tree, url, 200)
+            assert _extract_metadata_and_links(tree, url, 200, with_links=True) == expected
+            assert _extract_metadata_and_links(tree, url, 200) == (expected[0], None)
+
+    def test_links_only_walked_when_requested(self):
+        with patch.object(simple_scraper, "_resolve_link") as resolve:
+            result = _build_result(LINKS_PAGE, "https://a.com", 200, ["markdown"], True)
+        resolve.assert_not_called()
+        assert "links" not in result["data"]
+
+    def test_micro_benchmark_against_reference(self):
+        # ~9.500 <a> en la página de listado de la tienda
+        tree = _parse_html(_page("retailer_listing.html"))
+        url = "https://www.shop.example.com/mujer"
+
+        def best_of(fn, rounds=3):
+            times = []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                fn()
+                times.append(time.perf_counter() - started)
+            return min(times)
+
+        reference = best_of(lambda: _reference_metadata_and_links(tree, url, 200))
+        single_pass = best_of(lambda: _extract_metadata_and_links(tree, url, 200, with_links=True))
+        metadata_only = best_of(lambda: _extract_metadata_and_links(tree, url, 200))
+        # Localmente ~6x; margen amplio para máquinas de CI cargadas
+        assert single_pass < reference / 2
+        assert metadata_only < single_pass
+
+
+class TestJsShell:
+    """Señales de página pintada con JavaScript (domain_profile)."""
+
+    @pytest.mark.parametrize("html_content", [
+        '<html><body><div id="root"></div><script src="/app.js"></script></body></html>',
+        '<html><body><div id="__next"> </div></body></html>',
+        "<html><body><noscript>Activa JavaScript</noscript></body></html>",
+        "<html><body><p>Cargando</p><script>" + "var x = 1;" * 200 + "</script></body></html>",
+    ])
+    def test_spa_shells(self, html_content):
+        assert _looks_like_js_shell(_parse_html(html_content))
+
+    @pytest.mark.parametrize("html_content", [
+        "<html><body><h1>Contacto</h1><p>Llámanos al 900 000 000</p></body></html>",
+        # GTM: <noscript> en casi cualquier web, con contenido normal
+        '<html><body><noscript><iframe src="https://gtm"></iframe></noscript>'
+        '<div id="app"><p>Tarifa 0,15 €/kWh</p></div><script>gtag();</script></body></html>',
+        _page("utility_tariffs.html"),
+    ])
+    def test_static_pages(self, html_content):
+        assert not _looks_like_js_shell(_parse_html(html_content))
+
+    def test_in_build_result(self):
+        result = _build_result(PAGE, "https://a.com", 200, ["markdown"], True)
+        assert result["data"]["jsShell"] is False
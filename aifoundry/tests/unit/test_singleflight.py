@@ -0,0 +1,106 @@
+"""
+Tests para utils/singleflight.py — SingleFlight.
+"""
+
+import asyncio
+
+import pytest
+
+from aifoundry.app.utils.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    async def test_concurrent_calls_share_one_execution(self):
+        flights = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return {"value": 42}
+
+        results = await asyncio.gather(*(flights.do("k", work) for _ in range(5)))
+
+        assert calls == 1
+        assert all(r == {"value": 42} for r in results)
+        assert flights.coalesced == 4
+        assert flights.in_flight() == 0
+
+    async def test_different_keys_run_separately(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def work(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key
+
+        results = await asyncio.gather(
+            flights.do("a", lambda: work("a")),
+            flights.do("b", lambda: work("b")),
+        )
+        assert results == ["a", "b"]
+        assert sorted(calls) == ["a", "b"]
+
+    async def test_sequential_calls_are_not_cached(self):
+        flights = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await flights.do("k", work) == 1
+        assert await flights.do("k", work) == 2
+
+    async def test_exception_propagates_to_all_waiters(self):
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            flights.do("k", work), flights.do("k", work), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flights.in_flight() == 0
+
+    async def test_leader_cancel_does_not_cancel_followers(self):
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        leader = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await follower == "ok"
+
+    async def test_last_waiter_cancel_cancels_work(self):
+        flights = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        caller = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+        assert cancelled.is_set()
+        assert flights.in_flight() == 0
@@ -2,14 +2,28 @@
 Tests unitarios del módulo de resolución de tools.
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
+from langchain_core.tools import ToolException
 
 from aifoundry.app.core.agents.scraper.tool_executor import (
     ToolResolver,
     _tool_error_handler,
     _is_no_data_error,
+    _with_deadline,
+    _with_host_politeness,
+    _with_rate_limit,
+)
+from aifoundry.app.utils.deadline import Deadline, deadline_scope
+from aifoundry.app.utils.domain_profile import (
+    FETCHER_BROWSER,
+    REASON_CONNECTION,
+    get_domain_profiles,
 )
+from aifoundry.app.utils.host_scheduler import HostScheduler, RobotsDisallowedError
+from aifoundry.app.utils.rate_limiter import BraveRateLimiter
 
 
 class TestToolErrorHandler:
@@ -29,6 +43,120 @@ class TestToolErrorHandler:
         assert len(result) < 600
 
 
+class TestWithDeadline:
+    """Tools MCP acotadas al deadline del run."""
+
+    async def test_without_deadline_unchanged(self):
+        wrapped = _with_deadline("brave_web_search", AsyncMock(return_value="ok"))
+        assert await wrapped(query="x") == "ok"
+
+    async def test_deadline_raises_tool_exception(self):
+        async def slow(**kwargs):
+            await asyncio.sleep(5)
+
+        wrapped = _with_deadline("browser_navigate", slow)
+        with deadline_scope(Deadline(0.05)):
+            with pytest.raises(ToolException, match="browser_navigate"):
+                await wrapped(url="https://a.com")
+
+
+class TestWithHostPoliteness:
+    """browser_navigate pasa por el planificador por host."""
+
+    @pytest.fixture
+    def client(self):
+        client = MagicMock()
+        client.scheduler = HostScheduler(max_concurrency=1)
+        client.check_robots = AsyncMock()
+        with patch(
+            "aifoundry.app.core.agents.scraper.tool_executor.get_scrape_http_client",
+            return_value=client,
+        ):
+            yield client
+
+    async def test_navigation_uses_host_slot(self, client):
+        active = []
+        peak = []
+
+        async def navigate(url):
+            active.append(url)
+            peak.append(len(active))
+            await asyncio.sleep(0.01)
+            active.remove(url)
+            return "ok"
+
+        wrapped = _with_host_politeness(navigate)
+        results = await asyncio.gather(*(wrapped(url="https://a.com/x") for _ in range(3)))
+
+        assert results == ["ok"] * 3
+        assert max(peak) == 1
+        assert client.check_robots.await_count == 3
+
+    async def test_robots_disallowed_raises_tool_exception(self, client):
+        client.check_robots.side_effect = RobotsDisallowedError("https://a.com/privado")
+        navigate = AsyncMock()
+        wrapped = _with_host_politeness(navigate)
+
+        with pytest.raises(ToolException, match="robots.txt"):
+            await wrapped(url="https://a.com/privado")
+        navigate.assert_not_called()
+
+    async def test_without_url_unchanged(self, client):
+        wrapped = _with_host_politeness(AsyncMock(return_value="snapshot"))
+        assert await wrapped() == "snapshot"
+        client.check_robots.assert_not_called()
+
+    async def test_navigation_recorded_in_domain_profile(self, client):
+        wrapped = _with_host_politeness(AsyncMock(return_value="ok"))
+        await wrapped(url="https://a.com/x")
+        failing = _with_host_politeness(AsyncMock(side_effect=ToolException("net::ERR_NAME_NOT_RESOLVED")))
+        with pytest.raises(ToolException):
+            await failing(url="https://caido.com")
+
+        profiles = get_domain_profiles()
+        assert profiles.get("https://a.com").successes == 1
+        assert profiles.get("https://caido.com").consecutive_failures == 1
+
+    async def test_dead_domain_rejected_without_browser(self, client):
+        profiles = get_domain_profiles()
+        for _ in range(profiles.dead_after):
+            profiles.record("https://caido.com", FETCHER_BROWSER, False, reason=REASON_CONNECTION)
+        navigate = AsyncMock()
+        wrapped = _with_host_politeness(navigate)
+
+        with pytest.raises(ToolException, match="Dominio sin respuesta"):
+            await wrapped(url="https://caido.com/tarifas")
+        navigate.assert_not_called()
+        client.check_robots.assert_not_called()
+
+
+class TestWithRateLimit:
+    """Las búsquedas de Brave pasan por el BraveRateLimiter."""
+
+    @pytest.fixture
+    def limiter(self):
+        limiter = BraveRateLimiter(requests_per_second=100.0, max_retries=3)
+        with patch(
+            "aifoundry.app.core.agents.scraper.tool_executor.get_brave_rate_limiter",
+            return_value=limiter,
+        ):
+            yield limiter
+
+    async def test_search_goes_through_limiter(self, limiter):
+        search = AsyncMock(return_value="resultados")
+        wrapped = _with_rate_limit(search)
+        assert await wrapped(query="tarifas luz") == "resultados"
+        search.assert_awaited_once_with(query="tarifas luz")
+        assert limiter.requests == 1
+
+    async def test_retries_429(self, limiter):
+        search = AsyncMock(side_effect=[ToolException("429 Too Many Requests"), "resultados"])
+        wrapped = _with_rate_limit(search)
+        assert await wrapped(query="tarifas luz") == "resultados"
+        assert search.await_count == 2
+        assert limiter.throttled == 1
+
+
 class TestIsNoDataError:
     """Tests de detección de errores sin datos."""
 
@@ -55,6 +183,7 @@ class TestToolResolver:
 
         tool_names = [t.name for t in tools]
         assert "simple_scrape_url" in tool_names
+        assert "simple_scrape_urls" in tool_names
 
     def test_get_local_tools_disable_scrape(self):
         """disable_simple_scrape excluye simple_scrape_url."""
@@ -63,6 +192,7 @@ class TestToolResolver:
 
         tool_names = [t.name for t in tools]
         assert "simple_scrape_url" not in tool_names
+        assert "simple_scrape_urls" not in tool_names
 
     def test_get_local_tools_custom(self):
         """custom_tools sobreescribe las tools locales."""
@@ -84,6 +214,7 @@ class TestToolResolver:
 
         mock_mcp_tool = MagicMock()
         mock_mcp_tool.name = "brave_web_search"
+        original_coroutine = mock_mcp_tool.coroutine
         mock_mcp_instance = MagicMock()
         mock_mcp_instance.get_tools = AsyncMock(return_value=[mock_mcp_tool])
         mock_mcp_cls.return_value = mock_mcp_instance
@@ -97,6 +228,8 @@ class TestToolResolver:
 
         # Verificar que se configuró error handler
         assert mock_mcp_tool.handle_tool_error is not None
+        # Y que la búsqueda pasa por el rate limiter de Brave
+        assert mock_mcp_tool.coroutine.__wrapped__.__wrapped__ is original_coroutine
 
         await resolver.cleanup()
 
@@ -145,4 +278,39 @@ class TestToolResolver:
     async def test_cleanup_no_mcp(self):
         """cleanup() sin MCP no lanza error."""
         resolver = ToolResolver(use_mcp=False)
-        await resolver.cleanup()  # No debe lanzar
\ No newline at end of file
+        await resolver.cleanup()  # No debe lanzar
+
+class TestToolResolverHealthCheck:
+    """Tests del health check de conexiones MCP."""
+
+    async def test_no_mcp_always_healthy(self):
+        resolver = ToolResolver(use_mcp=False)
+        assert await resolver.health_check() is True
+
+    async def test_mcp_not_loaded_unhealthy(self):
+        resolver = ToolResolver(use_mcp=True)
+        assert await resolver.health_check() is False
+
+    @patch("aifoundry.app.core.agents.scraper.tool_executor.get_mcp_configs")
+    @patch("aifoundry.app.core.agents.scraper.tool_executor.MultiServerMCPClient")
+    async def test_ping_ok_and_failure(self, mock_mcp_cls, mock_get_configs):
+        mock_get_configs.return_value = {"brave": {"url": "http://fake"}}
+        mock_tool = MagicMock()
+        mock_tool.name = "brave_web_search"
+        session = MagicMock()
+        session.send_ping = AsyncMock()
+        session_cm = MagicMock()
+        session_cm.__aenter__ = AsyncMock(return_value=session)
+        session_cm.__aexit__ = AsyncMock(return_value=False)
+        mock_mcp_instance = MagicMock()
+        mock_mcp_instance.get_tools = AsyncMock(return_value=[mock_tool])
+        mock_mcp_instance.session = MagicMock(return_value=session_cm)
+        mock_mcp_cls.return_value = mock_mcp_instance
+
+        resolver = ToolResolver(use_mcp=True)
+        await resolver.resolve_tools()
+        assert await resolver.health_check() is True
+        mock_mcp_instance.session.assert_called_with("brave")
+
+        session.send_ping.side_effect = Exception("connection refused")
+        assert await resolver.health_check() is False
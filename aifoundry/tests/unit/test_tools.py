@@ -0,0 +1,280 @@
+"""
+Tests para las tools locales del scraper (core/agents/scraper/tools.py).
+
+simple_scrape_async se sustituye por un fake: sin red.
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+from aifoundry.app.config import settings
+from aifoundry.app.core.agents.scraper import tools
+from aifoundry.app.core.agents.scraper.tools import simple_scrape_url, simple_scrape_urls
+from aifoundry.app.utils.condense import CHARS_PER_TOKEN, PageFocus, focus_scope
+from aifoundry.app.utils.deadline import Deadline, deadline_scope
+from aifoundry.app.utils.domain_profile import (
+    FETCHER_SIMPLE,
+    REASON_BLOCKED,
+    REASON_CONNECTION,
+    REASON_NEEDS_JS,
+    ROUTE_DEAD,
+    ROUTE_SIMPLE,
+    get_domain_profiles,
+)
+from aifoundry.app.utils.prefetch import PrefetchCache, prefetch_scope
+
+
+def _page(url: str, markdown: str = "Precio 0,15 €/kWh", js_shell: bool = False) -> dict:
+    return {
+        "success": True,
+        "data": {
+            "markdown": markdown,
+            "metadata": {"title": f"Título {url}", "sourceURL": url},
+            "jsShell": js_shell,
+        },
+    }
+
+
+class TestSimpleScrapeUrl:
+    async def test_success(self):
+        async def fake(url, formats, timeout=30.0):
+            return _page(url)
+
+        with patch.object(tools, "_simple_scrape", fake):
+            output = await simple_scrape_url.ainvoke({"url": "https://a.com"})
+        assert output.startswith("# Título https://a.com")
+        assert "Source: https://a.com" in output
+
+    async def test_condenses_to_run_focus(self):
+        # Menú y cookies al principio, la tabla de precios al final
+        noise = "\n".join(f"[Sección {i}](https://a.com/{i}) · cookies y privacidad" for i in range(400))
+        table = "| Tarifa | Precio |\n|---|---|\n| One Luz Endesa | 0,149 €/kWh |"
+        markdown = f"{noise}\n## Tarifas Endesa\n{table}"
+
+        async def fake(url, formats, timeout=30.0):
+            return _page(url, markdown=markdown)
+
+        focus = PageFocus(["electricidad", "Endesa", "España"], token_budget=500)
+        with patch.object(tools, "_simple_scrape", fake), focus_scope(focus):
+            output = await simple_scrape_url.ainvoke({"url": "https://a.com"})
+
+        assert "0,149 €/kWh" in output
+        assert len(output) < 500 * CHARS_PER_TOKEN + 200
+
+    async def test_error_uses_tip_from_scraper(self):
+        async def fake(url, formats, timeout=30.0):
+            return {"success": False, "error": "Contenido no HTML (application/pdf)", "tip": "Usa otra URL"}
+
+        with patch.object(tools, "_simple_scrape", fake):
+            output = await simple_scrape_url.ainvoke({"url": "https://a.com/x.pdf"})
+        assert '"tip": "Usa otra URL"' in output
+
+
+class TestPrefetched:
+    """Las URLs precargadas tras la búsqueda se sirven sin volver a descargar."""
+
+    async def test_single_and_batch_use_prefetch(self):
+        prefetched = []
+        fetched = []
+
+        async def prefetch_fetch(url, timeout):
+            prefetched.append(url)
+            return _page(url, markdown="Precargada 0,15 €/kWh")
+
+        async def fake(url, formats, timeout=30.0):
+            fetched.append(url)
+            return _page(url)
+
+        with patch.object(tools, "_simple_scrape", fake), \
+                prefetch_scope(PrefetchCache(fetch=prefetch_fetch)) as prefetch:
+            prefetch.prefetch(["https://a.com", "https://b.com"])
+            single = await simple_scrape_url.ainvoke({"url": "https://a.com"})
+            batch = await simple_scrape_urls.ainvoke({"urls": ["https://b.com", "https://c.com"]})
+
+        assert "Precargada" in single
+        assert batch.startswith("Scrapeadas 2/2 URLs")
+        assert prefetched == ["https://a.com", "https://b.com"]
+        assert fetched == ["https://c.com"]
+
+
+class TestDomainRouting:
+    """El perfil por dominio evita descargas que ya se sabe que no sirven."""
+
+    async def test_known_domains_answer_without_fetching(self, monkeypatch):
+        monkeypatch.setattr(settings, "scrape_domain_js_after", 1)
+        monkeypatch.setattr(settings, "scrape_domain_dead_after", 1)
+        profiles = get_domain_profiles()
+        profiles.record("https://spa.com", FETCHER_SIMPLE, False, reason=REASON_BLOCKED)
+        profiles.record("https://caido.com", FETCHER_SIMPLE, False, reason=REASON_CONNECTION)
+        fetched = []
+
+        async def fake(url, formats, timeout=30.0):
+            fetched.append(url)
+            return _page(url, markdown="Precio 0,15 €/kWh. " * 20)
+
+        with patch.object(tools, "_simple_scrape", fake):
+            single = await simple_scrape_url.ainvoke({"url": "https://www.spa.com/tarifas"})
+            batch = await simple_scrape_urls.ainvoke(
+                {"urls": ["https://ok.com", "https://caido.com/precios"]}
+            )
+
+        assert fetched == ["https://ok.com"]
+        assert '"tip": "Usa browser_navigate directamente con esta URL"' in single
+        assert batch.startswith("Scrapeadas 1/2 URLs")
+        assert "Error: Dominio sin respuesta en runs anteriores (connection)" in batch
+
+    async def test_records_outcomes(self):
+        async def fake(url, formats, timeout=30.0):
+            if "vacia" in url:
+                return _page(url, markdown="Cargando...", js_shell=True)
+            if "bloqueo" in url:
+                return {"success": False, "error": "HTTP 403: Forbidden"}
+            return _page(url, markdown="Precio 0,15 €/kWh. " * 20)
+
+        urls = ["https://ok.com", "https://vacia.com", "https://bloqueo.com"]
+        with patch.object(tools, "_simple_scrape", fake):
+            await simple_scrape_urls.ainvoke({"urls": urls})
+
+        profiles = get_domain_profiles()
+        assert profiles.get("https://ok.com").success_rate == 1.0
+        assert profiles.get("https://ok.com").avg_latency is not None
+        assert profiles.get("https://vacia.com").last_failure == REASON_NEEDS_JS
+        assert profiles.get("https://bloqueo.com").last_failure == REASON_BLOCKED
+
+    async def test_short_static_page_keeps_simple_route(self, monkeypatch):
+        monkeypatch.setattr(settings, "scrape_domain_js_after", 1)
+
+        async def fake(url, formats, timeout=30.0):
+            return _page(url, markdown="Contacto: 900 000 000")
+
+        with patch.object(tools, "_simple_scrape", fake):
+            await simple_scrape_url.ainvoke({"url": "https://corta.com/contacto"})
+            await simple_scrape_url.ainvoke({"url": "https://corta.com/tarifa"})
+
+        profiles = get_domain_profiles()
+        assert profiles.route("https://corta.com") == ROUTE_SIMPLE
+        assert profiles.get("https://corta.com").success_rate == 1.0
+
+    async def test_deadline_timeout_does_not_mark_domain_dead(self, monkeypatch):
+        monkeypatch.setattr(settings, "scrape_domain_dead_after", 1)
+
+        async def fake(url, formats, timeout=30.0):
+            return {"success": False, "error": f"Timeout después de {timeout:g}s"}
+
+        with patch.object(tools, "_simple_scrape", fake):
+            # Poco tiempo de run: el timeout se recorta
+            with deadline_scope(Deadline(5)):
+                await simple_scrape_url.ainvoke({"url": "https://lento.com"})
+            assert get_domain_profiles().route("https://lento.com") == ROUTE_SIMPLE
+            # Con el timeout completo sí cuenta
+            await simple_scrape_url.ainvoke({"url": "https://lento.com"})
+        assert get_domain_profiles().route("https://lento.com") == ROUTE_DEAD
+
+
+class TestSimpleScrapeUrls:
+    async def test_fetches_concurrently(self):
+        async def fake(url, formats, timeout=30.0):
+            await asyncio.sleep(0.2)
+            return _page(url)
+
+        urls = [f"https://a{i}.com" for i in range(5)]
+        with patch.object(tools, "_simple_scrape", fake):
+            started = time.monotonic()
+            output = await simple_scrape_urls.ainvoke({"urls": urls})
+            elapsed = time.monotonic() - started
+
+        assert elapsed < 0.6
+        assert output.startswith("Scrapeadas 5/5 URLs")
+        # Mismo orden que la entrada
+        positions = [output.index(f"✅ {url}") for url in urls]
+        assert positions == sorted(positions)
+
+    async def test_per_url_status(self):
+        async def fake(url, formats, timeout=30.0):
+            if "falla" in url:
+                return {"success": False, "error": "HTTP 403: Forbidden"}
+            if "pdf" in url:
+                return {"success": False, "error": "Contenido no HTML", "tip": "Usa otra URL"}
+            if "boom" in url:
+                raise RuntimeError("inesperado")
+            return _page(url)
+
+        urls = ["https://ok.com", "https://falla.com", "https://a.com/x.pdf", "https://boom.com"]
+        with patch.object(tools, "_simple_scrape", fake):
+            output = await simple_scrape_urls.ainvoke({"urls": urls})
+
+        assert output.startswith("Scrapeadas 1/4 URLs")
+        assert "## [1] ✅ https://ok.com" in output
+        assert "## [2] ❌ https://falla.com\nError: HTTP 403: Forbidden\nTip: Intenta con playwright_navigate" in output
+        assert "Tip: Usa otra URL" in output
+        assert "Error: inesperado" in output
+
+    async def test_deduplicates_and_caps(self):
+        seen = []
+
+        async def fake(url, formats, timeout=30.0):
+            seen.append(url)
+            return _page(url)
+
+        urls = ["https://a.com", "https://a.com", " "] + [f"https://b{i}.com" for i in range(12)]
+        with patch.object(tools, "_simple_scrape", fake):
+            output = await simple_scrape_urls.ainvoke({"urls": urls})
+
+        assert len(seen) == 10
+        assert seen.count("https://a.com") == 1
+        assert "3 ignoradas" in output
+
+    async def test_total_timeout_cancels_slow_urls(self):
+        async def fake(url, formats, timeout=30.0):
+            if "lenta" in url:
+                await asyncio.sleep(10)
+            return _page(url)
+
+        with patch.object(tools, "_simple_scrape", fake), deadline_scope(Deadline(0.3)):
+            output = await simple_scrape_urls.ainvoke({"urls": ["https://rapida.com", "https://lenta.com"]})
+
+        assert "✅ https://rapida.com" in output
+        assert "❌ https://lenta.com\nError: Timeout del lote" in output
+
+    async def test_cancelling_the_tool_cancels_its_scrapes(self):
+        started = asyncio.Event()
+        cancelled = []
+
+        async def fake(url, formats, timeout=30.0):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(url)
+                raise
+            return _page(url)
+
+        urls = ["https://a.com", "https://b.com"]
+        with patch.object(tools, "_simple_scrape", fake):
+            call = asyncio.create_task(simple_scrape_urls.ainvoke({"urls": urls}))
+            await started.wait()
+            call.cancel()
+            await asyncio.gather(call, return_exceptions=True)
+            await asyncio.sleep(0)
+
+        assert sorted(cancelled) == urls
+
+    async def test_truncates_each_page(self):
+        async def fake(url, formats, timeout=30.0):
+            return _page(url, markdown="x" * 50_000)
+
+        with patch.object(tools, "_simple_scrape", fake):
+            output = await simple_scrape_urls.ainvoke({"urls": ["https://a.com", "https://b.com"]})
+        page_chars = settings.scrape_page_token_budget * tools._BATCH_PAGE_SHARE * CHARS_PER_TOKEN
+        assert len(output) < 2 * page_chars + 1000
+
+    async def test_expired_deadline_skips_fetch(self):
+        with patch.object(tools, "_simple_scrape") as mock_scrape, deadline_scope(Deadline(0)):
+            output = await simple_scrape_urls.ainvoke({"urls": ["https://a.com"]})
+        mock_scrape.assert_not_called()
+        assert "Tiempo agotado" in output
+
+    async def test_empty_list(self):
+        output = await simple_scrape_urls.ainvoke({"urls": []})
+        assert "vacía" in output
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la extracción del contenido principal.
+
+Compara, sobre un corpus de páginas guardadas, readability sola con el
+extractor por densidad (content_extractor.py) tal y como lo usa
+simple_scrape (readability solo si la calidad no llega al umbral):
+
+- Tiempo (mediana en ms) de la extracción, sin parseo ni markdown.
+- Caracteres de texto extraídos y su densidad de enlaces (menos es mejor).
+- F1 de palabras contra readability (cuánto coinciden ambos textos).
+- Si el extractor rápido tuvo que pasar a readability.
+
+Uso:
+    python scripts/bench_content_extraction.py                  # corpus de tests/fixtures/pages
+    python scripts/bench_content_extraction.py ./paginas -n 10  # otro directorio, 10 repeticiones
+"""
+
+import argparse
+import re
+import statistics
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Tuple
+
+import lxml.html
+from readability import Document
+
+from aifoundry.app.config import settings
+from aifoundry.app.utils.content_extractor import extract_main_content
+from aifoundry.app.utils.simple_scraper import _clean_html_for_markdown, _parse_html
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent.parent / "aifoundry" / "tests" / "fixtures" / "pages"
+_WORD_RE = re.compile(r"\w+")
+
+
+def readability_only(html_content: str) -> str:
+    return Document(_parse_html(html_content)).summary()
+
+
+def fast_first(html_content: str) -> str:
+    return _clean_html_for_markdown(_parse_html(html_content), use_readability=True)
+
+
+def _text_and_link_density(html: str) -> Tuple[str, float]:
+    if not html.strip():
+        return "", 0.0
+    root = lxml.html.fromstring(html)
+    text = root.text_content()
+    chars = len(text.strip()) or 1
+    links = sum(len(a.text_content()) for a in root.iter("a"))
+    return text, min(1.0, links / chars)
+
+
+def _word_f1(candidate: str, reference: str) -> float:
+    """F1 de la bolsa de palabras de `candidate` contra `reference`."""
+    cand = Counter(w.lower() for w in _WORD_RE.findall(candidate))
+    ref = Counter(w.lower() for w in _WORD_RE.findall(reference))
+    common = sum((cand & ref).values())
+    if not common:
+        return 0.0
+    precision = common / sum(cand.values())
+    recall = common / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def _time(fn, html_content: str, repeat: int) -> Tuple[float, str]:
+    """(mediana en milisegundos de `repeat` ejecuciones, último resultado)."""
+    samples = []
+    result = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(html_content)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", type=Path, default=DEFAULT_CORPUS,
+                        help="Directorio con páginas .html guardadas")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="Repeticiones por página")
+    args = parser.parse_args()
+
+    pages = sorted(args.corpus.glob("*.html"))
+    if not pages:
+        raise SystemExit(f"No hay páginas .html en {args.corpus}")
+
+    print(f"📄 Corpus: {args.corpus} ({len(pages)} páginas, mediana de {args.repeat} runs)")
+    print(f"   Umbral de calidad: {settings.scrape_extractor_min_quality}\n")
+    print(f"{'Página':<24} {'Calidad':>7} {'Readab. ms':>10} {'Rápido ms':>10} {'Speedup':>8} "
+          f"{'Chars R/F':>15} {'Enl. R/F':>11} {'F1':>5}")
+    print("-" * 97)
+
+    total_readability = total_fast = 0.0
+    fallbacks = 0
+    for page in pages:
+        html_content = page.read_text(encoding="utf-8", errors="replace")
+        readability_ms, readability_html = _time(readability_only, html_content, args.repeat)
+        fast_ms, fast_html = _time(fast_first, html_content, args.repeat)
+        _, quality = extract_main_content(_parse_html(html_content))
+        if quality < settings.scrape_extractor_min_quality:
+            fallbacks += 1
+
+        readability_text, readability_links = _text_and_link_density(readability_html)
+        fast_text, fast_links = _text_and_link_density(fast_html)
+        total_readability += readability_ms
+        total_fast += fast_ms
+        chars = f"{len(readability_text.strip())}/{len(fast_text.strip())}"
+        links = f"{readability_links:.2f}/{fast_links:.2f}"
+        print(f"{page.name:<24} {quality:>7.2f} {readability_ms:>10.1f} {fast_ms:>10.1f} "
+              f"{readability_ms / fast_ms:>7.1f}x {chars:>15} {links:>11} "
+              f"{_word_f1(fast_text, readability_text):>5.2f}")
+
+    print("-" * 97)
+    print(f"{'TOTAL':<24} {'':>7} {total_readability:>10.1f} {total_fast:>10.1f} "
+          f"{total_readability / total_fast:>7.1f}x")
+    print(f"\nPáginas que pasan a readability: {fallbacks}/{len(pages)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark del procesado de páginas en thread vs pool de procesos.
+
+Procesa el corpus de páginas guardadas muchas veces a la vez (como varios
+runs simultáneos) con el procesado en threads (SCRAPE_EXTRACT_WORKERS=0) y
+en el pool de procesos, y mide:
+
+- Páginas por segundo.
+- Retraso máximo del event loop (un ticker cada 10 ms): lo que tardan en
+  atenderse las demás corrutinas mientras se procesa.
+
+Uso:
+    python scripts/bench_extraction_pool.py                 # corpus de tests/fixtures/pages
+    python scripts/bench_extraction_pool.py -c 40 -w 8      # 40 páginas a la vez, 8 procesos
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from pathlib import Path
+
+from aifoundry.app.utils.extraction_pool import ExtractionPool
+from aifoundry.app.utils.simple_scraper import _build_result
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent.parent / "aifoundry" / "tests" / "fixtures" / "pages"
+FORMATS = ["markdown"]
+URL = "https://www.example.es/pagina"
+
+
+async def _loop_lag(stop: asyncio.Event) -> float:
+    """Retraso máximo (ms) de un sleep de 10 ms mientras no se pare."""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, (time.perf_counter() - started - 0.01) * 1000)
+    return worst
+
+
+async def _measure(pool: ExtractionPool, pages, concurrency: int):
+    # Un primer lote arranca los workers (no se mide)
+    await pool.run(_build_result, pages[0], URL, 200, FORMATS, True)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_loop_lag(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        pool.run(_build_result, pages[i % len(pages)], URL, 200, FORMATS, True)
+        for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return concurrency / elapsed, await lag_task
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", type=Path, default=DEFAULT_CORPUS,
+                        help="Directorio con páginas .html guardadas")
+    parser.add_argument("-c", "--concurrency", type=int, default=20, help="Páginas procesadas a la vez")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="Procesos del pool")
+    args = parser.parse_args()
+
+    pages = [p.read_text(encoding="utf-8", errors="replace") for p in sorted(args.corpus.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"No hay páginas .html en {args.corpus}")
+
+    print(f"📄 Corpus: {args.corpus} ({len(pages)} páginas, {args.concurrency} a la vez, "
+          f"{os.cpu_count()} CPUs)\n")
+    print(f"{'Modo':<22} {'Páginas/s':>10} {'Lag loop ms':>12}")
+    print("-" * 46)
+
+    for label, workers in (("thread", 0), (f"procesos ({args.workers})", args.workers)):
+        pool = ExtractionPool(max_workers=workers, max_pending=args.concurrency)
+        pool.start()
+        try:
+            rate, lag = await _measure(pool, pages, args.concurrency)
+        finally:
+            pool.shutdown()
+        print(f"{label:<22} {rate:>10.1f} {lag:>12.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la conversión HTML → Markdown de simple_scrape.
+
+Compara, sobre el contenido principal de un corpus de páginas guardadas,
+markdownify + limpieza de líneas vacías (SCRAPE_FAST_MARKDOWN=false) con el
+conversor de un solo recorrido (markdown_converter.py):
+
+- Tiempo (mediana en ms) de la conversión, sin parseo ni extracción.
+- Tamaño del markdown de cada uno y si ambos coinciden línea a línea.
+
+Uso:
+    python scripts/bench_markdown.py                  # corpus de tests/fixtures/pages
+    python scripts/bench_markdown.py ./paginas -n 10  # otro directorio, 10 repeticiones
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+import lxml.html
+from markdownify import markdownify as md
+
+from aifoundry.app.utils.markdown_converter import html_to_markdown
+from aifoundry.app.utils.simple_scraper import _main_content, _parse_html
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent.parent / "aifoundry" / "tests" / "fixtures" / "pages"
+
+
+def markdownify_convert(content) -> str:
+    """Conversión anterior: serializar, markdownify y quitar líneas vacías."""
+    markdown = md(lxml.html.tostring(content, encoding="unicode"), heading_style="ATX")
+    return "\n".join(line for line in markdown.split("\n") if line.strip()).strip()
+
+
+def _time(fn, content, repeat: int):
+    """(mediana en milisegundos de `repeat` ejecuciones, último resultado)."""
+    samples = []
+    result = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(content)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", type=Path, default=DEFAULT_CORPUS,
+                        help="Directorio con páginas .html guardadas")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="Repeticiones por página")
+    parser.add_argument("--full-page", action="store_true",
+                        help="Convertir la página entera (sin extraer el contenido principal)")
+    args = parser.parse_args()
+
+    pages = sorted(args.corpus.glob("*.html"))
+    if not pages:
+        raise SystemExit(f"No hay páginas .html en {args.corpus}")
+
+    print(f"📄 Corpus: {args.corpus} ({len(pages)} páginas, mediana de {args.repeat} runs)\n")
+    print(f"{'Página':<24} {'HTML KB':>8} {'markdownify ms':>15} {'Rápido ms':>10} {'Speedup':>8} "
+          f"{'Chars M/R':>15} {'Igual':>6}")
+    print("-" * 92)
+
+    total_markdownify = total_fast = 0.0
+    for page in pages:
+        tree = _parse_html(page.read_text(encoding="utf-8", errors="replace"))
+        content = tree.find(".//body") if args.full_page else _main_content(tree)
+        html_kb = len(lxml.html.tostring(content)) / 1024
+
+        markdownify_ms, expected = _time(markdownify_convert, content, args.repeat)
+        fast_ms, markdown = _time(html_to_markdown, content, args.repeat)
+        total_markdownify += markdownify_ms
+        total_fast += fast_ms
+        chars = f"{len(expected)}/{len(markdown)}"
+        print(f"{page.name:<24} {html_kb:>8.0f} {markdownify_ms:>15.1f} {fast_ms:>10.1f} "
+              f"{markdownify_ms / fast_ms:>7.1f}x {chars:>15} {'sí' if expected == markdown else 'no':>6}")
+
+    print("-" * 92)
+    print(f"{'TOTAL':<24} {'':>8} {total_markdownify:>15.1f} {total_fast:>10.1f} "
+          f"{total_markdownify / total_fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark del procesado de páginas de simple_scrape.
+
+Compara, sobre un corpus de páginas guardadas, el pipeline anterior
+(BeautifulSoup html.parser para metadata/links + readability parseando el
+string + otro BeautifulSoup en el fallback) con el actual (un único árbol
+lxml compartido).
+
+Uso:
+    python scripts/bench_scrape_parse.py                  # corpus de tests/fixtures/pages
+    python scripts/bench_scrape_parse.py ./paginas -n 10  # otro directorio, 10 repeticiones
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from markdownify import markdownify as md
+from readability import Document
+
+from aifoundry.app.utils.simple_scraper import _build_result, _clean_control_chars
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent.parent / "aifoundry" / "tests" / "fixtures" / "pages"
+FORMATS = ["markdown", "links"]
+URL = "https://www.example.es/pagina"
+
+
+def legacy_build_result(html_content: str) -> dict:
+    """Pipeline anterior: tres parseos (dos con html.parser puro Python)."""
+    soup = BeautifulSoup(html_content, "html.parser")
+
+    cleaned_input = _clean_control_chars(html_content)
+    doc = Document(cleaned_input)
+    cleaned = doc.summary()
+    title = doc.title()
+    if len(cleaned) < 200:
+        fallback = BeautifulSoup(cleaned_input, "html.parser")
+        for tag in fallback(["script", "style", "noscript", "iframe", "nav", "footer", "header"]):
+            tag.decompose()
+        cleaned = str(fallback.body) if fallback.body else cleaned_input
+
+    metadata = {
+        "title": title,
+        "description": (soup.find("meta", attrs={"name": "description"}) or {}).get("content", ""),
+    }
+    for prop in ("og:title", "og:description", "og:url", "og:image", "og:site_name", "og:type"):
+        soup.find("meta", property=prop)
+
+    links = sorted({a["href"] for a in soup.find_all("a", href=True)})
+    markdown = md(cleaned, heading_style="ATX")
+    return {"metadata": metadata, "links": links, "markdown": markdown}
+
+
+def current_build_result(html_content: str) -> dict:
+    return _build_result(html_content, URL, 200, FORMATS, True)
+
+
+def _time(fn, html_content: str, repeat: int) -> float:
+    """Mediana en milisegundos de `repeat` ejecuciones."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(html_content)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", type=Path, default=DEFAULT_CORPUS,
+                        help="Directorio con páginas .html guardadas")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="Repeticiones por página")
+    args = parser.parse_args()
+
+    pages = sorted(args.corpus.glob("*.html"))
+    if not pages:
+        raise SystemExit(f"No hay páginas .html en {args.corpus}")
+
+    print(f"📄 Corpus: {args.corpus} ({len(pages)} páginas, mediana de {args.repeat} runs)\n")
+    print(f"{'Página':<28} {'KB':>7} {'Anterior ms':>12} {'Actual ms':>10} {'Speedup':>8}")
+    print("-" * 69)
+
+    total_legacy = total_current = 0.0
+    for page in pages:
+        html_content = page.read_text(encoding="utf-8", errors="replace")
+        legacy = _time(legacy_build_result, html_content, args.repeat)
+        current = _time(current_build_result, html_content, args.repeat)
+        total_legacy += legacy
+        total_current += current
+        print(f"{page.name:<28} {len(html_content) / 1024:>7.0f} {legacy:>12.1f} {current:>10.1f} "
+              f"{legacy / current:>7.1f}x")
+
+    print("-" * 69)
+    print(f"{'TOTAL':<28} {'':>7} {total_legacy:>12.1f} {total_current:>10.1f} "
+          f"{total_legacy / total_current:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()